@@ -56,6 +56,9 @@ class EnvironmentConfig(FrozenClass):
     write_retry_count: int | None = None
     # if true, will randomize liquidation trades when liquidating.
     randomize_liquidation: bool = False
+    # number of worker processes to partition the agents across when running the agent loop.
+    # agents run in the main process if set to 1
+    num_shards: int = 1
 
     def __getitem__(self, attrib) -> None:
         return getattr(self, attrib)
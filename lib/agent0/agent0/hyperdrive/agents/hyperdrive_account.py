@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 import logging
-from typing import TypeVar
+from collections import defaultdict
+from typing import Sequence, TypeVar
 
 from eth_account.signers.local import LocalAccount
 from ethpy.hyperdrive.interface import HyperdriveReadInterface
@@ -11,6 +12,7 @@ from fixedpointmath import FixedPoint
 from agent0.base import MarketType, Trade
 from agent0.base.agents import EthAgent
 from agent0.base.policies import BasePolicy
+from agent0.hyperdrive.policies import HyperdrivePolicy
 from agent0.hyperdrive.state import HyperdriveMarketAction, HyperdriveWallet
 
 Policy = TypeVar("Policy", bound=BasePolicy)
@@ -111,9 +113,51 @@ class HyperdriveAgent(EthAgent[Policy, HyperdriveReadInterface, HyperdriveMarket
         # TODO: Deprecate the old wallet in favor of this new one
         actions: list[Trade[HyperdriveMarketAction]]
         actions, self.done_trading = self.policy.action(interface, self.wallet)
-        # edit each action in place
-        for action in actions:
-            if action.market_type == MarketType.HYPERDRIVE and action.market_action.maturity_time is None:
-                if action.market_action.trade_amount <= 0:
-                    raise ValueError("Trade amount cannot be zero or negative.")
+        _check_trades(actions)
         return actions
+
+    @classmethod
+    def get_trades_batch(
+        cls, agents: Sequence[HyperdriveAgent], interface: HyperdriveReadInterface
+    ) -> list[list[Trade[HyperdriveMarketAction]]]:
+        """Helper function for computing the trades of many agents at once
+
+        Agents with the same Hyperdrive policy class form a cohort, whose actions are evaluated in one pass
+        with the policy's `action_batch`. Other agents are evaluated one by one with `get_trades`.
+
+        Arguments
+        ---------
+        agents: Sequence[HyperdriveAgent]
+            The agents to compute trades for.
+        interface: HyperdriveReadInterface
+            The interface for the market on which the agents will be executing trades (MarketActions)
+
+        Returns
+        -------
+        list[list[Trade]]
+            The list of Trade type objects for each agent, in the order of the agents
+        """
+        agent_trades: list[list[Trade[HyperdriveMarketAction]]] = [[] for _ in agents]
+        cohorts: dict[type[HyperdrivePolicy], list[int]] = defaultdict(list)
+        for index, agent in enumerate(agents):
+            if isinstance(agent.policy, HyperdrivePolicy):
+                cohorts[type(agent.policy)].append(index)
+            else:
+                agent_trades[index] = agent.get_trades(interface)
+        for policy_type, indices in cohorts.items():
+            cohort_actions = policy_type.action_batch(
+                [agents[index].policy for index in indices], interface, [agents[index].wallet for index in indices]
+            )
+            for index, (actions, done_trading) in zip(indices, cohort_actions):
+                agents[index].done_trading = done_trading
+                _check_trades(actions)
+                agent_trades[index] = actions
+        return agent_trades
+
+
+def _check_trades(actions: list[Trade[HyperdriveMarketAction]]) -> None:
+    """Check that the trades of a policy are valid."""
+    for action in actions:
+        if action.market_type == MarketType.HYPERDRIVE and action.market_action.maturity_time is None:
+            if action.market_action.trade_amount <= 0:
+                raise ValueError("Trade amount cannot be zero or negative.")
@@ -123,7 +123,8 @@ def build_crash_trade_result(
     trade_result.raw_pool_config = pool_state.pool_config_to_dict
     # We call the conversion functions to convert them to human readable versions as well
     trade_result.pool_config = asdict(pool_state.pool_config)
-    trade_result.pool_config["contract_address"] = interface.hyperdrive_contract.address
+    # The contract objects report checksum addresses, while the addresses config can be lowercase
+    trade_result.pool_config["contract_address"] = Web3.to_checksum_address(interface.addresses.mock_hyperdrive)
     trade_result.pool_config["inv_time_stretch"] = FixedPoint(1) / trade_result.pool_config["time_stretch"]
 
     ## Get pool info
@@ -162,8 +163,8 @@ def build_crash_trade_result(
 
     ## Add extra info
     trade_result.contract_addresses = {
-        "hyperdrive_address": interface.hyperdrive_contract.address,
-        "base_token_address": interface.base_token_contract.address,
+        "hyperdrive_address": Web3.to_checksum_address(interface.addresses.mock_hyperdrive),
+        "base_token_address": Web3.to_checksum_address(interface.addresses.base_token),
     }
     # add additional information to the exception
     trade_result.additional_info = {
@@ -0,0 +1,67 @@
+"""Tests for the known error checks of crash reporting."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from ethpy.base import async_smart_contract_transact, get_gas_profile
+from ethpy.base.errors import ContractCallException
+from fixedpointmath import FixedPoint
+from web3.exceptions import ContractCustomError
+
+from agent0.base import MarketType, Trade
+from agent0.hyperdrive.interactive import InteractiveHyperdrive, LocalChain
+from agent0.hyperdrive.state import HyperdriveActionType, HyperdriveMarketAction, TradeResult, TradeStatus
+
+from .known_error_checks import check_for_slippage
+
+# needed to pass in fixtures
+# pylint: disable=redefined-outer-name
+
+
+@pytest.mark.anvil
+def test_profiled_slippage_revert(chain: LocalChain):
+    """Slippage is detected for transactions sent with a profiled gas limit, which revert on chain."""
+    interactive_hyperdrive = InteractiveHyperdrive(chain)
+    interface = interactive_hyperdrive.hyperdrive_interface
+    agent = interactive_hyperdrive.init_agent(base=FixedPoint(1_000_000), eth=FixedPoint(100))
+    gas_profile = get_gas_profile(interface.web3)
+    gas_profile.enabled = True
+    try:
+        # Open longs until the profile has enough samples to skip estimating gas
+        for _ in range(gas_profile.min_samples):
+            agent.open_long(FixedPoint(1_000))
+        trade_amount = FixedPoint(1_000)
+        # Ask for far more bonds than the trade can give, which reverts with OutputLimit
+        fn_args = (
+            trade_amount.scaled_value,
+            (trade_amount * 10).scaled_value,
+            0,
+            (agent.agent.checksum_address, True, bytes(0)),
+        )
+        func_handle = interface.hyperdrive_contract.get_function_by_name("openLong")(*fn_args)
+        assert gas_profile.get_gas_limit((func_handle.address, func_handle.selector.lower())) is not None
+        block_number = interface.web3.eth.block_number
+        with pytest.raises(ContractCallException) as exc_info:
+            asyncio.run(
+                async_smart_contract_transact(
+                    interface.web3, interface.hyperdrive_contract, agent.agent, "openLong", *fn_args
+                )
+            )
+    finally:
+        gas_profile.enabled = False
+    # The transaction was mined, instead of failing when estimating gas
+    assert interface.web3.eth.block_number == block_number + 1
+    assert isinstance(exc_info.value.orig_exception, ContractCustomError)
+    trade_result = TradeResult(
+        status=TradeStatus.FAIL,
+        agent=agent.agent,
+        trade_object=Trade(
+            market_type=MarketType.HYPERDRIVE,
+            market_action=HyperdriveMarketAction(HyperdriveActionType.OPEN_LONG, trade_amount),
+        ),
+        exception=exc_info.value,
+    )
+    trade_result = check_for_slippage(trade_result)
+    assert trade_result.is_slippage
+    assert trade_result.exception is not None and trade_result.exception.args[0] == "Slippage detected"
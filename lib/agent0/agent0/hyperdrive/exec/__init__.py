@@ -9,4 +9,18 @@ from .fund_agents import async_fund_agents
 from .get_agent_accounts import get_agent_accounts, set_max_approval
 from .run_agents import build_wallet_positions_from_data, setup_and_run_agent_loop
 from .setup_experiment import setup_experiment
-from .trade_loop import get_wait_for_new_block, trade_if_new_block
+from .scenario_runner import (
+    Scenario,
+    ScenarioAgents,
+    ScenarioResults,
+    VariableRateModel,
+    run_scenarios,
+    sweep_scenarios,
+)
+from .sharded_runner import AgentShard, ShardResult, async_run_agents_sharded
+from .trade_loop import (
+    async_trade_if_new_block,
+    async_wait_for_new_block,
+    get_wait_for_new_block,
+    trade_if_new_block,
+)
@@ -4,7 +4,6 @@ from __future__ import annotations
 import asyncio
 from typing import TYPE_CHECKING
 
-from ethpy.base import retry_call
 from ethpy.hyperdrive import ReceiptBreakdown
 from ethpy.hyperdrive.interface import HyperdriveReadWriteInterface
 from web3.types import Nonce
@@ -30,8 +29,6 @@ from agent0.test_utils import assert_never
 if TYPE_CHECKING:
     from agent0.hyperdrive.agents import HyperdriveAgent
 
-DEFAULT_READ_RETRY_COUNT = 5
-
 
 async def async_execute_single_agent_trade(
     agent: HyperdriveAgent,
@@ -39,6 +36,7 @@ async def async_execute_single_agent_trade(
     liquidate: bool,
     randomize_liquidation: bool,
     interactive_mode: bool,
+    trades: list[Trade[HyperdriveMarketAction]] | None = None,
 ) -> list[TradeResult]:
     """Executes a single agent's trade. This function is async as
     `match_contract_call_to_trade` waits for a transaction receipt.
@@ -55,6 +53,9 @@ async def async_execute_single_agent_trade(
         If set, will randomize the order of liquidation trades
     interactive_mode: bool
         If set, running in interactive mode
+    trades: list[Trade[HyperdriveMarketAction]] | None, optional
+        The trades to execute, if they were already computed from the agent's policy.
+        Defaults to computing the trades.
 
     Returns
     -------
@@ -62,21 +63,17 @@ async def async_execute_single_agent_trade(
         Returns a list of TradeResult objects, one for each trade made by the agent
         TradeResult handles any information about the trade, as well as any errors that the trade resulted in
     """
-    if liquidate:
-        # TODO: test this option
-        trades: list[Trade[HyperdriveMarketAction]] = agent.get_liquidation_trades(
-            interface, randomize_liquidation, interactive_mode
+    if trades is None:
+        # TODO: test the liquidate option
+        trades = (
+            agent.get_liquidation_trades(interface, randomize_liquidation, interactive_mode)
+            if liquidate
+            else agent.get_trades(interface=interface.get_read_interface())
         )
-    else:
-        trades: list[Trade[HyperdriveMarketAction]] = agent.get_trades(interface=interface.get_read_interface())
 
     # Make trades async for this agent. This way, an agent can submit multiple trades for a single block
-    # To do this, we need to manually set the nonce, so we get the base transaction count here
-    # and pass in an incrementing nonce per call
-    # TODO figure out which exception here to retry on
-    base_nonce = retry_call(
-        DEFAULT_READ_RETRY_COUNT, None, interface.web3.eth.get_transaction_count, agent.checksum_address
-    )
+    # Each transaction reserves its own nonce from the account's nonce manager, so we don't
+    # need to query the transaction count here
 
     # We expect the type here to be BaseException (due to the return type of asyncio.gather),
     # but the underlying exception should be subclassed from Exception.
@@ -86,10 +83,7 @@ async def async_execute_single_agent_trade(
     wallet_deltas_or_exception: list[
         tuple[HyperdriveWalletDeltas, ReceiptBreakdown] | BaseException
     ] = await asyncio.gather(
-        *[
-            async_match_contract_call_to_trade(agent, interface, trade_object, nonce=Nonce(base_nonce + i))
-            for i, trade_object in enumerate(trades)
-        ],
+        *[async_match_contract_call_to_trade(agent, interface, trade_object) for trade_object in trades],
         # Instead of throwing exception, return the exception to the caller here
         return_exceptions=True,
     )
@@ -133,6 +127,7 @@ async def async_execute_agent_trades(
     liquidate: bool,
     randomize_liquidation: bool = False,
     interactive_mode: bool = False,
+    batch_policy_actions: bool = False,
 ) -> list[TradeResult]:
     """Hyperdrive forever into the sunset.
 
@@ -148,6 +143,9 @@ async def async_execute_agent_trades(
         If set, will randomize the order of liquidation trades
     interactive_mode: bool
         Defines if this function is being called in interactive mode
+    batch_policy_actions: bool, optional
+        If set, agents with the same policy type compute their trades together in one batch.
+        Defaults to False.
 
     Returns
     -------
@@ -155,13 +153,18 @@ async def async_execute_agent_trades(
         Returns a list of TradeResult objects, one for each trade made by the agent
         TradeResult handles any information about the trade, as well as any errors that the trade resulted in
     """
+    trading_agents = [agent for agent in agents if not agent.done_trading]
+    agent_trades: list[list[Trade[HyperdriveMarketAction]] | None] = [None] * len(trading_agents)
+    if batch_policy_actions and not liquidate and len(trading_agents) > 0:
+        agent_trades = list(type(trading_agents[0]).get_trades_batch(trading_agents, interface.get_read_interface()))
     # Make calls per agent to execute_single_agent_trade
     # Await all trades to finish before continuing
     gathered_trade_results: list[list[TradeResult]] = await asyncio.gather(
         *[
-            async_execute_single_agent_trade(agent, interface, liquidate, randomize_liquidation, interactive_mode)
-            for agent in agents
-            if not agent.done_trading
+            async_execute_single_agent_trade(
+                agent, interface, liquidate, randomize_liquidation, interactive_mode, trades
+            )
+            for agent, trades in zip(trading_agents, agent_trades)
         ]
     )
     # Flatten list of lists, since agent information is already in TradeResult
@@ -186,7 +189,7 @@ async def async_match_contract_call_to_trade(
     agent: HyperdriveAgent,
     interface: HyperdriveReadWriteInterface,
     trade_envelope: Trade[HyperdriveMarketAction],
-    nonce: Nonce,
+    nonce: Nonce | None = None,
 ) -> tuple[HyperdriveWalletDeltas, ReceiptBreakdown]:
     """Match statement that executes the smart contract trade based on the provided type.
 
@@ -198,8 +201,9 @@ async def async_match_contract_call_to_trade(
         The Hyperdrive API interface object.
     trade_envelope: Trade[HyperdriveMarketAction]
         A specific Hyperdrive trade requested by the given agent.
-    nonce: Nonce
+    nonce: Nonce | None, optional
         Override the transaction number assigned to the transaction call from the agent wallet.
+        If not set, the nonce is reserved from the agent's nonce manager.
 
     Returns
     -------
@@ -11,18 +11,16 @@ from ethpy.base import (
     async_smart_contract_transact,
     get_account_balance,
     initialize_web3_with_http_provider,
-    retry_call,
 )
 from ethpy.hyperdrive import HyperdriveAddresses
 from hyperlogs import setup_logging
 from hypertypes.types import ERC20MintableContract
-from web3.types import Nonce, TxReceipt
+from web3.types import TxReceipt
 
 from agent0 import AccountKeyConfig
 from agent0.hyperdrive.agents import HyperdriveAgent
 
 FUND_RETRY_COUNT = 5
-DEFAULT_READ_RETRY_COUNT = 5
 
 
 # TODO break up this function
@@ -90,21 +88,12 @@ async def async_fund_agents(
     accounts_left = list(zip(agent_accounts, account_key_config.AGENT_ETH_BUDGETS))
     for attempt in range(FUND_RETRY_COUNT):
         # Fund agents async from a single account.
-        # To do this, we need to manually set the nonce, so we get the base transaction count here
-        # and pass in an incrementing nonce per call
-        # TODO figure out which exception here to retry on
-        base_nonce = retry_call(
-            DEFAULT_READ_RETRY_COUNT, None, web3.eth.get_transaction_count, user_account.checksum_address
-        )
-
+        # Each transfer reserves its own nonce from the user account's nonce manager,
+        # which resyncs with the chain if a batched transaction fails with a nonce error
         # Gather all async function calls in a list
-        # Running with retries
-        # Explicitly setting a nonce here due to nonce issues with launching a batch of transactions
         eth_funding_calls = [
-            async_eth_transfer(
-                web3, user_account, agent_account.checksum_address, agent_eth_budget, nonce=Nonce(base_nonce + i)
-            )
-            for i, (agent_account, agent_eth_budget) in enumerate(accounts_left)
+            async_eth_transfer(web3, user_account, agent_account.checksum_address, agent_eth_budget)
+            for agent_account, agent_eth_budget in accounts_left
         ]
         gather_results: list[TxReceipt | BaseException] = await asyncio.gather(
             *eth_funding_calls, return_exceptions=True
@@ -132,16 +121,9 @@ async def async_fund_agents(
     accounts_left = list(zip(agent_accounts, account_key_config.AGENT_BASE_BUDGETS))
     for attempt in range(FUND_RETRY_COUNT):
         # Fund agents async from a single account.
-        # To do this, we need to manually set the nonce, so we get the base transaction count here
-        # and pass in an incrementing nonce per call
-        # TODO figure out which exception here to retry on
-        base_nonce = retry_call(
-            DEFAULT_READ_RETRY_COUNT, None, web3.eth.get_transaction_count, user_account.checksum_address
-        )
-
+        # Each transfer reserves its own nonce from the user account's nonce manager,
+        # which resyncs with the chain if a batched transaction fails with a nonce error
         # Gather all async function calls in a list
-        # Running with retries
-        # Explicitly setting a nonce here due to nonce issues with launching a batch of transactions
         base_funding_calls = [
             async_smart_contract_transact(
                 web3,
@@ -150,9 +132,8 @@ async def async_fund_agents(
                 "transfer",
                 agent_account.checksum_address,
                 agent_base_budget,
-                nonce=Nonce(base_nonce + i),
             )
-            for i, (agent_account, agent_base_budget) in enumerate(accounts_left)
+            for agent_account, agent_base_budget in accounts_left
         ]
         gather_results: list[TxReceipt | BaseException] = await asyncio.gather(
             *base_funding_calls, return_exceptions=True
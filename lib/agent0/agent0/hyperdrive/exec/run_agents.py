@@ -4,15 +4,14 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
-import random
-import time
 from typing import TYPE_CHECKING
 
 from chainsync.db.api import balance_of, register_username
+from eth_account.account import Account
 from eth_typing import BlockNumber
 from ethpy import build_eth_config
 from ethpy.hyperdrive import fetch_hyperdrive_address_from_uri
-from ethpy.hyperdrive.interface import HyperdriveReadWriteInterface
+from ethpy.hyperdrive.interface import HyperdriveReadWriteInterface, SimulatedHyperdriveReadWriteInterface
 from fixedpointmath import FixedPoint
 from hexbytes import HexBytes
 
@@ -23,7 +22,8 @@ from agent0.hyperdrive.state import HyperdriveWallet, Long, Short
 from .create_and_fund_user_account import create_and_fund_user_account
 from .fund_agents import async_fund_agents
 from .setup_experiment import setup_experiment
-from .trade_loop import trade_if_new_block
+from .sharded_runner import async_run_agents_sharded
+from .trade_loop import async_trade_if_new_block, async_wait_for_new_block, get_wait_for_new_block
 
 if TYPE_CHECKING:
     import pandas as pd
@@ -35,10 +35,6 @@ if TYPE_CHECKING:
     from agent0.base.config import AgentConfig, EnvironmentConfig
     from agent0.hyperdrive.agents import HyperdriveAgent
 
-START_LATENCY = 1
-BACKOFF = 2
-
-
 # TODO: These functions might be able to have their arguments simplified, but for now we will ignore.
 # pylint: disable=too-many-arguments
 # pylint: disable=too-many-locals
@@ -93,16 +89,18 @@ def setup_and_run_agent_loop(
         load_wallet_state,
         liquidate,
     )
-    # Run the agent trades in a while True loop
-    run_agents(
-        environment_config,
-        eth_config,
-        account_key_config,
-        contract_addresses,
-        interface,
-        agent_accounts,
-        liquidate,
-        minimum_avg_agent_base,
+    # Run the agent trades in a while True loop, in a single event loop that lives across blocks
+    asyncio.run(
+        async_run_agents(
+            environment_config,
+            eth_config,
+            account_key_config,
+            contract_addresses,
+            interface,
+            agent_accounts,
+            liquidate,
+            minimum_avg_agent_base,
+        )
     )
 
 
@@ -167,7 +165,7 @@ def setup_agents(
 
     # Setup env automatically & fund the agents
     if develop:
-        _ = async_fund_agents_with_fake_user(eth_config, account_key_config, contract_addresses, interface)
+        _ = asyncio.run(async_fund_agents_with_fake_user(eth_config, account_key_config, contract_addresses, interface))
 
     # Get hyperdrive interface object and agents
     agent_accounts = setup_experiment(
@@ -220,6 +218,58 @@ def run_agents(
     minimum_avg_agent_base: FixedPoint | None = None,
 ):
     """Run agent trades in a forever (while True) loop.
+    Runs `async_run_agents` in a new event loop.
+
+    Arguments
+    ---------
+    environment_config: EnvironmentConfig
+        The agent's environment configuration.
+    eth_config: EthConfig
+        Configuration for URIs to the rpc and artifacts.
+    account_key_config: AccountKeyConfig
+        Dataclass containing configuration options for the agent account, including keys and budgets.
+    contract_addresses: HyperdriveAddresses | None, optional
+        Configuration for the URIs to the Hyperdrive contract addresses.
+        If not set, will look for the addresses in eth_config.
+    interface: HyperdriveReadWriteInterface
+        An interface for Hyperdrive with contracts deployed on any chain with an RPC url.
+    agent_accounts: list[HyperdriveAgent]
+        A list of HyperdriveAgent that are conducting the trades
+    liquidate: bool, optional
+        If set, will ignore all policy settings and liquidate all open positions.
+        Defaults to False.
+    minimum_avg_agent_base: FixedPoint, optional
+        If set, then the script will fund the agents with their original budgets
+        whenever the average balance across wallets is less than this amount.
+    """
+    asyncio.run(
+        async_run_agents(
+            environment_config,
+            eth_config,
+            account_key_config,
+            contract_addresses,
+            interface,
+            agent_accounts,
+            liquidate,
+            minimum_avg_agent_base,
+        )
+    )
+
+
+async def async_run_agents(
+    environment_config: EnvironmentConfig,
+    eth_config: EthConfig,
+    account_key_config: AccountKeyConfig,
+    contract_addresses: HyperdriveAddresses,
+    interface: HyperdriveReadWriteInterface,
+    agent_accounts: list[HyperdriveAgent],
+    liquidate: bool = False,
+    minimum_avg_agent_base: FixedPoint | None = None,
+):
+    """Run agent trades in a forever (while True) loop, in the running event loop.
+    Async resources such as receipt waiters live across blocks, and trades run as soon as a new block is mined.
+    If `environment_config.num_shards` is more than 1, the agents are partitioned across worker processes.
+    With a simulated interface, a block is mined whenever no agent traded, instead of waiting for the chain.
 
     Arguments
     ---------
@@ -243,15 +293,32 @@ def run_agents(
         If set, then the script will fund the agents with their original budgets
         whenever the average balance across wallets is less than this amount.
     """
+    is_simulated = isinstance(interface, SimulatedHyperdriveReadWriteInterface)
+    if environment_config.num_shards > 1:
+        if is_simulated:
+            raise ValueError("Sharding is not supported with a simulated interface, since the pool is kept in memory.")
+        await async_run_agents_sharded(
+            environment_config,
+            eth_config,
+            account_key_config,
+            contract_addresses,
+            interface,
+            agent_accounts,
+            liquidate,
+            minimum_avg_agent_base,
+        )
+        return
+    # Automining doesn't change while running, so we only check once
+    # The simulated chain mines a block for every trade, like anvil with automining
+    wait_for_new_block = False if is_simulated else get_wait_for_new_block(interface.web3)
     # Check if all agents done trading
     # If so, exit cleanly
     # The done trading state variable gets set internally
     last_executed_block = BlockNumber(0)
-    poll_latency = START_LATENCY + random.uniform(0, 1)
     while True:
         if all(agent.done_trading for agent in agent_accounts):
             break
-        new_executed_block = trade_if_new_block(
+        new_executed_block = await async_trade_if_new_block(
             interface,
             agent_accounts,
             environment_config.halt_on_errors,
@@ -262,24 +329,32 @@ def run_agents(
             last_executed_block,
             liquidate,
             environment_config.randomize_liquidation,
+            wait_for_new_block=wait_for_new_block,
         )
         if minimum_avg_agent_base is not None:
             if (
                 sum(agent.wallet.balance.amount for agent in agent_accounts) / FixedPoint(len(agent_accounts))
                 < minimum_avg_agent_base
             ):
-                _ = async_fund_agents_with_fake_user(eth_config, account_key_config, contract_addresses, interface)
+                if is_simulated:
+                    assert isinstance(interface, SimulatedHyperdriveReadWriteInterface)
+                    fund_simulated_agents(account_key_config, interface, agent_accounts)
+                else:
+                    _ = await async_fund_agents_with_fake_user(
+                        eth_config, account_key_config, contract_addresses, interface
+                    )
         if new_executed_block == last_executed_block:
-            # wait
-            time.sleep(poll_latency)
-            poll_latency *= BACKOFF
-            poll_latency += random.uniform(0, 1)
-        else:
-            # Reset backoff
-            poll_latency = START_LATENCY + random.uniform(0, 1)
+            if is_simulated:
+                assert isinstance(interface, SimulatedHyperdriveReadWriteInterface)
+                # Nothing happens on the simulated chain unless we mine the next block
+                interface.mine_block()
+            else:
+                # Wait for the next block head before trading again
+                await async_wait_for_new_block(interface.web3, last_executed_block)
+        last_executed_block = new_executed_block
 
 
-def async_fund_agents_with_fake_user(
+async def async_fund_agents_with_fake_user(
     eth_config: EthConfig,
     account_key_config: AccountKeyConfig,
     contract_addresses: HyperdriveAddresses,
@@ -306,10 +381,44 @@ def async_fund_agents_with_fake_user(
         The fake user account created to fund the agents.
     """
     user_account = create_and_fund_user_account(account_key_config, interface)
-    asyncio.run(async_fund_agents(user_account, eth_config, account_key_config, contract_addresses))
+    await async_fund_agents(user_account, eth_config, account_key_config, contract_addresses)
     return user_account
 
 
+def fund_simulated_agents(
+    account_key_config: AccountKeyConfig,
+    interface: SimulatedHyperdriveReadWriteInterface,
+    agent_accounts: list[HyperdriveAgent],
+) -> None:
+    """Fund the agents with their budgets on the simulated chain, which needs no user account to fund them from.
+
+    Arguments
+    ---------
+    account_key_config: AccountKeyConfig
+        Dataclass containing configuration options for the agent account, including keys and budgets.
+        Agents without a key in the config aren't funded.
+    interface: SimulatedHyperdriveReadWriteInterface
+        The interface to the simulated pool.
+    agent_accounts: list[HyperdriveAgent]
+        The agents to fund.
+    """
+    budgets = {
+        Account()
+        .from_key(agent_key)
+        .address: (FixedPoint(scaled_value=base_budget), FixedPoint(scaled_value=eth_budget))
+        for agent_key, base_budget, eth_budget in zip(
+            account_key_config.AGENT_KEYS, account_key_config.AGENT_BASE_BUDGETS, account_key_config.AGENT_ETH_BUDGETS
+        )
+    }
+    for agent in agent_accounts:
+        if agent.address not in budgets:
+            continue
+        base_budget, eth_budget = budgets[agent.address]
+        interface.fund_account(agent.address, base=base_budget, eth=eth_budget)
+        # The wallets are only updated by trades, so we add the funds here
+        agent.wallet.balance.amount += base_budget
+
+
 def build_wallet_positions_from_data(
     wallet_addr: str, db_balances: pd.DataFrame, base_contract: ERC20MintableContract
 ) -> HyperdriveWallet:
@@ -0,0 +1,484 @@
+"""Run Monte-Carlo scenarios of economic activity on simulated pools, in parallel across worker processes."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields, replace
+from typing import TYPE_CHECKING, Any, Type
+
+import numpy as np
+import pandas as pd
+from eth_account.account import Account
+from ethpy.hyperdrive import BASE_TOKEN_SYMBOL
+from ethpy.hyperdrive.interface import SimulatedHyperdriveReadWriteInterface
+from ethpy.hyperdrive.interface.simulated_interface import build_default_pool_config
+from fixedpointmath import FixedPoint
+from hypertypes.fixedpoint_types import PoolConfigFP
+
+from agent0.base.make_key import make_private_key
+from agent0.hyperdrive.agents import HyperdriveAgent
+from agent0.hyperdrive.state import TradeStatus
+
+from .execute_agent_trades import async_execute_agent_trades
+
+if TYPE_CHECKING:
+    from numpy.random._generator import Generator
+
+    from agent0.hyperdrive.policies import HyperdrivePolicy
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+# pylint: disable=too-many-instance-attributes
+
+# Scenario sweeps can set these fees by name, e.g. `curve_fee=[...]`
+FEE_PARAMETERS = {
+    "curve_fee": "curve",
+    "flat_fee": "flat",
+    "governance_lp_fee": "governance_lp",
+    "governance_zombie_fee": "governance_zombie",
+}
+
+
+@dataclass
+class VariableRateModel:
+    """A mean-reverting (Ornstein-Uhlenbeck) model of the variable rate, which is constant by default.
+
+    Attributes
+    ----------
+    mean: float | None, optional
+        The long run rate that the variable rate reverts to. Defaults to the scenario's initial variable rate.
+    mean_reversion: float, optional
+        The annualized speed at which the rate reverts to the mean. Defaults to 0.
+    volatility: float, optional
+        The annualized volatility of the rate. Defaults to 0.
+    floor: float, optional
+        The lowest rate on a path. Defaults to 0.
+    """
+
+    mean: float | None = None
+    mean_reversion: float = 0
+    volatility: float = 0
+    floor: float = 0
+
+    def sample_paths(
+        self, rng: Generator, initial_rate: float, num_paths: int, num_steps: int, step_seconds: int
+    ) -> np.ndarray:
+        """Sample the variable rate of each step for many paths at once.
+
+        Arguments
+        ---------
+        rng: Generator
+            The random number generator used for the paths.
+        initial_rate: float
+            The variable rate at the start of every path.
+        num_paths: int
+            The number of paths.
+        num_steps: int
+            The number of steps of each path.
+        step_seconds: int
+            The number of seconds between steps.
+
+        Returns
+        -------
+        np.ndarray
+            A (num_paths, num_steps) array of variable rates, starting at `initial_rate`.
+        """
+        mean = initial_rate if self.mean is None else self.mean
+        step_years = step_seconds / (60 * 60 * 24 * 365)
+        shocks = rng.standard_normal((num_paths, num_steps)) * self.volatility * np.sqrt(step_years)
+        rates = np.empty((num_paths, num_steps))
+        rates[:, 0] = initial_rate
+        for step in range(1, num_steps):
+            previous_rates = rates[:, step - 1]
+            rates[:, step] = (
+                previous_rates + self.mean_reversion * (mean - previous_rates) * step_years + shocks[:, step]
+            )
+            rates[:, step] = np.maximum(rates[:, step], self.floor)
+        return rates
+
+
+@dataclass
+class ScenarioAgents:
+    """A group of agents in a scenario that trade with the same policy.
+
+    Attributes
+    ----------
+    policy: Type[HyperdrivePolicy]
+        The policy of the agents.
+    policy_config: HyperdrivePolicy.Config | None, optional
+        The config of the policy. The random number generator of the config is replaced by the path's generator.
+        Defaults to the policy's default config.
+    base: FixedPoint, optional
+        The amount of base each agent is funded with. Defaults to 1 million.
+    num_agents: int, optional
+        The number of agents in the group. Defaults to 1.
+    name: str | None, optional
+        The name of the group in the results. Defaults to the name of the policy.
+    """
+
+    policy: Type[HyperdrivePolicy]
+    policy_config: HyperdrivePolicy.Config | None = None
+    base: FixedPoint = FixedPoint(1_000_000)
+    num_agents: int = 1
+    name: str | None = None
+
+    def __post_init__(self):
+        if self.name is None:
+            self.name = self.policy.__name__
+
+
+@dataclass
+class Scenario:
+    """A scenario of economic activity on a simulated pool.
+
+    Every step, the variable rate is set from the rate model, each agent executes its policy
+    `trades_per_step` times, and time advances by `step_seconds`, creating the checkpoints that are passed.
+
+    Attributes
+    ----------
+    agents: list[ScenarioAgents]
+        The groups of agents trading in the scenario.
+    name: str, optional
+        The name of the scenario in the results. Defaults to "scenario".
+    pool_config: PoolConfigFP | None, optional
+        The config of the pool. Defaults to the config of an interactive hyperdrive pool.
+    initial_liquidity: FixedPoint, optional
+        The liquidity the pool is initialized with. Defaults to 100 million.
+    initial_fixed_rate: FixedPoint, optional
+        The fixed rate the pool is initialized at. Defaults to 5%.
+    initial_variable_rate: FixedPoint, optional
+        The variable rate at the start of the scenario. Defaults to 5%.
+    variable_rate_model: VariableRateModel, optional
+        The model of the variable rate paths. Defaults to a constant rate.
+    num_steps: int, optional
+        The number of steps in the scenario. Defaults to 7.
+    step_seconds: int, optional
+        The number of seconds between steps. Defaults to 1 day.
+    trades_per_step: int, optional
+        The number of times each agent executes its policy every step. Defaults to 1.
+    liquidate: bool, optional
+        Whether the agents close all of their positions at the end of the scenario. Defaults to True.
+    batch_policy_actions: bool, optional
+        Whether agents with the same policy compute their trades together in one batch. Defaults to False.
+    """
+
+    agents: list[ScenarioAgents]
+    name: str = "scenario"
+    pool_config: PoolConfigFP | None = None
+    initial_liquidity: FixedPoint = FixedPoint(100_000_000)
+    initial_fixed_rate: FixedPoint = FixedPoint("0.05")
+    initial_variable_rate: FixedPoint = FixedPoint("0.05")
+    variable_rate_model: VariableRateModel = field(default_factory=VariableRateModel)
+    num_steps: int = 7
+    step_seconds: int = 60 * 60 * 24
+    trades_per_step: int = 1
+    liquidate: bool = True
+    batch_policy_actions: bool = False
+
+
+@dataclass
+class ScenarioResults:
+    """The results of running many paths of scenarios.
+
+    Attributes
+    ----------
+    pool_states: pd.DataFrame
+        The state of the pool after every step of every path, keyed by scenario, path and step.
+        Paths that ended early have an `error` in their last step.
+    agent_results: pd.DataFrame
+        The final balance and PnL of every agent on every path, keyed by scenario, path and agent.
+        Positions that are still open at the end of a path are marked to market in `positions_value`,
+        which is included in the PnL.
+    """
+
+    pool_states: pd.DataFrame
+    agent_results: pd.DataFrame
+
+    def pnl_summary(self) -> pd.DataFrame:
+        """Aggregate the PnL of each group of agents across the paths of each scenario.
+
+        Returns
+        -------
+        pd.DataFrame
+            The distribution of the PnL and holding period return, per scenario and agent group.
+        """
+        return _describe(self.agent_results, ["scenario", "agent_group"], ["pnl", "hpr"])
+
+    def pool_summary(self) -> pd.DataFrame:
+        """Aggregate the end state and the lowest solvency margin of the pool across the paths of each scenario.
+
+        Returns
+        -------
+        pd.DataFrame
+            The distribution of the final rates, LP share price and minimum solvency, per scenario.
+        """
+        paths = self.pool_states.groupby(["scenario", "path"]).agg(
+            fixed_rate=("fixed_rate", "last"),
+            variable_rate=("variable_rate", "last"),
+            lp_share_price=("lp_share_price", "last"),
+            min_solvency=("solvency", "min"),
+            failed_trades=("failed_trades", "sum"),
+            errors=("error", "count"),
+        )
+        return _describe(paths.reset_index(), ["scenario"], list(paths.columns))
+
+
+def sweep_scenarios(scenario: Scenario, **parameter_values: list[Any]) -> list[Scenario]:
+    """Build a scenario for every combination of the parameter values.
+
+    Parameters can be scenario attributes, such as `initial_fixed_rate`, pool config attributes,
+    such as `time_stretch` or `position_duration`, or the fees, named `curve_fee`, `flat_fee`,
+    `governance_lp_fee` and `governance_zombie_fee`.
+
+    Arguments
+    ---------
+    scenario: Scenario
+        The scenario that the parameters are changed in.
+    **parameter_values: list[Any]
+        The values of each swept parameter.
+
+    Returns
+    -------
+    list[Scenario]
+        The scenarios, named after the scenario and their parameter values.
+    """
+    scenario_parameters = {scenario_field.name for scenario_field in fields(Scenario)}
+    pool_config_parameters = {pool_config_field.name for pool_config_field in fields(PoolConfigFP)}
+    for name in parameter_values:
+        if name not in scenario_parameters | pool_config_parameters | FEE_PARAMETERS.keys():
+            raise ValueError(f"Can't sweep over {name}, it isn't a scenario, pool config or fee parameter.")
+    scenarios = []
+    for values in itertools.product(*parameter_values.values()):
+        parameters = dict(zip(parameter_values.keys(), values))
+        scenario_changes = {name: value for name, value in parameters.items() if name in scenario_parameters}
+        pool_config_changes = {name: value for name, value in parameters.items() if name in pool_config_parameters}
+        fee_changes = {FEE_PARAMETERS[name]: value for name, value in parameters.items() if name in FEE_PARAMETERS}
+        pool_config = scenario_changes.pop("pool_config", scenario.pool_config)
+        if pool_config_changes or fee_changes:
+            if pool_config is None:
+                pool_config = build_default_pool_config(
+                    scenario_changes.get("initial_fixed_rate", scenario.initial_fixed_rate)
+                )
+            pool_config = replace(pool_config, fees=replace(pool_config.fees, **fee_changes), **pool_config_changes)
+        name = ",".join(f"{name}={value}" for name, value in parameters.items())
+        scenarios.append(
+            replace(scenario, **scenario_changes, pool_config=pool_config, name=f"{scenario.name}[{name}]")
+        )
+    return scenarios
+
+
+def run_scenarios(
+    scenarios: Scenario | list[Scenario],
+    num_paths: int = 1,
+    seed: int | None = None,
+    num_workers: int | None = None,
+    genesis_timestamp: int | None = None,
+) -> ScenarioResults:
+    """Run many independent paths of each scenario across a pool of worker processes.
+
+    The variable rate paths of a scenario are sampled together up front, every path runs on its own
+    simulated pool, and every agent draws from its own random number generator, so results only depend on the seed
+    and the genesis timestamp. A path ends early if a policy or the final liquidation raises an error,
+    which is recorded in the `error` column of the results.
+
+    Arguments
+    ---------
+    scenarios: Scenario | list[Scenario]
+        The scenarios to run.
+    num_paths: int, optional
+        The number of paths of each scenario. Defaults to 1.
+    seed: int | None, optional
+        The seed for the variable rate paths and the agents' random number generators. Defaults to None.
+    num_workers: int | None, optional
+        The number of worker processes. If 1, the paths are run in this process.
+        Defaults to the number of processors on the machine.
+    genesis_timestamp: int | None, optional
+        The timestamp that every path starts at. Defaults to the current time.
+
+    Returns
+    -------
+    ScenarioResults
+        The pool states and agent results of every path.
+    """
+    if isinstance(scenarios, Scenario):
+        scenarios = [scenarios]
+    rng = np.random.default_rng(seed)
+    # All paths start at the same time, so that checkpoints line up across paths
+    if genesis_timestamp is None:
+        genesis_timestamp = int(time.time())
+    path_args = []
+    for scenario in scenarios:
+        variable_rates = scenario.variable_rate_model.sample_paths(
+            rng, float(scenario.initial_variable_rate), num_paths, scenario.num_steps, scenario.step_seconds
+        )
+        path_seeds = rng.integers(np.iinfo(np.int64).max, size=num_paths)
+        path_args.extend(
+            (scenario, path, int(path_seeds[path]), variable_rates[path], genesis_timestamp)
+            for path in range(num_paths)
+        )
+    if num_workers == 1:
+        path_results = [_run_scenario_path(*args) for args in path_args]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            path_results = list(executor.map(_run_scenario_path, *zip(*path_args)))
+    pool_states = [row for pool_rows, _ in path_results for row in pool_rows]
+    agent_results = [row for _, agent_rows in path_results for row in agent_rows]
+    return ScenarioResults(pool_states=pd.DataFrame(pool_states), agent_results=pd.DataFrame(agent_results))
+
+
+def _run_scenario_path(
+    scenario: Scenario, path: int, seed: int, variable_rates: np.ndarray, genesis_timestamp: int
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Run one path of a scenario on a new simulated pool, returning the pool and agent rows of the results."""
+    return asyncio.run(_async_run_scenario_path(scenario, path, seed, variable_rates, genesis_timestamp))
+
+
+async def _async_run_scenario_path(
+    scenario: Scenario, path: int, seed: int, variable_rates: np.ndarray, genesis_timestamp: int
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """See `_run_scenario_path`."""
+    interface = SimulatedHyperdriveReadWriteInterface(
+        scenario.pool_config,
+        initial_liquidity=scenario.initial_liquidity,
+        initial_fixed_rate=scenario.initial_fixed_rate,
+        initial_variable_rate=scenario.initial_variable_rate,
+        genesis_timestamp=genesis_timestamp,
+    )
+    rate_setter = Account().from_key(make_private_key())
+    agents: list[HyperdriveAgent] = []
+    agent_groups: list[tuple[str, int, FixedPoint]] = []
+    # Every agent draws from its own stream, so trades don't depend on the order agents are evaluated in
+    agent_seeds = iter(np.random.SeedSequence(seed).spawn(sum(group.num_agents for group in scenario.agents)))
+    for group in scenario.agents:
+        assert group.name is not None  # set in __post_init__
+        policy_config = group.policy.Config() if group.policy_config is None else group.policy_config
+        for index in range(group.num_agents):
+            agent = HyperdriveAgent(
+                Account().from_key(make_private_key()),
+                initial_budget=group.base,
+                policy=group.policy(replace(policy_config, rng=np.random.default_rng(next(agent_seeds)))),
+            )
+            interface.fund_account(agent.address, base=group.base, eth=FixedPoint(10))
+            agents.append(agent)
+            agent_groups.append((group.name, index, group.base))
+
+    pool_rows: list[dict[str, Any]] = []
+    error: str | None = None
+    for step in range(scenario.num_steps):
+        interface.set_variable_rate(rate_setter, FixedPoint(float(variable_rates[step])))
+        num_trades = num_failed_trades = 0
+        try:
+            for _ in range(scenario.trades_per_step):
+                trade_results = await async_execute_agent_trades(
+                    interface, agents, liquidate=False, batch_policy_actions=scenario.batch_policy_actions
+                )
+                num_trades += len(trade_results)
+                num_failed_trades += sum(trade_result.status == TradeStatus.FAIL for trade_result in trade_results)
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            # Failed trades are in the trade results, so this is an error in a policy, which ends the path
+            if not _is_path_error(exc):
+                raise
+            error = repr(exc)
+        if error is None:
+            interface.advance_time(scenario.step_seconds)
+        pool_rows.append(
+            {"scenario": scenario.name, "path": path, "step": step}
+            | _get_pool_row(interface)
+            | {"trades": num_trades, "failed_trades": num_failed_trades, "error": error}
+        )
+        if error is not None:
+            break
+    if scenario.liquidate:
+        try:
+            # Removing liquidity can leave withdrawal shares, which are redeemed on the next pass
+            for _ in range(2):
+                await async_execute_agent_trades(interface, agents, liquidate=True)
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            if not _is_path_error(exc):
+                raise
+            # The path ended early, before the positions were liquidated
+            if error is None:
+                error = repr(exc)
+                if len(pool_rows) > 0:
+                    pool_rows[-1]["error"] = error
+
+    agent_rows: list[dict[str, Any]] = []
+    for agent, (group_name, index, initial_base) in zip(agents, agent_groups):
+        _, final_base = interface.get_eth_base_balances(agent)
+        positions_value = _calc_positions_value(agent, interface)
+        pnl = float(final_base + positions_value - initial_base)
+        agent_rows.append(
+            {
+                "scenario": scenario.name,
+                "path": path,
+                "agent_group": group_name,
+                "agent": f"{group_name}_{index}",
+                "policy": agent.policy.name,
+                "initial_base": float(initial_base),
+                "final_base": float(final_base),
+                "positions_value": float(positions_value),
+                "pnl": pnl,
+                "hpr": pnl / float(initial_base),
+                "open_positions": _count_open_positions(agent, interface.pool_config.minimum_transaction_amount),
+                "error": error,
+            }
+        )
+    return pool_rows, agent_rows
+
+
+def _get_pool_row(interface: SimulatedHyperdriveReadWriteInterface) -> dict[str, Any]:
+    """Build the results row of the current pool state."""
+    pool_state = interface.current_pool_state
+    pool_info = pool_state.pool_info
+    # The share reserves that are left once the longs are paid out at maturity
+    solvency = (
+        pool_info.share_reserves
+        - pool_info.long_exposure / pool_info.share_price
+        - pool_state.pool_config.minimum_share_reserves
+    )
+    return {
+        "block_number": pool_state.block_number,
+        "timestamp": pool_state.block_time,
+        "variable_rate": float(pool_state.variable_rate),
+        "fixed_rate": float(interface.calc_fixed_rate(pool_state)),
+        "spot_price": float(interface.calc_spot_price(pool_state)),
+        "share_price": float(pool_info.share_price),
+        "lp_share_price": float(pool_info.lp_share_price),
+        "share_reserves": float(pool_info.share_reserves),
+        "longs_outstanding": float(pool_info.longs_outstanding),
+        "shorts_outstanding": float(pool_info.shorts_outstanding),
+        "solvency": float(solvency),
+    }
+
+
+def _calc_positions_value(agent: HyperdriveAgent, interface: SimulatedHyperdriveReadWriteInterface) -> FixedPoint:
+    """Mark the agent's open positions, other than base, to market on the current pool state."""
+    return sum(
+        (
+            interface.calc_position_value(position)
+            for position in interface.get_positions(agent.address)
+            if position.base_token_type != BASE_TOKEN_SYMBOL
+        ),
+        start=FixedPoint(0),
+    )
+
+
+def _is_path_error(exc: BaseException) -> bool:
+    """Whether an exception raised while running a path ends the path, instead of the scenario run."""
+    # Panics in hyperdrivepy aren't subclasses of Exception
+    return isinstance(exc, Exception) or type(exc).__name__ == "PanicException"
+
+
+def _count_open_positions(agent: HyperdriveAgent, minimum_amount: FixedPoint) -> int:
+    """Count the agent's positions, ignoring dust that is too small to close."""
+    balances = [long.balance for long in agent.wallet.longs.values()]
+    balances += [short.balance for short in agent.wallet.shorts.values()]
+    balances += [agent.wallet.lp_tokens, agent.wallet.withdraw_shares]
+    return sum(balance >= minimum_amount for balance in balances)
+
+
+def _describe(results: pd.DataFrame, group_columns: list[str], value_columns: list[str]) -> pd.DataFrame:
+    """Describe the distribution of the value columns within each group of the results."""
+    return results.groupby(group_columns)[value_columns].describe(percentiles=[0.05, 0.5, 0.95])
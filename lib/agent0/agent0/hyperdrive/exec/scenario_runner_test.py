@@ -0,0 +1,98 @@
+"""Tests for the scenario runner."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from fixedpointmath import FixedPoint
+
+from agent0.hyperdrive.agents import HyperdriveAgent
+from agent0.hyperdrive.policies import Zoo
+
+from .scenario_runner import Scenario, ScenarioAgents, VariableRateModel, run_scenarios, sweep_scenarios
+
+
+def test_variable_rate_paths():
+    """Rate paths start at the initial rate, and are constant without volatility or mean reversion."""
+    rng = np.random.default_rng(0)
+    rates = VariableRateModel().sample_paths(rng, 0.05, num_paths=3, num_steps=5, step_seconds=86400)
+    assert rates.shape == (3, 5)
+    assert np.all(rates == 0.05)
+    rates = VariableRateModel(mean=0.1, mean_reversion=5, volatility=0.5, floor=0.01).sample_paths(
+        rng, 0.05, num_paths=3, num_steps=5, step_seconds=86400
+    )
+    assert np.all(rates[:, 0] == 0.05)
+    assert np.all(rates >= 0.01)
+
+
+def test_run_scenarios():
+    """Every path returns its pool states and agent results, and results only depend on the seed."""
+    scenario = Scenario(
+        agents=[ScenarioAgents(Zoo.random, Zoo.random.Config(trade_chance=FixedPoint("0.8")), num_agents=2)],
+        variable_rate_model=VariableRateModel(volatility=0.1),
+        num_steps=3,
+    )
+    results = run_scenarios(scenario, num_paths=2, seed=123, num_workers=1, genesis_timestamp=1_700_000_000)
+    assert len(results.pool_states) == 2 * 3
+    assert len(results.agent_results) == 2 * 2
+    assert (results.agent_results.open_positions == 0).all()
+    assert list(results.pnl_summary().index) == [("scenario", "Random")]
+    assert results.pool_summary()[("min_solvency", "min")].iloc[0] > 0
+    repeated_results = run_scenarios(scenario, num_paths=2, seed=123, num_workers=1, genesis_timestamp=1_700_000_000)
+    assert results.agent_results.pnl.tolist() == repeated_results.agent_results.pnl.tolist()
+    # Agents draw from their own rngs, so evaluating their policies in batches doesn't change the results
+    scenario.batch_policy_actions = True
+    batch_results = run_scenarios(scenario, num_paths=2, seed=123, num_workers=1, genesis_timestamp=1_700_000_000)
+    assert results.agent_results.pnl.tolist() == batch_results.agent_results.pnl.tolist()
+
+
+def test_open_positions_pnl():
+    """Without liquidation, open positions are marked to market and included in the PnL."""
+    trade_list = [("open_long", 1_000), ("open_short", 500), ("add_liquidity", 2_000)]
+    scenario = Scenario(
+        agents=[ScenarioAgents(Zoo.deterministic, Zoo.deterministic.Config(trade_list=trade_list))],
+        num_steps=4,
+        liquidate=False,
+    )
+    results = run_scenarios(scenario, num_paths=1, seed=123, num_workers=1, genesis_timestamp=1_700_000_000)
+    agent_result = results.agent_results.iloc[0]
+    assert agent_result.open_positions == 3
+    spent = agent_result.initial_base - agent_result.final_base
+    # Closing after a few steps only costs the fees and slippage, less the accrued interest
+    assert agent_result.positions_value == pytest.approx(spent, rel=0.05)
+    assert agent_result.pnl == pytest.approx(agent_result.positions_value - spent)
+    assert agent_result.pnl != 0 and abs(agent_result.pnl) < 0.05 * spent
+
+
+def test_liquidation_error(monkeypatch: pytest.MonkeyPatch):
+    """An error while liquidating at the end of a path ends the path early, instead of the scenario run."""
+
+    def raise_error(*_args, **_kwargs):
+        raise RuntimeError("liquidation failed")
+
+    monkeypatch.setattr(HyperdriveAgent, "get_liquidation_trades", raise_error)
+    # Agents that are done trading aren't liquidated, so the agent has a trade left at the end of the path
+    trade_list = [("open_long", 1_000), ("open_long", 1_000)]
+    scenario = Scenario(
+        agents=[ScenarioAgents(Zoo.deterministic, Zoo.deterministic.Config(trade_list=trade_list))], num_steps=1
+    )
+    results = run_scenarios(scenario, num_paths=1, seed=123, num_workers=1, genesis_timestamp=1_700_000_000)
+    assert results.pool_states.error.tolist() == ["RuntimeError('liquidation failed')"]
+    agent_result = results.agent_results.iloc[0]
+    assert agent_result.error == "RuntimeError('liquidation failed')"
+    # The long wasn't closed, so it is marked to market
+    assert agent_result.open_positions == 1
+    assert agent_result.positions_value > 0
+
+
+def test_sweep_scenarios():
+    """Sweeps build a scenario for every combination of parameters."""
+    scenario = Scenario(agents=[ScenarioAgents(Zoo.random)])
+    scenarios = sweep_scenarios(
+        scenario, curve_fee=[FixedPoint("0.05"), FixedPoint("0.1")], num_steps=[1, 2], position_duration=[86400 * 7]
+    )
+    assert len(scenarios) == 4
+    assert scenarios[0].name == "scenario[curve_fee=0.05,num_steps=1,position_duration=604800]"
+    assert scenarios[0].pool_config is not None and scenarios[0].pool_config.fees.curve == FixedPoint("0.05")
+    assert scenarios[3].num_steps == 2
+    with pytest.raises(ValueError):
+        sweep_scenarios(scenario, not_a_parameter=[1])
@@ -0,0 +1,335 @@
+"""Run agents partitioned across worker processes."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import pickle
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import TYPE_CHECKING, Any
+
+from eth_typing import BlockNumber, ChecksumAddress
+from ethpy.hyperdrive.interface import HyperdriveReadWriteInterface
+from fixedpointmath import FixedPoint
+
+from agent0.hyperdrive.state import HyperdriveWallet, TradeResult
+
+from .create_and_fund_user_account import create_and_fund_user_account
+from .execute_agent_trades import async_execute_agent_trades
+from .fund_agents import async_fund_agents
+from .trade_loop import async_wait_for_new_block, check_result, get_wait_for_new_block
+
+if TYPE_CHECKING:
+    from ethpy import EthConfig
+    from ethpy.hyperdrive import HyperdriveAddresses
+    from ethpy.hyperdrive.state import PoolState
+
+    from agent0 import AccountKeyConfig
+    from agent0.base.config import EnvironmentConfig
+    from agent0.hyperdrive.agents import HyperdriveAgent
+
+SHARD_SHUTDOWN_TIMEOUT = 10
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+
+
+@dataclass
+class ShardResult:
+    """The results of one block of trades from a shard.
+
+    Attributes
+    ----------
+    trade_results: list[TradeResult]
+        The trade results of the shard's agents, with the agent replaced by `agent_address`
+    agent_addresses: list[ChecksumAddress]
+        The address of the agent for each trade result
+    agent_states: dict[ChecksumAddress, tuple[HyperdriveWallet, bool]]
+        The wallet and done trading flag of each agent in the shard after the trades
+    """
+
+    trade_results: list[TradeResult]
+    agent_addresses: list[ChecksumAddress]
+    agent_states: dict[ChecksumAddress, tuple[HyperdriveWallet, bool]]
+
+
+class AgentShard:
+    """A worker process that executes the trades of a partition of the agents.
+
+    Each shard owns its own web3 connection, event loop, and nonce manager, so agents in different shards
+    trade in parallel without contending for the GIL. Every block, the main process sends the pool state
+    to the shard, and the shard returns the trade results of its agents.
+    """
+
+    def __init__(
+        self,
+        interface: HyperdriveReadWriteInterface,
+        agent_accounts: list[HyperdriveAgent],
+        liquidate: bool,
+        randomize_liquidation: bool,
+    ):
+        """Start the shard worker process.
+
+        Arguments
+        ---------
+        interface: HyperdriveReadWriteInterface
+            The interface of the main process, used for the configuration of the shard's interface.
+        agent_accounts: list[HyperdriveAgent]
+            The agents that trade in this shard.
+        liquidate: bool
+            If set, will ignore all policy settings and liquidate all open positions.
+        randomize_liquidation: bool
+            If set, will randomize the order of liquidation trades.
+        """
+        self.agent_addresses = [agent.checksum_address for agent in agent_accounts]
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process: BaseProcess = multiprocessing.Process(
+            target=_run_shard,
+            args=(
+                child_connection,
+                interface.eth_config,
+                interface.addresses,
+                interface.read_retry_count,
+                interface.write_retry_count,
+                agent_accounts,
+                liquidate,
+                randomize_liquidation,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+
+    def send_pool_state(self, pool_state: PoolState) -> None:
+        """Send the pool state of a new block to the shard, which starts executing trades.
+
+        Arguments
+        ---------
+        pool_state: PoolState
+            The pool state of the block to trade on.
+        """
+        self._connection.send(pool_state)
+
+    async def async_receive_result(self) -> ShardResult:
+        """Wait for the shard to finish the trades of the last block, without blocking the event loop.
+
+        Returns
+        -------
+        ShardResult
+            The trade results of the shard's agents.
+        """
+        result = await asyncio.get_running_loop().run_in_executor(None, self._connection.recv)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def close(self) -> None:
+        """Stop the shard worker process."""
+        try:
+            self._connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(SHARD_SHUTDOWN_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._connection.close()
+
+
+def _run_shard(
+    connection: Connection,
+    eth_config: EthConfig,
+    contract_addresses: HyperdriveAddresses,
+    read_retry_count: int | None,
+    write_retry_count: int | None,
+    agent_accounts: list[HyperdriveAgent],
+    liquidate: bool,
+    randomize_liquidation: bool,
+) -> None:
+    """The main function of a shard worker process. Executes trades for every pool state received."""
+    interface = HyperdriveReadWriteInterface(
+        eth_config, contract_addresses, read_retry_count=read_retry_count, write_retry_count=write_retry_count
+    )
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            pool_state: PoolState | None = connection.recv()
+            if pool_state is None:
+                break
+            connection.send(
+                _execute_shard_trades(interface, pool_state, loop, agent_accounts, liquidate, randomize_liquidation)
+            )
+    finally:
+        loop.close()
+        connection.close()
+
+
+def _execute_shard_trades(
+    interface: HyperdriveReadWriteInterface,
+    pool_state: PoolState,
+    loop: asyncio.AbstractEventLoop,
+    agent_accounts: list[HyperdriveAgent],
+    liquidate: bool,
+    randomize_liquidation: bool,
+) -> ShardResult | Exception:
+    """Execute the trades of a shard's agents on the pool state sent from the main process.
+
+    Arguments
+    ---------
+    interface: HyperdriveReadWriteInterface
+        The interface of the shard.
+    pool_state: PoolState
+        The pool state of the block to trade on, which was queried by the main process.
+    loop: asyncio.AbstractEventLoop
+        The event loop of the shard.
+    agent_accounts: list[HyperdriveAgent]
+        The agents that trade in this shard.
+    liquidate: bool
+        If set, will ignore all policy settings and liquidate all open positions.
+    randomize_liquidation: bool
+        If set, will randomize the order of liquidation trades.
+
+    Returns
+    -------
+    ShardResult | Exception
+        The picklable trade results of the shard's agents, or the exception raised while executing the trades.
+    """
+    # Use the pool state from the main process instead of querying it again in each shard
+    interface.set_current_pool_state(pool_state)
+    try:
+        trade_results = loop.run_until_complete(
+            async_execute_agent_trades(interface, agent_accounts, liquidate, randomize_liquidation)
+        )
+    except Exception as err:  # pylint: disable=broad-except
+        return _make_picklable(err)
+    agent_addresses = []
+    for trade_result in trade_results:
+        assert trade_result.agent is not None
+        agent_addresses.append(trade_result.agent.checksum_address)
+        # The agent holds the account key, so we don't send it back, and set it in the main process
+        trade_result.agent = None
+        trade_result.exception = _make_picklable(trade_result.exception)
+        trade_result.orig_exception = _make_picklable(trade_result.orig_exception)
+    agent_states = {agent.checksum_address: (agent.wallet, agent.done_trading) for agent in agent_accounts}
+    return ShardResult(trade_results, agent_addresses, agent_states)
+
+
+def _make_picklable(value: Any) -> Any:
+    """Exceptions with custom constructors can fail to unpickle, so we replace them with a description."""
+    if value is None:
+        return None
+    try:
+        pickle.loads(pickle.dumps(value))
+        return value
+    except Exception:  # pylint: disable=broad-except
+        if isinstance(value, Exception):
+            return Exception(repr(value))
+        return repr(value)
+
+
+async def async_run_agents_sharded(
+    environment_config: EnvironmentConfig,
+    eth_config: EthConfig,
+    account_key_config: AccountKeyConfig,
+    contract_addresses: HyperdriveAddresses,
+    interface: HyperdriveReadWriteInterface,
+    agent_accounts: list[HyperdriveAgent],
+    liquidate: bool = False,
+    minimum_avg_agent_base: FixedPoint | None = None,
+) -> None:
+    """Run agent trades in a forever (while True) loop, with agents partitioned across worker processes.
+    The pool state is read once per block in the main process and sent to every shard.
+    Trade results are collected back for crash reporting and error handling in the main process.
+
+    Arguments
+    ---------
+    environment_config: EnvironmentConfig
+        The agent's environment configuration. The number of processes is set by `num_shards`.
+    eth_config: EthConfig
+        Configuration for URIs to the rpc and artifacts.
+    account_key_config: AccountKeyConfig
+        Dataclass containing configuration options for the agent account, including keys and budgets.
+    contract_addresses: HyperdriveAddresses
+        Configuration for the URIs to the Hyperdrive contract addresses.
+    interface: HyperdriveReadWriteInterface
+        An interface for Hyperdrive with contracts deployed on any chain with an RPC url.
+    agent_accounts: list[HyperdriveAgent]
+        A list of HyperdriveAgent that are conducting the trades
+    liquidate: bool, optional
+        If set, will ignore all policy settings and liquidate all open positions.
+        Defaults to False.
+    minimum_avg_agent_base: FixedPoint, optional
+        If set, then the script will fund the agents with their original budgets
+        whenever the average balance across wallets is less than this amount.
+    """
+    num_shards = min(environment_config.num_shards, len(agent_accounts))
+    if num_shards < 1:
+        raise ValueError(f"{environment_config.num_shards=} must be at least 1")
+    agents_by_address = {agent.checksum_address: agent for agent in agent_accounts}
+    # Round robin the agents, so that shards get a similar mix of policies
+    shards = [
+        AgentShard(
+            interface, agent_accounts[shard_index::num_shards], liquidate, environment_config.randomize_liquidation
+        )
+        for shard_index in range(num_shards)
+    ]
+    wait_for_new_block = get_wait_for_new_block(interface.web3)
+    last_executed_block = BlockNumber(0)
+    try:
+        while True:
+            if all(agent.done_trading for agent in agent_accounts):
+                break
+            pool_state = interface.current_pool_state
+            new_executed_block = last_executed_block
+            if not wait_for_new_block or pool_state.block_number > last_executed_block:
+                logging.info(
+                    "Block number: %d, Block time: %s, Price: %s, Rate: %s",
+                    pool_state.block_number,
+                    str(datetime.fromtimestamp(float(pool_state.block_time))),
+                    interface.calc_spot_price(pool_state),
+                    interface.calc_fixed_rate(pool_state),
+                )
+                active_shards = [
+                    shard
+                    for shard in shards
+                    if not all(agents_by_address[address].done_trading for address in shard.agent_addresses)
+                ]
+                for shard in active_shards:
+                    shard.send_pool_state(pool_state)
+                shard_results: list[ShardResult] = await asyncio.gather(
+                    *[shard.async_receive_result() for shard in active_shards]
+                )
+                trade_results = []
+                for shard_result in shard_results:
+                    for address, (wallet, done_trading) in shard_result.agent_states.items():
+                        agents_by_address[address].wallet = wallet
+                        agents_by_address[address].done_trading = done_trading
+                    for trade_result, address in zip(shard_result.trade_results, shard_result.agent_addresses):
+                        trade_result.agent = agents_by_address[address]
+                        trade_results.append(trade_result)
+                new_executed_block = pool_state.block_number
+                check_result(
+                    trade_results,
+                    interface,
+                    environment_config.halt_on_errors,
+                    environment_config.halt_on_slippage,
+                    environment_config.crash_report_to_file,
+                    environment_config.crash_report_file_prefix,
+                    environment_config.log_to_rollbar,
+                )
+            if minimum_avg_agent_base is not None:
+                if (
+                    sum(agent.wallet.balance.amount for agent in agent_accounts) / FixedPoint(len(agent_accounts))
+                    < minimum_avg_agent_base
+                ):
+                    user_account = create_and_fund_user_account(account_key_config, interface)
+                    await async_fund_agents(user_account, eth_config, account_key_config, contract_addresses)
+            if new_executed_block == last_executed_block:
+                # Wait for the next block head before trading again
+                await async_wait_for_new_block(interface.web3, last_executed_block)
+            last_executed_block = new_executed_block
+    finally:
+        for shard in shards:
+            shard.close()
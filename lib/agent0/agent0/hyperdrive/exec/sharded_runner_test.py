@@ -0,0 +1,60 @@
+"""Tests for running agents partitioned across worker processes."""
+from __future__ import annotations
+
+import asyncio
+import pickle
+
+import pytest
+from eth_account import Account
+from ethpy.hyperdrive.interface import HyperdriveReadInterface, HyperdriveReadWriteInterface
+
+from agent0.hyperdrive.agents import HyperdriveAgent
+from agent0.hyperdrive.policies import HyperdrivePolicy
+
+from .sharded_runner import ShardResult, _execute_shard_trades
+
+# we need to use the outer name for fixtures
+# pylint: disable=redefined-outer-name
+
+
+class _RecordStatePolicy(HyperdrivePolicy):
+    """Records the pool state it sees, and doesn't trade."""
+
+    def __init__(self):
+        super().__init__(HyperdrivePolicy.Config())
+        self.pool_states = []
+
+    def action(self, interface, wallet):
+        self.pool_states.append(interface.current_pool_state)
+        return [], False
+
+
+@pytest.mark.anvil
+def test_shard_uses_sent_pool_state(
+    hyperdrive_read_write_interface: HyperdriveReadWriteInterface, monkeypatch: pytest.MonkeyPatch
+):
+    """Policies in a shard see the pool state from the main process, without the shard querying it again."""
+    interface = hyperdrive_read_write_interface
+    # The shard's read interface is created once when it starts trading
+    _ = interface.get_read_interface()
+    num_state_queries = 0
+    get_hyperdrive_state = HyperdriveReadInterface.get_hyperdrive_state
+
+    def _count_state_queries(self, block=None):
+        nonlocal num_state_queries
+        num_state_queries += 1
+        return get_hyperdrive_state(self, block)
+
+    monkeypatch.setattr(HyperdriveReadInterface, "get_hyperdrive_state", _count_state_queries)
+    agents = [HyperdriveAgent(Account.create(), policy=_RecordStatePolicy()) for _ in range(3)]
+    loop = asyncio.new_event_loop()
+    try:
+        for _ in range(2):
+            # The pool state is pickled when it is sent to the shard
+            pool_state = pickle.loads(pickle.dumps(get_hyperdrive_state(interface)))
+            result = _execute_shard_trades(interface, pool_state, loop, agents, False, False)
+            assert isinstance(result, ShardResult)
+            assert all(agent.policy.pool_states[-1] is pool_state for agent in agents)
+    finally:
+        loop.close()
+    assert num_state_queries == 0
@@ -5,7 +5,11 @@ import asyncio
 import logging
 from datetime import datetime
 
-from ethpy.hyperdrive.interface import HyperdriveReadInterface, HyperdriveReadWriteInterface
+from ethpy.hyperdrive.interface import (
+    HyperdriveReadInterface,
+    HyperdriveReadWriteInterface,
+    SimulatedHyperdriveReadWriteInterface,
+)
 from web3 import Web3
 from web3.types import RPCEndpoint
 
@@ -19,6 +23,10 @@ from .execute_agent_trades import async_execute_agent_trades
 # TODO: Suppress logging from ethpy here as agent0 handles logging
 
 
+DEFAULT_HEAD_POLL_INTERVAL = 0.5
+DEFAULT_MAX_BLOCK_WAIT = 10
+
+
 # TODO cleanup this function
 # pylint: disable=too-many-arguments
 def trade_if_new_block(
@@ -34,6 +42,7 @@ def trade_if_new_block(
     randomize_liquidation: bool,
 ) -> int:
     """Execute trades if there is a new block.
+    Runs `async_trade_if_new_block` in a new event loop; long running loops should await it in a single event loop.
 
     Arguments
     ---------
@@ -64,12 +73,80 @@ def trade_if_new_block(
     int
         The block number when a trade last happened
     """
-    latest_block = interface.web3.eth.get_block("latest")
+    return asyncio.run(
+        async_trade_if_new_block(
+            interface,
+            agent_accounts,
+            halt_on_errors,
+            halt_on_slippage,
+            crash_report_to_file,
+            crash_report_file_prefix,
+            log_to_rollbar,
+            last_executed_block,
+            liquidate,
+            randomize_liquidation,
+        )
+    )
+
+
+async def async_trade_if_new_block(
+    interface: HyperdriveReadWriteInterface,
+    agent_accounts: list[HyperdriveAgent],
+    halt_on_errors: bool,
+    halt_on_slippage: bool,
+    crash_report_to_file: bool,
+    crash_report_file_prefix: str,
+    log_to_rollbar: bool,
+    last_executed_block: int,
+    liquidate: bool,
+    randomize_liquidation: bool,
+    wait_for_new_block: bool | None = None,
+) -> int:
+    """Execute trades if there is a new block, in the running event loop.
+
+    Arguments
+    ---------
+    interface: HyperdriveReadWriteInterface
+        The Hyperdrive API interface object.
+    agent_accounts: list[HyperdriveAgent]]
+        A list of HyperdriveAgent objects that contain a wallet address and Agent for determining trades.
+    halt_on_errors: bool
+        If true, raise an exception if a trade reverts.
+        Otherwise, log a warning and move on.
+    halt_on_slippage: bool
+        If halt_on_errors is true and halt_on_slippage is false, don't raise an exception if slippage happens.
+    crash_report_to_file: bool
+        Whether or not to save the crash report to a file.
+    crash_report_file_prefix: str
+        The string prefix to prepend to crash reports
+    log_to_rollbar: bool
+        Whether or not to log to rollbar.
+    last_executed_block: int
+        The block number when a trade last happened.
+    liquidate: bool
+        If set, will ignore all policy settings and liquidate all open positions.
+    randomize_liquidation: bool
+        If set, will randomize the order of liquidation trades
+    wait_for_new_block: bool | None, optional
+        Whether or not to wait for a new block before trading again.
+        If not set, will query the chain with `get_wait_for_new_block`.
+
+    Returns
+    -------
+    int
+        The block number when a trade last happened
+    """
+    latest_block = interface.get_current_block()
     latest_block_number = latest_block.get("number", None)
     latest_block_timestamp = latest_block.get("timestamp", None)
     if latest_block_number is None or latest_block_timestamp is None:
         raise AssertionError("latest_block_number and latest_block_timestamp can not be None")
-    wait_for_new_block = get_wait_for_new_block(interface.web3)
+    if wait_for_new_block is None:
+        if isinstance(interface, SimulatedHyperdriveReadWriteInterface):
+            # The simulated chain mines a block for every trade, like anvil with automining
+            wait_for_new_block = False
+        else:
+            wait_for_new_block = get_wait_for_new_block(interface.web3)
     # do trades if we don't need to wait for new block.  otherwise, wait and check for a new block
     if not wait_for_new_block or latest_block_number > last_executed_block:
         # log and show block info
@@ -82,8 +159,8 @@ def trade_if_new_block(
         )
         # To avoid jumbled print statements due to asyncio, we handle all logging and crash reporting
         # here, with inner functions returning trade results.
-        trade_results: list[TradeResult] = asyncio.run(
-            async_execute_agent_trades(interface, agent_accounts, liquidate, randomize_liquidation)
+        trade_results: list[TradeResult] = await async_execute_agent_trades(
+            interface, agent_accounts, liquidate, randomize_liquidation
         )
         last_executed_block = latest_block_number
 
@@ -99,6 +176,42 @@ def trade_if_new_block(
     return last_executed_block
 
 
+async def async_wait_for_new_block(
+    web3: Web3,
+    last_block_number: int,
+    poll_interval: float = DEFAULT_HEAD_POLL_INTERVAL,
+    max_wait: float | None = DEFAULT_MAX_BLOCK_WAIT,
+) -> int:
+    """Wait until the chain head moves past a block, without blocking the event loop.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3.py instantiation.
+    last_block_number: int
+        The block number to wait past.
+    poll_interval: float, optional
+        The number of seconds between checking the chain head. Defaults to 0.5 seconds.
+    max_wait: float | None, optional
+        The maximum number of seconds to wait, e.g., for chains that only mine blocks on transactions.
+        If None, will wait until there is a new block. Defaults to 10 seconds.
+
+    Returns
+    -------
+    int
+        The latest block number, which is equal to `last_block_number` if `max_wait` passed without a new block.
+    """
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    while True:
+        latest_block_number = web3.eth.block_number
+        if latest_block_number > last_block_number:
+            return latest_block_number
+        if max_wait is not None and loop.time() - start_time >= max_wait:
+            return latest_block_number
+        await asyncio.sleep(poll_interval)
+
+
 def check_result(
     trade_results: list[TradeResult],
     interface: HyperdriveReadInterface,
@@ -157,7 +270,8 @@ def check_result(
                 else:
                     # We only get anvil state dump here, since it's an on chain call
                     # and we don't want to do it when e.g., slippage happens
-                    if crash_report_to_file:
+                    # The simulated chain has no anvil state to dump
+                    if crash_report_to_file and not isinstance(interface, SimulatedHyperdriveReadWriteInterface):
                         trade_result.anvil_state = get_anvil_state_dump(interface.web3)
                     # Defaults to CRITICAL
                     log_hyperdrive_crash_report(
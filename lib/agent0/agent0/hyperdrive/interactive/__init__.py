@@ -1,3 +1,4 @@
 """Interactive hyperdrive"""
 from .chain import Chain, LocalChain
 from .interactive_hyperdrive import InteractiveHyperdrive
+from .simulated_hyperdrive import SimulatedChain, SimulatedInteractiveHyperdrive
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import contextlib
+import hashlib
 import logging
 import os
+import shutil
 import subprocess
 import time
 from dataclasses import dataclass
@@ -14,10 +16,11 @@ from typing import TYPE_CHECKING
 
 import docker
 from chainsync import PostgresConfig
+from chainsync.db.base import close_all_connections, create_database_from_template, drop_database
 from chainsync.db.hyperdrive.import_export_data import export_db_to_file, import_to_db
 from docker.errors import NotFound
 from docker.models.containers import Container
-from ethpy.base import initialize_web3_with_http_provider
+from ethpy.base import initialize_web3_with_http_provider, reset_gas_profiles, reset_nonce_managers
 from web3.types import RPCEndpoint
 
 from agent0.hyperdrive.crash_report import get_anvil_state_dump
@@ -25,7 +28,28 @@ from agent0.hyperdrive.crash_report import get_anvil_state_dump
 from .event_types import CreateCheckpoint
 
 if TYPE_CHECKING:
-    from .interactive_hyperdrive import InteractiveHyperdrive
+    from .interactive_hyperdrive import InteractiveHyperdrive, PoolSnapshotState
+
+DEFAULT_SNAPSHOT_NAME = "default"
+
+
+@dataclass
+class ChainSnapshot:
+    """A named snapshot of the chain.
+
+    Attributes
+    ----------
+    name: str
+        The name of the snapshot
+    evm_snapshot_id: str
+        The snapshot id returned from the `evm_snapshot` RPC call
+    pool_states: dict[str, PoolSnapshotState]
+        The cached state of each deployed pool at the snapshot, keyed by the pool's database name
+    """
+
+    name: str
+    evm_snapshot_id: str
+    pool_states: dict[str, PoolSnapshotState]
 
 
 # pylint: disable=too-many-instance-attributes
@@ -42,6 +66,9 @@ class Chain:
             The port to bind for the postgres container. Will fail if this port is being used.
         remove_existing_db_container: bool
             Whether to remove the existing container if it exists on container launch
+        template_db_snapshots: bool
+            If True, snapshots of the db are saved as copies of each pool's database within postgres,
+            which is much faster than dumping the db to `snapshot_dir`.
         """
 
         db_port: int = 5433
@@ -49,6 +76,7 @@ class Chain:
         snapshot_dir: str = ".interactive_state/snapshot/"
         saved_state_dir: str = ".interactive_state/"
         experimental_data_threading: bool = False
+        template_db_snapshots: bool = True
 
     def __init__(self, rpc_uri: str, config: Config | None = None):
         """Initialize the Chain class that connects to an existing chain.
@@ -79,8 +107,11 @@ class Chain:
 
         # Snapshot bookkeeping
         self._snapshot_dir = config.snapshot_dir
-        self._saved_snapshot_id: str
-        self._has_saved_snapshot = False
+        # Snapshots ordered by when they were saved
+        self._snapshots: list[ChainSnapshot] = []
+        # The snapshot the db was last saved to or loaded from, used for incremental db dumps
+        self._db_snapshot_base: str | None = None
+        self._template_db_snapshots = config.template_db_snapshots
         self._deployed_hyperdrive_pools: list[InteractiveHyperdrive] = []
         self.experimental_data_threading = config.experimental_data_threading
 
@@ -285,44 +316,98 @@ class Chain:
         """
         raise NotImplementedError
 
-    def save_snapshot(self) -> None:
-        """Saves a snapshot using the `evm_snapshot` RPC call.
-        The chain can store one snapshot at a time, saving another snapshot overwrites the previous snapshot.
+    @property
+    def snapshot_names(self) -> list[str]:
+        """The names of all saved snapshots, ordered by when they were saved."""
+        return [snapshot.name for snapshot in self._snapshots]
+
+    def save_snapshot(self, name: str = DEFAULT_SNAPSHOT_NAME) -> None:
+        """Saves a named snapshot using the `evm_snapshot` RPC call, along with the db and
+        the state of all deployed pools.
+        Saving a snapshot with the name of an existing snapshot overwrites the existing snapshot.
         Saving/loading snapshot only persist on the same chain, not across chains.
+
+        Arguments
+        ---------
+        name: str, optional
+            The name of the snapshot. Defaults to "default".
         """
-        response = self._web3.provider.make_request(method=RPCEndpoint("evm_snapshot"), params=[])
-        if "result" not in response:
-            raise KeyError("Response did not have a result.")
-        self._saved_snapshot_id = response["result"]
+        # The db snapshot of an existing snapshot gets overwritten below
+        self._snapshots = [snapshot for snapshot in self._snapshots if snapshot.name != name]
 
+        evm_snapshot_id = self._evm_snapshot()
         # Save the db state
-        self._dump_db(self._snapshot_dir)
-        self._has_saved_snapshot = True
+        if self._template_db_snapshots:
+            self._snapshot_db(name)
+        else:
+            self._dump_db(self._get_snapshot_dir(name), incremental=self._db_snapshot_base == name)
+        self._db_snapshot_base = name
 
-    def load_snapshot(self) -> None:
-        """Loads the previous snapshot using the `evm_revert` RPC call. Can load the snapshot multiple times.
+        pool_states = {
+            pool._db_name: pool._get_snapshot_state()  # pylint: disable=protected-access
+            for pool in self._deployed_hyperdrive_pools
+        }
+        self._snapshots.append(ChainSnapshot(name=name, evm_snapshot_id=evm_snapshot_id, pool_states=pool_states))
+
+    def load_snapshot(self, name: str = DEFAULT_SNAPSHOT_NAME) -> None:
+        """Loads a named snapshot using the `evm_revert` RPC call. Can load the snapshot multiple times.
         Note: Saving/loading snapshot only persist on the same chain, not across chains.
-        """
-        # Loads the previous snapshot
-        # When reverting snapshots, the chain deletes the previous snapshot, while we want it to persist.
-        # Hence, in this function, we first revert the snapshot, then immediately create a new snapshot
-        # to keep the original snapshot.
 
-        if not self._has_saved_snapshot:
-            raise ValueError("No saved snapshot to load")
+        Snapshots are stacked, i.e., loading a snapshot deletes all snapshots that were saved after it,
+        as the chain deletes them when reverting. Hence, to explore multiple paths from intermediate states,
+        load and save snapshots depth first.
+
+        Arguments
+        ---------
+        name: str, optional
+            The name of the snapshot. Defaults to "default".
+        """
+        if name not in self.snapshot_names:
+            raise ValueError(f"No saved snapshot {name} to load")
+        snapshot_index = self.snapshot_names.index(name)
+        snapshot = self._snapshots[snapshot_index]
 
-        response = self._web3.provider.make_request(method=RPCEndpoint("evm_revert"), params=[self._saved_snapshot_id])
+        response = self._web3.provider.make_request(method=RPCEndpoint("evm_revert"), params=[snapshot.evm_snapshot_id])
         if "result" not in response:
             raise KeyError("Response did not have a result.")
+        # Account nonces and contracts were reverted along with the chain
+        reset_nonce_managers(self._web3)
+        reset_gas_profiles(self._web3)
+
+        # The chain deletes all snapshots after the one we reverted to
+        for later_snapshot in self._snapshots[snapshot_index + 1 :]:
+            self._delete_db_snapshot(later_snapshot.name)
+        del self._snapshots[snapshot_index + 1 :]
 
         # load snapshot database state
-        self._load_db(self._snapshot_dir)
+        if self._template_db_snapshots:
+            self._restore_db_snapshot(name)
+        else:
+            self._load_db(self._get_snapshot_dir(name))
+        self._db_snapshot_base = name
 
-        # The hyperdrive interface in deployed pools need to wipe it's cache
+        # Restore the cached state of deployed pools
         for pool in self._deployed_hyperdrive_pools:
-            pool._reinit_state_after_load_snapshot()  # pylint: disable=protected-access
+            pool._reinit_state_after_load_snapshot(  # pylint: disable=protected-access
+                snapshot.pool_states[pool._db_name]  # pylint: disable=protected-access
+            )
 
-        self.save_snapshot()
+        # When reverting snapshots, the chain deletes the snapshot, while we want it to persist.
+        # The db snapshot and pool states are kept when loading, so we only need a new snapshot of the chain.
+        snapshot.evm_snapshot_id = self._evm_snapshot()
+
+    def delete_snapshot(self, name: str) -> None:
+        """Deletes a named snapshot, freeing the underlying db snapshot.
+
+        Arguments
+        ---------
+        name: str
+            The name of the snapshot.
+        """
+        if name not in self.snapshot_names:
+            raise ValueError(f"No saved snapshot {name} to delete")
+        self._snapshots = [snapshot for snapshot in self._snapshots if snapshot.name != name]
+        self._delete_db_snapshot(name)
 
     def get_deployer_account_private_key(self):
         """Get the private key of the deployer account."""
@@ -384,11 +469,65 @@ class Chain:
         return postgres_config, container
 
     def _add_deployed_pool_to_bookkeeping(self, pool: InteractiveHyperdrive):
-        if self._has_saved_snapshot:
+        if len(self._snapshots) > 0:
             raise ValueError("Cannot add a new pool after saving a snapshot")
         self._deployed_hyperdrive_pools.append(pool)
 
-    def _dump_db(self, save_dir: str):
+    def _evm_snapshot(self) -> str:
+        response = self._web3.provider.make_request(method=RPCEndpoint("evm_snapshot"), params=[])
+        if "result" not in response:
+            raise KeyError("Response did not have a result.")
+        return response["result"]
+
+    def _get_snapshot_db_name(self, pool: InteractiveHyperdrive, snapshot_name: str) -> str:
+        # Postgres truncates database names to 63 characters, and pool database names are already
+        # near that limit, so we hash the pool's database name and snapshot name to get a unique name
+        snapshot_id = pool._db_name + "/" + snapshot_name  # pylint: disable=protected-access
+        return f"snapshot-{hashlib.sha256(snapshot_id.encode('utf-8')).hexdigest()[:32]}"
+
+    def _get_snapshot_dir(self, snapshot_name: str) -> str:
+        return str(Path(self._snapshot_dir) / snapshot_name)
+
+    def _delete_db_snapshot(self, snapshot_name: str):
+        if self._template_db_snapshots:
+            for pool in self._deployed_hyperdrive_pools:
+                drop_database(self.postgres_config, self._get_snapshot_db_name(pool, snapshot_name))
+        else:
+            shutil.rmtree(self._get_snapshot_dir(snapshot_name), ignore_errors=True)
+        if self._db_snapshot_base == snapshot_name:
+            self._db_snapshot_base = None
+
+    def _snapshot_db(self, snapshot_name: str):
+        for pool in self._deployed_hyperdrive_pools:
+            if self.experimental_data_threading:
+                # Need to ensure data has caught up before snapshot, and
+                # there can't be any connections to the db while copying it
+                pool._ensure_data_caught_up()  # pylint: disable=protected-access
+                pool._stop_data_pipeline()  # pylint: disable=protected-access
+            close_all_connections(pool.db_session)
+            create_database_from_template(
+                self.postgres_config,
+                self._get_snapshot_db_name(pool, snapshot_name),
+                pool._db_name,  # pylint: disable=protected-access
+            )
+            if self.experimental_data_threading:
+                pool._launch_data_pipeline()  # pylint: disable=protected-access
+
+    def _restore_db_snapshot(self, snapshot_name: str):
+        for pool in self._deployed_hyperdrive_pools:
+            if self.experimental_data_threading:
+                # We need to stop the underlying data pipeline before replacing the underlying database
+                pool._stop_data_pipeline()  # pylint: disable=protected-access
+            close_all_connections(pool.db_session)
+            create_database_from_template(
+                self.postgres_config,
+                pool._db_name,  # pylint: disable=protected-access
+                self._get_snapshot_db_name(pool, snapshot_name),
+            )
+            if self.experimental_data_threading:
+                pool._launch_data_pipeline()  # pylint: disable=protected-access
+
+    def _dump_db(self, save_dir: str, incremental: bool = False):
         # TODO parameterize the save path
         for pool in self._deployed_hyperdrive_pools:
             if self.experimental_data_threading:
@@ -396,7 +535,7 @@ class Chain:
                 pool._ensure_data_caught_up()  # pylint: disable=protected-access
             export_path = str(Path(save_dir) / pool._db_name)  # pylint: disable=protected-access
             os.makedirs(export_path, exist_ok=True)
-            export_db_to_file(export_path, pool.db_session, raw=True)
+            export_db_to_file(export_path, pool.db_session, raw=True, incremental=incremental)
 
     def _load_db(self, load_dir: str):
         # TODO parameterize the load path
@@ -473,6 +612,9 @@ class LocalChain(Chain):
         )
 
         super().__init__(f"http://127.0.0.1:{str(config.chain_port)}", config)
+        # A previous chain on the same port may have left nonces and gas usage behind
+        reset_nonce_managers(self._web3)
+        reset_gas_profiles(self._web3)
 
         if config.block_timestamp_interval is not None:
             # TODO make RPC call for setting block timestamp
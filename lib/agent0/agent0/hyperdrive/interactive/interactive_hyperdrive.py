@@ -49,7 +49,7 @@ from agent0.hyperdrive.agents import HyperdriveAgent
 from agent0.hyperdrive.crash_report import get_anvil_state_dump, log_hyperdrive_crash_report
 from agent0.hyperdrive.exec import async_execute_agent_trades, build_wallet_positions_from_data, set_max_approval
 from agent0.hyperdrive.policies import HyperdrivePolicy
-from agent0.hyperdrive.state import HyperdriveActionType, TradeResult, TradeStatus
+from agent0.hyperdrive.state import HyperdriveActionType, HyperdriveWallet, TradeResult, TradeStatus
 from agent0.test_utils import assert_never
 
 from .chain import Chain
@@ -80,6 +80,22 @@ nest_asyncio.apply()
 # pylint: disable=too-many-lines
 
 
+@dataclass
+class PoolSnapshotState:
+    """The internal state of an interactive hyperdrive pool, saved alongside a chain snapshot.
+
+    Attributes
+    ----------
+    agent_wallets: dict[ChecksumAddress, HyperdriveWallet]
+        The wallet of each agent in the pool
+    initial_funds: dict[ChecksumAddress, FixedPoint]
+        The amount of base minted for each agent
+    """
+
+    agent_wallets: dict[ChecksumAddress, HyperdriveWallet]
+    initial_funds: dict[ChecksumAddress, FixedPoint]
+
+
 class InteractiveHyperdrive:
     """Hyperdrive class that supports an interactive interface for running tests and experiments."""
 
@@ -533,7 +549,7 @@ class InteractiveHyperdrive:
             and provides access to the interactive Hyperdrive API.
         """
         # pylint: disable=too-many-arguments
-        if self.chain._has_saved_snapshot:  # pylint: disable=protected-access
+        if len(self.chain.snapshot_names) > 0:
             raise ValueError("Cannot add a new agent after saving a snapshot")
         if base is None:
             base = FixedPoint(0)
@@ -891,7 +907,7 @@ class InteractiveHyperdrive:
 
     def _add_funds(self, agent: HyperdriveAgent, base: FixedPoint, eth: FixedPoint) -> None:
         # TODO this can be fixed by getting actual base values from the chain.
-        if self.chain._has_saved_snapshot:  # pylint: disable=protected-access
+        if len(self.chain.snapshot_names) > 0:
             raise ValueError("Cannot add funds to an agent after saving a snapshot")
 
         if eth > FixedPoint(0):
@@ -925,6 +941,9 @@ class InteractiveHyperdrive:
 
         # TODO do we want to report a status here?
 
+    def _get_anvil_state_dump(self) -> str | None:
+        return get_anvil_state_dump(self.hyperdrive_interface.web3)
+
     def _handle_trade_result(self, trade_results: list[TradeResult] | TradeResult) -> ReceiptBreakdown:
         # Sanity check, should only be one trade result
         if isinstance(trade_results, list):
@@ -940,7 +959,7 @@ class InteractiveHyperdrive:
             # TODO when we allow for async, we likely would want to ignore slippage checks here
             # We only get anvil state dump here, since it's an on chain call
             # and we don't want to do it when e.g., slippage happens
-            trade_result.anvil_state = get_anvil_state_dump(self.hyperdrive_interface.web3)
+            trade_result.anvil_state = self._get_anvil_state_dump()
             # Defaults to CRITICAL
             log_hyperdrive_crash_report(
                 trade_result, crash_report_to_file=True, crash_report_file_prefix="interactive_hyperdrive"
@@ -1260,17 +1279,35 @@ class InteractiveHyperdrive:
             case _:
                 assert_never(trade_type)
 
-    def _reinit_state_after_load_snapshot(self) -> None:
+    def _get_snapshot_state(self) -> PoolSnapshotState:
+        """Gets a copy of the internal state of the interactive hyperdrive to save alongside a chain snapshot."""
+        return PoolSnapshotState(
+            agent_wallets={agent.agent.checksum_address: agent.agent.wallet.copy() for agent in self._pool_agents},
+            initial_funds=self._initial_funds.copy(),
+        )
+
+    def _reinit_state_after_load_snapshot(self, snapshot_state: PoolSnapshotState | None = None) -> None:
         """After loading a snapshot, we need to re-initialize the state the internal
         variables of the interactive hyperdrive.
         1. Wipe the cache from the hyperdrive interface.
-        2. Load all agent's wallets from the db.
+        2. Restore all agent's wallets from the snapshot state if available, otherwise load them from the db.
+
+        Arguments
+        ---------
+        snapshot_state: PoolSnapshotState | None, optional
+            The state saved alongside the snapshot from `_get_snapshot_state`.
         """
-        # Set internal state block number to 0 to enusre it updates
-        self.hyperdrive_interface.last_state_block_number = BlockNumber(0)
+        # Drop the cached pool state and calc results to ensure they update
+        self.hyperdrive_interface.reset_current_pool_state()
+
+        if snapshot_state is not None:
+            self._initial_funds = snapshot_state.initial_funds.copy()
 
         # Load and set all agent wallets from the db
         for agent in self._pool_agents:
+            if snapshot_state is not None and agent.agent.checksum_address in snapshot_state.agent_wallets:
+                agent.agent.wallet = snapshot_state.agent_wallets[agent.agent.checksum_address].copy()
+                continue
             db_balances = chainsync_get_current_wallet(
                 self.db_session, wallet_address=[agent.agent.checksum_address], coerce_float=False
             )
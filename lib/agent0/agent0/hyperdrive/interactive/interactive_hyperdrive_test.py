@@ -414,6 +414,39 @@ def test_save_load_snapshot(chain: LocalChain):
     assert check_pool_state_on_db.equals(init_pool_state_on_db)
 
 
+@pytest.mark.anvil
+def test_named_snapshots(chain: LocalChain):
+    """Save and load stacked named snapshots."""
+    interactive_hyperdrive = InteractiveHyperdrive(chain, InteractiveHyperdrive.Config())
+    hyperdrive_agent = interactive_hyperdrive.init_agent(base=FixedPoint(111_111), eth=FixedPoint(111))
+
+    chain.save_snapshot("root")
+    root_wallet = hyperdrive_agent.wallet.copy()
+    root_db_wallet = interactive_hyperdrive.get_current_wallet(coerce_float=False).copy()
+
+    hyperdrive_agent.open_long(base=FixedPoint(2_222))
+    chain.save_snapshot("long")
+    long_wallet = hyperdrive_agent.wallet.copy()
+    long_db_wallet = interactive_hyperdrive.get_current_wallet(coerce_float=False).copy()
+    assert chain.snapshot_names == ["root", "long"]
+
+    # Branch from the intermediate snapshot multiple times
+    for _ in range(2):
+        hyperdrive_agent.open_short(bonds=FixedPoint(3_333))
+        chain.load_snapshot("long")
+        assert hyperdrive_agent.wallet == long_wallet
+        assert interactive_hyperdrive.get_current_wallet(coerce_float=False).equals(long_db_wallet)
+        assert chain.snapshot_names == ["root", "long"]
+
+    # Loading an earlier snapshot deletes all snapshots after it
+    chain.load_snapshot("root")
+    assert hyperdrive_agent.wallet == root_wallet
+    assert interactive_hyperdrive.get_current_wallet(coerce_float=False).equals(root_db_wallet)
+    assert chain.snapshot_names == ["root"]
+    with pytest.raises(ValueError):
+        chain.load_snapshot("long")
+
+
 @pytest.mark.anvil
 def test_set_variable_rate(chain: LocalChain):
     """Set the variable rate."""
@@ -0,0 +1,476 @@
+"""Interactive hyperdrive on a simulated chain, which keeps the pool in memory instead of deploying contracts."""
+from __future__ import annotations
+
+import time
+from dataclasses import asdict
+from datetime import timedelta
+from decimal import Decimal
+from typing import Type
+
+import pandas as pd
+from chainsync.dashboard.usernames import build_user_mapping
+from eth_account.account import Account
+from eth_typing import ChecksumAddress
+from ethpy import EthConfig
+from ethpy.hyperdrive.interface import SimulatedHyperdriveReadWriteInterface, UnsupportedSimulatedFeatureError
+from ethpy.hyperdrive.interface.simulated_interface import SIMULATED_CONTRACT_ADDRESS
+from fixedpointmath import FixedPoint
+from hypertypes.fixedpoint_types import FeesFP, PoolConfigFP
+
+from agent0.base.make_key import make_private_key
+from agent0.hyperdrive.agents import HyperdriveAgent
+from agent0.hyperdrive.policies import HyperdrivePolicy
+
+from .event_types import CreateCheckpoint
+from .interactive_hyperdrive import InteractiveHyperdrive
+from .interactive_hyperdrive_agent import InteractiveHyperdriveAgent
+from .interactive_hyperdrive_policy import InteractiveHyperdrivePolicy
+
+
+class SimulatedChain:
+    """A chain that only exists in memory, on which simulated hyperdrive pools can be launched.
+
+    Each pool keeps its own blocks, and advancing the time of the chain advances the time of all pools.
+    Snapshots and the data pipeline are not supported.
+    """
+
+    def __init__(self, block_time: int = 12, genesis_timestamp: int | None = None):
+        """Initialize the simulated chain.
+
+        Arguments
+        ---------
+        block_time: int, optional
+            The number of seconds between mined blocks. Defaults to 12.
+        genesis_timestamp: int, optional
+            The timestamp of the first block of each pool. Defaults to the current time.
+        """
+        self.rpc_uri = "simulated"
+        self.block_time = block_time
+        self.genesis_timestamp = int(time.time()) if genesis_timestamp is None else genesis_timestamp
+        self.experimental_data_threading = False
+        self._deployed_hyperdrive_pools: list[SimulatedInteractiveHyperdrive] = []
+
+    @property
+    def snapshot_names(self) -> list[str]:
+        """The simulated chain doesn't support snapshots, so there are no snapshot names."""
+        return []
+
+    def cleanup(self):
+        """The simulated chain has no resources to clean up."""
+
+    def advance_time(
+        self, time_delta: int | timedelta, create_checkpoints: bool = True
+    ) -> dict[InteractiveHyperdrive, list[CreateCheckpoint]]:
+        """Advance time for all pools on this chain, mining a block at the end.
+
+        Arguments
+        ---------
+        time_delta: int | timedelta
+            The amount of time to advance. Can either be a `datetime.timedelta` object or an integer in seconds.
+        create_checkpoints: bool, optional
+            If set to true, will create intermediate checkpoints between advance times. Defaults to True.
+
+        Returns
+        -------
+        dict[InteractiveHyperdrive, list[CreateCheckpoint]]
+            Returns a dictionary keyed by the interactive hyperdrive object,
+            with a value of a list of emitted `CreateCheckpoint` events called
+            from advancing time.
+        """
+        if isinstance(time_delta, timedelta):
+            time_delta = int(time_delta.total_seconds())
+        else:
+            time_delta = int(time_delta)  # convert int-like (e.g. np.int64) types to int
+        out_dict: dict[InteractiveHyperdrive, list[CreateCheckpoint]] = {}
+        for pool in self._deployed_hyperdrive_pools:
+            checkpoint_events = pool.hyperdrive_interface.advance_time(time_delta, create_checkpoints)
+            out_dict[pool] = [
+                CreateCheckpoint(
+                    checkpoint_time=event.checkpoint_time,
+                    share_price=event.share_price,
+                    matured_shorts=event.matured_shorts,
+                    matured_longs=event.matured_longs,
+                    lp_share_price=event.lp_share_price,
+                )
+                for event in checkpoint_events
+            ]
+            pool._run_blocking_data_pipeline()  # pylint: disable=protected-access
+        return out_dict
+
+    def _add_deployed_pool_to_bookkeeping(self, pool: SimulatedInteractiveHyperdrive):
+        self._deployed_hyperdrive_pools.append(pool)
+
+
+class SimulatedInteractiveHyperdrive(InteractiveHyperdrive):
+    """Interactive hyperdrive on a simulated chain, with trades applied to an in-memory pool.
+
+    The pool and the agents' balances are kept by a `SimulatedHyperdriveReadWriteInterface`,
+    so no chain, contracts or database are needed. The pool state at every block is available from
+    `get_pool_config` and `get_pool_state`, and the agents' positions from `get_current_wallet` and
+    `get_wallet_positions`. The checkpoint info, ticker and pnl over time require the database of an
+    `InteractiveHyperdrive`, and raise `UnsupportedSimulatedFeatureError`.
+    """
+
+    # pylint: disable=super-init-not-called
+
+    def __init__(self, chain: SimulatedChain, config: InteractiveHyperdrive.Config | None = None):  # type: ignore
+        """Launch a simulated hyperdrive pool on the simulated chain.
+
+        Arguments
+        ---------
+        chain: SimulatedChain
+            The simulated chain object to launch hyperdrive on
+        config: InteractiveHyperdrive.Config | None
+            The configuration for the initial pool configuration
+        """
+        if config is None:
+            config = self.Config()
+        # sanity check (also for type checking), should get set in __post_init__
+        assert config.time_stretch is not None
+        self.eth_config = EthConfig(
+            artifacts_uri="not_used", rpc_uri=chain.rpc_uri, preview_before_trade=config.preview_before_trade
+        )
+        pool_config = PoolConfigFP(
+            base_token=SIMULATED_CONTRACT_ADDRESS,
+            linker_factory=SIMULATED_CONTRACT_ADDRESS,
+            linker_code_hash=bytes(32),
+            initial_share_price=FixedPoint(1),
+            minimum_share_reserves=config.minimum_share_reserves,
+            minimum_transaction_amount=config.minimum_transaction_amount,
+            position_duration=config.position_duration,
+            checkpoint_duration=config.checkpoint_duration,
+            time_stretch=config.time_stretch,
+            governance=SIMULATED_CONTRACT_ADDRESS,
+            fee_collector=SIMULATED_CONTRACT_ADDRESS,
+            fees=FeesFP(
+                curve=config.curve_fee,
+                flat=config.flat_fee,
+                governance_lp=config.governance_lp_fee,
+                governance_zombie=config.governance_zombie_fee,
+            ),
+        )
+        self.hyperdrive_interface = SimulatedHyperdriveReadWriteInterface(
+            pool_config,
+            initial_liquidity=config.initial_liquidity,
+            initial_fixed_rate=config.initial_fixed_rate,
+            initial_variable_rate=config.initial_variable_rate,
+            block_time=chain.block_time,
+            genesis_timestamp=chain.genesis_timestamp,
+            eth_config=self.eth_config,
+        )
+        self._deploy_account = Account().from_key(make_private_key())
+        self._deploy_block_number = 0
+        # Keep track of how much base have been minted per agent
+        self._initial_funds: dict[ChecksumAddress, FixedPoint] = {}
+        self._agent_names: dict[str, str] = {}
+        # Add this pool to the chain bookkeeping
+        chain._add_deployed_pool_to_bookkeeping(self)  # pylint: disable=protected-access
+        self.chain = chain  # type: ignore
+        self._pool_agents: list[InteractiveHyperdriveAgent] = []
+        self.data_pipeline_timeout = config.data_pipeline_timeout
+        self.rng = config.rng
+
+    def _run_blocking_data_pipeline(self, start_block: int | None = None) -> None:
+        # The simulated interface records the pool state of every mined block, so there is no data to gather
+        pass
+
+    def _cleanup(self):
+        """The simulated pool has no resources to clean up."""
+
+    # The simulated pool has no contract address, so the object itself is used as a dictionary key
+    def __hash__(self):
+        return id(self)
+
+    def __eq__(self, other):
+        return self is other
+
+    def set_variable_rate(self, variable_rate: FixedPoint) -> None:
+        """Sets the underlying variable rate for this pool.
+
+        Arguments
+        ---------
+        variable_rate: FixedPoint
+            The new variable rate for the pool.
+        """
+        self.hyperdrive_interface.set_variable_rate(self._deploy_account, variable_rate)
+
+    def _create_checkpoint(
+        self, checkpoint_time: int | None = None, check_if_exists: bool = True
+    ) -> CreateCheckpoint | None:
+        """Internal function without safeguard checks for creating a checkpoint."""
+        assert isinstance(self.hyperdrive_interface, SimulatedHyperdriveReadWriteInterface)
+        if checkpoint_time is None:
+            checkpoint_time = int(self.hyperdrive_interface.calc_checkpoint_id())
+        if check_if_exists and self.hyperdrive_interface.get_checkpoint_share_price(checkpoint_time) > 0:
+            return None
+        tx_receipt = self.hyperdrive_interface.create_checkpoint(self._deploy_account, checkpoint_time=checkpoint_time)
+        return CreateCheckpoint(
+            checkpoint_time=tx_receipt.checkpoint_time,
+            share_price=tx_receipt.share_price,
+            matured_shorts=tx_receipt.matured_shorts,
+            matured_longs=tx_receipt.matured_longs,
+            lp_share_price=tx_receipt.lp_share_price,
+        )
+
+    ### Data methods
+    # The pool data comes from the history of the simulated pool, since there is no database
+
+    def get_pool_config(self, coerce_float: bool = True) -> pd.Series:
+        """Get the pool config and returns as a pandas series.
+
+        Arguments
+        ---------
+        coerce_float: bool
+            If True, will coerce underlying FixedPoints to floats.
+
+        Returns
+        -------
+        pd.Series
+            A pandas series that consists of the pool config.
+        """
+        pool_config = asdict(self.hyperdrive_interface.pool_config)
+        fees = pool_config.pop("fees")
+        pool_config.update({f"{name}_fee": value for name, value in fees.items()})
+        if coerce_float:
+            pool_config = {
+                key: float(value) if isinstance(value, FixedPoint) else value for key, value in pool_config.items()
+            }
+        return pd.Series(pool_config)
+
+    def get_pool_state(self, coerce_float: bool = True) -> pd.DataFrame:
+        """Get the pool info (and additional info) per block and returns as a pandas dataframe.
+
+        Arguments
+        ---------
+        coerce_float: bool
+            If True, will coerce FixedPoint columns to floats. Otherwise they are given as scaled integers.
+
+        Returns
+        -------
+        pd.Dataframe
+            A pandas dataframe that consists of the pool state per block.
+        """
+        assert isinstance(self.hyperdrive_interface, SimulatedHyperdriveReadWriteInterface)
+        return self.hyperdrive_interface.pool_state_history.to_pandas(coerce_float=coerce_float)
+
+    def get_checkpoint_info(self, coerce_float: bool = True) -> pd.DataFrame:
+        """Checkpoint info requires the database of an `InteractiveHyperdrive`.
+        The checkpoint share prices are in the `checkpoint_share_price` column of `get_pool_state`.
+
+        Arguments
+        ---------
+        coerce_float: bool
+            Unused.
+
+        Returns
+        -------
+        pd.DataFrame
+            Never returns, raises `UnsupportedSimulatedFeatureError`.
+        """
+        raise UnsupportedSimulatedFeatureError("Checkpoint info requires the database, use `get_pool_state` instead.")
+
+    def _add_username_to_dataframe(self, df: pd.DataFrame, addr_column: str):
+        # The usernames are the names the agents were initialized with, since there is no database
+        addr_to_username = pd.DataFrame(
+            {"address": list(self._agent_names.keys()), "username": list(self._agent_names.values())}
+        )
+        username_to_user = pd.DataFrame({"username": pd.Series(dtype=str), "user": pd.Series(dtype=str)})
+        usernames = build_user_mapping(df[addr_column], addr_to_username, username_to_user)["username"]
+        df.insert(df.columns.get_loc(addr_column), "username", usernames.to_numpy())
+        return df
+
+    def get_current_wallet(self, coerce_float: bool = True) -> pd.DataFrame:
+        """Gets the current wallet positions of all agents and their corresponding pnl
+        and returns as a pandas dataframe.
+
+        The positions come from the accounts of the simulated pool, and the pnl of a position is its value
+        marked to market on the current pool state.
+
+        Arguments
+        ---------
+        coerce_float: bool
+            If True, will coerce values to floats. Otherwise they are given as Decimals.
+
+        Returns
+        -------
+        pd.Dataframe
+            See `InteractiveHyperdrive.get_current_wallet` for the columns.
+        """
+        assert isinstance(self.hyperdrive_interface, SimulatedHyperdriveReadWriteInterface)
+        pool_state = self.hyperdrive_interface.current_pool_state
+        latest_block_updates = {
+            (delta.wallet_address, delta.position.token_type): delta.block_number
+            for delta in self.hyperdrive_interface.wallet_deltas
+        }
+        rows = []
+        for agent in self._pool_agents:
+            address = agent.agent.checksum_address
+            for position in self.hyperdrive_interface.get_positions(address):
+                rows.append(
+                    {
+                        "timestamp": pd.Timestamp(pool_state.block_time, unit="s"),
+                        "block_number": pool_state.block_number,
+                        "wallet_address": address,
+                        "token_type": position.token_type,
+                        "position": _to_value(position.amount, coerce_float),
+                        "pnl": _to_value(self.hyperdrive_interface.calc_position_value(position), coerce_float),
+                        "base_token_type": position.base_token_type,
+                        "maturity_time": _to_maturity_time(position.maturity_time, coerce_float),
+                        "latest_block_update": latest_block_updates.get(
+                            (address, position.token_type), self._deploy_block_number
+                        ),
+                    }
+                )
+        out = pd.DataFrame(rows, columns=_CURRENT_WALLET_COLUMNS)
+        return self._add_username_to_dataframe(out, "wallet_address")
+
+    def get_ticker(self, coerce_float: bool = True) -> pd.DataFrame:
+        """The ticker requires the database of an `InteractiveHyperdrive`.
+
+        Arguments
+        ---------
+        coerce_float: bool
+            Unused.
+
+        Returns
+        -------
+        pd.DataFrame
+            Never returns, raises `UnsupportedSimulatedFeatureError`.
+        """
+        raise UnsupportedSimulatedFeatureError("The ticker requires the database, use `get_wallet_positions` instead.")
+
+    def get_wallet_positions(self, coerce_float: bool = True) -> pd.DataFrame:
+        """Get a dataframe summarizing all wallet deltas and positions
+        and returns as a pandas dataframe.
+
+        The deltas are recorded by the simulated pool for every trade, which has no transaction hash.
+
+        Arguments
+        ---------
+        coerce_float: bool
+            If True, will coerce values to floats. Otherwise they are given as Decimals.
+
+        Returns
+        -------
+        pd.Dataframe
+            See `InteractiveHyperdrive.get_wallet_positions` for the columns.
+        """
+        assert isinstance(self.hyperdrive_interface, SimulatedHyperdriveReadWriteInterface)
+        addresses = {agent.agent.checksum_address for agent in self._pool_agents}
+        rows = []
+        for delta in self.hyperdrive_interface.wallet_deltas:
+            if delta.wallet_address not in addresses:
+                continue
+            block = self.hyperdrive_interface.get_block(delta.block_number)
+            rows.append(
+                {
+                    "timestamp": pd.Timestamp(block["timestamp"], unit="s"),
+                    "block_number": delta.block_number,
+                    "wallet_address": delta.wallet_address,
+                    "token_type": delta.position.token_type,
+                    "position": _to_value(delta.position.amount, coerce_float),
+                    "delta": _to_value(delta.delta, coerce_float),
+                    "base_token_type": delta.position.base_token_type,
+                    "maturity_time": _to_maturity_time(delta.position.maturity_time, coerce_float),
+                    "transaction_hash": None,
+                }
+            )
+        out = pd.DataFrame(rows, columns=_WALLET_POSITIONS_COLUMNS)
+        return self._add_username_to_dataframe(out, "wallet_address")
+
+    def get_total_wallet_pnl_over_time(self, coerce_float: bool = True) -> pd.DataFrame:
+        """Pnl over time requires the database of an `InteractiveHyperdrive`.
+        The current pnl of each position is in the `pnl` column of `get_current_wallet`.
+
+        Arguments
+        ---------
+        coerce_float: bool
+            Unused.
+
+        Returns
+        -------
+        pd.DataFrame
+            Never returns, raises `UnsupportedSimulatedFeatureError`.
+        """
+        raise UnsupportedSimulatedFeatureError("Pnl over time requires the database, use `get_current_wallet` instead.")
+
+    def _get_anvil_state_dump(self) -> str | None:
+        # The simulated chain has no anvil state to dump in crash reports
+        return None
+
+    ### Private agent methods ###
+
+    def _init_agent(
+        self,
+        base: FixedPoint,
+        eth: FixedPoint,
+        name: str | None,
+        policy: Type[HyperdrivePolicy] | None,
+        policy_config: HyperdrivePolicy.Config | None,
+        private_key: str | None = None,
+    ) -> HyperdriveAgent:
+        # pylint: disable=too-many-arguments
+        agent_private_key = make_private_key() if private_key is None else private_key
+        # Setting the budget to 0 here, `_add_funds` will take care of updating the wallet
+        agent = HyperdriveAgent(
+            Account().from_key(agent_private_key),
+            initial_budget=FixedPoint(0),
+            policy=InteractiveHyperdrivePolicy(
+                InteractiveHyperdrivePolicy.Config(sub_policy=policy, sub_policy_config=policy_config, rng=self.rng)
+            ),
+        )
+        # Fund agent, there is no approval since there is no base token contract
+        if eth > 0 or base > 0:
+            self._add_funds(agent, base, eth)
+        if name is not None:
+            self._agent_names[agent.address] = name
+        return agent
+
+    def _add_funds(self, agent: HyperdriveAgent, base: FixedPoint, eth: FixedPoint) -> None:
+        assert isinstance(self.hyperdrive_interface, SimulatedHyperdriveReadWriteInterface)
+        self.hyperdrive_interface.fund_account(agent.address, base, eth)
+        if base > FixedPoint(0):
+            # Update the agent's wallet balance
+            agent.wallet.balance.amount += base
+            # Keep track of how much base has been minted for each agent
+            if agent.address in self._initial_funds:
+                self._initial_funds[agent.address] += base
+            else:
+                self._initial_funds[agent.address] = base
+
+
+# The columns of `get_current_wallet` and `get_wallet_positions` before the username is added
+_CURRENT_WALLET_COLUMNS = [
+    "timestamp",
+    "block_number",
+    "wallet_address",
+    "token_type",
+    "position",
+    "pnl",
+    "base_token_type",
+    "maturity_time",
+    "latest_block_update",
+]
+_WALLET_POSITIONS_COLUMNS = [
+    "timestamp",
+    "block_number",
+    "wallet_address",
+    "token_type",
+    "position",
+    "delta",
+    "base_token_type",
+    "maturity_time",
+    "transaction_hash",
+]
+
+
+def _to_value(amount: FixedPoint, coerce_float: bool) -> float | Decimal:
+    """Convert an amount to the type of the values of the database dataframes."""
+    return float(amount) if coerce_float else Decimal(str(amount))
+
+
+def _to_maturity_time(maturity_time: int | None, coerce_float: bool) -> float | Decimal:
+    """Convert a maturity time to the type of the database dataframes, which is NaN for tokens without one."""
+    if maturity_time is None:
+        return float("nan") if coerce_float else Decimal("nan")
+    return float(maturity_time) if coerce_float else Decimal(maturity_time)
@@ -0,0 +1,225 @@
+"""Tests interactive hyperdrive and the agent trade loop on a simulated chain."""
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+from eth_account import Account
+from ethpy.hyperdrive.interface import UnsupportedSimulatedFeatureError
+from fixedpointmath import FixedPoint
+
+from agent0 import AccountKeyConfig
+from agent0.base import MarketType, Trade
+from agent0.base.config import EnvironmentConfig
+from agent0.base.make_key import make_private_key
+from agent0.hyperdrive.agents import HyperdriveAgent
+from agent0.hyperdrive.exec import async_trade_if_new_block
+from agent0.hyperdrive.exec.run_agents import run_agents
+from agent0.hyperdrive.policies import HyperdrivePolicy, Zoo
+from agent0.hyperdrive.state import HyperdriveActionType, HyperdriveMarketAction
+
+from .simulated_hyperdrive import SimulatedChain, SimulatedInteractiveHyperdrive
+
+# ruff: noqa: PLR2004 (comparison against magic values (literals like numbers))
+
+
+class _WaitThenLong(HyperdrivePolicy):
+    """Waits for a number of blocks without trading, then opens a long and is done."""
+
+    def __init__(self, policy_config: HyperdrivePolicy.Config, wait_blocks: int = 3):
+        super().__init__(policy_config)
+        self.wait_blocks = wait_blocks
+
+    def action(self, interface, wallet):
+        if self.wait_blocks > 0:
+            self.wait_blocks -= 1
+            return [], False
+        if len(wallet.longs) > 0:
+            return [], True
+        action = HyperdriveMarketAction(HyperdriveActionType.OPEN_LONG, FixedPoint(1_000))
+        return [Trade(market_type=MarketType.HYPERDRIVE, market_action=action)], False
+
+
+def test_simulated_interactive_trades():
+    """Trades on the simulated pool update the agent's wallet and the pool state history."""
+    chain = SimulatedChain(genesis_timestamp=1_700_000_000)
+    interactive_hyperdrive = SimulatedInteractiveHyperdrive(chain)
+    agent = interactive_hyperdrive.init_agent(base=FixedPoint(100_000), name="alice")
+    interface = interactive_hyperdrive.hyperdrive_interface
+
+    open_long = agent.open_long(FixedPoint(10_000))
+    assert agent.wallet.balance.amount == FixedPoint(90_000)
+    assert agent.wallet.longs[open_long.maturity_time].balance == open_long.bond_amount
+    assert interface.current_pool_state.pool_info.longs_outstanding == open_long.bond_amount
+    open_short = agent.open_short(FixedPoint(5_000))
+    assert agent.wallet.shorts[open_short.maturity_time].balance == FixedPoint(5_000)
+    add_liquidity = agent.add_liquidity(FixedPoint(10_000))
+    assert agent.wallet.lp_tokens == add_liquidity.lp_amount
+    # The simulated accounts match the wallets
+    assert interface.get_eth_base_balances(agent.agent)[1] == agent.wallet.balance.amount
+
+    chain.advance_time(60 * 60 * 24)
+    close_long = agent.close_long(open_long.maturity_time, open_long.bond_amount)
+    assert open_long.maturity_time not in agent.wallet.longs
+    assert close_long.base_amount > FixedPoint(0)
+    pool_info = interface.current_pool_state.pool_info
+    assert pool_info.longs_outstanding == FixedPoint(0)
+    assert pool_info.shorts_outstanding == FixedPoint(5_000)
+
+    pool_state_df = interactive_hyperdrive.get_pool_state()
+    assert pool_state_df["block_number"].is_monotonic_increasing
+    assert pool_state_df["block_number"].iloc[-1] == interface.current_pool_state.block_number
+    assert pool_state_df["shorts_outstanding"].iloc[-1] == 5_000
+    pool_state_df = interactive_hyperdrive.get_pool_state(coerce_float=False)
+    assert pool_state_df["longs_outstanding"].max() == open_long.bond_amount.scaled_value
+
+
+def test_run_agents_simulated():
+    """Agents run through the trade loop on the simulated chain, which mines blocks while no agent trades."""
+    chain = SimulatedChain(genesis_timestamp=1_700_000_000)
+    interactive_hyperdrive = SimulatedInteractiveHyperdrive(chain)
+    interface = interactive_hyperdrive.hyperdrive_interface
+    start_block_number = interface.current_pool_state.block_number
+    budget = FixedPoint(100_000)
+    agents = [
+        HyperdriveAgent(
+            Account.create(),
+            budget,
+            Zoo.deterministic(Zoo.deterministic.Config(trade_list=[("open_long", 1_000), ("open_short", 500)])),
+        ),
+        HyperdriveAgent(Account.create(), budget, _WaitThenLong(HyperdrivePolicy.Config())),
+    ]
+    for agent in agents:
+        interface.fund_account(agent.address, base=budget)
+    run_agents(
+        EnvironmentConfig(halt_on_errors=True),
+        interface.eth_config,
+        AccountKeyConfig(USER_KEY=None, AGENT_KEYS=[], AGENT_ETH_BUDGETS=[], AGENT_BASE_BUDGETS=[]),
+        interface.addresses,
+        interface,
+        agents,
+    )
+    assert all(agent.done_trading for agent in agents)
+    assert len(agents[0].wallet.longs) == 1
+    assert len(agents[0].wallet.shorts) == 1
+    assert len(agents[1].wallet.longs) == 1
+    pool_info = interface.current_pool_state.pool_info
+    assert pool_info.longs_outstanding == sum(
+        (long.balance for agent in agents for long in agent.wallet.longs.values()), start=FixedPoint(0)
+    )
+    assert pool_info.shorts_outstanding == FixedPoint(500)
+    for agent in agents:
+        assert interface.get_eth_base_balances(agent)[1] == agent.wallet.balance.amount
+    # One block per trade, and the blocks mined while no agent trades
+    assert interface.current_pool_state.block_number > start_block_number + 3
+
+
+def test_trade_if_new_block_simulated():
+    """The trade loop doesn't wait for a new block on the simulated chain, since every trade mines a block."""
+    chain = SimulatedChain(genesis_timestamp=1_700_000_000)
+    interactive_hyperdrive = SimulatedInteractiveHyperdrive(chain)
+    interface = interactive_hyperdrive.hyperdrive_interface
+    agent = HyperdriveAgent(
+        Account.create(),
+        FixedPoint(10_000),
+        Zoo.deterministic(Zoo.deterministic.Config(trade_list=[("open_long", 1_000), ("open_long", 1_000)])),
+    )
+    interface.fund_account(agent.address, base=FixedPoint(10_000))
+    for _ in range(2):
+        block_number = interface.current_pool_state.block_number
+        # The block was already traded on, but the trades still execute
+        executed_block = asyncio.run(
+            async_trade_if_new_block(interface, [agent], True, False, False, "", False, block_number, False, False)
+        )
+        assert executed_block == block_number
+        assert interface.current_pool_state.block_number == block_number + 1
+    assert sum((long.balance for long in agent.wallet.longs.values()), start=FixedPoint(0)) > FixedPoint(2_000)
+    assert agent.wallet.balance.amount == FixedPoint(8_000)
+
+
+def test_simulated_wallet_getters():
+    """The wallet getters are built from the accounts of the simulated pool, while the database getters raise."""
+    chain = SimulatedChain(genesis_timestamp=1_700_000_000)
+    interactive_hyperdrive = SimulatedInteractiveHyperdrive(chain)
+    alice = interactive_hyperdrive.init_agent(base=FixedPoint(100_000), name="alice")
+    bob = interactive_hyperdrive.init_agent(base=FixedPoint(100_000))
+    open_long = alice.open_long(FixedPoint(10_000))
+    alice.add_liquidity(FixedPoint(10_000))
+    bob.open_short(FixedPoint(1_000))
+    chain.advance_time(60 * 60 * 24)
+
+    current_wallet = interactive_hyperdrive.get_current_wallet()
+    assert list(current_wallet.columns) == [
+        "timestamp",
+        "block_number",
+        "username",
+        "wallet_address",
+        "token_type",
+        "position",
+        "pnl",
+        "base_token_type",
+        "maturity_time",
+        "latest_block_update",
+    ]
+    alice_wallet = current_wallet[current_wallet["username"] == "alice"].set_index("token_type")
+    assert alice_wallet.loc["WETH", "position"] == alice_wallet.loc["WETH", "pnl"] == 80_000
+    long_row = alice_wallet.loc[f"LONG-{open_long.maturity_time}"]
+    assert long_row["position"] == float(open_long.bond_amount)
+    assert long_row["maturity_time"] == open_long.maturity_time
+    # The long is marked to market, below the face value of its bonds before maturity
+    assert 0 < long_row["pnl"] < long_row["position"]
+    assert alice_wallet.loc["LP", "position"] == float(alice.wallet.lp_tokens)
+    # Agents without a name get their abbreviated address
+    bob_wallet = current_wallet[current_wallet["wallet_address"] == bob.agent.checksum_address]
+    assert set(bob_wallet["username"]) == {bob.agent.checksum_address[:6] + "..." + bob.agent.checksum_address[-4:]}
+    assert set(bob_wallet["base_token_type"]) == {"WETH", "SHORT"}
+
+    wallet_positions = interactive_hyperdrive.get_wallet_positions(coerce_float=False)
+    alice_positions = wallet_positions[wallet_positions["username"] == "alice"]
+    # Each trade changes the base and one position
+    assert len(alice_positions) == 4
+    base_positions = alice_positions[alice_positions["token_type"] == "WETH"]
+    assert list(base_positions["delta"]) == [Decimal(-10_000), Decimal(-10_000)]
+    assert list(base_positions["position"]) == [Decimal(90_000), Decimal(80_000)]
+    assert (wallet_positions["block_number"].diff().dropna() >= 0).all()
+
+    with pytest.raises(UnsupportedSimulatedFeatureError):
+        interactive_hyperdrive.get_ticker()
+    with pytest.raises(UnsupportedSimulatedFeatureError):
+        interactive_hyperdrive.get_checkpoint_info()
+    with pytest.raises(UnsupportedSimulatedFeatureError):
+        interactive_hyperdrive.get_total_wallet_pnl_over_time()
+
+
+def test_run_agents_simulated_refunding():
+    """Agents are funded with their budgets on the simulated chain when their average balance runs low."""
+    chain = SimulatedChain(genesis_timestamp=1_700_000_000)
+    interface = SimulatedInteractiveHyperdrive(chain).hyperdrive_interface
+    agent_key = make_private_key()
+    budget = FixedPoint(1_000)
+    agent = HyperdriveAgent(
+        Account().from_key(agent_key),
+        budget,
+        Zoo.deterministic(Zoo.deterministic.Config(trade_list=[("open_long", 1_000)])),
+    )
+    interface.fund_account(agent.address, base=budget)
+    run_agents(
+        EnvironmentConfig(halt_on_errors=True),
+        interface.eth_config,
+        AccountKeyConfig(
+            USER_KEY=None,
+            AGENT_KEYS=[agent_key],
+            AGENT_ETH_BUDGETS=[FixedPoint(1).scaled_value],
+            AGENT_BASE_BUDGETS=[budget.scaled_value],
+        ),
+        interface.addresses,
+        interface,
+        [agent],
+        minimum_avg_agent_base=FixedPoint(500),
+    )
+    assert agent.done_trading
+    assert len(agent.wallet.longs) == 1
+    # The agent spent its budget on the long, and was funded once
+    assert agent.wallet.balance.amount == budget
+    assert interface.get_eth_base_balances(agent) == (FixedPoint(1), budget)
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Sequence, cast
 
 from fixedpointmath import FixedPoint
 
@@ -13,6 +13,7 @@ from .hyperdrive_policy import HyperdrivePolicy
 
 if TYPE_CHECKING:
     from ethpy.hyperdrive.interface import HyperdriveReadInterface
+    from ethpy.hyperdrive.state import PoolState
 
     from agent0.hyperdrive.state import HyperdriveWallet
 
@@ -97,7 +98,47 @@ class Arbitrage(HyperdrivePolicy):
             and the second element defines if the agent is done trading.
         """
         pool_state = interface.current_pool_state
+        return self._action_given_fixed_rate(interface, wallet, pool_state, interface.calc_fixed_rate(pool_state))
+
+    @classmethod
+    def action_batch(
+        cls,
+        policies: Sequence[HyperdrivePolicy],
+        interface: HyperdriveReadInterface,
+        wallets: Sequence[HyperdriveWallet],
+    ) -> list[tuple[list[Trade[HyperdriveMarketAction]], bool]]:
+        """Specify the actions of a cohort of agents, calculating the fixed rate once for all of them.
+
+        Arguments
+        ---------
+        policies: Sequence[HyperdrivePolicy]
+            The Arbitrage policy of each agent in the cohort.
+        interface: HyperdriveReadInterface
+            Interface for the market on which the agents will be executing trades (MarketActions).
+        wallets: Sequence[HyperdriveWallet]
+            The wallet of each agent in the cohort.
+
+        Returns
+        -------
+        list[tuple[list[MarketAction], bool]]
+            The result of `action` for each agent: a list of actions, and whether the agent is done trading.
+        """
+        pool_state = interface.current_pool_state
         fixed_rate = interface.calc_fixed_rate(pool_state)
+        # pylint: disable=protected-access
+        return [
+            policy._action_given_fixed_rate(interface, wallet, pool_state, fixed_rate)
+            for policy, wallet in zip(cast(Sequence[Arbitrage], policies), wallets)
+        ]
+
+    def _action_given_fixed_rate(
+        self,
+        interface: HyperdriveReadInterface,
+        wallet: HyperdriveWallet,
+        pool_state: PoolState,
+        fixed_rate: FixedPoint,
+    ) -> tuple[list[Trade[HyperdriveMarketAction]], bool]:
+        """Specify actions given the pool's fixed rate."""
         action_list = []
 
         # Close longs if matured
@@ -1,4 +1,7 @@
 """Base class for hyperdrive policies"""
+from __future__ import annotations
+
+from typing import Sequence
 
 from ethpy.hyperdrive.interface import HyperdriveReadInterface
 
@@ -29,3 +32,32 @@ class HyperdrivePolicy(BasePolicy[HyperdriveReadInterface, HyperdriveWallet]):
             and the second element defines if the agent is done trading.
         """
         raise NotImplementedError
+
+    @classmethod
+    def action_batch(
+        cls,
+        policies: Sequence[HyperdrivePolicy],
+        interface: HyperdriveReadInterface,
+        wallets: Sequence[HyperdriveWallet],
+    ) -> list[tuple[list[Trade[HyperdriveMarketAction]], bool]]:
+        """Evaluate the actions of a cohort of agents that use this policy class, on the same pool state.
+
+        Policies can override this to share pool calculations across the cohort. Each agent still draws from
+        the random number generator of its own policy in the same order as `action`,
+        so the results match calling `action` for each agent.
+
+        Arguments
+        ---------
+        policies: Sequence[HyperdrivePolicy]
+            The policy of each agent in the cohort, which are instances of this class.
+        interface: HyperdriveReadInterface
+            Interface for the market on which the agents will be executing trades (MarketActions).
+        wallets: Sequence[HyperdriveWallet]
+            The wallet of each agent in the cohort.
+
+        Returns
+        -------
+        list[tuple[list[MarketAction], bool]]
+            The result of `action` for each agent: a list of actions, and whether the agent is done trading.
+        """
+        return [policy.action(interface, wallet) for policy, wallet in zip(policies, wallets)]
@@ -0,0 +1,62 @@
+"""Tests for evaluating the actions of Hyperdrive policies in batches."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+from eth_account import Account
+from ethpy.hyperdrive.interface import SimulatedHyperdriveReadWriteInterface
+from fixedpointmath import FixedPoint
+
+from agent0.hyperdrive.agents import HyperdriveAgent
+from agent0.hyperdrive.exec import async_execute_agent_trades
+
+from .zoo import Zoo
+
+
+def _summarize_actions(actions: list) -> list:
+    """Summarize the trades of each agent so that they can be compared."""
+    return [
+        (
+            [
+                (trade.market_action.action_type, trade.market_action.trade_amount, trade.market_action.maturity_time)
+                for trade in trades
+            ],
+            done_trading,
+        )
+        for trades, done_trading in actions
+    ]
+
+
+@pytest.mark.parametrize(
+    "policy, policy_config",
+    [
+        (Zoo.random, Zoo.random.Config(trade_chance=FixedPoint("0.9"))),
+        (Zoo.smart_long, Zoo.smart_long.Config(trade_chance=FixedPoint("0.9"))),
+        (Zoo.arbitrage, Zoo.arbitrage.Config(high_fixed_rate_thresh=FixedPoint("0.01"))),
+    ],
+)
+def test_action_batch(policy, policy_config):
+    """Batches of actions are the same as the actions of each agent, and leave the agents' rngs in the same state."""
+    interface = SimulatedHyperdriveReadWriteInterface()
+    interface.set_variable_rate(Account.create(), FixedPoint("0.02"))
+    agents = []
+    for index in range(10):
+        budget = FixedPoint(100_000 + 1_000 * index)
+        agent = HyperdriveAgent(Account.create(), budget, Zoo.random(Zoo.random.Config(rng_seed=index)))
+        interface.fund_account(agent.address, base=budget)
+        agents.append(agent)
+    # Trade for a few days to fill up the wallets
+    for _ in range(3):
+        asyncio.run(async_execute_agent_trades(interface, agents, liquidate=False, batch_policy_actions=True))
+        interface.advance_time(60 * 60 * 24)
+    wallets = [agent.wallet for agent in agents]
+    policies = [policy(replace(policy_config, rng_seed=index)) for index in range(10)]
+    batch_policies = [policy(replace(policy_config, rng_seed=index)) for index in range(10)]
+    actions = [agent_policy.action(interface, wallet) for agent_policy, wallet in zip(policies, wallets)]
+    batch_actions = policy.action_batch(batch_policies, interface, wallets)
+    assert _summarize_actions(actions) == _summarize_actions(batch_actions)
+    assert [agent_policy.rng.random() for agent_policy in policies] == [
+        agent_policy.rng.random() for agent_policy in batch_policies
+    ]
@@ -3,12 +3,10 @@ from __future__ import annotations
 
 import logging
 import time
-from copy import deepcopy
 from dataclasses import dataclass
 from statistics import mean
 from typing import TYPE_CHECKING
 
-from ethpy.hyperdrive.state import PoolState
 from fixedpointmath import FixedPoint
 
 from agent0.base import Trade
@@ -22,48 +20,12 @@ if TYPE_CHECKING:
 
 # pylint: disable=too-many-arguments, too-many-locals
 
-# constants
-TOLERANCE = 1e-16
-MAX_ITER = 50
-
-
-def calc_shares_needed_for_bonds(
-    bonds_needed: FixedPoint, pool_state: PoolState, interface: HyperdriveReadInterface
-) -> tuple[FixedPoint, FixedPoint]:
-    """Calculate the shares needed to trade a certain amount of bonds, and the associate governance fee.
-
-    Arguments
-    ---------
-    bonds_needed: FixedPoint
-        The given amount of bonds that is going to be traded.
-    pool_state: PoolState
-        The hyperdrive pool state.
-    interface: HyperdriveReadInterface
-        The Hyperdrive API interface object.
-
-
-    Returns
-    -------
-    tuple[FixedPoint, FixedPoint]
-        _shares_to_pool: FixedPoint
-            The change in shares in the pool for the given amount of bonds.
-        _shares_to_gov: FixedPoint
-            The associated shares going to governance.
-    """
-    _shares_to_pool = interface.calc_shares_out_given_bonds_in_down(abs(bonds_needed), pool_state)
-    spot_price = interface.calc_spot_price(pool_state)
-    price_discount = FixedPoint(1) - spot_price
-    _shares_to_gov = (
-        _shares_to_pool * price_discount * pool_state.pool_config.fees.curve * pool_state.pool_config.fees.governance_lp
-    )
-    _shares_to_pool -= _shares_to_gov
-    return _shares_to_pool, _shares_to_gov
-
 
 def calc_reserves_to_hit_target_rate(
     target_rate: FixedPoint, interface: HyperdriveReadInterface
 ) -> tuple[FixedPoint, FixedPoint, int, float]:
     """Calculate the bonds and shares needed to hit the target fixed rate.
+    Uses the target rate solver of the interface, and records how long it took.
 
     Arguments
     ---------
@@ -74,7 +36,7 @@ def calc_reserves_to_hit_target_rate(
 
     Returns
     -------
-    tuple[FixedPoint, FixedPoint]
+    tuple[FixedPoint, FixedPoint, int, float]
         total_shares_needed: FixedPoint
             Total amount of shares needed to be added into the pool to hit the target rate.
         total_bonds_needed: FixedPoint
@@ -84,94 +46,19 @@ def calc_reserves_to_hit_target_rate(
         convergence_speed: float
             The amount of time it took to converge, in seconds.
     """
-    predicted_rate = FixedPoint(0)
-    pool_state = deepcopy(interface.current_pool_state)
-
-    iteration = 0
-    start_time = time.time()
-    total_shares_needed = FixedPoint(0)
-    total_bonds_needed = FixedPoint(0)
     # pylint: disable=logging-fstring-interpolation
     logging.debug(f"Targeting {float(target_rate):.2%} from {float(interface.calc_fixed_rate()):.2%}")
-    while float(abs(predicted_rate - target_rate)) > TOLERANCE:
-        iteration += 1
-        latest_fixed_rate = interface.calc_fixed_rate(pool_state)
-        target_bonds = interface.calc_bonds_given_shares_and_rate(
-            target_rate, pool_state.pool_info.share_reserves, pool_state
-        )
-        # bonds_needed tells us the number of bonds to hit the desired reserves ratio, keeping shares constant.
-        # however trades modify both bonds and shares in amounts of equal value.
-        # we modify bonds by only half of bonds_needed, knowing that an amount of equal
-        # value will move shares in the other direction, toward our desired ratio.
-        # this guess is very bad when slippage is high, so we check how bad, then scale accordingly.
-        bonds_needed = (target_bonds - pool_state.pool_info.bond_reserves) / FixedPoint(2)
-        shares_to_pool, shares_to_gov = calc_shares_needed_for_bonds(bonds_needed, pool_state, interface)
-        # save bad first guess to a temporary variable
-        temp_pool_state = apply_step(deepcopy(pool_state), bonds_needed, shares_to_pool, shares_to_gov)
-        predicted_rate = interface.calc_fixed_rate(temp_pool_state)
-        # adjust guess up or down based on how much the first guess overshot or undershot
-        overshoot_or_undershoot = (predicted_rate - latest_fixed_rate) / (target_rate - latest_fixed_rate)
-        bonds_needed /= overshoot_or_undershoot
-        shares_to_pool, shares_to_gov = calc_shares_needed_for_bonds(bonds_needed, pool_state, interface)
-        # update pool state with second guess and continue from there
-        pool_state = apply_step(pool_state, bonds_needed, shares_to_pool, shares_to_gov)
-        predicted_rate = interface.calc_fixed_rate(pool_state)
-        # update running totals
-        total_shares_needed = (
-            pool_state.pool_info.share_reserves - interface.current_pool_state.pool_info.share_reserves
-        )
-        total_bonds_needed = pool_state.pool_info.bond_reserves - interface.current_pool_state.pool_info.bond_reserves
-        # log info about the completed step
-        formatted_str = (
-            f"iteration {iteration:3}: {float(predicted_rate):22.18%}"
-            + f" d_bonds={float(total_bonds_needed):27,.18f} d_shares={float(total_shares_needed):27,.18f}"
-        )
-        logging.debug(formatted_str)
-        if iteration >= MAX_ITER:
-            break
+    start_time = time.time()
+    total_shares_needed, total_bonds_needed, iteration = interface.calc_reserves_to_hit_target_rate(target_rate)
     convergence_speed = time.time() - start_time
-    formatted_str = f"predicted precision: {float(abs(predicted_rate-target_rate))}, time taken: {convergence_speed}s"
+    formatted_str = (
+        f"iterations: {iteration:3}, d_bonds={float(total_bonds_needed):27,.18f}"
+        + f" d_shares={float(total_shares_needed):27,.18f}, time taken: {convergence_speed}s"
+    )
     logging.debug(formatted_str)
     return total_shares_needed, total_bonds_needed, iteration, convergence_speed
 
 
-def apply_step(
-    pool_state: PoolState,
-    bonds_needed: FixedPoint,
-    shares_needed: FixedPoint,
-    gov_fee: FixedPoint,
-) -> PoolState:
-    """Save a single convergence step into the pool info.
-
-    Arguments
-    ---------
-    pool_state: PoolState
-        The current pool state.
-    bonds_needed: FixedPoint
-        The amount of bonds that is going to be traded.
-    shares_needed: FixedPoint
-        The amount of shares that is going to be traded.
-    gov_fee: FixedPoint
-        The associated governance fee.
-
-
-    Returns
-    -------
-    PoolState
-        The updated pool state.
-    """
-    if bonds_needed > 0:  # short case
-        # shares_needed is what the user takes OUT: curve_fee less due to fees.
-        # gov_fee of that doesn't stay in the pool, going OUT to governance (same direction as user flow).
-        pool_state.pool_info.share_reserves += -shares_needed - gov_fee
-    else:  # long case
-        # shares_needed is what the user pays IN: curve_fee more due to fees.
-        # gov_fee of that doesn't go to the pool, going OUT to governance (opposite direction of user flow).
-        pool_state.pool_info.share_reserves += shares_needed - gov_fee
-    pool_state.pool_info.bond_reserves += bonds_needed
-    return pool_state
-
-
 # TODO this should maybe subclass from arbitrage policy, but perhaps making it swappable
 class LPandArb(HyperdrivePolicy):
     """LP and Arbitrage in a fixed proportion."""
@@ -1,9 +1,11 @@
 """User strategy that opens or closes a random position with a random allowed amount."""
 from __future__ import annotations
 
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Sequence, cast
 
+import numpy as np
 from fixedpointmath import FixedPoint
 
 from agent0.base import WEI, Trade
@@ -118,190 +120,6 @@ class Random(HyperdrivePolicy):
         # down select from all actions to only include allowed actions
         return [action for action in all_available_actions if action in self.allowable_actions]
 
-    def open_short_with_random_amount(
-        self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
-    ) -> list[Trade[HyperdriveMarketAction]]:
-        """Open a short with a random allowable amount.
-
-        Arguments
-        ---------
-        interface: HyperdriveReadInterface
-            Interface for the market on which this agent will be executing trades (MarketActions).
-        wallet: HyperdriveWallet
-            The agent's wallet.
-
-        Returns
-        -------
-        list[Trade[HyperdriveMarketAction]]
-            A list with a single Trade element for opening a Hyperdrive short.
-        """
-        maximum_trade_amount = interface.calc_max_short(wallet.balance.amount, interface.current_pool_state)
-        if maximum_trade_amount <= WEI:
-            return []
-
-        initial_trade_amount = FixedPoint(
-            self.rng.normal(loc=float(wallet.balance.amount) * 0.1, scale=float(wallet.balance.amount) * 0.01)
-        )
-        # WEI <= trade_amount <= max_short
-        trade_amount = max(WEI, min(initial_trade_amount, maximum_trade_amount))
-        # return a trade using a specification that is parsable by the rest of the sim framework
-        return [interface.open_short_trade(trade_amount, self.slippage_tolerance)]
-
-    def close_random_short(
-        self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
-    ) -> list[Trade[HyperdriveMarketAction]]:
-        """Fully close the short balance for a random mint time.
-
-        Arguments
-        ---------
-        interface: HyperdriveReadInterface
-            Interface for the market on which this agent will be executing trades (MarketActions).
-        wallet: HyperdriveWallet
-            The agent's wallet.
-
-        Returns
-        -------
-        list[Trade[HyperdriveMarketAction]]
-            A list with a single Trade element for closing a Hyperdrive short.
-        """
-        # choose a random short time to close
-        short_time = list(wallet.shorts)[self.rng.integers(len(wallet.shorts))]
-        trade_amount = wallet.shorts[short_time].balance  # close the full trade
-        return [interface.close_short_trade(trade_amount, short_time, self.slippage_tolerance)]
-
-    def open_long_with_random_amount(
-        self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
-    ) -> list[Trade[HyperdriveMarketAction]]:
-        """Open a long with a random allowable amount.
-
-        Arguments
-        ---------
-        interface: HyperdriveReadInterface
-            Interface for the market on which this agent will be executing trades (MarketActions).
-        wallet: HyperdriveWallet
-            The agent's wallet.
-
-        Returns
-        -------
-        list[Trade[HyperdriveMarketAction]]
-            A list with a single Trade element for opening a Hyperdrive long.
-        """
-        maximum_trade_amount = interface.calc_max_long(wallet.balance.amount, interface.current_pool_state)
-        if maximum_trade_amount <= WEI:
-            return []
-        # take a guess at the trade amount, which should be about 10% of the agent’s budget
-        initial_trade_amount = FixedPoint(
-            self.rng.normal(loc=float(wallet.balance.amount) * 0.1, scale=float(wallet.balance.amount) * 0.01)
-        )
-        # WEI <= trade_amount <= max long
-        trade_amount = max(WEI, min(initial_trade_amount, maximum_trade_amount))
-        # return a trade using a specification that is parsable by the rest of the sim framework
-        return [interface.open_long_trade(trade_amount, self.slippage_tolerance)]
-
-    def close_random_long(
-        self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
-    ) -> list[Trade[HyperdriveMarketAction]]:
-        """Fully close the long balance for a random mint time.
-
-        Arguments
-        ---------
-        interface: HyperdriveReadInterface
-            Interface for the market on which this agent will be executing trades (MarketActions).
-        wallet: HyperdriveWallet
-            The agent's wallet.
-
-        Returns
-        -------
-        list[Trade[HyperdriveMarketAction]]
-            A list with a single Trade element for closing a Hyperdrive long.
-        """
-        # choose a random long time to close
-        long_time = list(wallet.longs)[self.rng.integers(len(wallet.longs))]
-        trade_amount = wallet.longs[long_time].balance  # close the full trade
-        return [interface.close_long_trade(trade_amount, long_time, self.slippage_tolerance)]
-
-    def add_liquidity_with_random_amount(
-        self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
-    ) -> list[Trade[HyperdriveMarketAction]]:
-        """Add liquidity with a random allowable amount.
-
-        Arguments
-        ---------
-        interface: HyperdriveReadInterface
-            Interface for the market on which this agent will be executing trades (MarketActions).
-        wallet: HyperdriveWallet
-            The agent's wallet.
-
-        Returns
-        -------
-        list[Trade[HyperdriveMarketAction]]
-            A list with a single Trade element for adding liquidity to a Hyperdrive pool.
-        """
-        # take a guess at the trade amount, which should be about 10% of the agent’s budget
-        initial_trade_amount = FixedPoint(
-            self.rng.normal(loc=float(wallet.balance.amount) * 0.1, scale=float(wallet.balance.amount) * 0.01)
-        )
-        # WEI <= trade_amount
-        trade_amount: FixedPoint = max(WEI, min(wallet.balance.amount, initial_trade_amount))
-        # return a trade using a specification that is parsable by the rest of the sim framework
-        return [interface.add_liquidity_trade(trade_amount)]
-
-    def remove_liquidity_with_random_amount(
-        self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
-    ) -> list[Trade[HyperdriveMarketAction]]:
-        """Remove liquidity with a random allowable amount.
-
-        Arguments
-        ---------
-        interface: HyperdriveReadInterface
-            Interface for the market on which this agent will be executing trades (MarketActions).
-        wallet: HyperdriveWallet
-            The agent's wallet.
-
-        Returns
-        -------
-        list[Trade[HyperdriveMarketAction]]
-            A list with a single Trade element for removing liquidity from a Hyperdrive pool.
-        """
-        # take a guess at the trade amount, which should be about 10% of the agent’s budget
-        initial_trade_amount = FixedPoint(
-            self.rng.normal(loc=float(wallet.balance.amount) * 0.1, scale=float(wallet.balance.amount) * 0.01)
-        )
-        # WEI <= trade_amount <= lp_tokens
-        trade_amount = max(WEI, min(wallet.lp_tokens, initial_trade_amount))
-        # return a trade using a specification that is parsable by the rest of the sim framework
-        return [interface.remove_liquidity_trade(trade_amount, self.slippage_tolerance)]
-
-    def redeem_withdraw_shares_with_random_amount(
-        self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
-    ) -> list[Trade[HyperdriveMarketAction]]:
-        """Redeem withdraw shares with a random allowable amount.
-
-        Arguments
-        ---------
-        interface: HyperdriveReadInterface
-            Interface for the market on which this agent will be executing trades (MarketActions).
-        wallet: HyperdriveWallet
-            The agent's wallet.
-
-        Returns
-        -------
-        list[Trade[HyperdriveMarketAction]]
-            A list with a single Trade element for redeeming the LP withdraw shares.
-        """
-        # take a guess at the trade amount, which should be about 10% of the agent’s budget
-        initial_trade_amount = FixedPoint(
-            self.rng.normal(loc=float(wallet.balance.amount) * 0.1, scale=float(wallet.balance.amount) * 0.01)
-        )
-        shares_available_to_withdraw = min(
-            wallet.withdraw_shares,
-            interface.current_pool_state.pool_info.withdrawal_shares_ready_to_withdraw,
-        )
-        # WEI <= trade_amount <= withdraw_shares
-        trade_amount = max(WEI, min(shares_available_to_withdraw, initial_trade_amount))
-        # return a trade using a specification that is parsable by the rest of the sim framework
-        return [interface.redeem_withdraw_shares_trade(trade_amount)]
-
     def action(
         self, interface: HyperdriveReadInterface, wallet: HyperdriveWallet
     ) -> tuple[list[Trade[HyperdriveMarketAction]], bool]:
@@ -326,34 +144,125 @@ class Random(HyperdrivePolicy):
             A tuple where the first element is a list of actions,
             and the second element defines if the agent is done trading.
         """
-        # pylint: disable=too-many-return-statements
-
-        # check if the agent will trade this block or not
-        gonna_trade = self.rng.choice([True, False], p=[float(self.trade_chance), 1 - float(self.trade_chance)])
-        if not gonna_trade:
-            return [], False
-
-        # user can always open a trade, and can close a trade if one is open
-        available_actions = self.get_available_actions(wallet, interface.current_pool_state)
-        if not available_actions:  # it's possible that no actions are available at this time
-            return [], False
-
-        # randomly choose one of the possible actions
-        action_type = available_actions[self.rng.integers(len(available_actions))]
-
-        # trade amount is also randomly chosen to be close to 10% of the agent's budget
-        if action_type == HyperdriveActionType.OPEN_SHORT:
-            return self.open_short_with_random_amount(interface, wallet), False
-        if action_type == HyperdriveActionType.CLOSE_SHORT:
-            return self.close_random_short(interface, wallet), False
-        if action_type == HyperdriveActionType.OPEN_LONG:
-            return self.open_long_with_random_amount(interface, wallet), False
-        if action_type == HyperdriveActionType.CLOSE_LONG:
-            return self.close_random_long(interface, wallet), False
-        if action_type == HyperdriveActionType.ADD_LIQUIDITY:
-            return self.add_liquidity_with_random_amount(interface, wallet), False
-        if action_type == HyperdriveActionType.REMOVE_LIQUIDITY:
-            return self.remove_liquidity_with_random_amount(interface, wallet), False
-        if action_type == HyperdriveActionType.REDEEM_WITHDRAW_SHARE:
-            return (self.redeem_withdraw_shares_with_random_amount(interface, wallet), False)
-        return [], False
+        return self.action_batch([self], interface, [wallet])[0]
+
+    @classmethod
+    def action_batch(
+        cls,
+        policies: Sequence[HyperdrivePolicy],
+        interface: HyperdriveReadInterface,
+        wallets: Sequence[HyperdriveWallet],
+    ) -> list[tuple[list[Trade[HyperdriveMarketAction]], bool]]:
+        """Implement the random user strategy for a cohort of agents, on the same pool state.
+
+        This is the implementation of `action`, which evaluates a cohort of one agent.
+        The maximum trade grows with the budget, so the maximum long and short are calculated once for the smallest
+        budget of the cohort, and only for agents whose trade amount is above that maximum.
+        Each agent draws from its own random number generator in the same order as it would on its own,
+        so the results match calling `action` for each agent.
+        Agents that share a random number generator are evaluated one by one.
+
+        Arguments
+        ---------
+        policies: Sequence[HyperdrivePolicy]
+            The Random policy of each agent in the cohort.
+        interface: HyperdriveReadInterface
+            Interface for the market on which the agents will be executing trades (MarketActions).
+        wallets: Sequence[HyperdriveWallet]
+            The wallet of each agent in the cohort.
+
+        Returns
+        -------
+        list[tuple[list[MarketAction], bool]]
+            The result of `action` for each agent: a list of actions, and whether the agent is done trading.
+        """
+        # pylint: disable=too-many-locals
+        random_policies = cast(Sequence[Random], policies)
+        if len({id(policy.rng) for policy in random_policies}) < len(random_policies):
+            # Calls `action`, which evaluates each agent as a cohort of one
+            return super().action_batch(policies, interface, wallets)
+        pool_state = interface.current_pool_state
+        trades: list[list[Trade[HyperdriveMarketAction]]] = [[] for _ in random_policies]
+
+        # Check if each agent will trade, and randomly choose one of its possible actions
+        agents_by_action: dict[HyperdriveActionType, list[int]] = defaultdict(list)
+        for index, (policy, wallet) in enumerate(zip(random_policies, wallets)):
+            trade_chance = float(policy.trade_chance)
+            if not policy.rng.choice([True, False], p=[trade_chance, 1 - trade_chance]):
+                continue
+            available_actions = policy.get_available_actions(wallet, pool_state)
+            if available_actions:
+                agents_by_action[available_actions[policy.rng.integers(len(available_actions))]].append(index)
+
+        # Open longs and shorts if the pool can take them, with an amount that is at most the maximum trade
+        for action_type, calc_max, make_trade in (
+            (HyperdriveActionType.OPEN_LONG, interface.calc_max_long, interface.open_long_trade),
+            (HyperdriveActionType.OPEN_SHORT, interface.calc_max_short, interface.open_short_trade),
+        ):
+            indices = agents_by_action[action_type]
+            if not indices:
+                continue
+            minimum_budget = min(wallets[index].balance.amount for index in indices)
+            cohort_maximum = calc_max(minimum_budget, pool_state)
+            maximum_trade_amounts: dict[int, FixedPoint] = {}
+            if cohort_maximum <= WEI:
+                for index in indices:
+                    if wallets[index].balance.amount == minimum_budget:
+                        maximum_trade_amounts[index] = cohort_maximum
+                    else:
+                        maximum_trade_amounts[index] = calc_max(wallets[index].balance.amount, pool_state)
+                indices = [index for index in indices if maximum_trade_amounts[index] > WEI]
+            for index, initial_trade_amount in zip(indices, _draw_trade_amounts(random_policies, wallets, indices)):
+                if index not in maximum_trade_amounts and initial_trade_amount > cohort_maximum:
+                    maximum_trade_amounts[index] = calc_max(wallets[index].balance.amount, pool_state)
+                # WEI <= trade_amount <= max trade
+                trade_amount = max(WEI, min(initial_trade_amount, maximum_trade_amounts.get(index, cohort_maximum)))
+                trades[index] = [make_trade(trade_amount, random_policies[index].slippage_tolerance)]
+
+        # Close the full balance of a random position
+        for index in agents_by_action[HyperdriveActionType.CLOSE_LONG]:
+            longs = wallets[index].longs
+            long_time = list(longs)[random_policies[index].rng.integers(len(longs))]
+            trades[index] = [
+                interface.close_long_trade(
+                    longs[long_time].balance, long_time, random_policies[index].slippage_tolerance
+                )
+            ]
+        for index in agents_by_action[HyperdriveActionType.CLOSE_SHORT]:
+            shorts = wallets[index].shorts
+            short_time = list(shorts)[random_policies[index].rng.integers(len(shorts))]
+            trades[index] = [
+                interface.close_short_trade(
+                    shorts[short_time].balance, short_time, random_policies[index].slippage_tolerance
+                )
+            ]
+
+        # Add and remove liquidity, and redeem withdraw shares, with an amount that is at most the available balance
+        indices = agents_by_action[HyperdriveActionType.ADD_LIQUIDITY]
+        for index, initial_trade_amount in zip(indices, _draw_trade_amounts(random_policies, wallets, indices)):
+            trade_amount = max(WEI, min(wallets[index].balance.amount, initial_trade_amount))
+            trades[index] = [interface.add_liquidity_trade(trade_amount)]
+        indices = agents_by_action[HyperdriveActionType.REMOVE_LIQUIDITY]
+        for index, initial_trade_amount in zip(indices, _draw_trade_amounts(random_policies, wallets, indices)):
+            trade_amount = max(WEI, min(wallets[index].lp_tokens, initial_trade_amount))
+            trades[index] = [interface.remove_liquidity_trade(trade_amount, random_policies[index].slippage_tolerance)]
+        indices = agents_by_action[HyperdriveActionType.REDEEM_WITHDRAW_SHARE]
+        for index, initial_trade_amount in zip(indices, _draw_trade_amounts(random_policies, wallets, indices)):
+            shares_available_to_withdraw = min(
+                wallets[index].withdraw_shares, pool_state.pool_info.withdrawal_shares_ready_to_withdraw
+            )
+            trade_amount = max(WEI, min(shares_available_to_withdraw, initial_trade_amount))
+            trades[index] = [interface.redeem_withdraw_shares_trade(trade_amount)]
+        return [(agent_trades, False) for agent_trades in trades]
+
+
+def _draw_trade_amounts(
+    policies: Sequence[Random], wallets: Sequence[HyperdriveWallet], indices: list[int]
+) -> list[FixedPoint]:
+    """Draw the trade amount of each agent, from a normal distribution with a mean of 10% of its budget and
+    a standard deviation of 1% of its budget.
+    """
+    budgets = np.array([float(wallets[index].balance.amount) for index in indices])
+    # The same draw as `rng.normal(loc, scale)`, which is `loc + scale * rng.standard_normal()`
+    standard_normals = np.array([policies[index].rng.standard_normal() for index in indices])
+    return [FixedPoint(float(amount)) for amount in budgets * 0.1 + budgets * 0.01 * standard_normals]
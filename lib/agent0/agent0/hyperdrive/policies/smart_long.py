@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Sequence, cast
 
 from fixedpointmath import FixedPoint, FixedPointMath
 
@@ -91,41 +91,93 @@ class SmartLong(HyperdrivePolicy):
             A tuple where the first element is a list of actions,
             and the second element defines if the agent is done trading.
         """
-        # Any trading at all is based on a weighted coin flip -- they have a trade_chance% chance of executing a trade
-        gonna_trade = self.rng.choice([True, False], p=[float(self.trade_chance), 1 - float(self.trade_chance)])
-        if not gonna_trade:
-            return ([], False)
+        return self.action_batch([self], interface, [wallet])[0]
+
+    @classmethod
+    def action_batch(
+        cls,
+        policies: Sequence[HyperdrivePolicy],
+        interface: HyperdriveReadInterface,
+        wallets: Sequence[HyperdriveWallet],
+    ) -> list[tuple[list[Trade[HyperdriveMarketAction]], bool]]:
+        """Implement the Long Louie user strategy for a cohort of agents, on the same pool state.
+
+        The long that pushes the fixed rate to the variable rate is the same for every agent, so it is calculated
+        once. The maximum long grows with the budget, so it is calculated once for the smallest budget of the
+        cohort, and only for agents whose budget can't afford the target long.
+
+        Arguments
+        ---------
+        policies: Sequence[HyperdrivePolicy]
+            The SmartLong policy of each agent in the cohort.
+        interface: HyperdriveReadInterface
+            Interface for the market on which the agents will be executing trades (MarketActions).
+        wallets: Sequence[HyperdriveWallet]
+            The wallet of each agent in the cohort.
+
+        Returns
+        -------
+        list[tuple[list[MarketAction], bool]]
+            The result of `action` for each agent: a list of actions, and whether the agent is done trading.
+        """
+        smart_long_policies = cast(Sequence[SmartLong], policies)
         pool_state = interface.current_pool_state
-        action_list = []
-        for long_time in wallet.longs:  # loop over longs # pylint: disable=consider-using-dict-items
-            # if any long is mature
-            # TODO: should we make this less time? they dont close before the agent runs out of money
-            # how to intelligently pick the length? using PNL I guess.
-            if (pool_state.block_time - FixedPoint(long_time)) >= pool_state.pool_config.position_duration:
-                trade_amount = wallet.longs[long_time].balance  # close the whole thing
-                action_list.append(interface.close_long_trade(trade_amount, long_time, self.slippage_tolerance))
-        long_balances = [long.balance for long in wallet.longs.values()]
-        has_opened_long = bool(any(long_balance > 0 for long_balance in long_balances))
-        # only open a long if the fixed rate is higher than variable rate
-        if (interface.calc_fixed_rate() - pool_state.variable_rate) > self.risk_threshold and not has_opened_long:
-            # calculate the total number of bonds we want to see in the pool
-            total_bonds_to_match_variable_apr = interface.calc_bonds_given_shares_and_rate(
-                target_rate=pool_state.variable_rate
-            )
-            # get the delta bond amount & convert units
-            bond_reserves: FixedPoint = pool_state.pool_info.bond_reserves
-            # calculate how many bonds we take out of the pool
-            new_bonds_to_match_variable_apr = (
-                bond_reserves - total_bonds_to_match_variable_apr
-            ) * interface.calc_spot_price()
-            # calculate how much base we pay for the new bonds
-            new_base_to_match_variable_apr = interface.calc_bonds_out_given_shares_in_down(
-                new_bonds_to_match_variable_apr
+        action_lists: list[list[Trade[HyperdriveMarketAction]]] = [[] for _ in smart_long_policies]
+        opening_agents: list[int] = []
+        fixed_rate: FixedPoint | None = None
+        for index, (policy, wallet) in enumerate(zip(smart_long_policies, wallets)):
+            # Any trading at all is based on a weighted coin flip
+            # -- they have a trade_chance% chance of executing a trade
+            gonna_trade = policy.rng.choice(
+                [True, False], p=[float(policy.trade_chance), 1 - float(policy.trade_chance)]
             )
-            # get the maximum amount the agent can long given the market and the agent's wallet
-            max_base = interface.calc_max_long(wallet.balance.amount, pool_state)
+            if not gonna_trade:
+                continue
+            for long_time in wallet.longs:  # loop over longs # pylint: disable=consider-using-dict-items
+                # if any long is mature
+                # TODO: should we make this less time? they dont close before the agent runs out of money
+                # how to intelligently pick the length? using PNL I guess.
+                if (pool_state.block_time - FixedPoint(long_time)) >= pool_state.pool_config.position_duration:
+                    trade_amount = wallet.longs[long_time].balance  # close the whole thing
+                    action_lists[index].append(
+                        interface.close_long_trade(trade_amount, long_time, policy.slippage_tolerance)
+                    )
+            long_balances = [long.balance for long in wallet.longs.values()]
+            has_opened_long = bool(any(long_balance > 0 for long_balance in long_balances))
+            if fixed_rate is None:
+                fixed_rate = interface.calc_fixed_rate()
+            # only open a long if the fixed rate is higher than variable rate
+            if (fixed_rate - pool_state.variable_rate) > policy.risk_threshold and not has_opened_long:
+                opening_agents.append(index)
+        if not opening_agents:
+            return [(action_list, False) for action_list in action_lists]
+
+        # calculate the total number of bonds we want to see in the pool
+        total_bonds_to_match_variable_apr = interface.calc_bonds_given_shares_and_rate(
+            target_rate=pool_state.variable_rate
+        )
+        # get the delta bond amount & convert units
+        bond_reserves: FixedPoint = pool_state.pool_info.bond_reserves
+        # calculate how many bonds we take out of the pool
+        new_bonds_to_match_variable_apr = (
+            bond_reserves - total_bonds_to_match_variable_apr
+        ) * interface.calc_spot_price()
+        # calculate how much base we pay for the new bonds
+        new_base_to_match_variable_apr = interface.calc_bonds_out_given_shares_in_down(new_bonds_to_match_variable_apr)
+        # get the maximum amount the agents can long given the market and the agents' wallets
+        cohort_max_base = interface.calc_max_long(
+            min(wallets[index].balance.amount for index in opening_agents), pool_state
+        )
+        for index in opening_agents:
+            wallet = wallets[index]
+            if new_base_to_match_variable_apr <= cohort_max_base:
+                max_base = cohort_max_base
+            else:
+                max_base = interface.calc_max_long(wallet.balance.amount, pool_state)
             # don't want to trade more than the agent has or more than the market can handle
             trade_amount = FixedPointMath.minimum(max_base, new_base_to_match_variable_apr)
             if trade_amount > WEI and wallet.balance.amount > WEI:
-                action_list.append(interface.open_long_trade(trade_amount, self.slippage_tolerance))
-        return action_list, False
+                action_lists[index].append(
+                    interface.open_long_trade(trade_amount, smart_long_policies[index].slippage_tolerance)
+                )
+        return [(action_list, False) for action_list in action_lists]
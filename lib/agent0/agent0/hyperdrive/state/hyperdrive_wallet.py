@@ -1,15 +1,15 @@
 """Empty accounts for engaging with smart contracts."""
 from __future__ import annotations
 
-import copy
 import logging
 from dataclasses import dataclass, field
 from typing import Iterable
 
 from fixedpointmath import FixedPoint
 
-from agent0.base import freezable
+from agent0.base import Quantity, freezable
 from agent0.base.state import EthWallet, EthWalletDeltas
+from agent0.base.state.eth_wallet import check_non_zero
 
 
 @freezable()
@@ -44,15 +44,27 @@ class HyperdriveWalletDeltas(EthWalletDeltas):
         Returns
         -------
         HyperdriveWalletDeltas
-            A deepcopy of the wallet deltas.
+            A copy of the wallet deltas that doesn't share any mutable state with them.
         """
-        return HyperdriveWalletDeltas(**copy.deepcopy(self.__dict__))
-
-
-@dataclass
+        return HyperdriveWalletDeltas(
+            balance=Quantity(amount=self.balance.amount, unit=self.balance.unit),
+            lp_tokens=self.lp_tokens,
+            longs={maturity_time: Long(long.balance, long.maturity_time) for maturity_time, long in self.longs.items()},
+            shorts={
+                maturity_time: Short(short.balance, short.maturity_time) for maturity_time, short in self.shorts.items()
+            },
+            withdraw_shares=self.withdraw_shares,
+            frozen=getattr(self, "frozen", False),
+            no_new_attribs=getattr(self, "no_new_attribs", False),
+        )
+
+
+@dataclass(slots=True)
 class Long:
     r"""An open long position.
 
+    Positions are slotted, since agents can hold many of them.
+
     Arguments
     ---------
     balance: FixedPoint
@@ -65,7 +77,7 @@ class Long:
     maturity_time: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Short:
     r"""An open short position.
 
@@ -108,63 +120,43 @@ class HyperdriveWallet(EthWallet[HyperdriveWalletDeltas]):
     longs: dict[int, Long] = field(default_factory=dict)
     shorts: dict[int, Short] = field(default_factory=dict)
 
-    def _update_longs(self, longs: Iterable[tuple[int, Long]]) -> None:
-        """Helper internal function that updates the data about Longs contained in the Agent's Wallet.
-
-        Arguments
-        ---------
-        longs: Iterable[tuple[int, Long]]
-            A list (or other Iterable type) of tuples that contain a Long object
-            and its market-relative maturity time
-        """
-        for maturity_time, long in longs:
-            if long.balance != FixedPoint(0):
-                logging.debug(
-                    "agent %s trade longs, maturity_time = %g\npre-trade amount = %s\ntrade delta = %s",
-                    self.address.hex(),
-                    maturity_time,
-                    self.longs,
-                    long,
-                )
-                if maturity_time in self.longs:  #  entry already exists for this maturity_time, so add to it
-                    self.longs[maturity_time].balance += long.balance
-                else:
-                    self.longs.update({maturity_time: long})
-            if self.longs[maturity_time].balance == FixedPoint(0):
-                # Removing the empty dictionary entries allows us to check existance
-                # of open longs using `if wallet.longs`
-                del self.longs[maturity_time]
-            if maturity_time in self.longs and self.longs[maturity_time].balance < FixedPoint(0):
-                raise AssertionError(f"ERROR: Wallet balance should be >= 0, not {self.longs[maturity_time]}.")
+    def _update_positions(self, positions: dict, deltas: Iterable[tuple[int, Long | Short]]) -> None:
+        """Helper internal function that applies Long or Short deltas to the positions in the Agent's Wallet.
 
-    def _update_shorts(self, shorts: Iterable[tuple[int, Short]]) -> None:
-        """Helper internal function that updates the data about Shorts contained in the Agent's Wallet.
+        Existing positions are updated in place, and new positions get their own records, so the wallet never
+        holds a reference to the deltas.
 
         Arguments
         ---------
-        shorts: Iterable[tuple[int, Short]]
-            A list (or other Iterable type) of tuples that contain a Short object
-            and its market-relative mint time
+        positions: dict[int, Long] | dict[int, Short]
+            The longs or shorts of the wallet, keyed by maturity time.
+        deltas: Iterable[tuple[int, Long | Short]]
+            A list (or other Iterable type) of tuples that contain the change in a position
+            and its market-relative maturity time
         """
-        for maturity_time, short in shorts:
-            if short.balance != FixedPoint(0):
-                logging.debug(
-                    "agent %s trade shorts, maturity_time = %s\npre-trade amount = %s\ntrade delta = %s",
-                    self.address.hex(),
-                    maturity_time,
-                    self.shorts,
-                    short,
-                )
-                if maturity_time in self.shorts:  #  entry already exists for this maturity_time, so add to it
-                    self.shorts[maturity_time].balance += short.balance
-                else:
-                    self.shorts.update({maturity_time: short})
-            if self.shorts[maturity_time].balance == FixedPoint(0):
+        for maturity_time, delta in deltas:
+            if delta.balance == FixedPoint(0):
+                continue
+            logging.debug(
+                "agent %s trade %ss, maturity_time = %s\npre-trade amount = %s\ntrade delta = %s",
+                self.address.hex(),
+                type(delta).__name__.lower(),
+                maturity_time,
+                positions,
+                delta,
+            )
+            position = positions.get(maturity_time)
+            if position is None:
+                position = type(delta)(balance=delta.balance, maturity_time=delta.maturity_time)
+                positions[maturity_time] = position
+            else:  # entry already exists for this maturity_time, so add to it
+                position.balance += delta.balance
+            if position.balance == FixedPoint(0):
                 # Removing the empty dictionary entries allows us to check existance
-                # of open shorts using `if wallet.shorts`
-                del self.shorts[maturity_time]
-            if maturity_time in self.shorts and self.shorts[maturity_time].balance < FixedPoint(0):
-                raise AssertionError(f"wallet balance should be >= 0, not {self.shorts[maturity_time]}")
+                # of open positions using `if wallet.longs`
+                del positions[maturity_time]
+            elif position.balance < FixedPoint(0):
+                raise AssertionError(f"wallet balance should be >= 0, not {position}")
 
     def copy(self) -> HyperdriveWallet:
         """Returns a new copy of self.
@@ -172,26 +164,40 @@ class HyperdriveWallet(EthWallet[HyperdriveWalletDeltas]):
         Returns
         -------
         HyperdriveWallet
-            A deep copy of the wallet.
+            A copy of the wallet that doesn't share any mutable state with it.
         """
-        return HyperdriveWallet(**copy.deepcopy(self.__dict__))
+        return HyperdriveWallet(
+            address=self.address,
+            balance=Quantity(amount=self.balance.amount, unit=self.balance.unit),
+            lp_tokens=self.lp_tokens,
+            withdraw_shares=self.withdraw_shares,
+            longs={maturity_time: Long(long.balance, long.maturity_time) for maturity_time, long in self.longs.items()},
+            shorts={
+                maturity_time: Short(short.balance, short.maturity_time) for maturity_time, short in self.shorts.items()
+            },
+        )
 
     def update(self, wallet_deltas: HyperdriveWalletDeltas) -> None:
         """Update the agent's wallet in-place.
 
+        The deltas are applied directly, without copying them,
+        and the wallet is validated once all of them are applied.
+
         Arguments
         ---------
         wallet_deltas: AgentDeltas
             The agent's wallet that tracks the amount of assets this agent holds
         """
         # track over time the agent's weighted average spend, for return calculation
-        for key, value_or_dict in wallet_deltas.copy().__dict__.items():
+        for key, value_or_dict in wallet_deltas.__dict__.items():
             if value_or_dict is None:
                 continue
             match key:
                 case "frozen" | "no_new_attribs" | "borrows":
                     continue
                 case "lp_tokens" | "withdraw_shares":
+                    if value_or_dict == FixedPoint(0):
+                        continue
                     logging.debug(
                         "agent %s %s pre-trade = %.0g\npost-trade = %1g\ndelta = %1g",
                         self.address.hex(),
@@ -200,23 +206,42 @@ class HyperdriveWallet(EthWallet[HyperdriveWalletDeltas]):
                         getattr(self, key) + value_or_dict,
                         value_or_dict,
                     )
-                    self[key] += value_or_dict
+                    setattr(self, key, getattr(self, key) + value_or_dict)
                 # handle updating a Quantity
                 case "balance":
                     logging.debug(
                         "agent %s %s pre-trade = %.0g\npost-trade = %1g\ndelta = %1g",
                         self.address.hex(),
                         key,
-                        float(getattr(self, key).amount),
-                        float(getattr(self, key).amount + value_or_dict.amount),
+                        float(self.balance.amount),
+                        float(self.balance.amount + value_or_dict.amount),
                         float(value_or_dict.amount),
                     )
-                    getattr(self, key).amount += value_or_dict.amount
+                    self.balance.amount += value_or_dict.amount
                 # handle updating a dict, which have maturity_time attached
                 case "longs":
-                    self._update_longs(value_or_dict.items())
+                    self._update_positions(self.longs, value_or_dict.items())
                 case "shorts":
-                    self._update_shorts(value_or_dict.items())
+                    self._update_positions(self.shorts, value_or_dict.items())
                 case _:
                     raise ValueError(f"wallet_{key=} is not allowed.")
-            self.check_valid_wallet_state(self.__dict__)
+        # Positions are checked as they are updated, and untouched positions are still valid
+        check_non_zero(
+            {"balance": self.balance.amount, "lp_tokens": self.lp_tokens, "withdraw_shares": self.withdraw_shares}
+        )
+
+    def check_valid_wallet_state(self, dictionary: dict | None = None) -> None:
+        """Test that all wallet state variables, including the balances of positions, are greater than zero.
+
+        Arguments
+        ---------
+        dictionary: dict | None, optional
+            The dictionary to check.
+            If not provided, it will use `self.__dict__`.
+        """
+        if dictionary is None:
+            dictionary = self.__dict__
+        check_non_zero(dictionary)
+        # Positions are slotted, so they aren't checked with the rest of the wallet
+        for positions in (dictionary.get("longs", {}), dictionary.get("shorts", {})):
+            check_non_zero({maturity_time: position.balance for maturity_time, position in positions.items()})
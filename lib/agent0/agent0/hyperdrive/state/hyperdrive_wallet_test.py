@@ -8,7 +8,7 @@ from hexbytes import HexBytes
 
 from agent0.base import Quantity, TokenType
 
-from .hyperdrive_wallet import HyperdriveWallet, HyperdriveWalletDeltas, Long
+from .hyperdrive_wallet import HyperdriveWallet, HyperdriveWalletDeltas, Long, Short
 
 
 class TestWallet(unittest.TestCase):
@@ -49,3 +49,31 @@ class TestWallet(unittest.TestCase):
         assert example_deltas.longs[0].balance == FixedPoint(
             "15.0"
         ), f"{example_deltas.longs[0].balance=} should be unchanged and equal 15."
+
+    def test_wallet_update_positions(self):
+        """Test that closed positions are removed, negative positions are invalid, and copies are independent."""
+        example_wallet = HyperdriveWallet(
+            address=HexBytes(0),
+            balance=Quantity(amount=FixedPoint("100.0"), unit=TokenType.BASE),
+            longs={0: Long(FixedPoint("15.0"), maturity_time=0)},
+            shorts={1: Short(FixedPoint("5.0"), maturity_time=1)},
+        )
+        wallet_copy = example_wallet.copy()
+        example_wallet.update(
+            HyperdriveWalletDeltas(
+                balance=Quantity(amount=FixedPoint("20.0"), unit=TokenType.BASE),
+                longs={0: Long(FixedPoint("-15.0"), maturity_time=0)},
+                shorts={1: Short(FixedPoint("-1.0"), maturity_time=1)},
+            )
+        )
+        assert not example_wallet.longs, f"{example_wallet.longs=} should be empty once the long is closed."
+        assert example_wallet.shorts[1].balance == FixedPoint("4.0")
+        assert wallet_copy.longs[0].balance == FixedPoint("15.0"), f"{wallet_copy.longs=} should be unchanged."
+        assert wallet_copy.shorts[1].balance == FixedPoint("5.0"), f"{wallet_copy.shorts=} should be unchanged."
+        assert wallet_copy.balance.amount == FixedPoint("100.0")
+        with self.assertRaises(AssertionError):
+            example_wallet.update(HyperdriveWalletDeltas(shorts={1: Short(FixedPoint("-5.0"), maturity_time=1)}))
+        with self.assertRaises(AssertionError):
+            example_wallet.update(
+                HyperdriveWalletDeltas(balance=Quantity(amount=FixedPoint("-200.0"), unit=TokenType.BASE))
+            )
@@ -12,9 +12,11 @@ from chainsync.db.hyperdrive import (
     Ticker,
     WalletPNL,
     get_current_wallet,
+    get_latest_snapshot_block,
     get_pool_info,
     get_transactions,
     get_wallet_deltas,
+    get_wallet_pnl,
 )
 from sqlalchemy import exc
 from sqlalchemy.orm import Session
@@ -29,6 +31,8 @@ from .calc_ticker import calc_ticker
 pd.set_option("display.max_columns", None)
 
 MAX_BATCH_SIZE = 10000
+# The number of blocks between full snapshots of the delta encoded wallet tables
+SNAPSHOT_INTERVAL = 1000
 
 
 def _df_to_db(insert_df: pd.DataFrame, schema_obj: Type[Base], session: Session):
@@ -56,6 +60,17 @@ def _df_to_db(insert_df: pd.DataFrame, schema_obj: Type[Base], session: Session)
         raise err
 
 
+def _is_snapshot_due(
+    schema_obj: Type[CurrentWallet] | Type[WalletPNL], end_block: int, snapshot_interval: int, session: Session
+) -> bool:
+    """Helper function to determine if a full snapshot should be written for a delta encoded table"""
+    latest_snapshot_block = get_latest_snapshot_block(schema_obj, session)
+    if latest_snapshot_block is None:
+        return True
+    # Snapshots are written at the last block of a batch, i.e., end_block - 1
+    return (end_block - 1) - latest_snapshot_block >= snapshot_interval
+
+
 def calc_total_wallet_delta(wallet_deltas: pd.DataFrame) -> pd.DataFrame:
     """Calculates total wallet deltas from wallet_delta for every wallet type and position.
 
@@ -135,6 +150,60 @@ def calc_current_wallet(wallet_deltas_df: pd.DataFrame, latest_wallet: pd.DataFr
     return wallet_deltas_df
 
 
+def _round_to_fixed_point(in_val: Decimal) -> Decimal:
+    """Rounds a decimal to the 18 decimal places stored in the db, so that it can be compared to stored values."""
+    if isinstance(in_val, Decimal) and in_val.is_finite():
+        return in_val.quantize(Decimal(10) ** -18)
+    return in_val
+
+
+def calc_wallet_pnl_delta(
+    wallet_pnl: pd.DataFrame, previous_wallet_pnl: pd.DataFrame, block_number: int
+) -> pd.DataFrame:
+    """Calculates the rows of wallet pnl that changed since the previous write.
+    Positions that exist in the previous wallet pnl but not in the current one are closed,
+    and are written as a zero-valued row.
+
+    Arguments
+    ---------
+    wallet_pnl: pd.DataFrame
+        The dataframe of all current wallet positions with pnl, following the schema of WalletPNL
+    previous_wallet_pnl: pd.DataFrame
+        The dataframe of all wallet positions with pnl at the previous write, from the output of `get_wallet_pnl`
+    block_number: int
+        The block number the current wallet positions are for
+
+    Returns
+    -------
+    pd.DataFrame
+        A dataframe of the changed wallet positions, following the schema of WalletPNL
+    """
+    if len(previous_wallet_pnl) == 0:
+        return wallet_pnl
+    keys = ["wallet_address", "token_type"]
+    merged = wallet_pnl.merge(
+        previous_wallet_pnl[keys + ["value", "pnl"]],
+        how="left",
+        on=keys,
+        suffixes=(None, "_previous"),
+        indicator=True,
+    )
+    is_new = merged["_merge"] == "left_only"
+    # Calculated values have more precision than what is stored, so we round before comparing
+    has_changed = (merged["value"].apply(_round_to_fixed_point) != merged["value_previous"]) | (
+        merged["pnl"].apply(_round_to_fixed_point) != merged["pnl_previous"]
+    )
+    changed_wallet_pnl = wallet_pnl[(is_new | has_changed).to_numpy()]
+
+    # Positions that no longer exist get a zero valued row to mark them as closed
+    closed = previous_wallet_pnl.merge(wallet_pnl[keys], how="left", on=keys, indicator=True)
+    closed = closed.loc[closed["_merge"] == "left_only", wallet_pnl.columns.intersection(closed.columns)]
+    closed = closed.assign(
+        value=Decimal(0), pnl=Decimal(0), block_number=block_number, latest_block_update=block_number
+    )
+    return pd.concat([changed_wallet_pnl, closed], ignore_index=True)
+
+
 def _decimal_to_str_scaled_value(in_val: Decimal):
     return str(int(in_val * 10**18))
 
@@ -153,10 +222,14 @@ def data_to_analysis(
     pool_config: pd.Series,
     db_session: Session,
     hyperdrive_contract: Contract,
+    snapshot_interval: int = SNAPSHOT_INTERVAL,
 ) -> None:
     """Function to query postgres data tables and insert to analysis tables.
     Executes analysis on a batch of blocks, defined by start and end block.
 
+    The `current_wallet` and `wallet_pnl` tables are delta encoded, i.e., only positions that changed are written.
+    A full snapshot of all positions is written every `snapshot_interval` blocks to bound the cost of reading them.
+
     Arguments
     ---------
     start_block: int
@@ -169,6 +242,8 @@ def data_to_analysis(
         The initialized db session.
     hyperdrive_contract: Contract
         The hyperdrive contract.
+    snapshot_interval: int, optional
+        The number of blocks between full snapshots of the delta encoded wallet tables.
     """
     # Get data
     pool_info = get_pool_info(db_session, start_block, end_block, coerce_float=False)
@@ -182,7 +257,14 @@ def data_to_analysis(
         # If it doesn't exist, should be an empty dataframe
         latest_wallet = get_current_wallet(db_session, end_block=start_block, coerce_float=False)
         current_wallet_df = calc_current_wallet(wallet_deltas_df, latest_wallet)
+        current_wallet_df["is_snapshot"] = False
         _df_to_db(current_wallet_df, CurrentWallet, db_session)
+        if _is_snapshot_due(CurrentWallet, end_block, snapshot_interval, db_session):
+            # Write all current positions at the last block of this batch
+            snapshot_df = get_current_wallet(db_session, end_block=end_block, coerce_float=False)
+            snapshot_df = snapshot_df.drop("latest_block_update", axis=1)
+            snapshot_df["is_snapshot"] = True
+            _df_to_db(snapshot_df, CurrentWallet, db_session)
 
         # calculate pnl through closeout pnl
         # TODO this function might be slow due to contract call on chain
@@ -194,18 +276,21 @@ def data_to_analysis(
         wallet_pnl = get_current_wallet(db_session, end_block=end_block, coerce_float=False)
         pnl_df = calc_closeout_pnl(wallet_pnl, pool_info, hyperdrive_contract)
 
-        # This sets the pnl to the current wallet dataframe, but there may be scaling issues here.
-        # This is because the `CurrentWallet` table has one entry per change in wallet position,
-        # and the `get_current_wallet` function handles getting all current positions at a block.
-        # If we add this current_wallet (plus pnl) to the database here, the final size in the db is
-        # number_of_blocks * number_of_addresses * number_of_open_positions, which is not scalable.
-        # We alleviate this by sampling periodically, and not calculate this for every block
+        # This sets the pnl to the current wallet dataframe. Writing all positions here would make the
+        # final size in the db number_of_blocks * number_of_addresses * number_of_open_positions.
+        # Instead, we only write the positions that changed since the last write, along with periodic
+        # full snapshots. `get_wallet_pnl` reconstructs all positions at a block from the latest snapshot.
         # TODO implement sampling by setting the start + end block parameters in the caller of this function
         # TODO If sampling, might want to move this to be a separate function, with the caller controlling
         # the sampling rate. Otherwise, the e.g., ticker updates will also be on the sampling rate (won't miss data,
         # just lower frequency updates)
-        # TODO do scaling tests to see the limit of this
         wallet_pnl["pnl"] = pnl_df
+        if _is_snapshot_due(WalletPNL, end_block, snapshot_interval, db_session):
+            wallet_pnl["is_snapshot"] = True
+        else:
+            previous_wallet_pnl = get_wallet_pnl(db_session, start_block=-1, return_timestamp=False, coerce_float=False)
+            wallet_pnl = calc_wallet_pnl_delta(wallet_pnl, previous_wallet_pnl, block_number=end_block - 1)
+            wallet_pnl["is_snapshot"] = False
         # Add wallet_pnl to the database
         _df_to_db(wallet_pnl, WalletPNL, db_session)
 
@@ -4,13 +4,20 @@ from .interface import (
     TableWithBlockNumber,
     add_addr_to_username,
     add_username_to_user,
+    close_all_connections,
     close_session,
+    create_block_range_partitions,
+    create_database_from_template,
+    create_missing_columns,
+    create_missing_indexes,
+    drop_database,
     drop_table,
     get_addr_to_username,
     get_latest_block_number_from_table,
     get_username_to_user,
     initialize_engine,
     initialize_session,
+    is_partitioned_table,
     query_tables,
 )
 from .schema import AddrToUsername, Base, UsernameToUser
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 import time
+from dataclasses import asdict
 from typing import Type, cast
 
 import pandas as pd
@@ -176,9 +177,130 @@ def initialize_session(
     if exception is not None:
         raise exception
 
+    # `create_all` only creates new tables, so we add any columns and indexes missing from existing tables
+    create_missing_columns(session)
+    create_missing_indexes(session)
+
     return session
 
 
+def create_missing_columns(session: Session) -> None:
+    """Add nullable columns defined in the schema that don't exist in the tables of the database.
+
+    Databases created before a column was added to the schema get the column, with null values in existing rows.
+
+    Arguments
+    ---------
+    session: Session
+        The initialized session object
+    """
+    bind = session.bind
+    assert isinstance(bind, sqlalchemy.engine.base.Engine), "bind is not an engine"
+    inspector = inspect(bind)
+    existing_tables = set(query_tables(session))
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if column.primary_key or not column.nullable:
+                raise ValueError(f"Can't add required column {column.name} to existing table {table.name}.")
+            column_type = column.type.compile(dialect=bind.dialect)
+            logging.info("Adding missing column %s to table %s", column.name, table.name)
+            session.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+    session.commit()
+
+
+def create_missing_indexes(session: Session) -> None:
+    """Create indexes defined in the schema that don't exist in the database.
+
+    Indexes on columns that don't exist in the database are skipped.
+
+    Arguments
+    ---------
+    session: Session
+        The initialized session object
+    """
+    bind = session.bind
+    assert isinstance(bind, sqlalchemy.engine.base.Engine), "bind is not an engine"
+    inspector = inspect(bind)
+    existing_tables = set(query_tables(session))
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            if any(column.name not in existing_columns for column in index.columns):
+                logging.warning("Skipping index %s, since its columns don't exist in %s", index.name, table.name)
+                continue
+            # checkfirst=true only creates the index if it doesn't exist
+            index.create(bind=bind, checkfirst=True)
+
+
+def is_partitioned_table(session: Session, table_name: str) -> bool:
+    """Check if a table is partitioned in postgres.
+
+    Arguments
+    ---------
+    session: Session
+        The initialized session object
+    table_name: str
+        The name of the table
+
+    Returns
+    -------
+    bool
+        True if the table exists and is a partitioned table
+    """
+    # relkind "p" denotes a partitioned table
+    result = session.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :table_name"), {"table_name": table_name}
+    ).first()
+    return result is not None and result[0] == "p"
+
+
+def create_block_range_partitions(
+    session: Session, table_name: str, start_block: int, end_block: int, partition_size: int
+) -> None:
+    """Create block range partitions for a table partitioned by block_number.
+
+    Partitions are aligned to multiples of partition_size, and cover the range [start_block, end_block).
+    Tables that were created without partitioning are ignored.
+
+    Arguments
+    ---------
+    session: Session
+        The initialized session object
+    table_name: str
+        The name of the partitioned table
+    start_block: int
+        The first block that needs to be covered by a partition
+    end_block: int
+        The block (exclusive) up to which partitions are created
+    partition_size: int
+        The number of blocks in each partition
+    """
+    if not is_partitioned_table(session, table_name):
+        return
+    first_partition_start = (start_block // partition_size) * partition_size
+    for partition_start in range(first_partition_start, end_block, partition_size):
+        partition_end = partition_start + partition_size
+        create_query = text(
+            f"CREATE TABLE IF NOT EXISTS {table_name}_{partition_start}_{partition_end} "
+            f"PARTITION OF {table_name} FOR VALUES FROM ({partition_start}) TO ({partition_end});"
+        )
+        try:
+            session.execute(create_query)
+            session.commit()
+        except exc.DBAPIError as err:
+            # This happens if the default partition already has rows in this range, in which case
+            # the rows stay in the default partition
+            session.rollback()
+            logging.warning("Unable to create partition of %s at block %s: %s", table_name, partition_start, err)
+
+
 def close_session(session: Session) -> None:
     """Close the session.
 
@@ -190,6 +312,83 @@ def close_session(session: Session) -> None:
     session.close()
 
 
+def close_all_connections(session: Session) -> None:
+    """Close the session and all pooled connections of its engine.
+    Postgres can only drop or copy a database when there are no connections to it.
+    The session can still be used afterwards, and will open a new connection when needed.
+
+    Arguments
+    ---------
+    session: Session
+        The initialized session object
+    """
+    session.close()
+    bind = session.get_bind()
+    assert isinstance(bind, Engine), "bind is not an engine"
+    bind.dispose()
+
+
+def create_database_from_template(postgres_config: PostgresConfig, database_name: str, template_name: str) -> None:
+    """Create a copy of a database using postgres' `CREATE DATABASE ... TEMPLATE`.
+    This copies the database at the file level, which is much faster than exporting and importing each table.
+    If `database_name` already exists, it gets replaced.
+
+    .. note::
+        There can't be any open connections to either database, see `close_all_connections`.
+
+    Arguments
+    ---------
+    postgres_config: PostgresConfig
+        The postgres config for connecting to postgres. The database field is ignored.
+    database_name: str
+        The name of the database to create
+    template_name: str
+        The name of the database to copy
+    """
+    _execute_maintenance_statements(
+        postgres_config,
+        [
+            f"DROP DATABASE IF EXISTS {_quote_identifier(database_name)} WITH (FORCE)",
+            f"CREATE DATABASE {_quote_identifier(database_name)} TEMPLATE {_quote_identifier(template_name)}",
+        ],
+    )
+
+
+def drop_database(postgres_config: PostgresConfig, database_name: str) -> None:
+    """Drop a database, terminating any open connections to it.
+
+    Arguments
+    ---------
+    postgres_config: PostgresConfig
+        The postgres config for connecting to postgres. The database field is ignored.
+    database_name: str
+        The name of the database to drop
+    """
+    _execute_maintenance_statements(
+        postgres_config, [f"DROP DATABASE IF EXISTS {_quote_identifier(database_name)} WITH (FORCE)"]
+    )
+
+
+def _quote_identifier(identifier: str) -> str:
+    """Quotes a postgres identifier, e.g., for database names with dashes."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _execute_maintenance_statements(postgres_config: PostgresConfig, statements: list[str]) -> None:
+    """Executes statements on the default `postgres` database outside of a transaction."""
+    # We can't be connected to the databases we're modifying, so we connect to the default database
+    maintenance_config = PostgresConfig(**asdict(postgres_config))
+    maintenance_config.POSTGRES_DB = "postgres"
+    engine = initialize_engine(maintenance_config)
+    try:
+        # Database level statements can't run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    finally:
+        engine.dispose()
+
+
 def add_addr_to_username(
     username: str, addresses: list[str] | str, session: Session, user_suffix: str = "", force_update: bool = False
 ) -> None:
@@ -1,10 +1,13 @@
 """CRUD tests for CheckpointInfo"""
 import numpy as np
 import pytest
+from sqlalchemy import inspect, text
 
 from .interface import (
     add_addr_to_username,
     add_username_to_user,
+    create_missing_columns,
+    create_missing_indexes,
     drop_table,
     get_addr_to_username,
     get_username_to_user,
@@ -29,6 +32,23 @@ def test_drop_table(dummy_session):
     np.testing.assert_array_equal(table_names, ["verybased"])
 
 
+@pytest.mark.docker
+def test_create_missing_columns(db_session):
+    """Columns and indexes added to the schema are created in existing tables."""
+    # Mimic a database created before the `is_snapshot` column existed
+    db_session.execute(text("ALTER TABLE wallet_pnl DROP COLUMN is_snapshot"))
+    db_session.commit()
+    inspector = inspect(db_session.bind)
+    assert "is_snapshot" not in {column["name"] for column in inspector.get_columns("wallet_pnl")}
+
+    create_missing_columns(db_session)
+    create_missing_indexes(db_session)
+    inspector = inspect(db_session.bind)
+    assert "is_snapshot" in {column["name"] for column in inspector.get_columns("wallet_pnl")}
+    index_names = {index["name"] for index in inspector.get_indexes("wallet_pnl")}
+    assert {"ix_wallet_pnl_is_snapshot", "ix_wallet_pnl_snapshot_block"} <= index_names
+
+
 class TestAddrToUsernameInterface:
     """Testing postgres interface for usermap table"""
 
@@ -6,19 +6,22 @@ from .convert_data import (
     convert_pool_config,
     convert_pool_info,
 )
-from .import_export_data import export_db_to_file, import_to_db, import_to_pandas
+from .import_export_data import export_db_to_file, get_export_watermark, import_to_db, import_to_pandas
 from .interface import (
     add_checkpoint_infos,
     add_pool_config,
     add_pool_infos,
     add_transactions,
     add_wallet_deltas,
+    downsample_wallet_pnl,
+    ensure_block_partitions,
     get_all_traders,
     get_checkpoint_info,
     get_current_wallet,
     get_latest_block_number_from_analysis_table,
     get_latest_block_number_from_pool_info_table,
     get_latest_block_number_from_table,
+    get_latest_snapshot_block,
     get_pool_analysis,
     get_pool_config,
     get_pool_info,
@@ -30,6 +33,8 @@ from .interface import (
     get_wallet_positions_over_time,
 )
 from .schema import (
+    BLOCK_PARTITIONED_TABLES,
+    PARTITION_BLOCK_SIZE,
     CheckpointInfo,
     CurrentWallet,
     HyperdriveTransaction,
@@ -1,11 +1,19 @@
 """Helper functions to export data to csv from the db and to load csv to dataframes."""
 from __future__ import annotations
 
+import glob
+import io
+import json
 import logging
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 from typing import Type
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from chainsync.db.base import (
     AddrToUsername,
     Base,
@@ -14,7 +22,7 @@ from chainsync.db.base import (
     get_username_to_user,
     initialize_session,
 )
-from sqlalchemy import exc
+from sqlalchemy import ARRAY, BigInteger, Boolean, DateTime, Engine, Integer, Numeric, exc
 from sqlalchemy.orm import Session
 
 from .interface import (
@@ -29,6 +37,7 @@ from .interface import (
     get_wallet_pnl,
 )
 from .schema import (
+    PARTITION_BLOCK_SIZE,
     CheckpointInfo,
     CurrentWallet,
     HyperdriveTransaction,
@@ -42,12 +51,41 @@ from .schema import (
 
 MAX_BATCH_SIZE = 10000
 
+# All tables that get exported, in import order
+EXPORT_TABLES: list[Type[Base]] = [
+    AddrToUsername,
+    UsernameToUser,
+    PoolConfig,
+    CheckpointInfo,
+    PoolInfo,
+    WalletDelta,
+    HyperdriveTransaction,
+    PoolAnalysis,
+    CurrentWallet,
+    Ticker,
+    WalletPNL,
+]
 
-def export_db_to_file(out_dir: str, db_session: Session | None = None, raw: bool = False) -> None:
+# The file in a raw export directory that keeps track of the latest exported block per table
+WATERMARK_FILE_NAME = "watermark.json"
+
+
+def export_db_to_file(
+    out_dir: str,
+    db_session: Session | None = None,
+    raw: bool = False,
+    incremental: bool = False,
+    chunk_size: int = MAX_BATCH_SIZE,
+    partition_size: int = PARTITION_BLOCK_SIZE,
+) -> None:
     """Export all tables from the database and write as parquet files, one per table.
     We use parquet since it's type aware, so all original types (including Decimals) are preserved
     when read
 
+    Raw exports are streamed from the db using server side cursors, and written in chunks as row groups.
+    Each table gets its own directory, and tables with a block number are split into subdirectories
+    by block range.
+
     Arguments
     ---------
     out_dir: str
@@ -56,16 +94,25 @@ def export_db_to_file(out_dir: str, db_session: Session | None = None, raw: bool
         The initialized session object. If none, will read credentials from `postgres.env`
     raw: bool, optional
         If true, won't add any additional columns to the output. Used for save/load state in db.
+    incremental: bool, optional
+        Only used for raw exports. If true and `out_dir` contains a previous raw export of this db,
+        will only export rows with a block number past the previous export's watermark.
+        Note this assumes the db has only been appended to since the previous export.
+    chunk_size: int, optional
+        Only used for raw exports. The number of rows to read from the db and write per row group.
+    partition_size: int, optional
+        Only used for raw exports. The number of blocks in each block range subdirectory.
     """
     if db_session is None:
         # postgres session
         db_session = initialize_session()
 
-    # TODO there might be a way to make this all programmatic by reading the schema
     if raw:
-        return_timestamps = False
-    else:
-        return_timestamps = True
+        _export_raw_db_to_dir(out_dir, db_session, incremental, chunk_size, partition_size)
+        return
+
+    # TODO there might be a way to make this all programmatic by reading the schema
+    return_timestamps = True
 
     # Base tables
     get_addr_to_username(db_session).to_parquet(
@@ -98,7 +145,7 @@ def export_db_to_file(out_dir: str, db_session: Session | None = None, raw: bool
     get_pool_analysis(db_session, coerce_float=False, return_timestamp=return_timestamps).to_parquet(
         os.path.join(out_dir, "pool_analysis.parquet"), index=False, engine="pyarrow"
     )
-    get_current_wallet(db_session, coerce_float=False, raw=raw).to_parquet(
+    get_current_wallet(db_session, coerce_float=False).to_parquet(
         os.path.join(out_dir, "current_wallet.parquet"), index=False, engine="pyarrow"
     )
     get_ticker(db_session, coerce_float=False).to_parquet(
@@ -123,24 +170,21 @@ def import_to_pandas(in_dir: str) -> dict[str, pd.DataFrame]:
         A dictionary of pandas dataframes keyed by the original table name in the db
     """
     out = {}
-
-    out["addr_to_username"] = pd.read_parquet(os.path.join(in_dir, "addr_to_username.parquet"), engine="pyarrow")
-    out["username_to_user"] = pd.read_parquet(os.path.join(in_dir, "username_to_user.parquet"), engine="pyarrow")
-    out["pool_config"] = pd.read_parquet(os.path.join(in_dir, "pool_config.parquet"), engine="pyarrow")
-    out["checkpoint_info"] = pd.read_parquet(os.path.join(in_dir, "checkpoint_info.parquet"), engine="pyarrow")
-    out["pool_info"] = pd.read_parquet(os.path.join(in_dir, "pool_info.parquet"), engine="pyarrow")
-    out["wallet_delta"] = pd.read_parquet(os.path.join(in_dir, "wallet_delta.parquet"), engine="pyarrow")
-    out["transactions"] = pd.read_parquet(os.path.join(in_dir, "transactions.parquet"), engine="pyarrow")
-    out["pool_analysis"] = pd.read_parquet(os.path.join(in_dir, "pool_analysis.parquet"), engine="pyarrow")
-    out["current_wallet"] = pd.read_parquet(os.path.join(in_dir, "current_wallet.parquet"), engine="pyarrow")
-    out["ticker"] = pd.read_parquet(os.path.join(in_dir, "ticker.parquet"), engine="pyarrow")
-    out["wallet_pnl"] = pd.read_parquet(os.path.join(in_dir, "wallet_pnl.parquet"), engine="pyarrow")
+    for schema_obj in EXPORT_TABLES:
+        table_name = schema_obj.__tablename__
+        table_dir = os.path.join(in_dir, table_name)
+        if os.path.isdir(table_dir):
+            out[table_name] = _read_raw_table_dir(table_dir, schema_obj)
+        else:
+            out[table_name] = pd.read_parquet(os.path.join(in_dir, table_name + ".parquet"), engine="pyarrow")
     return out
 
 
-def import_to_db(db_session: Session, in_dir: str, drop=True) -> None:
+def import_to_db(db_session: Session, in_dir: str, drop=True, num_workers: int | None = None) -> None:
     """Helper function to load data from parquet into the db
 
+    Tables from raw exports are loaded with `COPY`, with tables being loaded in parallel.
+
     Arguments
     ---------
     db_session: Session
@@ -149,6 +193,8 @@ def import_to_db(db_session: Session, in_dir: str, drop=True) -> None:
         The directory to read the parquet files from that matches the out_dir passed into export_db_to_file
     drop: bool, optional
         Whether to drop the existing data in the db before importing
+    num_workers: int | None, optional
+        The number of tables to load in parallel. Defaults to one per table.
     """
     # Drop all if drop is set
 
@@ -171,18 +217,29 @@ def import_to_db(db_session: Session, in_dir: str, drop=True) -> None:
             logging.error("Error on adding wallet_infos: %s", err)
             raise err
 
-    out = import_to_pandas(in_dir)
-    _df_to_db(out["addr_to_username"], AddrToUsername, db_session)
-    _df_to_db(out["username_to_user"], UsernameToUser, db_session)
-    _df_to_db(out["pool_config"], PoolConfig, db_session)
-    _df_to_db(out["checkpoint_info"], CheckpointInfo, db_session)
-    _df_to_db(out["pool_info"], PoolInfo, db_session)
-    _df_to_db(out["wallet_delta"], WalletDelta, db_session)
-    _df_to_db(out["transactions"], HyperdriveTransaction, db_session)
-    _df_to_db(out["pool_analysis"], PoolAnalysis, db_session)
-    _df_to_db(out["current_wallet"], CurrentWallet, db_session)
-    _df_to_db(out["ticker"], Ticker, db_session)
-    _df_to_db(out["wallet_pnl"], WalletPNL, db_session)
+    raw_tables = [
+        schema_obj for schema_obj in EXPORT_TABLES if os.path.isdir(os.path.join(in_dir, schema_obj.__tablename__))
+    ]
+    for schema_obj in EXPORT_TABLES:
+        if schema_obj not in raw_tables:
+            insert_df = pd.read_parquet(os.path.join(in_dir, schema_obj.__tablename__ + ".parquet"), engine="pyarrow")
+            _df_to_db(insert_df, schema_obj, db_session)
+
+    if len(raw_tables) > 0:
+        engine = db_session.get_bind()
+        assert isinstance(engine, Engine)
+        if num_workers is None:
+            num_workers = len(raw_tables)
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(
+                    _copy_raw_table_dir_to_db, os.path.join(in_dir, schema_obj.__tablename__), schema_obj, engine
+                )
+                for schema_obj in raw_tables
+            ]
+            # Raises any errors from the workers
+            for future in futures:
+                future.result()
 
 
 def _df_to_db(insert_df: pd.DataFrame, schema_obj: Type[Base], session: Session):
@@ -209,3 +266,203 @@ def _df_to_db(insert_df: pd.DataFrame, schema_obj: Type[Base], session: Session)
         session.rollback()
         logging.error("Error on adding %s: %s", table_name, err)
         raise err
+
+
+def get_export_watermark(out_dir: str) -> dict[str, int]:
+    """Get the latest exported block number per table from a raw export directory.
+
+    Arguments
+    ---------
+    out_dir: str
+        The directory of a raw export from export_db_to_file
+
+    Returns
+    -------
+    dict[str, int]
+        The latest exported block number keyed by table name. Empty if there's no previous export.
+    """
+    watermark_file = os.path.join(out_dir, WATERMARK_FILE_NAME)
+    if not os.path.exists(watermark_file):
+        return {}
+    with open(watermark_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _export_raw_db_to_dir(
+    out_dir: str, db_session: Session, incremental: bool, chunk_size: int, partition_size: int
+) -> None:
+    """Streams all tables into block range partitioned parquet files."""
+    watermark = get_export_watermark(out_dir) if incremental else {}
+    new_watermark = {}
+    for schema_obj in EXPORT_TABLES:
+        table_name = schema_obj.__tablename__
+        table_dir = os.path.join(out_dir, table_name)
+        since_block = watermark.get(table_name, None)
+        # Tables without a block number are small and always get exported in full
+        if since_block is None or "block_number" not in schema_obj.__table__.columns:
+            shutil.rmtree(table_dir, ignore_errors=True)
+            since_block = None
+        os.makedirs(table_dir, exist_ok=True)
+        latest_block = _stream_table_to_parquet(
+            table_dir, schema_obj, db_session, since_block, chunk_size, partition_size
+        )
+        if latest_block is not None:
+            new_watermark[table_name] = latest_block
+        elif since_block is not None:
+            new_watermark[table_name] = since_block
+
+    with open(os.path.join(out_dir, WATERMARK_FILE_NAME), "w", encoding="utf-8") as file:
+        json.dump(new_watermark, file)
+
+
+def _stream_table_to_parquet(
+    table_dir: str,
+    schema_obj: Type[Base],
+    db_session: Session,
+    since_block: int | None,
+    chunk_size: int,
+    partition_size: int,
+) -> int | None:
+    """Streams a table into parquet files in chunks, and returns the latest block number written."""
+    schema = _get_arrow_schema(schema_obj)
+    numeric_columns = [c.name for c in schema_obj.__table__.columns if isinstance(c.type, Numeric)]
+    has_block_number = "block_number" in schema_obj.__table__.columns
+
+    query = db_session.query(schema_obj)
+    if has_block_number:
+        block_number_column = schema_obj.__table__.columns["block_number"]
+        if since_block is not None:
+            query = query.filter(block_number_column > since_block)
+        query = query.order_by(block_number_column)
+    # We use a server side cursor to avoid loading the whole table into memory
+    statement = query.statement.execution_options(stream_results=True, max_row_buffer=chunk_size)
+
+    writer: pq.ParquetWriter | None = None
+    writer_partition: int | None = None
+    latest_block = None
+    for chunk_df in pd.read_sql(statement, con=db_session.connection(), coerce_float=False, chunksize=chunk_size):
+        if len(chunk_df) == 0:
+            continue
+        # Numeric columns have a larger precision than parquet decimals, so we store them as strings
+        for column in numeric_columns:
+            chunk_df[column] = chunk_df[column].map(lambda x: None if x is None else str(x))
+        if not has_block_number:
+            chunk_partitions = [(None, chunk_df)]
+        else:
+            latest_block = int(chunk_df["block_number"].iloc[-1])
+            chunk_partitions = chunk_df.groupby(chunk_df["block_number"] // partition_size, sort=True)
+        for partition, partition_df in chunk_partitions:
+            # Rows are ordered by block number, so we only ever need to write to the latest partition
+            if writer is None or partition != writer_partition:
+                if writer is not None:
+                    writer.close()
+                writer = pq.ParquetWriter(
+                    _get_partition_file_name(table_dir, partition, partition_size, partition_df), schema
+                )
+                writer_partition = partition
+            writer.write_table(pa.Table.from_pandas(partition_df, schema=schema, preserve_index=False))
+
+    if writer is not None:
+        writer.close()
+    elif not has_block_number or since_block is None:
+        # We always write a file for the table, so empty tables are kept on import
+        pq.write_table(schema.empty_table(), os.path.join(table_dir, "all.parquet"))
+    return latest_block
+
+
+def _get_partition_file_name(
+    table_dir: str, partition: int | None, partition_size: int, partition_df: pd.DataFrame
+) -> str:
+    """Gets the file to write a partition to.
+
+    Each export writes a new file in the partition, named by the first block in the file, so
+    incremental exports never overwrite previous files.
+    """
+    if partition is None:
+        return os.path.join(table_dir, "all.parquet")
+    partition_start = int(partition) * partition_size
+    partition_dir = os.path.join(table_dir, f"{partition_start:012d}_{partition_start + partition_size:012d}")
+    os.makedirs(partition_dir, exist_ok=True)
+    return os.path.join(partition_dir, f"from_{int(partition_df['block_number'].iloc[0]):012d}.parquet")
+
+
+def _get_arrow_schema(schema_obj: Type[Base]) -> pa.Schema:
+    """Gets the parquet schema of a table, used to keep types consistent across chunks."""
+    fields = []
+    for column in schema_obj.__table__.columns:
+        if isinstance(column.type, (BigInteger, Integer)):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, ARRAY):
+            arrow_type = pa.list_(pa.string())
+        else:
+            # Strings and numerics
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def _get_raw_table_files(table_dir: str) -> list[str]:
+    """Gets all parquet files of a table, ordered by block number."""
+    return sorted(glob.glob(os.path.join(table_dir, "**", "*.parquet"), recursive=True))
+
+
+def _read_raw_table_dir(table_dir: str, schema_obj: Type[Base]) -> pd.DataFrame:
+    """Reads a table from a raw export into a dataframe, converting numeric columns back to Decimals."""
+    schema = _get_arrow_schema(schema_obj)
+    out_df = pa.concat_tables(
+        [schema.empty_table()] + [pq.read_table(file, schema=schema) for file in _get_raw_table_files(table_dir)]
+    ).to_pandas()
+    for column in schema_obj.__table__.columns:
+        if isinstance(column.type, Numeric):
+            out_df[column.name] = out_df[column.name].map(lambda x: None if x is None else Decimal(x))
+    return out_df
+
+
+def _to_postgres_array(values) -> str | None:
+    """Formats a list of strings as a postgres array literal."""
+    if values is None:
+        return None
+    escaped = ['"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values]
+    return "{" + ",".join(escaped) + "}"
+
+
+def _copy_raw_table_dir_to_db(table_dir: str, schema_obj: Type[Base], engine: Engine) -> None:
+    """Loads a table from a raw export into the db using `COPY`, one row group at a time."""
+    table_name = schema_obj.__tablename__
+    columns = [c.name for c in schema_obj.__table__.columns]
+    array_columns = [c.name for c in schema_obj.__table__.columns if isinstance(c.type, ARRAY)]
+    copy_statement = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        with cursor.copy(copy_statement) as copy:  # type: ignore
+            for file in _get_raw_table_files(table_dir):
+                parquet_file = pq.ParquetFile(file)
+                for row_group in range(parquet_file.num_row_groups):
+                    # Keep integers as python objects, otherwise nulls cast integers to floats
+                    chunk_df = parquet_file.read_row_group(row_group, columns=columns).to_pandas(
+                        integer_object_nulls=True
+                    )
+                    for column in array_columns:
+                        chunk_df[column] = chunk_df[column].map(_to_postgres_array)
+                    buffer = io.StringIO()
+                    chunk_df.to_csv(buffer, header=False, index=False, na_rep="\\N")
+                    copy.write(buffer.getvalue())
+        # Since ids are copied, we need to update the id sequence to the latest id
+        if "id" in columns:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), COALESCE(MAX(id), 1), "
+                f"MAX(id) IS NOT NULL) FROM {table_name}"
+            )
+        connection.commit()
+    except Exception as err:  # pylint: disable=broad-except
+        connection.rollback()
+        logging.error("Error on copying %s: %s", table_name, err)
+        raise err
+    finally:
+        connection.close()
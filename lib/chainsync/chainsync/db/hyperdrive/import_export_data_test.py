@@ -4,9 +4,9 @@ from tempfile import TemporaryDirectory
 
 import pytest
 
-from .import_export_data import export_db_to_file, import_to_pandas
-from .interface import add_pool_config, get_pool_config
-from .schema import PoolConfig
+from .import_export_data import export_db_to_file, get_export_watermark, import_to_db, import_to_pandas
+from .interface import add_pool_config, add_wallet_deltas, get_pool_config, get_wallet_deltas
+from .schema import PoolConfig, WalletDelta
 
 
 # These tests are using fixtures defined in conftest.py
@@ -28,3 +28,43 @@ class TestExportImportData:
             export_db_to_file(temp_data_dir, db_session)
             read_pool_config = import_to_pandas(temp_data_dir)["pool_config"]
             assert read_pool_config.equals(pool_config_in)
+
+    @pytest.mark.docker
+    def test_raw_export_import(self, db_session):
+        """Testing streaming raw export with incremental exports and importing back into the db"""
+        pool_config = PoolConfig(contract_address="0", initial_share_price=Decimal("3.22222222222222"))
+        add_pool_config(pool_config, db_session)
+        pool_config_in = get_pool_config(db_session, coerce_float=False)
+        add_wallet_deltas(
+            [
+                WalletDelta(block_number=1, wallet_address="a", token_type="LP", delta=Decimal("1.1")),
+                WalletDelta(block_number=3, wallet_address="a", token_type="LP", delta=Decimal("2.2")),
+            ],
+            db_session,
+        )
+
+        with TemporaryDirectory() as temp_data_dir:
+            # Small chunks and partitions to test writing multiple row groups and partitions
+            export_db_to_file(temp_data_dir, db_session, raw=True, chunk_size=1, partition_size=2)
+            assert get_export_watermark(temp_data_dir)["wallet_delta"] == 3
+
+            add_wallet_deltas(
+                [WalletDelta(block_number=4, wallet_address="b", token_type="LP", delta=Decimal("3.3"))], db_session
+            )
+            export_db_to_file(temp_data_dir, db_session, raw=True, incremental=True, chunk_size=1, partition_size=2)
+            assert get_export_watermark(temp_data_dir)["wallet_delta"] == 4
+
+            wallet_deltas_in = get_wallet_deltas(db_session, coerce_float=False, return_timestamp=False)
+            read_wallet_deltas = import_to_pandas(temp_data_dir)["wallet_delta"]
+            assert read_wallet_deltas["delta"].tolist() == wallet_deltas_in["delta"].tolist()
+
+            import_to_db(db_session, temp_data_dir, drop=True)
+            wallet_deltas_out = get_wallet_deltas(db_session, coerce_float=False, return_timestamp=False)
+            assert wallet_deltas_out.equals(wallet_deltas_in)
+            assert get_pool_config(db_session, coerce_float=False).equals(pool_config_in)
+
+            # Ids should keep incrementing after import
+            add_wallet_deltas(
+                [WalletDelta(block_number=5, wallet_address="b", token_type="LP", delta=Decimal("4.4"))], db_session
+            )
+            assert len(get_wallet_deltas(db_session)) == 4
@@ -2,14 +2,17 @@
 from __future__ import annotations
 
 import logging
+from typing import Type
 
 import pandas as pd
-from chainsync.db.base import get_latest_block_number_from_table
+from chainsync.db.base import create_block_range_partitions, get_latest_block_number_from_table
 from ethpy.hyperdrive import BASE_TOKEN_SYMBOL
 from sqlalchemy import exc, func
 from sqlalchemy.orm import Session
 
 from .schema import (
+    BLOCK_PARTITIONED_TABLES,
+    PARTITION_BLOCK_SIZE,
     CheckpointInfo,
     CurrentWallet,
     HyperdriveTransaction,
@@ -164,6 +167,31 @@ def add_wallet_deltas(wallet_deltas: list[WalletDelta], session: Session) -> Non
         raise err
 
 
+def ensure_block_partitions(session: Session, block_number: int, partition_size: int = PARTITION_BLOCK_SIZE) -> int:
+    """Create block range partitions for all partitioned tables, covering the partition
+    that contains `block_number` and the one after it.
+
+    Arguments
+    ---------
+    session: Session
+        The initialized session object
+    block_number: int
+        The block number that needs to be covered by a partition
+    partition_size: int, optional
+        The number of blocks in each partition
+
+    Returns
+    -------
+    int
+        The block number (exclusive) that the partitions cover up to
+    """
+    # We always create the next partition ahead of time, so that rows never land in the default partition
+    end_block = (block_number // partition_size + 2) * partition_size
+    for table_obj in BLOCK_PARTITIONED_TABLES:
+        create_block_range_partitions(session, table_obj.__tablename__, block_number, end_block, partition_size)
+    return end_block
+
+
 def get_latest_block_number_from_pool_info_table(session: Session) -> int:
     """Get the latest block number based on the pool info table in the db.
 
@@ -446,6 +474,35 @@ def add_current_wallet(current_wallet: list[CurrentWallet], session: Session) ->
         raise err
 
 
+def get_latest_snapshot_block(
+    table_obj: Type[CurrentWallet] | Type[WalletPNL], session: Session, end_block: int | None = None
+) -> int | None:
+    """Get the latest block that has a full snapshot of wallet positions in the specified table.
+
+    Arguments
+    ---------
+    table_obj: Type[CurrentWallet] | Type[WalletPNL]
+        The delta encoded table to query
+    session: Session
+        The initialized session object
+    end_block: int | None, optional
+        If set, only considers snapshots before this block
+
+    Returns
+    -------
+    int | None
+        The latest snapshot block, or None if there is no snapshot
+    """
+    query = session.query(func.max(table_obj.block_number))  # pylint: disable=not-callable
+    query = query.filter(table_obj.is_snapshot.is_(True))
+    if end_block is not None:
+        query = query.filter(table_obj.block_number < end_block)
+    result = query.first()
+    if result is None or result[0] is None:
+        return None
+    return int(result[0])
+
+
 def get_current_wallet(
     session: Session,
     end_block: int | None = None,
@@ -474,8 +531,11 @@ def get_current_wallet(
     DataFrame
         A DataFrame that consists of the queried wallet info data
     """
-    # TODO this function might not scale, as it's looking across all blocks from the beginning of time
-    # Ways to improve: add indexes on wallet_address, token_type, block_number
+    # The CurrentWallet table only stores a row per change in wallet position, along with periodic
+    # full snapshots of all positions. Hence, we only need to look at rows from the latest snapshot
+    # before end_block onwards.
+    # The `ix_current_wallet_latest_position` index on (wallet_address, token_type, block_number DESC)
+    # matches the distinct and ordering below.
 
     # Postgres SQL query (this one is fast, but isn't supported by sqlite)
     # select distinct on (wallet_address, token_type) * from CurrentWallet
@@ -499,6 +559,9 @@ def get_current_wallet(
         query = query.filter(CurrentWallet.wallet_address.in_(wallet_address))
 
     query = query.filter(CurrentWallet.block_number < end_block)
+    snapshot_block = get_latest_snapshot_block(CurrentWallet, session, end_block=end_block)
+    if snapshot_block is not None:
+        query = query.filter(CurrentWallet.block_number >= snapshot_block)
     query = query.distinct(CurrentWallet.wallet_address, CurrentWallet.token_type)
     query = query.order_by(CurrentWallet.wallet_address, CurrentWallet.token_type, CurrentWallet.block_number.desc())
     current_wallet = pd.read_sql(query.statement, con=session.connection(), coerce_float=coerce_float)
@@ -509,8 +572,8 @@ def get_current_wallet(
     current_wallet["latest_block_update"] = current_wallet["block_number"]
     current_wallet["block_number"] = end_block - 1
 
-    # Drop id, as id is autofilled when inserting
-    current_wallet = current_wallet.drop("id", axis=1)
+    # Drop id, as id is autofilled when inserting, and drop the snapshot flag, as it's storage bookkeeping
+    current_wallet = current_wallet.drop(["id", "is_snapshot"], axis=1)
 
     # filter non-base zero positions here
     has_value = current_wallet["value"] > 0
@@ -625,6 +688,101 @@ def get_ticker(
     return pd.read_sql(query.statement, con=session.connection(), coerce_float=coerce_float)
 
 
+def add_wallet_pnl(wallet_pnl: list[WalletPNL], session: Session) -> None:
+    """Add wallet pnl rows to the wallet_pnl table.
+
+    Arguments
+    ---------
+    wallet_pnl: list[WalletPNL]
+        A list of WalletPNL objects to insert into postgres
+    session: Session
+        The initialized session object
+    """
+    for wallet in wallet_pnl:
+        session.add(wallet)
+    try:
+        session.commit()
+    except exc.DataError as err:
+        session.rollback()
+        logging.error("Error on adding wallet_pnl: %s", err)
+        raise err
+
+
+def _reconstruct_positions(delta_df: pd.DataFrame, start_block: int | None = None) -> pd.DataFrame:
+    """Reconstructs all wallet positions at every block from delta encoded rows.
+
+    Arguments
+    ---------
+    delta_df: pd.DataFrame
+        The delta encoded rows, sorted by block number. The rows must start at a full snapshot
+        (or the beginning of the table) for the reconstruction to be complete.
+    start_block: int | None, optional
+        If set, only returns positions for blocks on or after this block. Rows before this block
+        are still used to build up the positions.
+
+    Returns
+    -------
+    pd.DataFrame
+        A dataframe with every open position for each block that has at least one row in `delta_df`,
+        with the `block_number` column set to the block the positions were reconstructed at.
+    """
+    columns = [column for column in delta_df.columns if column != "is_snapshot"]
+    latest_positions: dict[tuple[str, str], tuple] = {}
+    out_rows = []
+    for block_number, block_df in delta_df.groupby("block_number", sort=True):
+        # A full snapshot replaces all previous positions, so we don't rely on
+        # the rows before it, which may have been removed from the table.
+        if block_df["is_snapshot"].eq(True).any():
+            latest_positions = {}
+        # Each row overwrites the previous value of that position
+        for row in block_df[columns].itertuples(index=False):
+            latest_positions[(row.wallet_address, row.token_type)] = row
+        if start_block is None or block_number >= start_block:
+            out_rows.extend(row._replace(block_number=block_number) for row in latest_positions.values())
+    out = pd.DataFrame(out_rows, columns=columns)
+
+    # Closed positions are written as a zero valued row, so we filter non-base zero positions here
+    has_value = out["value"] > 0
+    is_base = out["token_type"] == BASE_TOKEN_SYMBOL
+    return out[has_value | is_base].reset_index(drop=True)
+
+
+def downsample_wallet_pnl(session: Session, retention_blocks: int) -> int:
+    """Removes delta rows from the wallet_pnl table that are older than the retention period.
+
+    Only full snapshots are kept for blocks older than `retention_blocks`, i.e., old pnl history is
+    downsampled to the snapshot interval. Deltas are only removed before a snapshot, so positions at
+    any block after the retention period are still reconstructed exactly.
+
+    Arguments
+    ---------
+    session: Session
+        The initialized session object
+    retention_blocks: int
+        The number of most recent blocks to keep all rows for
+
+    Returns
+    -------
+    int
+        The number of rows removed
+    """
+    cutoff_block = get_latest_block_number_from_table(WalletPNL, session) - retention_blocks
+    snapshot_block = get_latest_snapshot_block(WalletPNL, session, end_block=cutoff_block + 1)
+    if snapshot_block is None:
+        return 0
+    query = session.query(WalletPNL).filter(WalletPNL.block_number < snapshot_block)
+    # Rows written before snapshots were introduced have a null flag, and are treated as deltas
+    query = query.filter(WalletPNL.is_snapshot.isnot(True))
+    num_removed = query.delete()
+    try:
+        session.commit()
+    except exc.DataError as err:
+        session.rollback()
+        logging.error("Error on downsampling wallet_pnl: %s", err)
+        raise err
+    return num_removed
+
+
 # Lots of arguments, most are defaults
 # pylint: disable=too-many-arguments
 def get_wallet_pnl(
@@ -634,9 +792,13 @@ def get_wallet_pnl(
     wallet_address: list[str] | None = None,
     return_timestamp: bool = True,
     coerce_float=True,
+    raw: bool = False,
 ) -> pd.DataFrame:
     """Get all wallet pnl and returns as a pandas dataframe.
 
+    The wallet_pnl table is delta encoded with periodic snapshots. This function reconstructs
+    all open positions for every block in the range that has a pnl update.
+
     Arguments
     ---------
     session: Session
@@ -653,16 +815,15 @@ def get_wallet_pnl(
         Returns the timestamp from the pool info table if True. Defaults to True.
     coerce_float: bool
         If true, will return floats in dataframe. Otherwise, will return fixed point Decimal
+    raw: bool
+        If true, will return the stored delta encoded rows without reconstructing positions.
 
     Returns
     -------
     DataFrame
         A DataFrame that consists of the queried pool info data
     """
-    if return_timestamp:
-        query = session.query(PoolInfo.timestamp, WalletPNL)
-    else:
-        query = session.query(WalletPNL)
+    query = session.query(WalletPNL)
 
     # Support for negative indices
     if (start_block is not None) and (start_block < 0):
@@ -670,21 +831,39 @@ def get_wallet_pnl(
     if (end_block is not None) and (end_block < 0):
         end_block = get_latest_block_number_from_table(WalletPNL, session) + end_block + 1
 
-    if start_block is not None:
-        query = query.filter(WalletPNL.block_number >= start_block)
+    # To reconstruct positions at start_block, we need to read from the latest snapshot on or before start_block.
+    # If there is no snapshot, we read from the beginning of the table.
+    read_start_block = start_block
+    if not raw and start_block is not None:
+        read_start_block = get_latest_snapshot_block(WalletPNL, session, end_block=start_block + 1)
+
+    if read_start_block is not None:
+        query = query.filter(WalletPNL.block_number >= read_start_block)
     if end_block is not None:
         query = query.filter(WalletPNL.block_number < end_block)
     if wallet_address is not None:
         query = query.filter(WalletPNL.wallet_address.in_(wallet_address))
 
+    # Always sort by block in order
+    query = query.order_by(WalletPNL.block_number, WalletPNL.id)
+
+    wallet_pnl = pd.read_sql(query.statement, con=session.connection(), coerce_float=coerce_float)
+    if not raw:
+        wallet_pnl = _reconstruct_positions(wallet_pnl, start_block)
+
     if return_timestamp:
         # query from PoolInfo the timestamp
-        query = query.join(PoolInfo, WalletPNL.block_number == PoolInfo.block_number)
-
-    # Always sort by block in order
-    query = query.order_by(WalletPNL.block_number)
+        timestamp_query = session.query(PoolInfo.block_number, PoolInfo.timestamp)
+        if len(wallet_pnl) > 0:
+            timestamp_query = timestamp_query.filter(
+                PoolInfo.block_number >= int(wallet_pnl["block_number"].min()),
+                PoolInfo.block_number <= int(wallet_pnl["block_number"].max()),
+            )
+        timestamps = pd.read_sql(timestamp_query.statement, con=session.connection())
+        wallet_pnl = wallet_pnl.merge(timestamps, how="inner", on="block_number")
+        wallet_pnl.insert(0, "timestamp", wallet_pnl.pop("timestamp"))
 
-    return pd.read_sql(query.statement, con=session.connection(), coerce_float=coerce_float)
+    return wallet_pnl
 
 
 def get_total_wallet_pnl_over_time(
@@ -716,37 +895,17 @@ def get_total_wallet_pnl_over_time(
     DataFrame
         A DataFrame that consists of the queried pool info data
     """
-    # Do a subquery that groups wallet pnl by address and block
-    # Not sure why func.sum is not callable, but it is
-    subquery = session.query(
-        WalletPNL.wallet_address,
-        WalletPNL.block_number,
-        func.sum(WalletPNL.pnl).label("pnl"),  # pylint: disable=not-callable
+    # The wallet_pnl table is delta encoded, so we group the reconstructed positions by address and block
+    wallet_pnl = get_wallet_pnl(
+        session,
+        start_block=start_block,
+        end_block=end_block,
+        wallet_address=wallet_address,
+        return_timestamp=True,
+        coerce_float=coerce_float,
     )
-
-    # Support for negative indices
-    if (start_block is not None) and (start_block < 0):
-        start_block = get_latest_block_number_from_table(WalletPNL, session) + start_block + 1
-    if (end_block is not None) and (end_block < 0):
-        end_block = get_latest_block_number_from_table(WalletPNL, session) + end_block + 1
-
-    if start_block is not None:
-        subquery = subquery.filter(WalletPNL.block_number >= start_block)
-    if end_block is not None:
-        subquery = subquery.filter(WalletPNL.block_number < end_block)
-    if wallet_address is not None:
-        subquery = subquery.filter(WalletPNL.wallet_address.in_(wallet_address))
-
-    subquery = subquery.group_by(WalletPNL.wallet_address, WalletPNL.block_number)
-
-    # Always sort by block in order
-    subquery = subquery.order_by(WalletPNL.block_number).subquery()
-
-    # Additional query to join timestamp to block number
-    query = session.query(PoolInfo.timestamp, subquery)
-    query = query.join(PoolInfo, subquery.c.block_number == PoolInfo.block_number)
-
-    return pd.read_sql(query.statement, con=session.connection(), coerce_float=coerce_float)
+    # Grouping by timestamp as well to keep the timestamp column, and to sort by time in order
+    return wallet_pnl.groupby(["timestamp", "wallet_address", "block_number"], as_index=False)["pnl"].sum()
 
 
 def get_wallet_positions_over_time(
@@ -778,34 +937,16 @@ def get_wallet_positions_over_time(
     DataFrame
         A DataFrame that consists of the queried pool info data
     """
-    # Not sure why func.sum is not callable, but it is
-    subquery = session.query(
-        WalletPNL.wallet_address,
-        WalletPNL.block_number,
-        WalletPNL.base_token_type,
-        func.sum(WalletPNL.value).label("value"),  # pylint: disable=not-callable
+    # The wallet_pnl table is delta encoded, so we group the reconstructed positions by address, block and type
+    wallet_pnl = get_wallet_pnl(
+        session,
+        start_block=start_block,
+        end_block=end_block,
+        wallet_address=wallet_address,
+        return_timestamp=True,
+        coerce_float=coerce_float,
     )
-
-    # Support for negative indices
-    if (start_block is not None) and (start_block < 0):
-        start_block = get_latest_block_number_from_table(WalletPNL, session) + start_block + 1
-    if (end_block is not None) and (end_block < 0):
-        end_block = get_latest_block_number_from_table(WalletPNL, session) + end_block + 1
-
-    if start_block is not None:
-        subquery = subquery.filter(WalletPNL.block_number >= start_block)
-    if end_block is not None:
-        subquery = subquery.filter(WalletPNL.block_number < end_block)
-    if wallet_address is not None:
-        subquery = subquery.filter(WalletPNL.wallet_address.in_(wallet_address))
-
-    subquery = subquery.group_by(WalletPNL.wallet_address, WalletPNL.block_number, WalletPNL.base_token_type).subquery()
-
-    # query from PoolInfo the timestamp
-    query = session.query(PoolInfo.timestamp, subquery)
-    query = query.join(PoolInfo, subquery.c.block_number == PoolInfo.block_number)
-
-    # Always sort by block in order
-    query = query.order_by(PoolInfo.timestamp)
-
-    return pd.read_sql(query.statement, con=session.connection(), coerce_float=coerce_float)
+    # Grouping by timestamp as well to keep the timestamp column, and to sort by time in order
+    return wallet_pnl.groupby(["timestamp", "wallet_address", "block_number", "base_token_type"], as_index=False)[
+        "value"
+    ].sum()
@@ -14,6 +14,8 @@ from .interface import (
     add_pool_infos,
     add_transactions,
     add_wallet_deltas,
+    add_wallet_pnl,
+    downsample_wallet_pnl,
     get_all_traders,
     get_checkpoint_info,
     get_current_wallet,
@@ -23,8 +25,9 @@ from .interface import (
     get_pool_info,
     get_transactions,
     get_wallet_deltas,
+    get_wallet_pnl,
 )
-from .schema import CheckpointInfo, CurrentWallet, HyperdriveTransaction, PoolConfig, PoolInfo, WalletDelta
+from .schema import CheckpointInfo, CurrentWallet, HyperdriveTransaction, PoolConfig, PoolInfo, WalletDelta, WalletPNL
 
 
 # These tests are using fixtures defined in conftest.py
@@ -392,3 +395,86 @@ class TestCurrentWalletInterface:
         wallet_info_df = wallet_info_df.sort_values(by=["value"])
         np.testing.assert_array_equal(wallet_info_df["token_type"], ["LP", BASE_TOKEN_SYMBOL])
         np.testing.assert_array_equal(wallet_info_df["value"], [5.1, 6.1])
+
+    @pytest.mark.docker
+    def test_current_wallet_snapshot(self, db_session):
+        """Testing getting current wallet values from the latest snapshot"""
+        wallet_info_1 = CurrentWallet(block_number=0, wallet_address="addr", token_type="LP", value=Decimal("3.1"))
+        wallet_info_2 = CurrentWallet(block_number=1, wallet_address="addr", token_type="LP", value=Decimal("5.1"))
+        # Snapshot at block 2 contains all positions
+        wallet_info_3 = CurrentWallet(
+            block_number=2, wallet_address="addr", token_type="LP", value=Decimal("5.1"), is_snapshot=True
+        )
+        wallet_info_4 = CurrentWallet(
+            block_number=3, wallet_address="addr", token_type=BASE_TOKEN_SYMBOL, value=Decimal("6.1")
+        )
+        add_current_wallet([wallet_info_1, wallet_info_2, wallet_info_3, wallet_info_4], db_session)
+        wallet_info_df = get_current_wallet(db_session).sort_values(by=["value"])
+        np.testing.assert_array_equal(wallet_info_df["token_type"], ["LP", BASE_TOKEN_SYMBOL])
+        np.testing.assert_array_equal(wallet_info_df["value"], [5.1, 6.1])
+        np.testing.assert_array_equal(wallet_info_df["latest_block_update"], [2, 3])
+        # Querying before the snapshot reads from the beginning of the table
+        wallet_info_df = get_current_wallet(db_session, end_block=1)
+        np.testing.assert_array_equal(wallet_info_df["value"], [3.1])
+
+
+class TestWalletPNLInterface:
+    """Testing postgres interface for the delta encoded WalletPNL table"""
+
+    @pytest.mark.docker
+    def test_get_wallet_pnl(self, db_session):
+        """Testing reconstructing wallet pnl from snapshots and deltas"""
+        wallet_pnl = [
+            # Full snapshot at block 0
+            WalletPNL(block_number=0, wallet_address="a", token_type="LP", value=Decimal("1"), is_snapshot=True),
+            WalletPNL(block_number=0, wallet_address="b", token_type="LP", value=Decimal("2"), is_snapshot=True),
+            # Only wallet a changes on block 1
+            WalletPNL(block_number=1, wallet_address="a", token_type="LP", value=Decimal("3")),
+            # Wallet b closes its position on block 2
+            WalletPNL(block_number=2, wallet_address="b", token_type="LP", value=Decimal("0")),
+        ]
+        add_wallet_pnl(wallet_pnl, db_session)
+
+        wallet_pnl_df = get_wallet_pnl(db_session, return_timestamp=False)
+        np.testing.assert_array_equal(wallet_pnl_df["block_number"], [0, 0, 1, 1, 2])
+        np.testing.assert_array_equal(wallet_pnl_df["wallet_address"], ["a", "b", "a", "b", "a"])
+        np.testing.assert_array_equal(wallet_pnl_df["value"], [1, 2, 3, 2, 3])
+
+        wallet_pnl_df = get_wallet_pnl(db_session, start_block=1, end_block=2, return_timestamp=False)
+        np.testing.assert_array_equal(wallet_pnl_df["block_number"], [1, 1])
+        np.testing.assert_array_equal(wallet_pnl_df["value"], [3, 2])
+
+        wallet_pnl_df = get_wallet_pnl(db_session, start_block=-1, return_timestamp=False)
+        np.testing.assert_array_equal(wallet_pnl_df["wallet_address"], ["a"])
+        np.testing.assert_array_equal(wallet_pnl_df["value"], [3])
+
+        # Raw returns the stored rows
+        wallet_pnl_df = get_wallet_pnl(db_session, return_timestamp=False, raw=True)
+        assert len(wallet_pnl_df) == 4
+
+    @pytest.mark.docker
+    def test_downsample_wallet_pnl(self, db_session):
+        """Testing removing wallet pnl deltas older than the retention period"""
+        wallet_pnl = [
+            WalletPNL(block_number=0, wallet_address="a", token_type="LP", value=Decimal("1"), is_snapshot=True),
+            WalletPNL(block_number=1, wallet_address="a", token_type="LP", value=Decimal("2")),
+            WalletPNL(block_number=2, wallet_address="b", token_type="LP", value=Decimal("4")),
+            WalletPNL(block_number=3, wallet_address="a", token_type="LP", value=Decimal("2"), is_snapshot=True),
+            WalletPNL(block_number=3, wallet_address="b", token_type="LP", value=Decimal("4"), is_snapshot=True),
+            WalletPNL(block_number=4, wallet_address="b", token_type="LP", value=Decimal("0")),
+            WalletPNL(block_number=5, wallet_address="a", token_type="LP", value=Decimal("5")),
+        ]
+        add_wallet_pnl(wallet_pnl, db_session)
+
+        # No snapshot before the cutoff block, nothing gets removed
+        assert downsample_wallet_pnl(db_session, retention_blocks=10) == 0
+        # Cutoff is block 2, only deltas before the snapshot at block 0 can be removed
+        assert downsample_wallet_pnl(db_session, retention_blocks=3) == 0
+        # Cutoff is block 4, deltas before the snapshot at block 3 are removed
+        assert downsample_wallet_pnl(db_session, retention_blocks=1) == 2
+
+        # Positions after the snapshot are unchanged
+        wallet_pnl_df = get_wallet_pnl(db_session, start_block=3, return_timestamp=False)
+        np.testing.assert_array_equal(wallet_pnl_df["block_number"], [3, 3, 4, 5])
+        np.testing.assert_array_equal(wallet_pnl_df["wallet_address"], ["a", "b", "a", "a"])
+        np.testing.assert_array_equal(wallet_pnl_df["value"], [2, 4, 2, 5])
@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import Union
 
 from chainsync.db.base import Base
-from sqlalchemy import ARRAY, BigInteger, Boolean, DateTime, Integer, Numeric, String
+from sqlalchemy import ARRAY, DDL, BigInteger, Boolean, DateTime, Index, Integer, Numeric, String, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 # pylint: disable=invalid-name
@@ -17,6 +17,12 @@ from sqlalchemy.orm import Mapped, mapped_column
 # https://stackoverflow.com/questions/40686571/performance-of-numeric-type-with-high-precisions-and-scales-in-postgresql
 FIXED_NUMERIC = Numeric(precision=1000, scale=18)
 
+# Large append-only tables are partitioned by block number in postgres.
+# Partitioned tables require the partition key to be part of the primary key.
+BLOCK_PARTITION_ARGS = {"postgresql_partition_by": "RANGE (block_number)"}
+# The number of blocks in each partition
+PARTITION_BLOCK_SIZE = 100_000
+
 
 ## Base schemas for raw data
 
@@ -88,11 +94,12 @@ class WalletDelta(Base):
     """Table/dataclass schema for wallet deltas."""
 
     __tablename__ = "wallet_delta"
+    __table_args__ = BLOCK_PARTITION_ARGS
 
     # Default table primary key
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, init=False, autoincrement=True)
     transaction_hash: Mapped[str] = mapped_column(String, index=True)
-    block_number: Mapped[int] = mapped_column(BigInteger, index=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     wallet_address: Mapped[Union[str, None]] = mapped_column(String, index=True, default=None)
     # base_token_type can be BASE, LONG, SHORT, LP, or WITHDRAWAL_SHARE
     base_token_type: Mapped[Union[str, None]] = mapped_column(String, index=True, default=None)
@@ -237,10 +244,11 @@ class CurrentWallet(Base):
     """Table/dataclass schema for current wallet positions."""
 
     __tablename__ = "current_wallet"
+    __table_args__ = BLOCK_PARTITION_ARGS
 
     # Default table primary key
     id: Mapped[int] = mapped_column(BigInteger(), primary_key=True, init=False, autoincrement=True)
-    block_number: Mapped[int] = mapped_column(BigInteger, index=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     wallet_address: Mapped[Union[str, None]] = mapped_column(String, index=True, default=None)
     # base_token_type can be BASE, LONG, SHORT, LP, or WITHDRAWAL_SHARE
     base_token_type: Mapped[Union[str, None]] = mapped_column(String, index=True, default=None)
@@ -249,6 +257,9 @@ class CurrentWallet(Base):
     value: Mapped[Union[Decimal, None]] = mapped_column(FIXED_NUMERIC, default=None)
     # While time here is in epoch seconds, we use Numeric to allow for (1) lossless storage and (2) allow for NaNs
     maturity_time: Mapped[Union[int, None]] = mapped_column(Numeric, default=None)
+    # Rows are written only when a position changes. Every so often we write a full copy of all positions
+    # with this flag set, so that readers only need to scan from the latest snapshot onwards.
+    is_snapshot: Mapped[Union[bool, None]] = mapped_column(Boolean, index=True, default=False)
 
 
 class Ticker(Base):
@@ -258,9 +269,10 @@ class Ticker(Base):
     """
 
     __tablename__ = "ticker"
+    __table_args__ = BLOCK_PARTITION_ARGS
 
     id: Mapped[int] = mapped_column(BigInteger(), primary_key=True, init=False, autoincrement=True)
-    block_number: Mapped[int] = mapped_column(BigInteger, index=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime)
     wallet_address: Mapped[Union[str, None]] = mapped_column(String, index=True, default=None)
     trade_type: Mapped[Union[str, None]] = mapped_column(String, default=None)
@@ -269,17 +281,20 @@ class Ticker(Base):
 
 class WalletPNL(Base):
     """Table/dataclass schema for pnl data
-    This table differs from CurrentWallet by (1) including the PNL, and (2) contains all wallet positions
-    for a given block.
+    This table differs from CurrentWallet by including the PNL. Rows are delta encoded,
+    i.e., a block only contains the positions whose value or pnl changed since the previous
+    write, with a full snapshot of all wallet positions written periodically. Closed positions
+    are written as a zero-valued row. Use `get_wallet_pnl` to reconstruct all positions at a block.
 
     Mapped class that is a data class on the python side, and an declarative base on the sql side.
     """
 
     __tablename__ = "wallet_pnl"
+    __table_args__ = BLOCK_PARTITION_ARGS
 
     # Default table primary key
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, init=False, autoincrement=True)
-    block_number: Mapped[int] = mapped_column(BigInteger, index=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     wallet_address: Mapped[Union[str, None]] = mapped_column(String, index=True, default=None)
     # base_token_type can be BASE, LONG, SHORT, LP, or WITHDRAWAL_SHARE
     base_token_type: Mapped[Union[str, None]] = mapped_column(String, index=True, default=None)
@@ -290,3 +305,39 @@ class WalletPNL(Base):
     maturity_time: Mapped[Union[int, None]] = mapped_column(Numeric, default=None)
     latest_block_update: Mapped[Union[int, None]] = mapped_column(BigInteger, default=None)
     pnl: Mapped[Union[Decimal, None]] = mapped_column(FIXED_NUMERIC, default=None)
+    # True if this row is part of a full snapshot of all positions, False if it's a delta
+    is_snapshot: Mapped[Union[bool, None]] = mapped_column(Boolean, index=True, default=False)
+
+
+## Composite indexes matching the access paths of the interface functions
+
+# `get_current_wallet` selects distinct (wallet_address, token_type) ordered by descending block number
+Index(
+    "ix_current_wallet_latest_position",
+    CurrentWallet.wallet_address,
+    CurrentWallet.token_type,
+    CurrentWallet.block_number.desc(),
+)
+# `get_wallet_pnl` reads blocks in order from the latest snapshot, optionally filtered by wallet
+Index("ix_wallet_pnl_block_wallet", WalletPNL.block_number, WalletPNL.wallet_address)
+Index("ix_wallet_pnl_wallet_block", WalletPNL.wallet_address, WalletPNL.block_number)
+# `get_ticker` filters by wallet and sorts by block
+Index("ix_ticker_wallet_block", Ticker.wallet_address, Ticker.block_number)
+# `get_latest_snapshot_block` looks for the latest snapshot block
+Index("ix_current_wallet_snapshot_block", CurrentWallet.is_snapshot, CurrentWallet.block_number)
+Index("ix_wallet_pnl_snapshot_block", WalletPNL.is_snapshot, WalletPNL.block_number)
+
+
+## Partitioning
+
+# Tables that are partitioned by block number
+BLOCK_PARTITIONED_TABLES = [WalletDelta, CurrentWallet, Ticker, WalletPNL]
+
+# Rows that don't fall within a block range partition are stored in a default partition,
+# so inserts never fail if range partitions haven't been created yet.
+for _table in BLOCK_PARTITIONED_TABLES:
+    event.listen(
+        _table.__table__,
+        "after_create",
+        DDL(f"CREATE TABLE IF NOT EXISTS {_table.__tablename__}_default PARTITION OF {_table.__tablename__} DEFAULT"),
+    )
@@ -8,7 +8,9 @@ from typing import Callable
 from chainsync import PostgresConfig
 from chainsync.db.base import initialize_session
 from chainsync.db.hyperdrive import (
+    PARTITION_BLOCK_SIZE,
     data_chain_to_db,
+    ensure_block_partitions,
     get_latest_block_number_from_pool_info_table,
     init_data_chain_to_db,
 )
@@ -93,6 +95,9 @@ def acquire_data(
             curr_write_block,
         )
 
+    # Create block range partitions ahead of the blocks we're writing
+    partitioned_until = ensure_block_partitions(db_session, curr_write_block)
+
     ## Collect initial data
     init_data_chain_to_db(interface, db_session)
 
@@ -111,6 +116,9 @@ def acquire_data(
                 break
             time.sleep(_SLEEP_AMOUNT)
             continue
+        # Keep at least one partition ahead of the chain
+        if latest_mined_block >= partitioned_until - PARTITION_BLOCK_SIZE:
+            partitioned_until = ensure_block_partitions(db_session, latest_mined_block)
         # Backfilling for blocks that need updating
         for block_int in range(curr_write_block, latest_mined_block + 1):
             block_number: BlockNumber = BlockNumber(block_int)
@@ -10,6 +10,7 @@ from chainsync.analysis import data_to_analysis
 from chainsync.db.base import initialize_session
 from chainsync.db.hyperdrive import (
     PoolInfo,
+    downsample_wallet_pnl,
     get_latest_block_number_from_analysis_table,
     get_latest_block_number_from_table,
     get_pool_config,
@@ -36,6 +37,7 @@ def data_analysis(
     exit_on_catch_up: bool = False,
     exit_callback_fn: Callable[[], bool] | None = None,
     suppress_logs: bool = False,
+    wallet_pnl_retention_blocks: int | None = None,
 ):
     """Execute the data acquisition pipeline.
 
@@ -65,6 +67,9 @@ def data_analysis(
         Defaults to not set.
     suppress_logs: bool, optional
         If true, will suppress info logging from this function. Defaults to False.
+    wallet_pnl_retention_blocks: int | None, optional
+        If set, will only keep full wallet pnl history for this many of the most recent blocks.
+        Older wallet pnl history is downsampled to the snapshot interval. Defaults to keeping all history.
     """
     # TODO implement logger instead of global logging to suppress based on module name.
 
@@ -127,6 +132,8 @@ def data_analysis(
         if not suppress_logs:
             logging.info("Running batch %s to %s", analysis_start_block, analysis_end_block)
         data_to_analysis(analysis_start_block, analysis_end_block, pool_config, db_session, hyperdrive_contract)
+        if wallet_pnl_retention_blocks is not None:
+            downsample_wallet_pnl(db_session, wallet_pnl_retention_blocks)
         curr_start_write_block = latest_data_block_number + 1
 
     # Clean up resources on clean exit
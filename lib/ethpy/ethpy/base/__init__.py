@@ -1,9 +1,27 @@
 """Base utilities for working with contracts via web3"""
 from .abi import load_abi_from_file, load_all_abis
-from .errors import ABIError, UnknownBlockError, decode_error_selector_for_contract
+from .batch_submission import RawTransactionBatcher, get_transaction_batcher, send_raw_transaction_batch
+from .errors import (
+    ABIError,
+    UnknownBlockError,
+    decode_error_data_for_contract,
+    decode_error_selector_for_contract,
+    describe_contract_custom_error,
+    format_contract_custom_error,
+)
+from .gas_profile import GasProfile, get_gas_profile, reset_gas_profiles
+from .nonce_manager import (
+    NonceManager,
+    get_nonce_manager,
+    is_already_known_error,
+    is_nonce_error,
+    reset_nonce_managers,
+)
+from .receipt_waiter import ReceiptWaiter, format_receipt, get_receipt_waiter
 from .receipts import get_event_object, get_transaction_logs
 from .retry_utils import retry_call
-from .rpc_interface import get_account_balance, set_anvil_account_balance
+from .rpc_interface import get_account_balance, get_chain_key, make_batch_request, set_anvil_account_balance
+from .signing import get_signing_executor, set_signing_executor
 from .transactions import (
     async_eth_transfer,
     async_smart_contract_transact,
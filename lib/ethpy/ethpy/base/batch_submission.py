@@ -0,0 +1,168 @@
+"""Submit many raw transactions in a single JSON-RPC batch request."""
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import Sequence
+
+from eth_account.datastructures import SignedTransaction
+from hexbytes import HexBytes
+from web3 import Web3
+
+from .rpc_interface import make_batch_request
+
+DEFAULT_BATCH_WINDOW = 0.005
+
+
+def send_raw_transaction_batch(
+    web3: Web3, signed_transactions: Sequence[SignedTransaction | HexBytes | bytes]
+) -> list[HexBytes | Exception]:
+    """Send signed transactions, possibly from many accounts, in a single JSON-RPC batch request.
+    Falls back to sending the transactions one by one with `send_raw_transaction` if the provider isn't
+    an HTTP provider or the node doesn't support batch requests.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3 provider object
+    signed_transactions: Sequence[SignedTransaction | HexBytes | bytes]
+        The signed transactions, or their raw encoding
+
+    Returns
+    -------
+    list[HexBytes | Exception]
+        The transaction hash of each transaction, or the exception of transactions that failed to send,
+        in the order of `signed_transactions`.
+    """
+    raw_transactions = [
+        HexBytes(txn.rawTransaction if isinstance(txn, SignedTransaction) else txn) for txn in signed_transactions
+    ]
+    if len(raw_transactions) == 0:
+        return []
+    batch_response = None
+    if len(raw_transactions) > 1:
+        batch_response = make_batch_request(
+            web3,
+            [("eth_sendRawTransaction", [Web3.to_hex(raw_transaction)]) for raw_transaction in raw_transactions],
+        )
+    if batch_response is None:
+        return _send_raw_transactions_sequentially(web3, raw_transactions)
+    # web3 raises rpc errors as a ValueError of the error dict, so we do the same
+    return [
+        ValueError(response["error"]) if "error" in response else HexBytes(response["result"])
+        for response in batch_response
+    ]
+
+
+def _send_raw_transactions_sequentially(web3: Web3, raw_transactions: list[HexBytes]) -> list[HexBytes | Exception]:
+    """Sends raw transactions one by one, returning the exception of transactions that failed to send."""
+    results: list[HexBytes | Exception] = []
+    for raw_transaction in raw_transactions:
+        try:
+            results.append(web3.eth.send_raw_transaction(raw_transaction))
+        except Exception as err:  # pylint: disable=broad-except
+            results.append(err)
+    return results
+
+
+class RawTransactionBatcher:
+    """Collects raw transactions submitted by coroutines of an event loop within a short window,
+    and sends them together with `send_raw_transaction_batch`.
+    Hence, submitting trades of many agents in the same block takes one round trip instead of one per trade.
+    """
+
+    def __init__(self, web3: Web3, batch_window: float = DEFAULT_BATCH_WINDOW):
+        """Initialize the batcher.
+
+        Arguments
+        ---------
+        web3: Web3
+            web3 provider object
+        batch_window: float, optional
+            The number of seconds to collect transactions before sending a batch. Defaults to 5 milliseconds.
+        """
+        self.web3 = web3
+        self.batch_window = batch_window
+        self._queue: list[tuple[int, HexBytes, asyncio.Future[HexBytes]]] = []
+        self._flush_scheduled = False
+        # Keep a reference to the running flush, since the event loop only keeps weak references to tasks
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def submit(self, raw_transaction: HexBytes | bytes, nonce: int = 0) -> HexBytes:
+        """Submit a signed transaction with the next batch.
+
+        Arguments
+        ---------
+        raw_transaction: HexBytes | bytes
+            The raw signed transaction
+        nonce: int, optional
+            The nonce of the transaction. Transactions in a batch are sent in order of nonce,
+            so that transactions from the same account don't arrive with a nonce gap.
+
+        Returns
+        -------
+        HexBytes
+            The transaction hash. Raises the error of the batch entry if the transaction failed to send.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[HexBytes] = loop.create_future()
+        self._queue.append((nonce, HexBytes(raw_transaction), future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_later(self.batch_window, self._start_flush, loop)
+        return await future
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Starts sending the queued transactions."""
+        flush_task = loop.create_task(self._flush())
+        self._flush_tasks.add(flush_task)
+        flush_task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self) -> None:
+        """Sends all queued transactions in one batch, resolving each submission with its own result."""
+        queue, self._queue = sorted(self._queue, key=lambda entry: entry[0]), []
+        self._flush_scheduled = False
+        raw_transactions = [raw_transaction for _, raw_transaction, _ in queue]
+        try:
+            # The batch request is blocking, so we send it off the event loop
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, send_raw_transaction_batch, self.web3, raw_transactions
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            results = [err] * len(queue)
+        for (_, _, future), result in zip(queue, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# Batchers keyed by the event loop and the rpc endpoint, since futures are bound to an event loop
+_BATCHERS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, RawTransactionBatcher]
+] = weakref.WeakKeyDictionary()
+
+
+def get_transaction_batcher(web3: Web3) -> RawTransactionBatcher:
+    """Get the transaction batcher shared by all coroutines of the running event loop connected to the same
+    rpc endpoint. Must be called from a running event loop.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3 provider object
+
+    Returns
+    -------
+    RawTransactionBatcher
+        The transaction batcher for the running event loop and the chain that web3 is connected to
+    """
+    loop = asyncio.get_running_loop()
+    # Not all providers have an endpoint, in which case we fall back to the web3 object
+    key = str(getattr(web3.provider, "endpoint_uri", id(web3)))
+    loop_batchers = _BATCHERS.setdefault(loop, {})
+    if key not in loop_batchers:
+        loop_batchers[key] = RawTransactionBatcher(web3)
+    return loop_batchers[key]
@@ -1,3 +1,11 @@
 """Custom error reporting and contract error parsing."""
-from .errors import ContractCallException, ContractCallType, decode_error_selector_for_contract
+from .errors import (
+    ContractCallException,
+    ContractCallType,
+    decode_error_data_for_contract,
+    decode_error_selector_for_contract,
+    describe_contract_custom_error,
+    format_contract_custom_error,
+    get_error_abis_by_selector,
+)
 from .types import ABIError, UnknownBlockError
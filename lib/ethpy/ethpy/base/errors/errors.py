@@ -1,9 +1,14 @@
 """Error handling for the hyperdrive ecosystem"""
 from __future__ import annotations
 
+import functools
+import json
 from enum import Enum
-from typing import Any
+from typing import Any, Sequence
 
+from eth_abi import decode
+from eth_abi.exceptions import DecodingError
+from eth_utils.abi import collapse_if_tuple
 from eth_utils.conversions import to_hex
 from eth_utils.crypto import keccak
 from web3.contract.contract import Contract
@@ -47,6 +52,73 @@ class ContractCallException(Exception):
         self.raw_txn = raw_txn
 
 
+def get_error_abis_by_selector(abi: Sequence[dict[str, Any]]) -> dict[str, ABIError]:
+    """Get the errors of a contract abi keyed by their selector.
+    The selectors are computed once per abi, and cached for subsequent calls with an abi with the same contents.
+
+    Arguments
+    ---------
+    abi: Sequence[dict[str, Any]]
+        The contract abi.
+
+    Returns
+    -------
+    dict[str, ABIError]
+        The error abis keyed by their 4 byte selector as a lowercase hex string, i.e. '0xc1ab6dc1'.
+    """
+    return _get_error_abis_by_selector(json.dumps(abi, sort_keys=True, default=str))
+
+
+# Keyed by the contents of the contract abi, so that equal abis share an entry
+@functools.lru_cache(maxsize=32)
+def _get_error_abis_by_selector(abi_json: str) -> dict[str, ABIError]:
+    """Compute the selectors of the errors in a contract abi."""
+    errors_by_selector: dict[str, ABIError] = {}
+    for err in json.loads(abi_json):
+        if err.get("type") != "error":
+            continue
+        error = ABIError(name=err.get("name"), inputs=err.get("inputs") or [], type="error")  # type: ignore
+        # build a list of argument types like 'uint256,bytes,bool'
+        input_types_csv = ",".join(_get_input_types(error))
+        # create an error signature, i.e. CustomError(uint256,bool)
+        error_signature = f"{error.get('name')}({input_types_csv})"
+        errors_by_selector[str(to_hex(primitive=keccak(text=error_signature)))[:10]] = error
+    return errors_by_selector
+
+
+def decode_error_data_for_contract(error_data: str, contract: Contract) -> tuple[str, tuple[Any, ...]]:
+    """Decode the name and arguments of a custom error raised by a contract.
+
+    Arguments
+    ---------
+    error_data: str
+        The revert data as a hex string, i.e. the 4 byte error selector followed by the abi encoded arguments.
+    contract: Contract
+        A web3.py Contract interface, the abi is required for this function to work.
+
+    Returns
+    -------
+    tuple[str, tuple[Any, ...]]
+        The name of the error and the decoded arguments.
+        If the error is not found, returns UnknownError and no arguments.
+        If the arguments fail to decode, returns the name of the error and no arguments.
+    """
+    abi = contract.abi
+    if not abi:
+        raise ValueError("Contract does not have an abi, cannot decode the error selector.")
+    error = get_error_abis_by_selector(abi).get(error_data[:10].lower(), None)
+    if error is None:
+        return "UnknownError", ()
+    input_types = _get_input_types(error)
+    if len(input_types) == 0:
+        return error.get("name"), ()
+    try:
+        error_args = decode(input_types, bytes.fromhex(error_data[10:]))
+    except (ValueError, DecodingError):
+        return error.get("name"), ()
+    return error.get("name"), tuple(error_args)
+
+
 def decode_error_selector_for_contract(error_selector: str, contract: Contract) -> str:
     """Decode the error selector for a contract,
 
@@ -54,7 +126,7 @@ def decode_error_selector_for_contract(error_selector: str, contract: Contract)
     ---------
     error_selector: str
         A 3 byte hex string obtained from a keccak256 has of the error signature, i.e.
-        'InvalidToken()' would yield '0xc1ab6dc1'.
+        'InvalidToken()' would yield '0xc1ab6dc1'. Any revert data following the selector is ignored.
     contract: Contract
         A web3.py Contract interface, the abi is required for this function to work.
 
@@ -66,24 +138,50 @@ def decode_error_selector_for_contract(error_selector: str, contract: Contract)
     abi = contract.abi
     if not abi:
         raise ValueError("Contract does not have an abi, cannot decode the error selector.")
+    error = get_error_abis_by_selector(abi).get(error_selector[:10].lower(), None)
+    if error is None:
+        return "UnknownError"
+    return error.get("name")
 
-    errors = [
-        ABIError(name=err.get("name"), inputs=err.get("inputs"), type="error")  # type: ignore
-        for err in abi
-        if err.get("type") == "error"
-    ]
 
-    error_name = "UnknownError"
+def format_contract_custom_error(error_data: str, contract: Contract) -> str:
+    """Format a custom error raised by a contract with its decoded arguments, i.e. 'CustomError(1, True)'.
+
+    Arguments
+    ---------
+    error_data: str
+        The revert data as a hex string, i.e. the 4 byte error selector followed by the abi encoded arguments.
+    contract: Contract
+        A web3.py Contract interface, the abi is required for this function to work.
+
+    Returns
+    -------
+    str
+        The error name followed by the decoded arguments.
+    """
+    return describe_contract_custom_error(error_data, contract)[1]
+
+
+def describe_contract_custom_error(error_data: str, contract: Contract) -> tuple[str, str]:
+    """Decode a custom error raised by a contract once, and get both its name and its formatted arguments.
+
+    Arguments
+    ---------
+    error_data: str
+        The revert data as a hex string, i.e. the 4 byte error selector followed by the abi encoded arguments.
+    contract: Contract
+        A web3.py Contract interface, the abi is required for this function to work.
+
+    Returns
+    -------
+    tuple[str, str]
+        The name of the error, as in `decode_error_selector_for_contract`,
+        and the error formatted with its arguments, as in `format_contract_custom_error`.
+    """
+    error_name, error_args = decode_error_data_for_contract(error_data, contract)
+    return error_name, f"{error_name}({', '.join(repr(arg) for arg in error_args)})"
 
-    for error in errors:
-        error_inputs = error.get("inputs")
-        # build a list of argument types like 'uint256,bytes,bool'
-        input_types_csv = ",".join([input_type.get("type") or "" for input_type in error_inputs])
-        # create an error signature, i.e. CustomError(uint256,bool)
-        error_signature = f"{error.get('name')}({input_types_csv})"
-        decoded_error_selector = str(to_hex(primitive=keccak(text=error_signature)))[:10]
-        if decoded_error_selector == error_selector:
-            error_name = error.get("name")
-            break
 
-    return error_name
+def _get_input_types(error: ABIError) -> list[str]:
+    """Get the abi types of the error inputs, expanding tuples to their components."""
+    return [collapse_if_tuple(dict(input_type)) if input_type.get("type") else "" for input_type in error.get("inputs")]
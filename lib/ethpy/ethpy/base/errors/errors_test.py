@@ -2,7 +2,13 @@
 from __future__ import annotations
 import pytest
 
-from .errors import decode_error_selector_for_contract
+from .errors import (
+    decode_error_data_for_contract,
+    decode_error_selector_for_contract,
+    describe_contract_custom_error,
+    format_contract_custom_error,
+    get_error_abis_by_selector,
+)
 
 
 class TestDecodeErrorSelector:
@@ -53,3 +59,39 @@ class TestDecodeErrorSelector:
         error_selector = "0xdeadbeef"
         with pytest.raises(ValueError):
             decode_error_selector_for_contract(error_selector, mock_contract)
+
+    def test_decode_error_selector_with_revert_data(self, mock_contract):
+        """Test that revert data following the selector is ignored."""
+        error_selector = "0x659c1f59" + "00" * 31 + "01" + "00" * 31 + "01"
+        result = decode_error_selector_for_contract(error_selector, mock_contract)
+        assert result == "CustomError"
+
+    def test_decode_error_data_for_contract(self, mock_contract):
+        """Test decoding the error arguments."""
+        error_data = "0x659c1f59" + "00" * 31 + "05" + "00" * 31 + "01"
+        assert decode_error_data_for_contract(error_data, mock_contract) == ("CustomError", (5, True))
+        assert decode_error_data_for_contract("0xc1ab6dc1", mock_contract) == ("InvalidToken", ())
+        assert decode_error_data_for_contract("0xdeadbeef", mock_contract) == ("UnknownError", ())
+        # Truncated revert data only decodes the name
+        assert decode_error_data_for_contract("0x659c1f59" + "00" * 4, mock_contract) == ("CustomError", ())
+
+    def test_format_contract_custom_error(self, mock_contract):
+        """Test formatting the error with its arguments."""
+        error_data = "0x659c1f59" + "00" * 31 + "05" + "00" * 31 + "01"
+        assert format_contract_custom_error(error_data, mock_contract) == "CustomError(5, True)"
+        assert format_contract_custom_error("0xc1ab6dc1", mock_contract) == "InvalidToken()"
+
+    def test_error_abis_by_selector_cached(self, mock_contract):
+        """Test that the selectors are computed once per abi contents."""
+        errors_by_selector = get_error_abis_by_selector(mock_contract.abi)
+        assert set(errors_by_selector.keys()) == {"0xc1ab6dc1", "0x659c1f59", "0x77ebef4d"}
+        assert get_error_abis_by_selector(mock_contract.abi) is errors_by_selector
+        # An equal abi in a different object shares the cache entry, and a different abi doesn't
+        assert get_error_abis_by_selector([dict(entry) for entry in mock_contract.abi]) is errors_by_selector
+        assert set(get_error_abis_by_selector(mock_contract.abi[:1]).keys()) == {"0xc1ab6dc1"}
+
+    def test_describe_contract_custom_error(self, mock_contract):
+        """Test that the error name and the formatted error come from one decode."""
+        error_data = "0x659c1f59" + "00" * 31 + "05" + "00" * 31 + "01"
+        assert describe_contract_custom_error(error_data, mock_contract) == ("CustomError", "CustomError(5, True)")
+        assert describe_contract_custom_error("0x12345678", mock_contract) == ("UnknownError", "UnknownError()")
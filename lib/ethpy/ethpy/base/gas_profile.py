@@ -0,0 +1,238 @@
+"""Gas limits for contract functions learned from the gas used in transaction receipts."""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from collections import deque
+
+from web3 import Web3
+from web3.types import TxParams, TxReceipt
+
+from .rpc_interface import get_chain_key
+
+DEFAULT_GAS_PROFILE_WINDOW = 100
+DEFAULT_GAS_PROFILE_PERCENTILE = 95.0
+DEFAULT_GAS_PROFILE_MARGIN = 1.25
+DEFAULT_GAS_PROFILE_MIN_SAMPLES = 5
+
+# Gas profiles are keyed by the contract address and the 4 byte function selector
+GasProfileKey = tuple[str, str]
+
+
+class GasProfile:
+    """Learns the gas limit of contract functions from the gas used by their mined transactions,
+    so that building a transaction doesn't need to estimate gas via an rpc call.
+
+    The gas limit of a function is a rolling percentile of the gas used by the last transactions,
+    multiplied by a safety margin. Transactions fall back to estimating gas until the function has
+    enough samples, and after a transaction ran out of gas with the profiled limit.
+
+    Profiled gas limits are opt-in, i.e. `get_gas_limit` returns None unless the profile is enabled,
+    since transactions sent without estimating gas are mined even if they revert, which costs gas.
+    The error of a reverted transaction is still raised, by replaying the call on the block of its receipt.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_GAS_PROFILE_WINDOW,
+        percentile: float = DEFAULT_GAS_PROFILE_PERCENTILE,
+        margin: float = DEFAULT_GAS_PROFILE_MARGIN,
+        min_samples: int = DEFAULT_GAS_PROFILE_MIN_SAMPLES,
+        enabled: bool = False,
+    ):
+        """Initialize the gas profile.
+
+        Arguments
+        ---------
+        window: int, optional
+            The number of most recent receipts per function to compute the gas limit from. Defaults to 100.
+        percentile: float, optional
+            The percentile of the gas used in the window, between 0 and 100. Defaults to 95.
+        margin: float, optional
+            The multiplier applied to the percentile of the gas used. Defaults to 1.25.
+        min_samples: int, optional
+            The number of receipts needed for a function before using the profiled gas limit. Defaults to 5.
+        enabled: bool, optional
+            Whether transactions use the profiled gas limits. Samples are recorded either way. Defaults to False.
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError(f"{percentile=} must be between 0 and 100")
+        if margin < 1:
+            raise ValueError(f"{margin=} must be at least 1")
+        if min_samples < 1 or min_samples > window:
+            raise ValueError(f"{min_samples=} must be between 1 and {window=}")
+        self.window = window
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._gas_used: dict[GasProfileKey, deque[int]] = {}
+        # The gas limit is cached per function, and invalidated when a new sample is recorded
+        self._gas_limits: dict[GasProfileKey, int | None] = {}
+
+    def get_gas_limit(self, key: GasProfileKey) -> int | None:
+        """Get the profiled gas limit of a contract function.
+
+        Arguments
+        ---------
+        key: GasProfileKey
+            The contract address and the function selector
+
+        Returns
+        -------
+        int | None
+            The gas limit, or None if the gas needs to be estimated.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key not in self._gas_limits:
+                self._gas_limits[key] = self._calc_gas_limit(key)
+            return self._gas_limits[key]
+
+    def record(self, key: GasProfileKey, gas_used: int) -> None:
+        """Record the gas used by a successful transaction.
+
+        Arguments
+        ---------
+        key: GasProfileKey
+            The contract address and the function selector
+        gas_used: int
+            The gas used from the transaction receipt
+        """
+        with self._lock:
+            if key not in self._gas_used:
+                self._gas_used[key] = deque(maxlen=self.window)
+            self._gas_used[key].append(gas_used)
+            self._gas_limits.pop(key, None)
+
+    def mark_out_of_gas(self, key: GasProfileKey) -> None:
+        """Drop the samples of a function after a transaction ran out of gas,
+        so that the next transactions estimate gas until enough new samples are recorded.
+
+        Arguments
+        ---------
+        key: GasProfileKey
+            The contract address and the function selector
+        """
+        with self._lock:
+            self._gas_used.pop(key, None)
+            self._gas_limits.pop(key, None)
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._gas_used.clear()
+            self._gas_limits.clear()
+
+    def _calc_gas_limit(self, key: GasProfileKey) -> int | None:
+        """Computes the gas limit of a function using the nearest rank percentile.
+        Must be called while holding the lock.
+        """
+        gas_used = self._gas_used.get(key, None)
+        if gas_used is None or len(gas_used) < self.min_samples:
+            return None
+        sorted_gas_used = sorted(gas_used)
+        rank = max(math.ceil(self.percentile / 100 * len(sorted_gas_used)), 1)
+        return math.ceil(sorted_gas_used[rank - 1] * self.margin)
+
+
+def get_gas_profile_key(unsent_txn: TxParams) -> GasProfileKey | None:
+    """Get the gas profile key of a contract function call transaction.
+
+    Arguments
+    ---------
+    unsent_txn: TxParams
+        The built transaction
+
+    Returns
+    -------
+    GasProfileKey | None
+        The contract address and the function selector, or None if the transaction doesn't call a contract function.
+    """
+    to_address = unsent_txn.get("to", None)
+    data = unsent_txn.get("data", None)
+    if to_address is None or data is None:
+        return None
+    if isinstance(data, bytes):
+        selector = "0x" + data[:4].hex()
+    else:
+        selector = str(data)[:10]
+    if len(selector) < 10:
+        return None
+    return (Web3.to_checksum_address(str(to_address)), selector.lower())
+
+
+def update_gas_profile(gas_profile: GasProfile, unsent_txn: TxParams, tx_receipt: TxReceipt) -> None:
+    """Update the gas profile from the receipt of a sent transaction.
+
+    Successful transactions add a sample. Failed transactions that used all of their gas ran out of gas,
+    and drop the samples of the function. Other failed transactions reverted, and are ignored.
+
+    Arguments
+    ---------
+    gas_profile: GasProfile
+        The gas profile to update
+    unsent_txn: TxParams
+        The transaction that was sent
+    tx_receipt: TxReceipt
+        The receipt of the transaction
+    """
+    key = get_gas_profile_key(unsent_txn)
+    gas_used = tx_receipt.get("gasUsed", None)
+    if key is None or gas_used is None:
+        return
+    status = tx_receipt.get("status", None)
+    if status == 1:
+        gas_profile.record(key, gas_used)
+    elif status == 0 and gas_used >= unsent_txn.get("gas", 0):
+        logging.warning("Transaction calling %s ran out of gas with a gas limit of %s", key, gas_used)
+        gas_profile.mark_out_of_gas(key)
+
+
+# Gas profiles keyed by the chain id and the rpc endpoint,
+# since gas usage is shared across web3 objects connected to the same chain
+_GAS_PROFILES: dict[tuple[int, str], GasProfile] = {}
+_GAS_PROFILES_LOCK = threading.Lock()
+
+
+def get_gas_profile(web3: Web3) -> GasProfile:
+    """Get the gas profile shared by all web3 objects connected to the same rpc endpoint.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3 provider object
+
+    Returns
+    -------
+    GasProfile
+        The gas profile for the chain that web3 is connected to
+    """
+    key = get_chain_key(web3)
+    with _GAS_PROFILES_LOCK:
+        if key not in _GAS_PROFILES:
+            _GAS_PROFILES[key] = GasProfile()
+        return _GAS_PROFILES[key]
+
+
+def reset_gas_profiles(web3: Web3 | None = None) -> None:
+    """Reset the gas profiles of a chain, e.g., after the chain was launched, reset or reverted,
+    since the contracts at the profiled addresses may have changed.
+
+    Arguments
+    ---------
+    web3: Web3 | None, optional
+        web3 provider object connected to the chain. If None, resets the gas profiles of all chains.
+    """
+    endpoint = None if web3 is None else get_chain_key(web3)[1]
+    with _GAS_PROFILES_LOCK:
+        gas_profiles = [
+            gas_profile
+            for (_, key_endpoint), gas_profile in _GAS_PROFILES.items()
+            if endpoint is None or key_endpoint == endpoint
+        ]
+    for gas_profile in gas_profiles:
+        gas_profile.reset()
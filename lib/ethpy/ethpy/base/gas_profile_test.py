@@ -0,0 +1,80 @@
+"""Test the gas profile of contract functions."""
+import pytest
+from ethpy.base import GasProfile, get_gas_profile, initialize_web3_with_http_provider, reset_gas_profiles
+from ethpy.base.gas_profile import get_gas_profile_key, update_gas_profile
+from ethpy.hyperdrive.interface import HyperdriveReadInterface
+from web3.types import TxParams, TxReceipt
+
+ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+
+def _txn(selector: str, gas: int) -> TxParams:
+    return TxParams({"to": ADDRESS, "data": selector + "00" * 32, "gas": gas})
+
+
+def test_gas_limit_percentile():
+    """The gas limit is the percentile of the window times the margin, after enough samples."""
+    gas_profile = GasProfile(window=4, percentile=50, margin=1.5, min_samples=2, enabled=True)
+    key = get_gas_profile_key(_txn("0xabcdef01", 0))
+    assert key == (ADDRESS, "0xabcdef01")
+    assert gas_profile.get_gas_limit(key) is None
+    gas_profile.record(key, 100)
+    assert gas_profile.get_gas_limit(key) is None
+    gas_profile.record(key, 300)
+    assert gas_profile.get_gas_limit(key) == 150
+    # The window drops the oldest sample
+    for gas_used in [200, 400, 500]:
+        gas_profile.record(key, gas_used)
+    assert gas_profile.get_gas_limit(key) == 450
+
+
+def test_gas_profile_out_of_gas():
+    """Running out of gas drops the samples, while reverts are ignored."""
+    gas_profile = GasProfile(min_samples=1, enabled=True)
+    unsent_txn = _txn("0xabcdef01", 1000)
+    key = get_gas_profile_key(unsent_txn)
+    assert key is not None
+    update_gas_profile(gas_profile, unsent_txn, TxReceipt({"status": 1, "gasUsed": 800}))
+    assert gas_profile.get_gas_limit(key) == 1000
+    update_gas_profile(gas_profile, unsent_txn, TxReceipt({"status": 0, "gasUsed": 500}))
+    assert gas_profile.get_gas_limit(key) == 1000
+    update_gas_profile(gas_profile, unsent_txn, TxReceipt({"status": 0, "gasUsed": 1000}))
+    assert gas_profile.get_gas_limit(key) is None
+
+
+def test_gas_profile_disabled():
+    """Profiles are opt-in, and only give gas limits while enabled."""
+    gas_profile = GasProfile(min_samples=1)
+    key = get_gas_profile_key(_txn("0xabcdef01", 0))
+    assert key is not None
+    gas_profile.record(key, 100)
+    assert gas_profile.get_gas_limit(key) is None
+    gas_profile.enabled = True
+    assert gas_profile.get_gas_limit(key) == 125
+
+
+def test_gas_profile_invalid_args():
+    """Invalid profile parameters raise."""
+    with pytest.raises(ValueError):
+        GasProfile(percentile=101)
+    with pytest.raises(ValueError):
+        GasProfile(margin=0.5)
+    with pytest.raises(ValueError):
+        GasProfile(window=2, min_samples=3)
+
+
+@pytest.mark.anvil
+def test_reset_gas_profiles(hyperdrive_read_interface: HyperdriveReadInterface):
+    """Gas profiles are shared per chain, and resetting the chain drops their samples."""
+    web3 = hyperdrive_read_interface.web3
+    gas_profile = get_gas_profile(web3)
+    assert not gas_profile.enabled
+    gas_profile.enabled = True
+    assert get_gas_profile(initialize_web3_with_http_provider(str(web3.provider.endpoint_uri))) is gas_profile
+    key = ("0x" + "11" * 20, "0x12345678")
+    for _ in range(gas_profile.min_samples):
+        gas_profile.record(key, 100_000)
+    assert gas_profile.get_gas_limit(key) is not None
+    reset_gas_profiles(web3)
+    assert gas_profile.get_gas_limit(key) is None
+    gas_profile.enabled = False
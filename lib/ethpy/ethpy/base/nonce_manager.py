@@ -0,0 +1,264 @@
+"""Local tracking of transaction nonces per account."""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+
+from eth_typing import ChecksumAddress
+from web3 import Web3
+from web3.types import Nonce
+
+from .retry_utils import retry_call
+from .rpc_interface import get_chain_key
+
+DEFAULT_NONCE_RESYNC_INTERVAL = 60.0
+
+
+class NonceManager:
+    """Tracks the next nonce of each account locally, so that transactions don't need to query the chain
+    for the transaction count before every transaction.
+
+    Nonces are reserved before sending a transaction, and released if the transaction was never sent.
+    The manager resyncs with the chain on nonce errors (see `resync`), or when the last sync of an account
+    is older than the resync interval. All functions are thread safe, and can be shared across coroutines.
+    """
+
+    def __init__(self, web3: Web3, resync_interval: float | None = DEFAULT_NONCE_RESYNC_INTERVAL):
+        """Initialize the nonce manager.
+
+        Arguments
+        ---------
+        web3: Web3
+            web3 provider object used to get the transaction count of accounts
+        resync_interval: float | None, optional
+            The number of seconds after which the nonce of an account gets synced with the chain on reservation.
+            If None, will only sync on the first reservation and on `resync`. Defaults to 60 seconds.
+        """
+        self.web3 = web3
+        self.resync_interval = resync_interval
+        self._lock = threading.Lock()
+        self._next_nonce: dict[ChecksumAddress, int] = {}
+        self._last_sync_time: dict[ChecksumAddress, float] = {}
+        # Nonces reserved and not yet released, per account
+        self._reserved: dict[ChecksumAddress, set[int]] = {}
+        # Nonces released below the next nonce, stored as a heap to reuse the lowest nonce first
+        self._released: dict[ChecksumAddress, list[int]] = {}
+
+    def reserve(self, address: str) -> Nonce:
+        """Reserve the next nonce for an account.
+
+        Arguments
+        ---------
+        address: str
+            The address of the account
+
+        Returns
+        -------
+        Nonce
+            The reserved nonce
+        """
+        checksum_address = Web3.to_checksum_address(address)
+        with self._lock:
+            last_sync_time = self._last_sync_time.get(checksum_address, None)
+            if last_sync_time is None:
+                self._sync(checksum_address, force=True)
+            elif self.resync_interval is not None and time.time() - last_sync_time > self.resync_interval:
+                self._sync(checksum_address, force=False)
+            released = self._released.setdefault(checksum_address, [])
+            if len(released) > 0:
+                nonce = heapq.heappop(released)
+            else:
+                nonce = self._next_nonce[checksum_address]
+                self._next_nonce[checksum_address] += 1
+            self._reserved.setdefault(checksum_address, set()).add(nonce)
+            return Nonce(nonce)
+
+    def release(self, address: str, nonce: int) -> bool:
+        """Release a reserved nonce of a transaction that was never sent, to be used by the next reservation.
+
+        Arguments
+        ---------
+        address: str
+            The address of the account
+        nonce: int
+            The reserved nonce
+
+        Returns
+        -------
+        bool
+            True if the nonce was reserved by this manager, False otherwise.
+        """
+        checksum_address = Web3.to_checksum_address(address)
+        with self._lock:
+            reserved = self._reserved.get(checksum_address, set())
+            if nonce not in reserved:
+                return False
+            reserved.remove(nonce)
+            if nonce == self._next_nonce[checksum_address] - 1:
+                self._next_nonce[checksum_address] = nonce
+            else:
+                heapq.heappush(self._released.setdefault(checksum_address, []), nonce)
+            return True
+
+    def confirm(self, address: str, nonce: int) -> None:
+        """Mark a reserved nonce as used after the transaction was sent.
+
+        Arguments
+        ---------
+        address: str
+            The address of the account
+        nonce: int
+            The reserved nonce
+        """
+        checksum_address = Web3.to_checksum_address(address)
+        with self._lock:
+            self._reserved.get(checksum_address, set()).discard(nonce)
+
+    def resync(self, address: str) -> None:
+        """Reset the next nonce of an account to the transaction count on the chain.
+        This should be called after nonce related errors.
+
+        Arguments
+        ---------
+        address: str
+            The address of the account
+        """
+        checksum_address = Web3.to_checksum_address(address)
+        with self._lock:
+            self._sync(checksum_address, force=True)
+
+    def reset(self) -> None:
+        """Drop all local nonces, e.g., after reverting the chain to a snapshot.
+        All accounts get synced with the chain on their next reservation.
+        """
+        with self._lock:
+            self._next_nonce.clear()
+            self._last_sync_time.clear()
+            self._reserved.clear()
+            self._released.clear()
+
+    def _sync(self, checksum_address: ChecksumAddress, force: bool) -> None:
+        """Syncs the next nonce with the chain. Must be called while holding the lock.
+
+        If force is True, the next nonce is set to the chain's transaction count. Otherwise, the next nonce moves
+        forward if transactions were sent from this account without the nonce manager, and moves back if the chain
+        lost transactions that were sent, e.g., after the chain was reset. Nonces that are reserved or released
+        haven't been sent, so the next nonce isn't moved back while there are any.
+        """
+        # We use the pending transaction count to include transactions that haven't been mined yet
+        chain_nonce = retry_call(5, None, self.web3.eth.get_transaction_count, checksum_address, "pending")
+        next_nonce = self._next_nonce.get(checksum_address, 0)
+        has_unsent_nonces = bool(self._reserved.get(checksum_address)) or bool(self._released.get(checksum_address))
+        if force or chain_nonce > next_nonce or (chain_nonce < next_nonce and not has_unsent_nonces):
+            if not force:
+                logging.info("Nonce of %s is out of sync with the chain, resyncing", checksum_address)
+            self._next_nonce[checksum_address] = chain_nonce
+            self._released[checksum_address] = []
+            self._reserved[checksum_address] = set()
+        self._last_sync_time[checksum_address] = time.time()
+
+
+# Error messages of nodes rejecting a transaction because of its nonce
+NONCE_ERROR_MESSAGES = (
+    # geth, anvil, erigon and hardhat
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+    # A different transaction with the same nonce is already pending
+    "replacement transaction underpriced",
+    # nethermind
+    "oldnonce",
+)
+
+
+def is_nonce_error(err: Exception) -> bool:
+    """Checks if an exception from sending a transaction is due to an invalid nonce.
+
+    Arguments
+    ---------
+    err: Exception
+        The exception raised when sending a transaction
+
+    Returns
+    -------
+    bool
+        True if the exception is due to an invalid nonce
+    """
+    message = _get_error_message(err)
+    return any(nonce_error_message in message for nonce_error_message in NONCE_ERROR_MESSAGES)
+
+
+def is_already_known_error(err: Exception) -> bool:
+    """Checks if an exception from sending a transaction is due to the node already having the transaction.
+    This means the exact same signed transaction is pending, so it must not be resent with another nonce.
+
+    Arguments
+    ---------
+    err: Exception
+        The exception raised when sending a transaction
+
+    Returns
+    -------
+    bool
+        True if the node already has the transaction
+    """
+    message = _get_error_message(err)
+    # geth and anvil say "already known", nethermind says "alreadyknown"
+    return "already known" in message or "alreadyknown" in message
+
+
+def _get_error_message(err: Exception) -> str:
+    """Gets the lowercase error message of an exception from sending a transaction."""
+    # Web3 raises rpc errors as a ValueError with the error response as the first argument
+    if len(err.args) > 0 and isinstance(err.args[0], dict):
+        message = str(err.args[0].get("message", ""))
+    else:
+        message = str(err)
+    return message.lower()
+
+
+# Nonce managers keyed by the chain id and the rpc endpoint,
+# since nonces are shared across web3 objects connected to the same chain
+_NONCE_MANAGERS: dict[tuple[int, str], NonceManager] = {}
+_NONCE_MANAGERS_LOCK = threading.Lock()
+
+
+def get_nonce_manager(web3: Web3) -> NonceManager:
+    """Get the nonce manager shared by all web3 objects connected to the same rpc endpoint.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3 provider object
+
+    Returns
+    -------
+    NonceManager
+        The nonce manager for the chain that web3 is connected to
+    """
+    key = get_chain_key(web3)
+    with _NONCE_MANAGERS_LOCK:
+        if key not in _NONCE_MANAGERS:
+            _NONCE_MANAGERS[key] = NonceManager(web3)
+        return _NONCE_MANAGERS[key]
+
+
+def reset_nonce_managers(web3: Web3 | None = None) -> None:
+    """Reset the nonce managers of a chain, e.g., after the chain was launched, reset or reverted.
+
+    Arguments
+    ---------
+    web3: Web3 | None, optional
+        web3 provider object connected to the chain. If None, resets the nonce managers of all chains.
+    """
+    endpoint = None if web3 is None else get_chain_key(web3)[1]
+    with _NONCE_MANAGERS_LOCK:
+        nonce_managers = [
+            nonce_manager
+            for (_, key_endpoint), nonce_manager in _NONCE_MANAGERS.items()
+            if endpoint is None or key_endpoint == endpoint
+        ]
+    for nonce_manager in nonce_managers:
+        nonce_manager.reset()
@@ -0,0 +1,77 @@
+"""Test the local nonce manager."""
+import pytest
+from eth_account.account import Account
+from ethpy.base import NonceManager, is_already_known_error, is_nonce_error
+from ethpy.hyperdrive.interface import HyperdriveReadInterface
+
+
+@pytest.mark.anvil
+def test_nonce_reserve_release(hyperdrive_read_interface: HyperdriveReadInterface):
+    """Reserved nonces are sequential, and released nonces are reused lowest first."""
+    web3 = hyperdrive_read_interface.web3
+    address = Account.create().address
+    nonce_manager = NonceManager(web3, resync_interval=None)
+    nonces = [nonce_manager.reserve(address) for _ in range(4)]
+    assert nonces == [0, 1, 2, 3]
+    # Releasing the last nonce rolls back the next nonce
+    assert nonce_manager.release(address, 3)
+    assert nonce_manager.reserve(address) == 3
+    # Releasing nonces in the middle reuses them before new nonces
+    assert nonce_manager.release(address, 2)
+    assert nonce_manager.release(address, 1)
+    assert nonce_manager.reserve(address) == 1
+    assert nonce_manager.reserve(address) == 2
+    assert nonce_manager.reserve(address) == 4
+    # Nonces that weren't reserved or were already confirmed can't be released
+    nonce_manager.confirm(address, 0)
+    assert not nonce_manager.release(address, 0)
+    assert not nonce_manager.release(address, 10)
+
+
+@pytest.mark.anvil
+def test_nonce_resync(hyperdrive_read_interface: HyperdriveReadInterface):
+    """Resyncing and resetting the manager restores the nonce from the chain."""
+    web3 = hyperdrive_read_interface.web3
+    address = Account.create().address
+    nonce_manager = NonceManager(web3, resync_interval=None)
+    for _ in range(3):
+        nonce_manager.reserve(address)
+    # None of the reserved nonces were sent, so the chain transaction count is still 0
+    nonce_manager.resync(address)
+    assert nonce_manager.reserve(address) == 0
+    nonce_manager.reserve(address)
+    nonce_manager.reset()
+    assert nonce_manager.reserve(address) == 0
+
+
+@pytest.mark.anvil
+def test_nonce_sync_after_chain_reset(hyperdrive_read_interface: HyperdriveReadInterface):
+    """The manager moves the nonce back when the chain lost transactions that were sent."""
+    web3 = hyperdrive_read_interface.web3
+    address = Account.create().address
+    nonce_manager = NonceManager(web3, resync_interval=None)
+    for _ in range(3):
+        nonce_manager.confirm(address, nonce_manager.reserve(address))
+    # The confirmed transactions never made it to the chain, as if the chain was reset after they were sent
+    nonce_manager.resync_interval = 0
+    assert nonce_manager.reserve(address) == 0
+    # Reserved nonces haven't been sent, so they don't move the nonce back
+    assert nonce_manager.reserve(address) == 1
+
+
+def test_is_nonce_error():
+    """Only node errors about the transaction nonce are nonce errors."""
+    assert is_nonce_error(ValueError({"code": -32003, "message": "nonce too low"}))
+    assert is_nonce_error(ValueError("Nonce too high. Expected nonce to be 2 but got 4."))
+    assert is_nonce_error(ValueError({"code": -32000, "message": "replacement transaction underpriced"}))
+    assert not is_nonce_error(ValueError({"code": -32003, "message": "insufficient funds for gas * price + value"}))
+    assert not is_nonce_error(ValueError("execution reverted: NonceManager: invalid signature"))
+    # The node already has this exact transaction, which isn't a nonce collision
+    assert not is_nonce_error(ValueError({"code": -32000, "message": "already known"}))
+
+
+def test_is_already_known_error():
+    """Only node errors about an already pending copy of the transaction are already known errors."""
+    assert is_already_known_error(ValueError({"code": -32000, "message": "already known"}))
+    assert is_already_known_error(ValueError("AlreadyKnown"))
+    assert not is_already_known_error(ValueError({"code": -32003, "message": "nonce too low"}))
@@ -0,0 +1,279 @@
+"""A shared service that waits for the receipts of many in-flight transactions."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Callable
+
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from web3.types import RPCEndpoint, TxReceipt
+
+from .retry_utils import retry_call
+from .rpc_interface import make_batch_request
+
+DEFAULT_RECEIPT_POLL_INTERVAL = 0.1
+DEFAULT_READ_RETRY_COUNT = 5
+
+
+class ReceiptWaiter:
+    """Waits for the receipts of all transactions sent from an event loop with a single polling task.
+
+    Instead of polling for the receipt of each transaction, the polling task watches for new blocks,
+    fetches all receipts of each new block in one call, and resolves every transaction waiting on that block.
+    Nodes without `eth_getBlockReceipts` get the receipts of the pending transactions in one batch request instead.
+    Hence, the polling load scales with the number of blocks instead of the number of transactions.
+    The polling task only runs while there are transactions to wait for.
+    """
+
+    def __init__(self, web3: Web3, poll_interval: float = DEFAULT_RECEIPT_POLL_INTERVAL):
+        """Initialize the receipt waiter.
+
+        Arguments
+        ---------
+        web3: Web3
+            web3 provider object
+        poll_interval: float, optional
+            The number of seconds to wait between polling for new blocks. Defaults to 0.1 seconds.
+        """
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self._pending: dict[HexBytes, list[asyncio.Future[TxReceipt]]] = {}
+        # Hashes registered since the last poll, which could have been mined in an already processed block
+        self._new_hashes: set[HexBytes] = set()
+        self._last_block_number: int | None = None
+        self._poll_task: asyncio.Task | None = None
+        self._block_receipts_supported = True
+
+    async def wait(self, transaction_hash: HexBytes, timeout: float = 30) -> TxReceipt:
+        """Wait for the receipt of a transaction.
+
+        Arguments
+        ---------
+        transaction_hash: HexBytes
+            The hash of the transaction
+        timeout: float, optional
+            The amount of time in seconds to wait for the receipt. Defaults to 30 seconds.
+
+        Returns
+        -------
+        TxReceipt
+            The transaction receipt
+        """
+        transaction_hash = HexBytes(transaction_hash)
+        # We don't keep a reference to the loop, since waiters are stored in a weak dictionary keyed by the loop
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[TxReceipt] = loop.create_future()
+        self._pending.setdefault(transaction_hash, []).append(future)
+        self._new_hashes.add(transaction_hash)
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = loop.create_task(self._poll())
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError as exc:
+            raise TimeExhausted(
+                f"Transaction {HexBytes(transaction_hash) !r} is not in the chain " f"after {timeout} seconds"
+            ) from exc
+        finally:
+            futures = self._pending.get(transaction_hash, [])
+            if future in futures:
+                futures.remove(future)
+            if len(futures) == 0:
+                self._pending.pop(transaction_hash, None)
+
+    async def _poll(self) -> None:
+        """Polls for receipts until no transactions are pending.
+        Errors when polling are raised in every pending wait.
+        """
+        try:
+            while len(self._pending) > 0:
+                self._poll_once()
+                if len(self._pending) > 0:
+                    await asyncio.sleep(self.poll_interval)
+        except Exception as err:  # pylint: disable=broad-except
+            for futures in self._pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(err)
+        finally:
+            # Blocks mined while idle are skipped, since new hashes are looked up directly
+            self._last_block_number = None
+
+    def _poll_once(self) -> None:
+        """Looks up the receipts of newly registered transactions, then processes all blocks since the last poll."""
+        latest_block_number = retry_call(DEFAULT_READ_RETRY_COUNT, None, lambda: self.web3.eth.block_number)
+        new_hashes, self._new_hashes = self._new_hashes, set()
+        for tx_receipt in self._get_transaction_receipts(
+            [transaction_hash for transaction_hash in new_hashes if transaction_hash in self._pending]
+        ):
+            self._resolve(tx_receipt)
+        if self._last_block_number is not None:
+            for block_number in range(self._last_block_number + 1, latest_block_number + 1):
+                if len(self._pending) == 0:
+                    break
+                for tx_receipt in self._get_block_receipts(block_number):
+                    self._resolve(tx_receipt)
+        self._last_block_number = latest_block_number
+
+    def _resolve(self, tx_receipt: TxReceipt) -> None:
+        """Resolves all waits for the transaction of a receipt."""
+        for future in self._pending.pop(HexBytes(tx_receipt["transactionHash"]), []):
+            if not future.done():
+                future.set_result(tx_receipt)
+
+    def _get_block_receipts(self, block_number: int) -> list[TxReceipt]:
+        """Gets the receipts of a block in a single call with `eth_getBlockReceipts`.
+        If the node doesn't support it, falls back to getting the receipts of pending transactions in the block.
+        """
+        if self._block_receipts_supported:
+            response: dict[str, Any] = retry_call(
+                DEFAULT_READ_RETRY_COUNT,
+                None,
+                self.web3.provider.make_request,
+                RPCEndpoint("eth_getBlockReceipts"),
+                [hex(block_number)],
+            )
+            if response.get("result", None) is not None:
+                return [format_receipt(receipt) for receipt in response["result"]]
+            logging.info("eth_getBlockReceipts is not supported, falling back to individual receipts: %s", response)
+            self._block_receipts_supported = False
+        block = retry_call(DEFAULT_READ_RETRY_COUNT, None, self.web3.eth.get_block, block_number)
+        return self._get_transaction_receipts(
+            [
+                HexBytes(transaction_hash)
+                for transaction_hash in block.get("transactions", [])
+                if HexBytes(transaction_hash) in self._pending
+            ]
+        )
+
+    def _get_transaction_receipts(self, transaction_hashes: list[HexBytes]) -> list[TxReceipt]:
+        """Gets the receipts of mined transactions in one batch request, skipping transactions that aren't mined.
+        Falls back to one request per transaction if the provider doesn't support batch requests.
+        """
+        if len(transaction_hashes) == 0:
+            return []
+        responses = make_batch_request(
+            self.web3,
+            [
+                (RPCEndpoint("eth_getTransactionReceipt"), [Web3.to_hex(transaction_hash)])
+                for transaction_hash in transaction_hashes
+            ],
+        )
+        if responses is not None:
+            tx_receipts = []
+            for response in responses:
+                if "error" in response:
+                    # web3 raises rpc errors as a ValueError of the error dict, so we do the same
+                    raise ValueError(response["error"])
+                if response.get("result", None) is not None:
+                    tx_receipts.append(format_receipt(response["result"]))
+            return tx_receipts
+        tx_receipts = []
+        for transaction_hash in transaction_hashes:
+            try:
+                tx_receipts.append(self.web3.eth.get_transaction_receipt(transaction_hash))
+            except TransactionNotFound:
+                continue
+        return tx_receipts
+
+
+def _to_int(value: Any) -> Any:
+    """Converts a hex string quantity to an int."""
+    return int(value, 16) if isinstance(value, str) else value
+
+
+def _format_topics(topics: list[str]) -> list[HexBytes]:
+    """Converts the topics of a log entry to bytes."""
+    return [HexBytes(topic) for topic in topics]
+
+
+def _format_logs(logs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Converts the fields of the log entries of a receipt to python types."""
+    return [_apply_formatters(_LOG_ENTRY_FORMATTERS, log) for log in logs]
+
+
+def _apply_formatters(formatters: dict[str, Callable[[Any], Any]], value: dict[str, Any]) -> dict[str, Any]:
+    """Applies the formatter of each key to the non null values of a dictionary."""
+    return {
+        key: formatters[key](item) if key in formatters and item is not None else item for key, item in value.items()
+    }
+
+
+# The python types of the fields of raw json receipts, matching those returned by `web3.eth.get_transaction_receipt`
+_LOG_ENTRY_FORMATTERS: dict[str, Callable[[Any], Any]] = {
+    "blockHash": HexBytes,
+    "blockNumber": _to_int,
+    "transactionIndex": _to_int,
+    "transactionHash": HexBytes,
+    "logIndex": _to_int,
+    "address": to_checksum_address,
+    "topics": _format_topics,
+    "data": HexBytes,
+}
+_RECEIPT_FORMATTERS: dict[str, Callable[[Any], Any]] = {
+    "blockHash": HexBytes,
+    "blockNumber": _to_int,
+    "transactionIndex": _to_int,
+    "transactionHash": HexBytes,
+    "cumulativeGasUsed": _to_int,
+    "status": _to_int,
+    "gasUsed": _to_int,
+    "contractAddress": to_checksum_address,
+    "logs": _format_logs,
+    "logsBloom": HexBytes,
+    "from": to_checksum_address,
+    "to": to_checksum_address,
+    "effectiveGasPrice": _to_int,
+    "type": _to_int,
+    "blobGasPrice": _to_int,
+    "blobGasUsed": _to_int,
+}
+
+
+def format_receipt(receipt: dict[str, Any]) -> TxReceipt:
+    """Format a raw json transaction receipt, e.g. from a batch request, like `web3.eth.get_transaction_receipt`.
+
+    Arguments
+    ---------
+    receipt: dict[str, Any]
+        The receipt as returned by the node, with hex string quantities.
+
+    Returns
+    -------
+    TxReceipt
+        The receipt with ints, bytes and checksum addresses.
+    """
+    return AttributeDict.recursive(_apply_formatters(_RECEIPT_FORMATTERS, receipt))  # type: ignore
+
+
+# Receipt waiters keyed by the event loop and the rpc endpoint, since futures are bound to an event loop
+_RECEIPT_WAITERS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, ReceiptWaiter]
+] = weakref.WeakKeyDictionary()
+
+
+def get_receipt_waiter(web3: Web3) -> ReceiptWaiter:
+    """Get the receipt waiter shared by all coroutines of the running event loop connected to the same rpc endpoint.
+    Must be called from a running event loop.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3 provider object
+
+    Returns
+    -------
+    ReceiptWaiter
+        The receipt waiter for the running event loop and the chain that web3 is connected to
+    """
+    loop = asyncio.get_running_loop()
+    # Not all providers have an endpoint, in which case we fall back to the web3 object
+    key = str(getattr(web3.provider, "endpoint_uri", id(web3)))
+    loop_waiters = _RECEIPT_WAITERS.setdefault(loop, {})
+    if key not in loop_waiters:
+        loop_waiters[key] = ReceiptWaiter(web3)
+    return loop_waiters[key]
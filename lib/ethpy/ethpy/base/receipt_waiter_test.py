@@ -0,0 +1,77 @@
+"""Test waiting for receipts of concurrent transactions."""
+import asyncio
+
+import pytest
+from eth_account.account import Account
+from ethpy.base import async_eth_transfer, format_receipt, make_batch_request
+from ethpy.hyperdrive import DeployedHyperdrivePool
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.types import RPCEndpoint, TxReceipt
+
+
+@pytest.mark.anvil
+def test_concurrent_receipts(local_hyperdrive_pool: DeployedHyperdrivePool):
+    """Concurrent transfers from the same account all resolve with their own receipt."""
+    web3 = local_hyperdrive_pool.web3
+    deploy_account = local_hyperdrive_pool.deploy_account
+    to_addresses = [Account.create().address for _ in range(10)]
+
+    async def _transfer_all() -> list[TxReceipt]:
+        return await asyncio.gather(
+            *[async_eth_transfer(web3, deploy_account, to_address, 1) for to_address in to_addresses]
+        )
+
+    tx_receipts = asyncio.run(_transfer_all())
+    assert [tx_receipt["to"] for tx_receipt in tx_receipts] == to_addresses
+    assert all(tx_receipt["status"] == 1 for tx_receipt in tx_receipts)
+    assert len({tx_receipt["transactionHash"] for tx_receipt in tx_receipts}) == len(to_addresses)
+
+
+def test_format_receipt():
+    """Raw json receipts are formatted with ints, bytes and checksum addresses."""
+    transaction_hash = "0x" + "cd" * 32
+    raw_receipt = {
+        "blockHash": "0x" + "ab" * 32,
+        "blockNumber": "0x1b",
+        "contractAddress": None,
+        "from": "0x" + "aa" * 20,
+        "gasUsed": "0x5208",
+        "logs": [{"address": "0x" + "bb" * 20, "topics": ["0x" + "01" * 32], "data": "0x1234", "logIndex": "0x0"}],
+        "status": "0x1",
+        "to": "0x" + "cc" * 20,
+        "transactionHash": transaction_hash,
+    }
+    tx_receipt = format_receipt(raw_receipt)
+    assert tx_receipt["blockNumber"] == 27
+    assert tx_receipt["gasUsed"] == 21_000
+    assert tx_receipt["status"] == 1
+    assert tx_receipt["contractAddress"] is None
+    assert tx_receipt["from"] == Web3.to_checksum_address("0x" + "aa" * 20)
+    assert tx_receipt["transactionHash"] == HexBytes(transaction_hash)
+    assert tx_receipt["logs"][0]["topics"] == [HexBytes("0x" + "01" * 32)]
+    assert tx_receipt["logs"][0]["logIndex"] == 0
+
+
+@pytest.mark.anvil
+def test_batch_receipts_match_web3(local_hyperdrive_pool: DeployedHyperdrivePool):
+    """Receipts from a batch request match the receipts from web3."""
+    web3 = local_hyperdrive_pool.web3
+    deploy_account = local_hyperdrive_pool.deploy_account
+
+    async def _transfer_all() -> list[TxReceipt]:
+        return await asyncio.gather(
+            *[async_eth_transfer(web3, deploy_account, Account.create().address, 1) for _ in range(3)]
+        )
+
+    tx_receipts = asyncio.run(_transfer_all())
+    responses = make_batch_request(
+        web3,
+        [
+            (RPCEndpoint("eth_getTransactionReceipt"), [Web3.to_hex(tx_receipt["transactionHash"])])
+            for tx_receipt in tx_receipts
+        ],
+    )
+    assert responses is not None
+    for response, tx_receipt in zip(responses, tx_receipts):
+        assert format_receipt(response["result"]) == web3.eth.get_transaction_receipt(tx_receipt["transactionHash"])
@@ -1,7 +1,15 @@
 """Functions for interfacing with the anvil or ethereum RPC endpoint"""
 from __future__ import annotations
 
-from web3 import Web3
+import itertools
+import json
+import logging
+import threading
+import weakref
+from typing import Any, Sequence
+
+import requests
+from web3 import HTTPProvider, Web3
 from web3.types import RPCEndpoint, RPCResponse
 
 
@@ -51,3 +59,82 @@ def get_account_balance(web3: Web3, account_address: str) -> int | None:
     if hex_result is not None:
         return int(hex_result, base=16)  # cast hex to int
     return None
+
+
+# Chain ids of web3 objects, so that keying per chain state doesn't make an rpc call every time
+_CHAIN_IDS: weakref.WeakKeyDictionary[Web3, int] = weakref.WeakKeyDictionary()
+
+
+def get_chain_key(web3: Web3) -> tuple[int, str]:
+    """Get a key identifying the chain that web3 is connected to, for state shared across web3 objects.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3 provider object
+
+    Returns
+    -------
+    tuple[int, str]
+        The chain id and the rpc endpoint. Providers without an endpoint fall back to the id of the web3 object.
+    """
+    chain_id = _CHAIN_IDS.get(web3, None)
+    if chain_id is None:
+        chain_id = web3.eth.chain_id
+        _CHAIN_IDS[web3] = chain_id
+    return chain_id, str(getattr(web3.provider, "endpoint_uri", id(web3)))
+
+
+_BATCH_REQUEST_IDS = itertools.count()
+# Sessions keyed by the rpc endpoint, so that batch requests reuse connections
+_BATCH_SESSIONS: dict[str, requests.Session] = {}
+_BATCH_SESSIONS_LOCK = threading.Lock()
+
+
+def make_batch_request(web3: Web3, rpc_requests: Sequence[tuple[str, list[Any]]]) -> list[RPCResponse] | None:
+    """Send many JSON-RPC requests in a single batch request to the endpoint of an HTTP provider.
+
+    .. note::
+        web3 doesn't support batch requests, so the batch is posted to the endpoint of the provider
+        with the request arguments of the provider, and the responses skip the web3 middleware and formatters.
+
+    Arguments
+    ---------
+    web3: Web3
+        web3 provider object
+    rpc_requests: Sequence[tuple[str, list[Any]]]
+        The method and the parameters of each request
+
+    Returns
+    -------
+    list[RPCResponse] | None
+        The response to each request, in the order of `rpc_requests`.
+        None if the provider isn't an HTTP provider, or the node doesn't support batch requests,
+        in which case the requests need to be made one by one.
+    """
+    provider = web3.provider
+    if not isinstance(provider, HTTPProvider) or len(rpc_requests) == 0:
+        return None
+    request_ids = [next(_BATCH_REQUEST_IDS) for _ in rpc_requests]
+    batch_request = [
+        {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+        for request_id, (method, params) in zip(request_ids, rpc_requests)
+    ]
+    endpoint_uri = str(provider.endpoint_uri)
+    with _BATCH_SESSIONS_LOCK:
+        session = _BATCH_SESSIONS.setdefault(endpoint_uri, requests.Session())
+    response = session.post(endpoint_uri, data=json.dumps(batch_request), **provider.get_request_kwargs())
+    response.raise_for_status()
+    batch_response = response.json()
+    if not isinstance(batch_response, list):
+        # Nodes that don't support batch requests return a single error response
+        logging.info("Batch requests are not supported by %s: %s", endpoint_uri, batch_response)
+        return None
+    responses_by_id: dict[Any, RPCResponse] = {response.get("id", None): response for response in batch_response}
+    return [
+        responses_by_id.get(
+            request_id,
+            RPCResponse({"error": {"code": -32603, "message": f"No response in batch for request {request_id}"}}),
+        )
+        for request_id in request_ids
+    ]
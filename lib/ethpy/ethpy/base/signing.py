@@ -0,0 +1,82 @@
+"""Executor for signing transactions off the event loop."""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from eth_account import Account
+from eth_account.datastructures import SignedTransaction
+from eth_account.signers.local import LocalAccount
+from web3.types import TxParams
+
+DEFAULT_SIGNING_WORKERS = 4
+
+_SIGNING_EXECUTOR: Executor | None = None
+_SIGNING_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_signing_executor() -> Executor:
+    """Get the executor used to sign transactions, creating a thread pool on first use.
+
+    Returns
+    -------
+    Executor
+        The signing executor
+    """
+    global _SIGNING_EXECUTOR  # pylint: disable=global-statement
+    with _SIGNING_EXECUTOR_LOCK:
+        if _SIGNING_EXECUTOR is None:
+            _SIGNING_EXECUTOR = ThreadPoolExecutor(max_workers=DEFAULT_SIGNING_WORKERS, thread_name_prefix="signing")
+        return _SIGNING_EXECUTOR
+
+
+def set_signing_executor(executor: Executor | None) -> None:
+    """Set the executor used to sign transactions, e.g., a `ProcessPoolExecutor` to sign on multiple cores.
+    The caller owns the executor and is responsible for shutting it down.
+
+    Arguments
+    ---------
+    executor: Executor | None
+        The signing executor. If None, a thread pool is created on the next signature.
+    """
+    global _SIGNING_EXECUTOR  # pylint: disable=global-statement
+    with _SIGNING_EXECUTOR_LOCK:
+        _SIGNING_EXECUTOR = executor
+
+
+def sign_transaction(unsent_txn: TxParams, private_key: bytes) -> SignedTransaction:
+    """Sign a transaction. This is a module level function, so that it can be sent to a process pool.
+
+    Arguments
+    ---------
+    unsent_txn: TxParams
+        The built transaction ready to be signed
+    private_key: bytes
+        The private key of the signer
+
+    Returns
+    -------
+    SignedTransaction
+        The signed transaction
+    """
+    return Account.sign_transaction(unsent_txn, private_key)
+
+
+async def async_sign_transaction(unsent_txn: TxParams, signer: LocalAccount) -> SignedTransaction:
+    """Sign a transaction in the signing executor, so that the event loop is free while signing.
+
+    Arguments
+    ---------
+    unsent_txn: TxParams
+        The built transaction ready to be signed
+    signer: LocalAccount
+        The LocalAccount that signs the transaction
+
+    Returns
+    -------
+    SignedTransaction
+        The signed transaction
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_signing_executor(), sign_transaction, dict(unsent_txn), bytes(signer.key))
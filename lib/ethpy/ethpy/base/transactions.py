@@ -1,6 +1,8 @@
 """Web3 powered functions for interfacing with smart contracts"""
 from __future__ import annotations
 
+import functools
+import json
 import logging
 import random
 from typing import Any, Sequence
@@ -11,12 +13,27 @@ from hexbytes import HexBytes
 from web3 import Web3
 from web3._utils.threads import Timeout
 from web3.contract.contract import Contract, ContractFunction
-from web3.exceptions import ContractCustomError, ContractPanicError, TimeExhausted, TransactionNotFound
+from web3.exceptions import (
+    ContractCustomError,
+    ContractLogicError,
+    ContractPanicError,
+    TimeExhausted,
+    TransactionNotFound,
+)
 from web3.types import ABI, ABIFunctionComponents, ABIFunctionParams, BlockData, Nonce, TxData, TxParams, TxReceipt, Wei
 
-from .errors.errors import ContractCallException, ContractCallType, decode_error_selector_for_contract
+from .batch_submission import get_transaction_batcher
+from .errors.errors import (
+    ContractCallException,
+    ContractCallType,
+    describe_contract_custom_error,
+)
 from .errors.types import UnknownBlockError
+from .gas_profile import get_gas_profile, update_gas_profile
+from .nonce_manager import get_nonce_manager, is_already_known_error, is_nonce_error
+from .receipt_waiter import get_receipt_waiter
 from .retry_utils import retry_call
+from .signing import async_sign_transaction
 
 DEFAULT_READ_RETRY_COUNT = 5
 DEFAULT_WRITE_RETRY_COUNT = 1
@@ -105,24 +122,7 @@ def smart_contract_read(
     if not isinstance(return_values, Sequence) or isinstance(return_values, str):
         return_values = [return_values]
 
-    if contract.abi:  # not all contracts have an associated ABI
-        # NOTE: this will break if a function signature is passed.  need to update this helper
-        return_names_and_types = _contract_function_abi_outputs(contract.abi, function_name_or_signature)
-        if return_names_and_types is not None:
-            if len(return_names_and_types) != len(return_values):
-                raise AssertionError(
-                    f"{len(return_names_and_types)=} must equal {len(return_values)=}."
-                    f"\n{return_names_and_types=}\n{return_values=}"
-                )
-            function_return_dict = {}
-            for var_name_and_type, var_value in zip(return_names_and_types, return_values):
-                var_name = var_name_and_type[0]
-                if var_name:
-                    function_return_dict[var_name] = var_value
-                else:
-                    function_return_dict["value"] = var_value
-            return function_return_dict
-    return {f"value{idx}": value for idx, value in enumerate(return_values)}
+    return _build_return_dict(function, function_name_or_signature, return_values)
 
 
 # TODO cleanup
@@ -180,19 +180,6 @@ def smart_contract_preview_transaction(
     # that may contain additional call arguments such as max_gas, nonce, etc.
     transaction_kwargs = {"from": signer_address}
 
-    raw_txn = {}
-    # We build the raw transaction here in case of error, where we want to attach the raw txn to the crash report.
-    # Note that we don't call `build_transaction`
-    # since it adds the nonce to the transaction, and we ignore nonce in preview
-    # This is a best attempt at building a transaction for the preview call, because
-    # this function doesn't accept a block_number as an argument,
-    # so there's a race condition if a new trade comes in and this preview call is no longer valid
-    # Hence, we wrap this in a try/catch, and ignore if it fails
-    try:
-        raw_txn = function.build_transaction({"from": signer_address})
-    except Exception:  # pylint: disable=broad-except
-        pass
-
     try:
         return_values = retry_call(
             read_retry_count,
@@ -205,7 +192,9 @@ def smart_contract_preview_transaction(
     # If block number is set in the preview call, will add to crash report,
     # otherwise will do best attempt at getting the block it crashed at.
     except ContractCustomError as err:
-        err.args += (f"ContractCustomError {decode_error_selector_for_contract(err.args[0], contract)} raised.",)
+        # Crash reporting matches on the error name, so the decoded arguments are added as a separate arg
+        error_name, formatted_error = describe_contract_custom_error(err.args[0], contract)
+        err.args += (f"ContractCustomError {error_name} raised.", formatted_error)
         raise ContractCallException(
             "Error in preview transaction",
             orig_exception=err,
@@ -213,7 +202,7 @@ def smart_contract_preview_transaction(
             function_name_or_signature=function_name_or_signature,
             fn_args=fn_args,
             fn_kwargs=fn_kwargs,
-            raw_txn=dict(raw_txn),
+            raw_txn=_build_preview_raw_txn(function, signer_address),
             block_number=block_number,
         ) from err
     except Exception as err:
@@ -224,30 +213,13 @@ def smart_contract_preview_transaction(
             function_name_or_signature=function_name_or_signature,
             fn_args=fn_args,
             fn_kwargs=fn_kwargs,
-            raw_txn=dict(raw_txn),
+            raw_txn=_build_preview_raw_txn(function, signer_address),
             block_number=block_number,
         ) from err
 
     if not isinstance(return_values, Sequence):  # could be list or tuple
         return_values = [return_values]
-    if contract.abi:  # not all contracts have an associated ABI
-        # NOTE: this will break if a function signature is passed.  need to update this helper
-        return_names_and_types = _contract_function_abi_outputs(contract.abi, function_name_or_signature)
-        if return_names_and_types is not None:
-            if len(return_names_and_types) != len(return_values):
-                raise AssertionError(
-                    f"{len(return_names_and_types)=} must equal {len(return_values)=}."
-                    f"\n{return_names_and_types=}\n{return_values=}"
-                )
-            function_return_dict = {}
-            for var_name_and_type, var_value in zip(return_names_and_types, return_values):
-                var_name = var_name_and_type[0]
-                if var_name:
-                    function_return_dict[var_name] = var_value
-                else:
-                    function_return_dict["value"] = var_value
-            return function_return_dict
-    return {f"value{idx}": value for idx, value in enumerate(return_values)}
+    return _build_return_dict(function, function_name_or_signature, return_values)
 
 
 def wait_for_transaction_receipt(
@@ -372,7 +344,7 @@ def build_transaction(
     web3: Web3
         web3 container object
     nonce: Nonce | None
-        The nonce to use for this transaction. Defaults to setting it to the result of `get_transaction_count`.
+        The nonce to use for this transaction. Defaults to reserving the next nonce from the nonce manager.
     read_retry_count: BlockNumber | None
         The number of times to retry the read call if it fails. Defaults to 5.
 
@@ -380,18 +352,15 @@ def build_transaction(
     -------
     TxParams
         The unsent raw transaction.
+
+    .. note::
+        If the gas profile is enabled and has enough receipts for the function, the gas limit is set from
+        the profile instead of estimating gas. See `GasProfile` for details.
     """
     if read_retry_count is None:
         read_retry_count = DEFAULT_READ_RETRY_COUNT
     signer_checksum_address = Web3.to_checksum_address(signer.address)
-    # TODO figure out which exception here to retry on
-    base_nonce = retry_call(read_retry_count, None, web3.eth.get_transaction_count, signer_checksum_address)
-    if nonce is None:
-        nonce = base_nonce
-    # We explicitly check to ensure explicit nonce is larger than what web3 is reporting
-    if base_nonce > nonce:
-        logging.warning("Specified nonce %s is larger than current trx count %s", nonce, base_nonce)
-        nonce = base_nonce
+    nonce = _get_transaction_nonce(web3, signer_checksum_address, nonce, read_retry_count)
 
     # This is the additional transaction argument passed into function.call
     # that may contain additional call arguments such as max_gas, nonce, etc.
@@ -401,11 +370,102 @@ def build_transaction(
             "nonce": nonce,
         }
     )
+    # Setting the gas limit from the gas profile skips estimating gas when building the transaction
+    gas_limit = get_gas_profile(web3).get_gas_limit((func_handle.address, func_handle.selector.lower()))
+    if gas_limit is not None:
+        transaction_kwargs["gas"] = gas_limit
     # Building transactions can also fail, so we add retry here
-    unsent_txn = retry_call(read_retry_count, _retry_preview_check, func_handle.build_transaction, transaction_kwargs)
+    try:
+        unsent_txn = retry_call(
+            read_retry_count, _retry_preview_check, func_handle.build_transaction, transaction_kwargs
+        )
+    except Exception as err:
+        # The transaction was never sent, so the nonce can be used by the next transaction
+        get_nonce_manager(web3).release(signer_checksum_address, nonce)
+        raise err
     return unsent_txn
 
 
+def _get_transaction_nonce(
+    web3: Web3, signer_checksum_address: ChecksumAddress, nonce: Nonce | None, read_retry_count: int
+) -> Nonce:
+    """Reserves the next nonce from the nonce manager, or checks an explicitly set nonce against the chain."""
+    if nonce is None:
+        return get_nonce_manager(web3).reserve(signer_checksum_address)
+    # TODO figure out which exception here to retry on
+    base_nonce = retry_call(read_retry_count, None, web3.eth.get_transaction_count, signer_checksum_address)
+    # We explicitly check to ensure explicit nonce is larger than what web3 is reporting
+    if base_nonce > nonce:
+        logging.warning("Specified nonce %s is larger than current trx count %s", nonce, base_nonce)
+        nonce = base_nonce
+    return nonce
+
+
+def _sign_and_send_transaction(unsent_txn: TxParams, signer: LocalAccount, web3: Web3) -> HexBytes:
+    """Signs and sends a transaction.
+    If the nonce of the transaction was reserved from the nonce manager and sending fails, the nonce gets released.
+    On nonce errors, the nonce manager is synced with the chain and we retry once with a new nonce.
+    If the node already has the transaction, e.g. from a retried request, we return its hash without resending.
+    """
+    signer_checksum_address = Web3.to_checksum_address(signer.address)
+    for attempt in range(2):
+        nonce = unsent_txn["nonce"]
+        signed_txn = None
+        try:
+            signed_txn = signer.sign_transaction(unsent_txn)
+            tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as err:  # pylint: disable=broad-except
+            if signed_txn is None or not is_already_known_error(err):
+                _handle_send_error(err, attempt, unsent_txn, signer_checksum_address, web3)
+                continue
+            # The node already has this exact transaction, so we wait on it instead of resending with a new nonce
+            tx_hash = HexBytes(signed_txn.hash)
+        get_nonce_manager(web3).confirm(signer_checksum_address, nonce)
+        return tx_hash
+    # Unreachable, the loop either returns or raises
+    raise AssertionError("Unreachable")
+
+
+async def _async_sign_and_send_transaction(unsent_txn: TxParams, signer: LocalAccount, web3: Web3) -> HexBytes:
+    """Async version of `_sign_and_send_transaction`.
+    Signing is CPU bound, so we sign in the signing executor to keep the event loop free for other transactions.
+    """
+    signer_checksum_address = Web3.to_checksum_address(signer.address)
+    for attempt in range(2):
+        nonce = unsent_txn["nonce"]
+        signed_txn = None
+        try:
+            signed_txn = await async_sign_transaction(unsent_txn, signer)
+            # Transactions sent by concurrent coroutines are sent together in one batch request
+            tx_hash = await get_transaction_batcher(web3).submit(signed_txn.rawTransaction, nonce)
+        except Exception as err:  # pylint: disable=broad-except
+            if signed_txn is None or not is_already_known_error(err):
+                _handle_send_error(err, attempt, unsent_txn, signer_checksum_address, web3)
+                continue
+            # The node already has this exact transaction, so we wait on it instead of resending with a new nonce
+            tx_hash = HexBytes(signed_txn.hash)
+        get_nonce_manager(web3).confirm(signer_checksum_address, nonce)
+        return tx_hash
+    # Unreachable, the loop either returns or raises
+    raise AssertionError("Unreachable")
+
+
+def _handle_send_error(
+    err: Exception, attempt: int, unsent_txn: TxParams, signer_checksum_address: ChecksumAddress, web3: Web3
+) -> None:
+    """Releases the nonce of a transaction that failed to send.
+    Reserves a new nonce in the transaction to retry on the first nonce error, otherwise raises the error.
+    """
+    nonce_manager = get_nonce_manager(web3)
+    nonce = unsent_txn["nonce"]
+    is_reserved_nonce = nonce_manager.release(signer_checksum_address, nonce)
+    if attempt > 0 or not is_reserved_nonce or not is_nonce_error(err):
+        raise err
+    logging.warning("Nonce %s for %s is invalid, resyncing nonce: %s", nonce, signer_checksum_address, err)
+    nonce_manager.resync(signer_checksum_address)
+    unsent_txn["nonce"] = nonce_manager.reserve(signer_checksum_address)
+
+
 async def _async_send_transaction_and_wait_for_receipt(
     unsent_txn: TxParams, signer: LocalAccount, web3: Web3
 ) -> TxReceipt:
@@ -425,10 +485,22 @@ async def _async_send_transaction_and_wait_for_receipt(
     TxReceipt
         a TypedDict; success can be checked via tx_receipt["status"]
     """
-    signed_txn = signer.sign_transaction(unsent_txn)
-    tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    tx_receipt = await async_wait_for_transaction_receipt(web3, tx_hash)
+    tx_hash = await _async_sign_and_send_transaction(unsent_txn, signer, web3)
+    # The receipt waiter polls for receipts of all in-flight transactions together
+    tx_receipt = await get_receipt_waiter(web3).wait(tx_hash)
+    update_gas_profile(get_gas_profile(web3), unsent_txn, tx_receipt)
+
+    _check_receipt_status(unsent_txn, tx_receipt, web3)
+    return tx_receipt
+
 
+def _check_receipt_status(unsent_txn: TxParams, tx_receipt: TxReceipt, web3: Web3) -> None:
+    """Raises an error if the receipt of a sent transaction doesn't have a successful status.
+
+    Transactions with a profiled gas limit are sent without estimating gas, so reverts aren't raised when
+    building the transaction. Hence, we replay reverted transactions on the block of the receipt,
+    to raise the same decoded contract error as estimating gas.
+    """
     # Error checking when transaction doesn't throw an error, but instead
     # has errors in the tx_receipt
     # The block number of this call failing is the previous block
@@ -439,8 +511,25 @@ async def _async_send_transaction_and_wait_for_receipt(
     if status is None:
         raise UnknownBlockError("Receipt did not return status", f"{block_number=}")
     if status == 0:
+        # Transactions that used all of their gas ran out of gas instead of reverting
+        if tx_receipt.get("gasUsed", 0) < unsent_txn.get("gas", 0):
+            _replay_reverted_transaction(unsent_txn, tx_receipt, web3)
         raise UnknownBlockError("Receipt has status of 0", f"{block_number=}", f"{tx_receipt=}")
-    return tx_receipt
+
+
+def _replay_reverted_transaction(unsent_txn: TxParams, tx_receipt: TxReceipt, web3: Web3) -> None:
+    """Replays a reverted transaction as a call on the block of its receipt, raising the contract error.
+    Returns without raising if the call doesn't revert, e.g. if the state that caused the revert changed.
+    """
+    call_params = TxParams(
+        {key: unsent_txn[key] for key in ("from", "to", "data", "value", "gas") if key in unsent_txn}  # type: ignore
+    )
+    try:
+        web3.eth.call(call_params, block_identifier=tx_receipt["blockNumber"])
+    except ContractLogicError:
+        raise
+    except Exception as err:  # pylint: disable=broad-except
+        logging.warning("Failed to replay the reverted transaction %s: %s", tx_receipt.get("transactionHash"), err)
 
 
 # TODO cleanup args
@@ -472,7 +561,7 @@ async def async_smart_contract_transact(
     *fn_args: Unknown
         The positional arguments passed to the contract method.
     nonce: Nonce | None
-        If set, will explicitly set the nonce to this value, otherwise will use web3 to get transaction count
+        If set, will explicitly set the nonce to this value, otherwise will reserve a nonce from the nonce manager
     read_retry_count: BlockNumber | None
         The number of times to retry the read call if it fails. Defaults to 5.
     write_retry_count: BlockNumber | None
@@ -509,7 +598,9 @@ async def async_smart_contract_transact(
     # the rest will default to setting the block number to None, which then crash reporting
     # will attempt a best effort guess as to the block the chain was on before it crashed.
     except ContractCustomError as err:
-        err.args += (f"ContractCustomError {decode_error_selector_for_contract(err.args[0], contract)} raised.",)
+        # Crash reporting matches on the error name, so the decoded arguments are added as a separate arg
+        error_name, formatted_error = describe_contract_custom_error(err.args[0], contract)
+        err.args += (f"ContractCustomError {error_name} raised.", formatted_error)
         # Race condition here, other transactions may have happened when we get the block number here
         # Hence, this is a best effort guess as to which block the chain was on when this exception was thrown.
         block_number = int(web3.eth.block_number)
@@ -570,21 +661,11 @@ def send_transaction_and_wait_for_receipt(unsent_txn: TxParams, signer: LocalAcc
     TxReceipt
         a TypedDict; success can be checked via tx_receipt["status"]
     """
-    signed_txn = signer.sign_transaction(unsent_txn)
-    tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    tx_hash = _sign_and_send_transaction(unsent_txn, signer, web3)
     tx_receipt = wait_for_transaction_receipt(web3, tx_hash)
+    update_gas_profile(get_gas_profile(web3), unsent_txn, tx_receipt)
 
-    # Error checking when transaction doesn't throw an error, but instead
-    # has errors in the tx_receipt
-    # The block number of this call failing is the previous block
-    block_number = tx_receipt.get("blockNumber") - 1
-    # Check status here
-    status = tx_receipt.get("status", None)
-    # Set block number as the second argument
-    if status is None:
-        raise UnknownBlockError("Receipt did not return status", f"{block_number=}")
-    if status == 0:
-        raise UnknownBlockError("Receipt has status of 0", f"{block_number=}", f"{tx_receipt=}")
+    _check_receipt_status(unsent_txn, tx_receipt, web3)
     return tx_receipt
 
 
@@ -614,7 +695,7 @@ def smart_contract_transact(
     *fn_args: Unknown
         The positional arguments passed to the contract method.
     nonce: Nonce | None
-        If set, will explicitly set the nonce to this value, otherwise will use web3 to get transaction count
+        If set, will explicitly set the nonce to this value, otherwise will reserve a nonce from the nonce manager
     read_retry_count: BlockNumber | None
         The number of times to retry the read call if it fails. Defaults to 5.
     write_retry_count: BlockNumber | None
@@ -651,7 +732,9 @@ def smart_contract_transact(
     # the rest will default to setting the block number to None, which then crash reporting
     # will attempt a best effort guess as to the block the chain was on before it crashed.
     except ContractCustomError as err:
-        err.args += (f"ContractCustomError {decode_error_selector_for_contract(err.args[0], contract)} raised.",)
+        # Crash reporting matches on the error name, so the decoded arguments are added as a separate arg
+        error_name, formatted_error = describe_contract_custom_error(err.args[0], contract)
+        err.args += (f"ContractCustomError {error_name} raised.", formatted_error)
         raise ContractCallException(
             "Error in smart_contract_transact",
             orig_exception=err,
@@ -713,7 +796,7 @@ async def async_eth_transfer(
     max_priority_fee: int
         Amount of tip to provide to the miner when a block is mined
     nonce: Nonce | None
-        If set, will explicitly set the nonce to this value, otherwise will use web3 to get transaction count
+        If set, will explicitly set the nonce to this value, otherwise will reserve a nonce from the nonce manager
     read_retry_count: BlockNumber | None
         The number of times to retry the read call if it fails. Defaults to 5.
 
@@ -725,34 +808,15 @@ async def async_eth_transfer(
     if read_retry_count is None:
         read_retry_count = DEFAULT_READ_RETRY_COUNT
     signer_checksum_address = Web3.to_checksum_address(signer.address)
-    base_nonce = retry_call(read_retry_count, None, web3.eth.get_transaction_count, signer_checksum_address)
-    if nonce is None:
-        nonce = base_nonce
-    # We explicitly check to ensure explicit nonce is larger than what web3 is reporting
-    if base_nonce > nonce:
-        logging.warning("Specified nonce %s is larger than current trx count %s", nonce, base_nonce)
-        nonce = base_nonce
-
-    unsent_txn: TxParams = {
-        "from": signer_checksum_address,
-        "to": to_address,
-        "value": Wei(amount_wei),
-        "nonce": nonce,
-        "chainId": web3.eth.chain_id,
-    }
-    if max_priority_fee is None:
-        max_priority_fee = web3.eth.max_priority_fee
-    pending_block = web3.eth.get_block("pending")
-    base_fee = pending_block.get("baseFeePerGas", None)
-    if base_fee is None:
-        raise AssertionError("The latest block does not have a baseFeePerGas")
-    max_fee_per_gas = max_priority_fee + base_fee
-    unsent_txn["gas"] = web3.eth.estimate_gas(unsent_txn)
-    unsent_txn["maxFeePerGas"] = Wei(max_fee_per_gas)
-    unsent_txn["maxPriorityFeePerGas"] = Wei(max_priority_fee)
-    signed_txn = signer.sign_transaction(unsent_txn)
-    tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    return await async_wait_for_transaction_receipt(web3, tx_hash)
+    nonce = _get_transaction_nonce(web3, signer_checksum_address, nonce, read_retry_count)
+    try:
+        unsent_txn = _build_eth_transfer(web3, signer_checksum_address, to_address, amount_wei, max_priority_fee, nonce)
+    except Exception as err:
+        # The transaction was never sent, so the nonce can be used by the next transaction
+        get_nonce_manager(web3).release(signer_checksum_address, nonce)
+        raise err
+    tx_hash = await _async_sign_and_send_transaction(unsent_txn, signer, web3)
+    return await get_receipt_waiter(web3).wait(tx_hash)
 
 
 # TODO clean up args
@@ -781,7 +845,7 @@ def eth_transfer(
     max_priority_fee: int
         Amount of tip to provide to the miner when a block is mined
     nonce: Nonce | None
-        If set, will explicitly set the nonce to this value, otherwise will use web3 to get transaction count
+        If set, will explicitly set the nonce to this value, otherwise will reserve a nonce from the nonce manager
     read_retry_count: BlockNumber | None
         The number of times to retry the read call if it fails. Defaults to 5.
 
@@ -793,9 +857,26 @@ def eth_transfer(
     if read_retry_count is None:
         read_retry_count = DEFAULT_READ_RETRY_COUNT
     signer_checksum_address = Web3.to_checksum_address(signer.address)
-    if nonce is None:
-        # TODO figure out which exception here to retry on
-        nonce = retry_call(read_retry_count, None, web3.eth.get_transaction_count, signer_checksum_address)
+    nonce = _get_transaction_nonce(web3, signer_checksum_address, nonce, read_retry_count)
+    try:
+        unsent_txn = _build_eth_transfer(web3, signer_checksum_address, to_address, amount_wei, max_priority_fee, nonce)
+    except Exception as err:
+        # The transaction was never sent, so the nonce can be used by the next transaction
+        get_nonce_manager(web3).release(signer_checksum_address, nonce)
+        raise err
+    tx_hash = _sign_and_send_transaction(unsent_txn, signer, web3)
+    return web3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def _build_eth_transfer(
+    web3: Web3,
+    signer_checksum_address: ChecksumAddress,
+    to_address: ChecksumAddress,
+    amount_wei: int,
+    max_priority_fee: int | None,
+    nonce: Nonce,
+) -> TxParams:
+    """Builds an unsent eth transfer transaction."""
     unsent_txn: TxParams = {
         "from": signer_checksum_address,
         "to": to_address,
@@ -813,10 +894,7 @@ def eth_transfer(
     unsent_txn["gas"] = web3.eth.estimate_gas(unsent_txn)
     unsent_txn["maxFeePerGas"] = Wei(max_fee_per_gas)
     unsent_txn["maxPriorityFeePerGas"] = Wei(max_priority_fee)
-    signed_txn = signer.sign_transaction(unsent_txn)
-
-    tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    return web3.eth.wait_for_transaction_receipt(tx_hash)
+    return unsent_txn
 
 
 def fetch_contract_transactions_for_block(
@@ -873,6 +951,51 @@ def _get_name_and_type_from_abi(abi_outputs: ABIFunctionComponents | ABIFunction
     return (return_value_name, return_value_type)
 
 
+def _build_preview_raw_txn(function: ContractFunction, signer_address: ChecksumAddress) -> dict[str, Any]:
+    """Builds the raw transaction of a failed preview call to attach to the crash report.
+    We only build this on failure, since building the transaction estimates gas, which is an extra rpc call.
+    This is a best attempt at building a transaction for the preview call, because `build_transaction`
+    doesn't accept a block_number as an argument, so the chain may have changed since the preview call.
+    Hence, we ignore if it fails.
+    """
+    try:
+        return dict(function.build_transaction({"from": signer_address}))
+    except Exception:  # pylint: disable=broad-except
+        return {}
+
+
+# Output names and types of contract functions, keyed by the contents of the function abi and the function name.
+# Keying by the contents ensures a different contract deployed at the same address, e.g., on a reset chain,
+# doesn't reuse the outputs of the previous one.
+@functools.lru_cache(maxsize=1024)
+def _get_function_outputs(function_abi_json: str, function_name: str) -> list[tuple[str, str]] | None:
+    """Get the output names and types of a contract function, which are cached afterwards."""
+    # NOTE: this will break if a function signature is passed.  need to update this helper
+    return _contract_function_abi_outputs([json.loads(function_abi_json)], function_name)
+
+
+def _build_return_dict(function: ContractFunction, function_name: str, return_values: Sequence) -> dict[str, Any]:
+    """Names the return values of a contract call using the outputs in the abi of the called function.
+    The outputs are looked up once per function abi, and cached afterwards.
+    """
+    if not function.abi:  # not all contracts have an associated ABI
+        return {f"value{idx}": value for idx, value in enumerate(return_values)}
+
+    return_names_and_types = _get_function_outputs(json.dumps(function.abi, sort_keys=True), function_name)
+
+    if return_names_and_types is None:
+        return {f"value{idx}": value for idx, value in enumerate(return_values)}
+    if len(return_names_and_types) != len(return_values):
+        raise AssertionError(
+            f"{len(return_names_and_types)=} must equal {len(return_values)=}."
+            f"\n{return_names_and_types=}\n{return_values=}"
+        )
+    return {
+        (var_name if var_name else "value"): var_value
+        for (var_name, _), var_value in zip(return_names_and_types, return_values)
+    }
+
+
 # TODO: add ability to parse function_signature as well
 def _contract_function_abi_outputs(contract_abi: ABI, function_name: str) -> list[tuple[str, str]] | None:
     # TODO clean this function up
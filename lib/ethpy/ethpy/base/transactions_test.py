@@ -0,0 +1,45 @@
+"""Tests for transactions.py."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import cast
+
+from web3.contract.contract import ContractFunction
+
+from .transactions import _build_return_dict, _get_function_outputs
+
+# pylint: disable=protected-access
+
+
+def _make_function(output_name: str) -> ContractFunction:
+    """Build a view function that returns a named uint."""
+    function_abi = {
+        "type": "function",
+        "name": "getValue",
+        "inputs": [],
+        "outputs": [{"name": output_name, "type": "uint256", "internalType": "uint256"}],
+        "stateMutability": "view",
+    }
+    return cast(ContractFunction, SimpleNamespace(abi=function_abi))
+
+
+def test_build_return_dict_cache():
+    """Return values are named with the outputs of the abi of the function, even if another abi was
+    cached for a function with the same name."""
+    function = _make_function("first")
+    assert _build_return_dict(function, "getValue", [1]) == {"first": 1}
+    # The same function uses the cached outputs
+    cache_hits = _get_function_outputs.cache_info().hits
+    assert _build_return_dict(function, "getValue", [2]) == {"first": 2}
+    assert _get_function_outputs.cache_info().hits == cache_hits + 1
+    # A contract redeployed at the same address with a different abi
+    assert _build_return_dict(_make_function("second"), "getValue", [3]) == {"second": 3}
+    # An equal abi in a different object shares the cache entry
+    cache_hits = _get_function_outputs.cache_info().hits
+    assert _build_return_dict(_make_function("first"), "getValue", [4]) == {"first": 4}
+    assert _get_function_outputs.cache_info().hits == cache_hits + 1
+    # Functions without an abi name the values by position
+    assert _build_return_dict(cast(ContractFunction, SimpleNamespace(abi=None)), "getValue", [5, 6]) == {
+        "value0": 5,
+        "value1": 6,
+    }
@@ -6,6 +6,9 @@ from web3 import Web3
 from web3.middleware import geth_poa
 from web3.types import RPCEndpoint
 
+from .gas_profile import reset_gas_profiles
+from .nonce_manager import reset_nonce_managers
+
 
 def initialize_web3_with_http_provider(
     ethereum_node: URI | str, request_kwargs: dict | None = None, reset_provider: bool = False
@@ -41,4 +44,7 @@ def initialize_web3_with_http_provider(
     if reset_provider:
         # TODO: Check that the user is running on anvil, raise error if not
         _ = web3.provider.make_request(method=RPCEndpoint("anvil_reset"), params=[])
+        # Nonces and gas usage learned from the previous chain state are no longer valid
+        reset_nonce_managers(web3)
+        reset_gas_profiles(web3)
     return web3
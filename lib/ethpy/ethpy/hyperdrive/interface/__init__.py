@@ -1,3 +1,9 @@
 """High-level interface for the Hyperdrive market."""
 from .read_interface import HyperdriveReadInterface
 from .read_write_interface import HyperdriveReadWriteInterface
+from .simulated_interface import (
+    SimulatedHyperdriveReadWriteInterface,
+    SimulatedPosition,
+    SimulatedWalletDelta,
+    UnsupportedSimulatedFeatureError,
+)
@@ -0,0 +1,82 @@
+"""Per-block memoization of pure calc functions."""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    from ethpy.hyperdrive.state import PoolState
+
+T = TypeVar("T")
+
+
+class BlockCalcCache:
+    """Memoizes the results of pure calc functions for a single block.
+
+    Results are keyed by the function and its arguments, and all results are dropped when a result
+    for a newer block, or for a different block with the same number (e.g. after reverting a snapshot),
+    is requested. The cache can be shared across interfaces connected to the same pool,
+    so that agents running the same policy don't repeat the same computation within a block.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self.block_number: int | None = None
+        self._block_hash: Any = None
+        self._results: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def get_or_calc(self, pool_state: PoolState, calc_function: Callable[..., T], *args: Any) -> T:
+        """Get the cached result of a calc function for the block of a pool state, or compute and cache it.
+
+        Arguments
+        ---------
+        pool_state: PoolState
+            The pool state of the block the result is computed on.
+            This must be the state of the pool at that block, and not a hypothetical state.
+        calc_function: Callable[..., T]
+            The pure calc function, which takes the pool state as the first argument.
+        *args: Any
+            The remaining arguments passed to the calc function.
+
+        Returns
+        -------
+        T
+            The result of the calc function.
+        """
+        block_number = pool_state.block_number
+        block_hash = pool_state.block.get("hash", None)
+        key = (calc_function.__name__, *(_to_key(arg) for arg in args))
+        with self._lock:
+            if block_number != self.block_number or block_hash != self._block_hash:
+                if self.block_number is not None and block_number < self.block_number:
+                    # Results for older blocks aren't cached, since we don't want to drop the current block
+                    return calc_function(pool_state, *args)
+                self.block_number = block_number
+                self._block_hash = block_hash
+                self._results = {}
+            if key in self._results:
+                return self._results[key]
+        # We compute outside of the lock, since calc functions can take a while
+        result = calc_function(pool_state, *args)
+        with self._lock:
+            if block_number == self.block_number and block_hash == self._block_hash:
+                self._results[key] = result
+        return result
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self.block_number = None
+            self._block_hash = None
+            self._results = {}
+
+
+def _to_key(arg: Any) -> Hashable:
+    """Converts an argument to a hashable key, using the scaled value for FixedPoint arguments."""
+    scaled_value = getattr(arg, "scaled_value", None)
+    if scaled_value is not None:
+        return (type(arg).__name__, scaled_value)
+    if isinstance(arg, Hashable):
+        return arg
+    return repr(arg)
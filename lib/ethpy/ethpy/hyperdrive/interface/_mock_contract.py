@@ -1,14 +1,16 @@
 """Mock function calls using hyperdrivepy."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence, cast
 
 import hyperdrivepy
+import numpy as np
 from fixedpointmath import FixedPoint
-from hypertypes.utilities.conversions import fixedpoint_to_pool_config, fixedpoint_to_pool_info
 from web3.types import Timestamp
 
 if TYPE_CHECKING:
+    from hypertypes import PoolConfig, PoolInfo
+
     from ..state import PoolState
 
 # We only worry about protected access for users outside of this folder
@@ -29,8 +31,8 @@ def _calc_position_duration_in_years(pool_state: PoolState) -> FixedPoint:
 def _calc_fixed_rate(pool_state: PoolState) -> FixedPoint:
     """See API for documentation."""
     spot_rate = hyperdrivepy.get_spot_rate(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
     )
     return FixedPoint(scaled_value=int(spot_rate))
 
@@ -47,8 +49,8 @@ def _calc_effective_share_reserves(pool_state: PoolState) -> FixedPoint:
 def _calc_spot_price(pool_state: PoolState):
     """See API for documentation."""
     spot_price = hyperdrivepy.get_spot_price(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
     )
     return FixedPoint(scaled_value=int(spot_price))
 
@@ -56,8 +58,8 @@ def _calc_spot_price(pool_state: PoolState):
 def _calc_open_long(pool_state: PoolState, base_amount: FixedPoint) -> FixedPoint:
     """See API for documentation."""
     long_amount = hyperdrivepy.calculate_open_long(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(base_amount.scaled_value),
     )
     return FixedPoint(scaled_value=int(long_amount))
@@ -68,8 +70,8 @@ def _calc_close_long(
 ) -> FixedPoint:
     """See API for documentation."""
     long_returns = hyperdrivepy.calculate_close_long(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(bond_amount.scaled_value),
         str(normalized_time_remaining.scaled_value),
     )
@@ -89,8 +91,8 @@ def _calc_open_short(
     else:  # convert FixedPoint to string
         open_share_price_str = str(open_share_price.scaled_value)
     short_deposit = hyperdrivepy.calculate_open_short(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(short_amount.scaled_value),
         str(spot_price.scaled_value),
         open_share_price_str,  # str | None
@@ -107,8 +109,8 @@ def _calc_close_short(
 ) -> FixedPoint:
     """See API for documentation."""
     short_returns = hyperdrivepy.calculate_close_short(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(bond_amount.scaled_value),
         str(open_share_price.scaled_value),
         str(close_share_price.scaled_value),
@@ -123,8 +125,8 @@ def _calc_bonds_out_given_shares_in_down(
 ) -> FixedPoint:
     """See API for documentation."""
     amount_out = hyperdrivepy.calculate_bonds_out_given_shares_in_down(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(amount_in.scaled_value),
     )
     return FixedPoint(scaled_value=int(amount_out))
@@ -136,8 +138,8 @@ def _calc_shares_in_given_bonds_out_up(
 ) -> FixedPoint:
     """See API for documentation."""
     amount_out = hyperdrivepy.calculate_shares_in_given_bonds_out_up(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(amount_in.scaled_value),
     )
 
@@ -150,8 +152,8 @@ def _calc_shares_in_given_bonds_out_down(
 ) -> FixedPoint:
     """See API for documentation."""
     amount_out = hyperdrivepy.calculate_shares_in_given_bonds_out_down(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(amount_in.scaled_value),
     )
     return FixedPoint(scaled_value=int(amount_out))
@@ -163,8 +165,8 @@ def _calc_shares_out_given_bonds_in_down(
 ) -> FixedPoint:
     """See API for documentation."""
     amount_out = hyperdrivepy.calculate_shares_out_given_bonds_in_down(
-        fixedpoint_to_pool_config(pool_state.pool_config),
-        fixedpoint_to_pool_info(pool_state.pool_info),
+        pool_state.hyperdrivepy_pool_config,
+        pool_state.hyperdrivepy_pool_info,
         str(amount_in.scaled_value),
     )
     return FixedPoint(scaled_value=int(amount_out))
@@ -250,8 +252,8 @@ def _calc_max_long(pool_state: PoolState, budget: FixedPoint) -> FixedPoint:
     return FixedPoint(
         scaled_value=int(
             hyperdrivepy.get_max_long(
-                fixedpoint_to_pool_config(pool_state.pool_config),
-                fixedpoint_to_pool_info(pool_state.pool_info),
+                pool_state.hyperdrivepy_pool_config,
+                pool_state.hyperdrivepy_pool_info,
                 str(budget.scaled_value),
                 checkpoint_exposure=str(pool_state.exposure.scaled_value),
                 maybe_max_iterations=None,
@@ -265,8 +267,8 @@ def _calc_max_short(pool_state: PoolState, budget: FixedPoint) -> FixedPoint:
     return FixedPoint(
         scaled_value=int(
             hyperdrivepy.get_max_short(
-                pool_config=fixedpoint_to_pool_config(pool_state.pool_config),
-                pool_info=fixedpoint_to_pool_info(pool_state.pool_info),
+                pool_config=pool_state.hyperdrivepy_pool_config,
+                pool_info=pool_state.hyperdrivepy_pool_info,
                 budget=str(budget.scaled_value),
                 open_share_price=str(pool_state.pool_info.share_price.scaled_value),
                 checkpoint_exposure=str(pool_state.exposure.scaled_value),
@@ -282,9 +284,116 @@ def _calc_present_value(pool_state: PoolState, current_block_timestamp: int) ->
     return FixedPoint(
         scaled_value=int(
             hyperdrivepy.calculate_present_value(
-                pool_config=fixedpoint_to_pool_config(pool_state.pool_config),
-                pool_info=fixedpoint_to_pool_info(pool_state.pool_info),
+                pool_config=pool_state.hyperdrivepy_pool_config,
+                pool_info=pool_state.hyperdrivepy_pool_info,
                 current_block_timestamp=str(current_block_timestamp),
             )
         )
     )
+
+
+# Batch variants take the pool state of each row and the arguments as columns of scaled integer strings,
+# and return an object array of FixedPoint results.
+
+
+def _iter_batch(
+    pool_states: Sequence[PoolState], *columns: Sequence[str]
+) -> Iterator[tuple[PoolState, PoolConfig, PoolInfo, list[str]]]:
+    """Iterates over the rows of a batch, getting the hyperdrivepy config and info once per run of the same state."""
+    last_pool_state: PoolState | None = None
+    pool_config: Any = None
+    pool_info: Any = None
+    for pool_state, *row in zip(pool_states, *columns):
+        if pool_state is not last_pool_state:
+            pool_config = pool_state.hyperdrivepy_pool_config
+            pool_info = pool_state.hyperdrivepy_pool_info
+            last_pool_state = pool_state
+        yield pool_state, pool_config, pool_info, row
+
+
+def _to_fixedpoint_array(scaled_values: Iterable[str]) -> np.ndarray:
+    """Converts the results of hyperdrivepy calls to an array of FixedPoint."""
+    results = [FixedPoint(scaled_value=int(scaled_value)) for scaled_value in scaled_values]
+    array = np.empty(len(results), dtype=object)
+    array[:] = results
+    return array
+
+
+def _calc_open_long_batch(pool_states: Sequence[PoolState], base_amounts: Sequence[str]) -> np.ndarray:
+    """See API for documentation."""
+    return _to_fixedpoint_array(
+        hyperdrivepy.calculate_open_long(pool_config, pool_info, base_amount)
+        for _, pool_config, pool_info, (base_amount,) in _iter_batch(pool_states, base_amounts)
+    )
+
+
+def _calc_close_long_batch(
+    pool_states: Sequence[PoolState], bond_amounts: Sequence[str], normalized_times_remaining: Sequence[str]
+) -> np.ndarray:
+    """See API for documentation."""
+    return _to_fixedpoint_array(
+        hyperdrivepy.calculate_close_long(pool_config, pool_info, bond_amount, normalized_time_remaining)
+        for _, pool_config, pool_info, (bond_amount, normalized_time_remaining) in _iter_batch(
+            pool_states, bond_amounts, normalized_times_remaining
+        )
+    )
+
+
+def _calc_open_short_batch(
+    pool_states: Sequence[PoolState], bond_amounts: Sequence[str], spot_prices: Sequence[str]
+) -> np.ndarray:
+    """See API for documentation."""
+    return _to_fixedpoint_array(
+        hyperdrivepy.calculate_open_short(
+            pool_config, pool_info, bond_amount, spot_price, str(pool_state.pool_info.share_price.scaled_value)
+        )
+        for pool_state, pool_config, pool_info, (bond_amount, spot_price) in _iter_batch(
+            pool_states, bond_amounts, spot_prices
+        )
+    )
+
+
+def _calc_close_short_batch(
+    pool_states: Sequence[PoolState],
+    bond_amounts: Sequence[str],
+    open_share_prices: Sequence[str],
+    close_share_prices: Sequence[str],
+    normalized_times_remaining: Sequence[str],
+) -> np.ndarray:
+    """See API for documentation."""
+    return _to_fixedpoint_array(
+        hyperdrivepy.calculate_close_short(pool_config, pool_info, *row)
+        for _, pool_config, pool_info, row in _iter_batch(
+            pool_states, bond_amounts, open_share_prices, close_share_prices, normalized_times_remaining
+        )
+    )
+
+
+def _calc_max_long_batch(pool_states: Sequence[PoolState], budgets: Sequence[str]) -> np.ndarray:
+    """See API for documentation."""
+    return _to_fixedpoint_array(
+        hyperdrivepy.get_max_long(
+            pool_config,
+            pool_info,
+            budget,
+            checkpoint_exposure=str(pool_state.exposure.scaled_value),
+            maybe_max_iterations=None,
+        )
+        for pool_state, pool_config, pool_info, (budget,) in _iter_batch(pool_states, budgets)
+    )
+
+
+def _calc_max_short_batch(pool_states: Sequence[PoolState], budgets: Sequence[str]) -> np.ndarray:
+    """See API for documentation."""
+    return _to_fixedpoint_array(
+        hyperdrivepy.get_max_short(
+            pool_config=pool_config,
+            pool_info=pool_info,
+            budget=budget,
+            open_share_price=str(pool_state.pool_info.share_price.scaled_value),
+            checkpoint_exposure=str(pool_state.exposure.scaled_value),
+            maybe_conservative_price=None,
+            maybe_max_iterations=None,
+        )
+        for pool_state, pool_config, pool_info, (budget,) in _iter_batch(pool_states, budgets)
+    )
@@ -0,0 +1,429 @@
+"""Apply trades to a pool state locally, without submitting them to the chain."""
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any
+
+from fixedpointmath import FixedPoint
+
+from ..receipt_breakdown import ReceiptBreakdown
+from ._mock_contract import (
+    _calc_bonds_out_given_shares_in_down,
+    _calc_checkpoint_id,
+    _calc_close_long,
+    _calc_close_short,
+    _calc_fees_out_given_bonds_in,
+    _calc_open_long,
+    _calc_open_short,
+    _calc_present_value,
+    _calc_shares_in_given_bonds_out_up,
+    _calc_shares_out_given_bonds_in_down,
+    _calc_spot_price,
+)
+
+if TYPE_CHECKING:
+    from hypertypes.fixedpoint_types import PoolInfoFP
+
+    from ..state import PoolState
+
+# We only worry about protected access for users outside of this folder
+# pylint: disable=protected-access
+
+
+def _apply_open_long(pool_state: PoolState, base_amount: FixedPoint) -> tuple[PoolState, ReceiptBreakdown]:
+    """See API for documentation."""
+    _check_minimum_transaction_amount(pool_state, base_amount)
+    pool_state = _apply_checkpoint(pool_state)
+    pool_info = pool_state.pool_info
+    share_price = pool_info.share_price
+    maturity_time = _calc_maturity_time(pool_state)
+    share_amount = base_amount / share_price
+    bond_proceeds = _calc_open_long(pool_state, base_amount)
+    # The curve fee is taken out of the bonds; the LPs keep their part of it in the bond reserves,
+    # and the governance part is paid out of the shares
+    curve_bonds = _calc_bonds_out_given_shares_in_down(pool_state, share_amount)
+    curve_fee = curve_bonds - bond_proceeds
+    governance_fee = curve_fee * pool_state.pool_config.fees.governance_lp
+    governance_fee_shares = governance_fee * _calc_spot_price(pool_state) / share_price
+    new_pool_info = replace(
+        pool_info,
+        share_reserves=pool_info.share_reserves + share_amount - governance_fee_shares,
+        bond_reserves=pool_info.bond_reserves - bond_proceeds - governance_fee,
+        longs_outstanding=pool_info.longs_outstanding + bond_proceeds,
+        long_average_maturity_time=_update_weighted_average(
+            pool_info.long_average_maturity_time,
+            pool_info.longs_outstanding,
+            FixedPoint(maturity_time),
+            bond_proceeds,
+            is_adding=True,
+        ),
+    )
+    new_pool_state = _replace_pool_state(
+        pool_state,
+        new_pool_info,
+        vault_shares=pool_state.vault_shares + share_amount,
+        gov_fees_accrued=pool_state.gov_fees_accrued + governance_fee_shares,
+    )
+    new_pool_state = _update_exposure(new_pool_state, bond_proceeds, maturity_time)
+    return new_pool_state, ReceiptBreakdown(
+        maturity_time_seconds=maturity_time,
+        base_amount=base_amount,
+        bond_amount=bond_proceeds,
+        share_price=share_price,
+        lp_share_price=pool_info.lp_share_price,
+    )
+
+
+def _apply_close_long(
+    pool_state: PoolState, bond_amount: FixedPoint, maturity_time: int
+) -> tuple[PoolState, ReceiptBreakdown]:
+    """See API for documentation."""
+    _check_minimum_transaction_amount(pool_state, bond_amount)
+    pool_state = _apply_checkpoint(pool_state)
+    pool_info = pool_state.pool_info
+    share_price = pool_info.share_price
+    normalized_time_remaining = _calc_normalized_time_remaining(pool_state, maturity_time)
+    share_proceeds = _calc_close_long(pool_state, bond_amount, normalized_time_remaining)
+    curve_fee, flat_fee, governance_fee = _calc_fees_out_given_bonds_in(
+        pool_state, bond_amount, max(maturity_time, int(pool_state.block_time))
+    )
+    governance_lp = pool_state.pool_config.fees.governance_lp
+    # The curve part of the trade sells bonds to the pool, and the LPs keep the curve fee net of governance
+    curve_bonds = bond_amount * normalized_time_remaining
+    curve_shares = FixedPoint(0)
+    if curve_bonds > FixedPoint(0):
+        curve_shares = _calc_shares_out_given_bonds_in_down(pool_state, curve_bonds)
+    new_pool_info = replace(
+        pool_info,
+        share_reserves=pool_info.share_reserves - curve_shares + curve_fee * (FixedPoint(1) - governance_lp),
+        bond_reserves=pool_info.bond_reserves + curve_bonds,
+        longs_outstanding=pool_info.longs_outstanding - bond_amount,
+        long_average_maturity_time=_update_weighted_average(
+            pool_info.long_average_maturity_time,
+            pool_info.longs_outstanding,
+            FixedPoint(maturity_time),
+            bond_amount,
+            is_adding=False,
+        ),
+    )
+    # The flat part of the trade is redeemed at par from the pool's liquidity
+    flat_shares = bond_amount * (FixedPoint(1) - normalized_time_remaining) / share_price
+    new_pool_info = _update_liquidity(
+        pool_state, new_pool_info, -(flat_shares - flat_fee * (FixedPoint(1) - governance_lp))
+    )
+    new_pool_state = _replace_pool_state(
+        pool_state,
+        new_pool_info,
+        vault_shares=pool_state.vault_shares - share_proceeds,
+        gov_fees_accrued=pool_state.gov_fees_accrued + governance_fee,
+    )
+    new_pool_state = _update_exposure(new_pool_state, -bond_amount, maturity_time)
+    return new_pool_state, ReceiptBreakdown(
+        maturity_time_seconds=maturity_time,
+        base_amount=share_proceeds * share_price,
+        bond_amount=bond_amount,
+        share_price=share_price,
+        lp_share_price=pool_info.lp_share_price,
+    )
+
+
+def _apply_open_short(pool_state: PoolState, bond_amount: FixedPoint) -> tuple[PoolState, ReceiptBreakdown]:
+    """See API for documentation."""
+    _check_minimum_transaction_amount(pool_state, bond_amount)
+    pool_state = _apply_checkpoint(pool_state)
+    pool_info = pool_state.pool_info
+    share_price = pool_info.share_price
+    maturity_time = _calc_maturity_time(pool_state)
+    base_deposit = _calc_open_short(
+        pool_state, bond_amount, _calc_spot_price(pool_state), pool_state.checkpoint.share_price
+    )
+    curve_fee, _, governance_fee = _calc_fees_out_given_bonds_in(pool_state, bond_amount, maturity_time)
+    # The trader sells the bonds to the pool, and the LPs keep the curve fee net of governance
+    curve_shares = _calc_shares_out_given_bonds_in_down(pool_state, bond_amount)
+    new_pool_info = replace(
+        pool_info,
+        share_reserves=pool_info.share_reserves - curve_shares + curve_fee - governance_fee,
+        bond_reserves=pool_info.bond_reserves + bond_amount,
+        shorts_outstanding=pool_info.shorts_outstanding + bond_amount,
+        short_average_maturity_time=_update_weighted_average(
+            pool_info.short_average_maturity_time,
+            pool_info.shorts_outstanding,
+            FixedPoint(maturity_time),
+            bond_amount,
+            is_adding=True,
+        ),
+    )
+    new_pool_state = _replace_pool_state(
+        pool_state,
+        new_pool_info,
+        vault_shares=pool_state.vault_shares + base_deposit / share_price,
+        gov_fees_accrued=pool_state.gov_fees_accrued + governance_fee,
+    )
+    new_pool_state = _update_exposure(new_pool_state, -bond_amount, maturity_time)
+    return new_pool_state, ReceiptBreakdown(
+        maturity_time_seconds=maturity_time,
+        base_amount=base_deposit,
+        bond_amount=bond_amount,
+        share_price=share_price,
+        lp_share_price=pool_info.lp_share_price,
+    )
+
+
+def _apply_close_short(
+    pool_state: PoolState, bond_amount: FixedPoint, maturity_time: int, open_share_price: FixedPoint | None = None
+) -> tuple[PoolState, ReceiptBreakdown]:
+    """See API for documentation."""
+    _check_minimum_transaction_amount(pool_state, bond_amount)
+    pool_state = _apply_checkpoint(pool_state)
+    pool_info = pool_state.pool_info
+    share_price = pool_info.share_price
+    if open_share_price is None:
+        open_share_price = share_price
+    normalized_time_remaining = _calc_normalized_time_remaining(pool_state, maturity_time)
+    share_proceeds = _calc_close_short(
+        pool_state, bond_amount, open_share_price, share_price, normalized_time_remaining
+    )
+    curve_fee, flat_fee, governance_fee = _calc_fees_out_given_bonds_in(
+        pool_state, bond_amount, max(maturity_time, int(pool_state.block_time))
+    )
+    governance_lp = pool_state.pool_config.fees.governance_lp
+    # The curve part of the trade buys bonds back from the pool, and the LPs keep the curve fee net of governance
+    curve_bonds = bond_amount * normalized_time_remaining
+    curve_shares = FixedPoint(0)
+    if curve_bonds > FixedPoint(0):
+        curve_shares = _calc_shares_in_given_bonds_out_up(pool_state, curve_bonds)
+    new_pool_info = replace(
+        pool_info,
+        share_reserves=pool_info.share_reserves + curve_shares + curve_fee * (FixedPoint(1) - governance_lp),
+        bond_reserves=pool_info.bond_reserves - curve_bonds,
+        shorts_outstanding=pool_info.shorts_outstanding - bond_amount,
+        short_average_maturity_time=_update_weighted_average(
+            pool_info.short_average_maturity_time,
+            pool_info.shorts_outstanding,
+            FixedPoint(maturity_time),
+            bond_amount,
+            is_adding=False,
+        ),
+    )
+    # The flat part of the trade is bought back at par, which adds to the pool's liquidity
+    flat_shares = bond_amount * (FixedPoint(1) - normalized_time_remaining) / share_price
+    new_pool_info = _update_liquidity(
+        pool_state, new_pool_info, flat_shares + flat_fee * (FixedPoint(1) - governance_lp)
+    )
+    new_pool_state = _replace_pool_state(
+        pool_state,
+        new_pool_info,
+        vault_shares=pool_state.vault_shares - share_proceeds,
+        gov_fees_accrued=pool_state.gov_fees_accrued + governance_fee,
+    )
+    new_pool_state = _update_exposure(new_pool_state, bond_amount, maturity_time)
+    return new_pool_state, ReceiptBreakdown(
+        maturity_time_seconds=maturity_time,
+        base_amount=share_proceeds * share_price,
+        bond_amount=bond_amount,
+        share_price=share_price,
+        lp_share_price=pool_info.lp_share_price,
+    )
+
+
+def _apply_add_liquidity(pool_state: PoolState, base_amount: FixedPoint) -> tuple[PoolState, ReceiptBreakdown]:
+    """See API for documentation."""
+    _check_minimum_transaction_amount(pool_state, base_amount)
+    pool_state = _apply_checkpoint(pool_state)
+    pool_info = pool_state.pool_info
+    share_price = pool_info.share_price
+    share_amount = base_amount / share_price
+    starting_present_value = _calc_present_value(pool_state, pool_state.block_time)
+    new_pool_state = _replace_pool_state(
+        pool_state,
+        _update_liquidity(pool_state, pool_info, share_amount),
+        vault_shares=pool_state.vault_shares + share_amount,
+    )
+    # The LP receives shares in proportion to the increase of the present value
+    ending_present_value = _calc_present_value(new_pool_state, new_pool_state.block_time)
+    lp_shares = (ending_present_value - starting_present_value) * pool_info.lp_total_supply / starting_present_value
+    lp_total_supply = pool_info.lp_total_supply + lp_shares
+    new_pool_state.pool_info.lp_total_supply = lp_total_supply
+    new_pool_state.pool_info.lp_share_price = ending_present_value * share_price / lp_total_supply
+    return new_pool_state, ReceiptBreakdown(
+        base_amount=base_amount,
+        lp_amount=lp_shares,
+        share_price=share_price,
+        lp_share_price=new_pool_state.pool_info.lp_share_price,
+    )
+
+
+def _apply_remove_liquidity(pool_state: PoolState, lp_shares: FixedPoint) -> tuple[PoolState, ReceiptBreakdown]:
+    """See API for documentation."""
+    _check_minimum_transaction_amount(pool_state, lp_shares)
+    pool_state = _apply_checkpoint(pool_state)
+    pool_info = pool_state.pool_info
+    share_price = pool_info.share_price
+    active_lp_supply = pool_info.lp_total_supply - pool_state.total_supply_withdrawal_shares
+    if lp_shares > active_lp_supply:
+        raise ValueError(f"{lp_shares=} is larger than the active LP supply {active_lp_supply}.")
+    # The LP is paid their part of the idle liquidity, which is the liquidity that isn't backing longs
+    idle_shares = (
+        pool_info.share_reserves - pool_info.long_exposure / share_price - pool_state.pool_config.minimum_share_reserves
+    )
+    share_proceeds = FixedPoint(0)
+    if idle_shares > FixedPoint(0):
+        share_proceeds = idle_shares * lp_shares / active_lp_supply
+    starting_present_value = _calc_present_value(pool_state, pool_state.block_time)
+    new_pool_state = _replace_pool_state(
+        pool_state,
+        _update_liquidity(pool_state, pool_info, -share_proceeds),
+        vault_shares=pool_state.vault_shares - share_proceeds,
+    )
+    # The LP shares that weren't paid out with the idle liquidity are converted to withdrawal shares
+    ending_present_value = _calc_present_value(new_pool_state, new_pool_state.block_time)
+    lp_shares_paid = (
+        (starting_present_value - ending_present_value) * pool_info.lp_total_supply / starting_present_value
+    )
+    withdrawal_shares = max(lp_shares - lp_shares_paid, FixedPoint(0))
+    lp_total_supply = pool_info.lp_total_supply - lp_shares + withdrawal_shares
+    new_pool_state.pool_info.lp_total_supply = lp_total_supply
+    if lp_total_supply > FixedPoint(0):
+        new_pool_state.pool_info.lp_share_price = ending_present_value * share_price / lp_total_supply
+    new_pool_state.total_supply_withdrawal_shares = pool_state.total_supply_withdrawal_shares + withdrawal_shares
+    return new_pool_state, ReceiptBreakdown(
+        base_amount=share_proceeds * share_price,
+        lp_amount=lp_shares,
+        withdrawal_share_amount=withdrawal_shares,
+        share_price=share_price,
+        lp_share_price=new_pool_state.pool_info.lp_share_price,
+    )
+
+
+def _apply_redeem_withdraw_shares(
+    pool_state: PoolState, withdrawal_shares: FixedPoint
+) -> tuple[PoolState, ReceiptBreakdown]:
+    """See API for documentation."""
+    _check_minimum_transaction_amount(pool_state, withdrawal_shares)
+    if withdrawal_shares > pool_state.total_supply_withdrawal_shares:
+        raise ValueError(
+            f"{withdrawal_shares=} is larger than the withdrawal share supply "
+            f"{pool_state.total_supply_withdrawal_shares}."
+        )
+    pool_state = _apply_checkpoint(pool_state)
+    pool_info = pool_state.pool_info
+    share_price = pool_info.share_price
+    # Withdrawal shares are redeemed at the LP share price, as far as the idle liquidity allows
+    idle_shares = max(
+        pool_info.share_reserves
+        - pool_info.long_exposure / share_price
+        - pool_state.pool_config.minimum_share_reserves,
+        FixedPoint(0),
+    )
+    share_proceeds = min(withdrawal_shares * pool_info.lp_share_price / share_price, idle_shares)
+    redeemed_shares = FixedPoint(0)
+    if pool_info.lp_share_price > FixedPoint(0):
+        redeemed_shares = share_proceeds * share_price / pool_info.lp_share_price
+    new_pool_state = _replace_pool_state(
+        pool_state,
+        _update_liquidity(pool_state, pool_info, -share_proceeds),
+        vault_shares=pool_state.vault_shares - share_proceeds,
+        total_supply_withdrawal_shares=pool_state.total_supply_withdrawal_shares - redeemed_shares,
+    )
+    new_pool_state.pool_info.lp_total_supply = pool_info.lp_total_supply - redeemed_shares
+    return new_pool_state, ReceiptBreakdown(
+        base_amount=share_proceeds * share_price,
+        withdrawal_share_amount=redeemed_shares,
+        share_price=share_price,
+        lp_share_price=pool_info.lp_share_price,
+    )
+
+
+def _check_minimum_transaction_amount(pool_state: PoolState, amount: FixedPoint) -> None:
+    """Raises a ValueError for trades that the contract would revert for being too small."""
+    if amount < pool_state.pool_config.minimum_transaction_amount:
+        raise ValueError(
+            f"{amount=} is less than the minimum transaction amount "
+            f"{pool_state.pool_config.minimum_transaction_amount}."
+        )
+
+
+def _apply_checkpoint(pool_state: PoolState) -> PoolState:
+    """Mints the checkpoint of the pool state's block if it doesn't exist yet, as the first trade in it would."""
+    if pool_state.checkpoint.share_price > FixedPoint(0):
+        return pool_state
+    checkpoint = replace(pool_state.checkpoint, share_price=pool_state.pool_info.share_price)
+    return replace(pool_state, checkpoint=checkpoint)
+
+
+def _calc_maturity_time(pool_state: PoolState) -> int:
+    """Returns the maturity time of positions opened in the pool state's block."""
+    checkpoint_id = _calc_checkpoint_id(pool_state.pool_config.checkpoint_duration, pool_state.block_time)
+    return int(checkpoint_id) + int(pool_state.pool_config.position_duration)
+
+
+def _calc_normalized_time_remaining(pool_state: PoolState, maturity_time: int) -> FixedPoint:
+    """Returns the time remaining before a position matures, normalized such that 1 is at opening."""
+    time_remaining = max(maturity_time - int(pool_state.block_time), 0)
+    return FixedPoint(time_remaining) / FixedPoint(pool_state.pool_config.position_duration)
+
+
+def _update_weighted_average(
+    average: FixedPoint, total_weight: FixedPoint, value: FixedPoint, delta: FixedPoint, is_adding: bool
+) -> FixedPoint:
+    """Returns the weighted average after adding or removing a value with a weight of `delta`."""
+    if is_adding:
+        new_total_weight = total_weight + delta
+        if new_total_weight == FixedPoint(0):
+            return FixedPoint(0)
+        return (average * total_weight + value * delta) / new_total_weight
+    new_total_weight = total_weight - delta
+    if new_total_weight <= FixedPoint(0):
+        return FixedPoint(0)
+    return (average * total_weight - value * delta) / new_total_weight
+
+
+def _update_liquidity(pool_state: PoolState, pool_info: PoolInfoFP, share_reserves_delta: FixedPoint) -> PoolInfoFP:
+    """Adds liquidity to the pool, or removes it for a negative delta, without changing the spot price.
+
+    The share adjustment and bond reserves are scaled with the share reserves, so that the ratio of
+    the effective share reserves to the bond reserves is unchanged.
+    """
+    if share_reserves_delta == FixedPoint(0):
+        return pool_info
+    share_reserves = pool_info.share_reserves + share_reserves_delta
+    if share_reserves < pool_state.pool_config.minimum_share_reserves:
+        raise ValueError(
+            f"The share reserves {share_reserves} would be less than the minimum share reserves "
+            f"{pool_state.pool_config.minimum_share_reserves}."
+        )
+    return replace(
+        pool_info,
+        share_reserves=share_reserves,
+        share_adjustment=pool_info.share_adjustment * share_reserves / pool_info.share_reserves,
+        bond_reserves=pool_info.bond_reserves * share_reserves / pool_info.share_reserves,
+    )
+
+
+def _update_exposure(pool_state: PoolState, exposure_delta: FixedPoint, maturity_time: int) -> PoolState:
+    """Updates the checkpoint exposure and the pool's long exposure for a position that matures at `maturity_time`.
+
+    The exposure of the checkpoint the position was opened in is only known if it is the pool state's checkpoint.
+    Otherwise, we assume the checkpoint's exposure is the position's own, so only closing longs reduces the
+    pool's long exposure.
+    """
+    pool_info = pool_state.pool_info
+    open_checkpoint = maturity_time - int(pool_state.pool_config.position_duration)
+    if open_checkpoint == _calc_checkpoint_id(pool_state.pool_config.checkpoint_duration, pool_state.block_time):
+        exposure = pool_state.exposure + exposure_delta
+        # The pool's long exposure is the sum of the net long exposure of each checkpoint
+        long_exposure = pool_info.long_exposure + max(exposure, FixedPoint(0)) - max(pool_state.exposure, FixedPoint(0))
+        pool_state.exposure = exposure
+    elif exposure_delta < FixedPoint(0):
+        long_exposure = max(pool_info.long_exposure + exposure_delta, FixedPoint(0))
+    else:
+        long_exposure = pool_info.long_exposure
+    pool_info.long_exposure = long_exposure
+    return pool_state
+
+
+def _replace_pool_state(pool_state: PoolState, pool_info: PoolInfoFP, **changes: Any) -> PoolState:
+    """Returns a pool state with new pool info and attributes, sharing the unchanged attributes with the original."""
+    if pool_info is pool_state.pool_info:
+        pool_info = replace(pool_info)
+    return replace(pool_state, pool_info=pool_info, **changes)
@@ -0,0 +1,126 @@
+"""Solve for the trade that moves the pool's fixed rate to a target rate."""
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+from fixedpointmath import FixedPoint
+
+from ._mock_contract import (
+    _calc_bonds_given_shares_and_rate,
+    _calc_fixed_rate,
+    _calc_shares_out_given_bonds_in_down,
+    _calc_spot_price,
+)
+
+if TYPE_CHECKING:
+    from ..state import PoolState
+
+DEFAULT_TARGET_RATE_TOLERANCE = FixedPoint(scaled_value=100)  # 1e-16
+DEFAULT_TARGET_RATE_MAX_ITERATIONS = 50
+
+
+def _calc_reserves_to_hit_target_rate(
+    pool_state: PoolState,
+    target_rate: FixedPoint,
+    tolerance: FixedPoint = DEFAULT_TARGET_RATE_TOLERANCE,
+    max_iterations: int = DEFAULT_TARGET_RATE_MAX_ITERATIONS,
+) -> tuple[FixedPoint, FixedPoint, int]:
+    """See API for documentation."""
+    # pylint: disable=too-many-locals
+    share_reserves = pool_state.pool_info.share_reserves
+    bond_reserves = pool_state.pool_info.bond_reserves
+    zero = FixedPoint(0)
+    low_error = _calc_fixed_rate(pool_state) - target_rate
+    if abs(low_error) <= tolerance:
+        return zero, zero, 0
+    # The fees on the trade only depend on the spot price before the trade
+    gov_fee_rate = (
+        (FixedPoint(1) - _calc_spot_price(pool_state))
+        * pool_state.pool_config.fees.curve
+        * pool_state.pool_config.fees.governance_lp
+    )
+
+    def apply_bonds(bonds: FixedPoint) -> PoolState | None:
+        """Returns the pool state after trading the bonds, or None if the trade is too large for the pool."""
+        try:
+            shares_out = _calc_shares_out_given_bonds_in_down(pool_state, abs(bonds))
+        except Exception:  # pylint: disable=broad-except
+            return None
+        shares_to_gov = shares_out * gov_fee_rate
+        shares_to_pool = shares_out - shares_to_gov
+        if bonds > zero:  # short: the trader takes shares out, and the governance fee leaves the pool
+            new_share_reserves = share_reserves - shares_to_pool - shares_to_gov
+        else:  # long: the trader pays shares in, and the governance fee doesn't go to the pool
+            new_share_reserves = share_reserves + shares_to_pool - shares_to_gov
+        # We only replace the reserves, instead of deep copying the whole pool state
+        pool_info = replace(
+            pool_state.pool_info, share_reserves=new_share_reserves, bond_reserves=bond_reserves + bonds
+        )
+        return replace(pool_state, pool_info=pool_info)
+
+    def calc_error(bonds: FixedPoint) -> tuple[PoolState | None, FixedPoint | None]:
+        """Returns the pool state after trading the bonds, and its distance from the target rate."""
+        new_pool_state = apply_bonds(bonds)
+        if new_pool_state is None:
+            return None, None
+        try:
+            return new_pool_state, _calc_fixed_rate(new_pool_state) - target_rate
+        except Exception:  # pylint: disable=broad-except
+            return None, None
+
+    # Trading the bonds that hit the target rate with constant shares overshoots the target,
+    # since the shares move in the opposite direction. Hence, no trade and that trade bracket the solution.
+    # The error is `low_error` at `low_bonds`, and changes sign before `high_bonds`.
+    # A high end without an error is a trade that is too large for the pool.
+    low_bonds = zero
+    high_bonds = _calc_bonds_given_shares_and_rate(pool_state, target_rate, share_reserves) - bond_reserves
+    best_state, best_bonds, best_error = None, zero, abs(low_error)
+    high_state, high_error = calc_error(high_bonds)
+    if high_state is not None and high_error is not None and abs(high_error) < best_error:
+        best_state, best_bonds, best_error = high_state, high_bonds, abs(high_error)
+    iteration = 0
+    # Which end of the bracket moved in the last step, for the Illinois modification of regula falsi
+    last_moved_end: str | None = None
+    while iteration < max_iterations and best_error > tolerance:
+        iteration += 1
+        if high_error is not None and (high_error > zero) == (low_error > zero):
+            if high_bonds == zero:
+                break
+            # The guess didn't reach the target, so we extend the bracket
+            low_bonds, low_error = high_bonds, high_error
+            high_bonds = high_bonds * FixedPoint(2)
+            high_state, high_error = calc_error(high_bonds)
+            if high_state is not None and high_error is not None and abs(high_error) < best_error:
+                best_state, best_bonds, best_error = high_state, high_bonds, abs(high_error)
+            continue
+        if high_error is None:
+            bonds = (low_bonds + high_bonds) / FixedPoint(2)
+        else:
+            # Secant step within the bracket, falling back to bisection if it leaves the bracket
+            bonds = low_bonds - low_error * (high_bonds - low_bonds) / (high_error - low_error)
+            if not min(low_bonds, high_bonds) < bonds < max(low_bonds, high_bonds):
+                bonds = (low_bonds + high_bonds) / FixedPoint(2)
+        new_state, error = calc_error(bonds)
+        if new_state is None or error is None:
+            high_bonds, high_error = bonds, None
+            last_moved_end = None
+            continue
+        if abs(error) < best_error:
+            best_state, best_bonds, best_error = new_state, bonds, abs(error)
+        if abs(error) <= tolerance or abs(high_bonds - low_bonds) <= FixedPoint(scaled_value=1):
+            break
+        if (error > zero) == (low_error > zero):
+            low_bonds, low_error = bonds, error
+            if last_moved_end == "low" and high_error is not None:
+                # Halve the error at the stale end, so the secant doesn't keep approaching from one side
+                high_error /= FixedPoint(2)
+            last_moved_end = "low"
+        else:
+            high_bonds, high_error = bonds, error
+            if last_moved_end == "high":
+                low_error /= FixedPoint(2)
+            last_moved_end = "high"
+    if best_state is None:
+        return zero, zero, iteration
+    return best_state.pool_info.share_reserves - share_reserves, best_bonds, iteration
@@ -3,9 +3,11 @@ from __future__ import annotations
 
 import copy
 import os
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, Callable, Sequence, TypeVar, Union, cast
 
+import numpy as np
 from eth_account import Account
+from eth_typing import BlockNumber
 from ethpy import build_eth_config
 from ethpy.base import initialize_web3_with_http_provider
 from ethpy.hyperdrive.addresses import HyperdriveAddresses, fetch_hyperdrive_address_from_uri
@@ -26,6 +28,7 @@ from agent0.base import MarketType, Trade
 from agent0.hyperdrive.state import HyperdriveActionType, HyperdriveMarketAction
 
 from ._block_getters import _get_block, _get_block_number, _get_block_time
+from ._calc_cache import BlockCalcCache
 from ._contract_calls import (
     _get_eth_base_balances,
     _get_gov_fees_accrued,
@@ -40,15 +43,21 @@ from ._mock_contract import (
     _calc_bonds_out_given_shares_in_down,
     _calc_checkpoint_id,
     _calc_close_long,
+    _calc_close_long_batch,
     _calc_close_short,
+    _calc_close_short_batch,
     _calc_effective_share_reserves,
     _calc_fees_out_given_bonds_in,
     _calc_fees_out_given_shares_in,
     _calc_fixed_rate,
     _calc_max_long,
+    _calc_max_long_batch,
     _calc_max_short,
+    _calc_max_short_batch,
     _calc_open_long,
+    _calc_open_long_batch,
     _calc_open_short,
+    _calc_open_short_batch,
     _calc_position_duration_in_years,
     _calc_present_value,
     _calc_shares_in_given_bonds_out_down,
@@ -56,6 +65,20 @@ from ._mock_contract import (
     _calc_shares_out_given_bonds_in_down,
     _calc_spot_price,
 )
+from ._offline_trades import (
+    _apply_add_liquidity,
+    _apply_close_long,
+    _apply_close_short,
+    _apply_open_long,
+    _apply_open_short,
+    _apply_redeem_withdraw_shares,
+    _apply_remove_liquidity,
+)
+from ._target_rate_solver import (
+    DEFAULT_TARGET_RATE_MAX_ITERATIONS,
+    DEFAULT_TARGET_RATE_TOLERANCE,
+    _calc_reserves_to_hit_target_rate,
+)
 
 # We expect to have many instance attributes & public methods since this is a large API.
 # pylint: disable=too-many-lines
@@ -68,10 +91,16 @@ from ._mock_contract import (
 
 if TYPE_CHECKING:
     from eth_account.signers.local import LocalAccount
-    from eth_typing import BlockNumber
     from ethpy import EthConfig
     from web3 import Web3
 
+    from ..receipt_breakdown import ReceiptBreakdown
+
+T = TypeVar("T")
+
+# Amounts for batch calcs, as FixedPoint values or as integers of their scaled value
+BatchAmounts = Union[Sequence[FixedPoint], Sequence[int], np.ndarray]
+
 
 class HyperdriveReadInterface:
     """Read-only end-point API for interfacing with a deployed Hyperdrive pool."""
@@ -136,6 +165,8 @@ class HyperdriveReadInterface:
         # and uses defaults for other smart_contract_read functions, e.g., get_pool_info.
         self.read_retry_count = read_retry_count
         self._deployed_hyperdrive_pool = self._create_deployed_hyperdrive_pool()
+        # Results of calc functions on the current pool state, which can be shared with other interfaces
+        self._calc_cache = BlockCalcCache()
 
     def _create_deployed_hyperdrive_pool(self) -> DeployedHyperdrivePool:
         return DeployedHyperdrivePool(
@@ -180,6 +211,51 @@ class HyperdriveReadInterface:
             return True
         return False
 
+    def set_current_pool_state(self, pool_state: PoolState) -> None:
+        """Use a pool state that was queried elsewhere (e.g. by another process) as the current pool state.
+
+        The state is used until a newer block is mined, so it must be the state of the pool at its block.
+
+        Arguments
+        ---------
+        pool_state: PoolState
+            The state of the pool at the latest block.
+        """
+        self._current_pool_state = pool_state
+        self.last_state_block_number = pool_state.block_number
+
+    def reset_current_pool_state(self) -> None:
+        """Drop the cached pool state and calc results, so that they are queried again on the next access.
+
+        This must be called when the chain is reverted (e.g. after loading a snapshot),
+        since the cached state can be from a block that no longer exists.
+        """
+        self.last_state_block_number = BlockNumber(0)
+        self._calc_cache.clear()
+
+    def _cached_calc(self, pool_state: PoolState, calc_function: Callable[..., T], *args: Any) -> T:
+        """Calls a pure calc function, reusing the result of previous calls with the same arguments in the same block.
+
+        Only results on the current pool state are cached, since other pool states can be hypothetical.
+
+        Arguments
+        ---------
+        pool_state: PoolState
+            The state of the pool, which is passed as the first argument to the calc function.
+        calc_function: Callable[..., T]
+            The pure calc function.
+        *args: Any
+            The remaining arguments passed to the calc function.
+
+        Returns
+        -------
+        T
+            The result of the calc function.
+        """
+        if pool_state is not self._current_pool_state:
+            return calc_function(pool_state, *args)
+        return self._calc_cache.get_or_calc(pool_state, calc_function, *args)
+
     def get_current_block(self) -> BlockData:
         """Use an RPC to get the current block.
 
@@ -678,7 +754,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_fixed_rate(pool_state)
+        return self._cached_calc(pool_state, _calc_fixed_rate)
 
     def calc_spot_price(self, pool_state: PoolState | None = None) -> FixedPoint:
         """Calculate the spot price for a given Hyperdrive pool.
@@ -699,7 +775,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_spot_price(pool_state)
+        return self._cached_calc(pool_state, _calc_spot_price)
 
     def calc_effective_share_reserves(self, pool_state: PoolState | None = None) -> FixedPoint:
         """Calculate the adjusted share reserves for a given Hyperdrive pool.
@@ -720,7 +796,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_effective_share_reserves(pool_state)
+        return self._cached_calc(pool_state, _calc_effective_share_reserves)
 
     def calc_open_long(self, base_amount: FixedPoint, pool_state: PoolState | None = None) -> FixedPoint:
         """Calculate the long amount that will be opened for a given base amount after fees.
@@ -743,7 +819,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_open_long(pool_state, base_amount)
+        return self._cached_calc(pool_state, _calc_open_long, base_amount)
 
     def calc_close_long(
         self, bond_amount: FixedPoint, normalized_time_remaining: FixedPoint, pool_state: PoolState | None = None
@@ -768,7 +844,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_close_long(pool_state, bond_amount, normalized_time_remaining)
+        return self._cached_calc(pool_state, _calc_close_long, bond_amount, normalized_time_remaining)
 
     def calc_open_short(self, bond_amount: FixedPoint, pool_state: PoolState | None = None) -> FixedPoint:
         """Calculate the amount of base the trader will need to deposit for a short of a given size, after fees.
@@ -791,7 +867,13 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_open_short(pool_state, bond_amount, _calc_spot_price(pool_state), pool_state.pool_info.share_price)
+        return self._cached_calc(
+            pool_state,
+            _calc_open_short,
+            bond_amount,
+            self.calc_spot_price(pool_state),
+            pool_state.pool_info.share_price,
+        )
 
     def calc_close_short(
         self,
@@ -825,8 +907,8 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_close_short(
-            pool_state, bond_amount, open_share_price, close_share_price, normalized_time_remaining
+        return self._cached_calc(
+            pool_state, _calc_close_short, bond_amount, open_share_price, close_share_price, normalized_time_remaining
         )
 
     def calc_bonds_out_given_shares_in_down(
@@ -854,7 +936,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_bonds_out_given_shares_in_down(pool_state, amount_in)
+        return self._cached_calc(pool_state, _calc_bonds_out_given_shares_in_down, amount_in)
 
     def calc_shares_in_given_bonds_out_up(
         self, amount_in: FixedPoint, pool_state: PoolState | None = None
@@ -881,7 +963,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_shares_in_given_bonds_out_up(pool_state, amount_in)
+        return self._cached_calc(pool_state, _calc_shares_in_given_bonds_out_up, amount_in)
 
     def calc_shares_in_given_bonds_out_down(
         self, amount_in: FixedPoint, pool_state: PoolState | None = None
@@ -908,7 +990,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_shares_in_given_bonds_out_down(pool_state, amount_in)
+        return self._cached_calc(pool_state, _calc_shares_in_given_bonds_out_down, amount_in)
 
     def calc_shares_out_given_bonds_in_down(
         self, amount_in: FixedPoint, pool_state: PoolState | None = None
@@ -935,7 +1017,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_shares_out_given_bonds_in_down(pool_state, amount_in)
+        return self._cached_calc(pool_state, _calc_shares_out_given_bonds_in_down, amount_in)
 
     def calc_fees_out_given_bonds_in(
         self, bonds_in: FixedPoint, maturity_time: int | None = None, pool_state: PoolState | None = None
@@ -974,7 +1056,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_fees_out_given_bonds_in(pool_state, bonds_in, maturity_time)
+        return self._cached_calc(pool_state, _calc_fees_out_given_bonds_in, bonds_in, maturity_time)
 
     def calc_fees_out_given_shares_in(
         self, shares_in: FixedPoint, maturity_time: int | None = None, pool_state: PoolState | None = None
@@ -1013,7 +1095,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_fees_out_given_shares_in(pool_state, shares_in, maturity_time)
+        return self._cached_calc(pool_state, _calc_fees_out_given_shares_in, shares_in, maturity_time)
 
     def calc_bonds_given_shares_and_rate(
         self, target_rate: FixedPoint, target_shares: FixedPoint | None = None, pool_state: PoolState | None = None
@@ -1050,7 +1132,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_bonds_given_shares_and_rate(pool_state, target_rate, target_shares)
+        return self._cached_calc(pool_state, _calc_bonds_given_shares_and_rate, target_rate, target_shares)
 
     def calc_max_long(self, budget: FixedPoint, pool_state: PoolState | None = None) -> FixedPoint:
         """Calculate the maximum allowable long for the given Hyperdrive pool and agent budget.
@@ -1073,7 +1155,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_max_long(pool_state, budget)
+        return self._cached_calc(pool_state, _calc_max_long, budget)
 
     def calc_max_short(self, budget: FixedPoint, pool_state: PoolState | None = None) -> FixedPoint:
         """Calculate the maximum allowable short for the given Hyperdrive pool and agent budget.
@@ -1096,7 +1178,7 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_max_short(pool_state, budget)
+        return self._cached_calc(pool_state, _calc_max_short, budget)
 
     def calc_present_value(self, pool_state: PoolState | None = None) -> FixedPoint:
         """Calculates the present value of LPs capital in the pool.
@@ -1114,4 +1196,408 @@ class HyperdriveReadInterface:
         """
         if pool_state is None:
             pool_state = self.current_pool_state
-        return _calc_present_value(pool_state, pool_state.block_time)
+        return self._cached_calc(pool_state, _calc_present_value, pool_state.block_time)
+
+    def calc_reserves_to_hit_target_rate(
+        self,
+        target_rate: FixedPoint,
+        pool_state: PoolState | None = None,
+        tolerance: FixedPoint = DEFAULT_TARGET_RATE_TOLERANCE,
+        max_iterations: int = DEFAULT_TARGET_RATE_MAX_ITERATIONS,
+    ) -> tuple[FixedPoint, FixedPoint, int]:
+        """Calculate the change in share and bond reserves from a trade that moves the fixed rate to a target rate.
+
+        The trade is solved with a bracketed secant search on the amount of bonds traded,
+        which converges in a handful of steps.
+
+        Arguments
+        ---------
+        target_rate: FixedPoint
+            The fixed rate the pool will have after the trade.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+        tolerance: FixedPoint, optional
+            The maximum distance between the fixed rate after the trade and the target rate. Defaults to 1e-16.
+        max_iterations: int, optional
+            The maximum number of search steps. Defaults to 50.
+
+        Returns
+        -------
+        tuple[FixedPoint, FixedPoint, int]
+            The change in share reserves, the change in bond reserves, and the number of search steps.
+            Bonds are added to the pool for a short, and removed for a long.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return self._cached_calc(pool_state, _calc_reserves_to_hit_target_rate, target_rate, tolerance, max_iterations)
+
+    def apply_open_long(
+        self, base_amount: FixedPoint, pool_state: PoolState | None = None
+    ) -> tuple[PoolState, ReceiptBreakdown]:
+        """Apply a long to the pool state locally, without submitting the trade to the chain.
+
+        The trade is computed with the Hyperdrive-rust sdk, including fees and minting the checkpoint.
+        The given pool state is not modified.
+
+        Arguments
+        ---------
+        base_amount: FixedPoint
+            The amount of base to spend.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+
+        Returns
+        -------
+        tuple[PoolState, ReceiptBreakdown]
+            The state of the pool after the trade, and the amounts of the trade.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return _apply_open_long(pool_state, base_amount)
+
+    def apply_close_long(
+        self, bond_amount: FixedPoint, maturity_time: int, pool_state: PoolState | None = None
+    ) -> tuple[PoolState, ReceiptBreakdown]:
+        """Apply closing a long to the pool state locally, without submitting the trade to the chain.
+
+        Arguments
+        ---------
+        bond_amount: FixedPoint
+            The amount of bonds to sell.
+        maturity_time: int
+            The maturity time of the long, in seconds.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+
+        Returns
+        -------
+        tuple[PoolState, ReceiptBreakdown]
+            The state of the pool after the trade, and the amounts of the trade.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return _apply_close_long(pool_state, bond_amount, maturity_time)
+
+    def apply_open_short(
+        self, bond_amount: FixedPoint, pool_state: PoolState | None = None
+    ) -> tuple[PoolState, ReceiptBreakdown]:
+        """Apply a short to the pool state locally, without submitting the trade to the chain.
+
+        Arguments
+        ---------
+        bond_amount: FixedPoint
+            The amount of bonds to short.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+
+        Returns
+        -------
+        tuple[PoolState, ReceiptBreakdown]
+            The state of the pool after the trade, and the amounts of the trade.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return _apply_open_short(pool_state, bond_amount)
+
+    def apply_close_short(
+        self,
+        bond_amount: FixedPoint,
+        maturity_time: int,
+        open_share_price: FixedPoint | None = None,
+        pool_state: PoolState | None = None,
+    ) -> tuple[PoolState, ReceiptBreakdown]:
+        """Apply closing a short to the pool state locally, without submitting the trade to the chain.
+
+        Arguments
+        ---------
+        bond_amount: FixedPoint
+            The amount of bonds to close.
+        maturity_time: int
+            The maturity time of the short, in seconds.
+        open_share_price: FixedPoint, optional
+            The share price when the short was opened. Defaults to the pool's current share price.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+
+        Returns
+        -------
+        tuple[PoolState, ReceiptBreakdown]
+            The state of the pool after the trade, and the amounts of the trade.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return _apply_close_short(pool_state, bond_amount, maturity_time, open_share_price)
+
+    def apply_add_liquidity(
+        self, base_amount: FixedPoint, pool_state: PoolState | None = None
+    ) -> tuple[PoolState, ReceiptBreakdown]:
+        """Apply adding liquidity to the pool state locally, without submitting the trade to the chain.
+
+        Arguments
+        ---------
+        base_amount: FixedPoint
+            The amount of base to contribute.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+
+        Returns
+        -------
+        tuple[PoolState, ReceiptBreakdown]
+            The state of the pool after the trade, and the amounts of the trade.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return _apply_add_liquidity(pool_state, base_amount)
+
+    def apply_remove_liquidity(
+        self, lp_shares: FixedPoint, pool_state: PoolState | None = None
+    ) -> tuple[PoolState, ReceiptBreakdown]:
+        """Apply removing liquidity to the pool state locally, without submitting the trade to the chain.
+
+        The LP is paid their part of the idle liquidity, and the rest of the LP shares are converted
+        to withdrawal shares.
+
+        Arguments
+        ---------
+        lp_shares: FixedPoint
+            The amount of LP shares to remove.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+
+        Returns
+        -------
+        tuple[PoolState, ReceiptBreakdown]
+            The state of the pool after the trade, and the amounts of the trade.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return _apply_remove_liquidity(pool_state, lp_shares)
+
+    def apply_redeem_withdraw_shares(
+        self, withdrawal_shares: FixedPoint, pool_state: PoolState | None = None
+    ) -> tuple[PoolState, ReceiptBreakdown]:
+        """Apply redeeming withdrawal shares to the pool state locally, without submitting the trade to the chain.
+
+        Withdrawal shares are redeemed at the LP share price, as far as the idle liquidity in the pool allows.
+
+        Arguments
+        ---------
+        withdrawal_shares: FixedPoint
+            The amount of withdrawal shares to redeem.
+        pool_state: PoolState, optional
+            The state of the pool, which includes block details, pool config, and pool info.
+            If not given, use the current pool state.
+
+        Returns
+        -------
+        tuple[PoolState, ReceiptBreakdown]
+            The state of the pool after the trade, and the amounts of the trade.
+        """
+        if pool_state is None:
+            pool_state = self.current_pool_state
+        return _apply_redeem_withdraw_shares(pool_state, withdrawal_shares)
+
+    def calc_open_long_batch(
+        self, base_amounts: BatchAmounts, pool_states: PoolState | Sequence[PoolState] | None = None
+    ) -> np.ndarray:
+        """Gets the long amount for each of many base amounts, and optionally many pool states.
+        Amounts are given as FixedPoint values, or as integers of their scaled value.
+
+        Arguments
+        ---------
+        base_amounts: Sequence[FixedPoint] | np.ndarray
+            The amount of base provided for each row.
+        pool_states: PoolState | Sequence[PoolState], optional
+            The state of the pool for all rows, or for each row.
+            If not given, use the current pool state for all rows.
+
+        Returns
+        -------
+        np.ndarray
+            The amount of bonds purchased for each row, as an object array of FixedPoint.
+        """
+        base_amounts_scaled = _to_scaled_strings(base_amounts)
+        pool_states = self._broadcast_pool_states(pool_states, len(base_amounts_scaled))
+        return _calc_open_long_batch(pool_states, base_amounts_scaled)
+
+    def calc_close_long_batch(
+        self,
+        bond_amounts: BatchAmounts,
+        normalized_times_remaining: BatchAmounts,
+        pool_states: PoolState | Sequence[PoolState] | None = None,
+    ) -> np.ndarray:
+        """Gets the amount of shares received for closing each of many longs, and optionally on many pool states.
+        Amounts are given as FixedPoint values, or as integers of their scaled value.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[FixedPoint] | np.ndarray
+            The amount of bonds to close for each row.
+        normalized_times_remaining: Sequence[FixedPoint] | np.ndarray
+            The time remaining before the long reaches maturity for each row,
+            normalized such that 0 is at opening and 1 is at maturity.
+        pool_states: PoolState | Sequence[PoolState], optional
+            The state of the pool for all rows, or for each row.
+            If not given, use the current pool state for all rows.
+
+        Returns
+        -------
+        np.ndarray
+            The amount of shares returned for each row, as an object array of FixedPoint.
+        """
+        bond_amounts_scaled = _to_scaled_strings(bond_amounts)
+        times_remaining_scaled = _to_scaled_strings(normalized_times_remaining, len(bond_amounts_scaled))
+        pool_states = self._broadcast_pool_states(pool_states, len(bond_amounts_scaled))
+        return _calc_close_long_batch(pool_states, bond_amounts_scaled, times_remaining_scaled)
+
+    def calc_open_short_batch(
+        self, bond_amounts: BatchAmounts, pool_states: PoolState | Sequence[PoolState] | None = None
+    ) -> np.ndarray:
+        """Gets the amount of base required to short each of many bond amounts, and optionally on many pool states.
+        Amounts are given as FixedPoint values, or as integers of their scaled value.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[FixedPoint] | np.ndarray
+            The amount of bonds to short for each row.
+        pool_states: PoolState | Sequence[PoolState], optional
+            The state of the pool for all rows, or for each row.
+            If not given, use the current pool state for all rows.
+
+        Returns
+        -------
+        np.ndarray
+            The amount of base required to short the bonds for each row, as an object array of FixedPoint.
+        """
+        bond_amounts_scaled = _to_scaled_strings(bond_amounts)
+        pool_states = self._broadcast_pool_states(pool_states, len(bond_amounts_scaled))
+        # The spot price only depends on the pool state, so we compute it once per state
+        spot_prices: dict[int, str] = {}
+        for pool_state in pool_states:
+            if id(pool_state) not in spot_prices:
+                spot_prices[id(pool_state)] = str(self.calc_spot_price(pool_state).scaled_value)
+        return _calc_open_short_batch(
+            pool_states, bond_amounts_scaled, [spot_prices[id(pool_state)] for pool_state in pool_states]
+        )
+
+    def calc_close_short_batch(
+        self,
+        bond_amounts: BatchAmounts,
+        open_share_prices: BatchAmounts,
+        close_share_prices: BatchAmounts,
+        normalized_times_remaining: BatchAmounts,
+        pool_states: PoolState | Sequence[PoolState] | None = None,
+    ) -> np.ndarray:
+        """Gets the amount of shares received for closing each of many shorts, and optionally on many pool states.
+        Amounts are given as FixedPoint values, or as integers of their scaled value.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[FixedPoint] | np.ndarray
+            The amount of bonds to close for each row.
+        open_share_prices: Sequence[FixedPoint] | np.ndarray
+            The share price when the short was opened for each row.
+        close_share_prices: Sequence[FixedPoint] | np.ndarray
+            The share price when the short was closed for each row.
+        normalized_times_remaining: Sequence[FixedPoint] | np.ndarray
+            The time remaining before the short reaches maturity for each row,
+            normalized such that 0 is at opening and 1 is at maturity.
+        pool_states: PoolState | Sequence[PoolState], optional
+            The state of the pool for all rows, or for each row.
+            If not given, use the current pool state for all rows.
+
+        Returns
+        -------
+        np.ndarray
+            The amount of shares returned for each row, as an object array of FixedPoint.
+        """
+        bond_amounts_scaled = _to_scaled_strings(bond_amounts)
+        num_rows = len(bond_amounts_scaled)
+        pool_states = self._broadcast_pool_states(pool_states, num_rows)
+        return _calc_close_short_batch(
+            pool_states,
+            bond_amounts_scaled,
+            _to_scaled_strings(open_share_prices, num_rows),
+            _to_scaled_strings(close_share_prices, num_rows),
+            _to_scaled_strings(normalized_times_remaining, num_rows),
+        )
+
+    def calc_max_long_batch(
+        self, budgets: BatchAmounts, pool_states: PoolState | Sequence[PoolState] | None = None
+    ) -> np.ndarray:
+        """Calculate the maximum allowable long for each of many budgets, and optionally on many pool states.
+        Amounts are given as FixedPoint values, or as integers of their scaled value.
+
+        Arguments
+        ---------
+        budgets: Sequence[FixedPoint] | np.ndarray
+            How much money the agent is able to spend, in base, for each row.
+        pool_states: PoolState | Sequence[PoolState], optional
+            The state of the pool for all rows, or for each row.
+            If not given, use the current pool state for all rows.
+
+        Returns
+        -------
+        np.ndarray
+            The maximum long, in units of base, for each row, as an object array of FixedPoint.
+        """
+        budgets_scaled = _to_scaled_strings(budgets)
+        pool_states = self._broadcast_pool_states(pool_states, len(budgets_scaled))
+        return _calc_max_long_batch(pool_states, budgets_scaled)
+
+    def calc_max_short_batch(
+        self, budgets: BatchAmounts, pool_states: PoolState | Sequence[PoolState] | None = None
+    ) -> np.ndarray:
+        """Calculate the maximum allowable short for each of many budgets, and optionally on many pool states.
+        Amounts are given as FixedPoint values, or as integers of their scaled value.
+
+        Arguments
+        ---------
+        budgets: Sequence[FixedPoint] | np.ndarray
+            How much money the agent is able to spend, in base, for each row.
+        pool_states: PoolState | Sequence[PoolState], optional
+            The state of the pool for all rows, or for each row.
+            If not given, use the current pool state for all rows.
+
+        Returns
+        -------
+        np.ndarray
+            The maximum short, in units of bonds, for each row, as an object array of FixedPoint.
+        """
+        budgets_scaled = _to_scaled_strings(budgets)
+        pool_states = self._broadcast_pool_states(pool_states, len(budgets_scaled))
+        return _calc_max_short_batch(pool_states, budgets_scaled)
+
+    def _broadcast_pool_states(
+        self, pool_states: PoolState | Sequence[PoolState] | None, num_rows: int
+    ) -> Sequence[PoolState]:
+        """Gets the pool state of each row of a batch, using the current pool state if none are given."""
+        if pool_states is None:
+            pool_states = self.current_pool_state
+        if isinstance(pool_states, PoolState):
+            return [pool_states] * num_rows
+        if len(pool_states) != num_rows:
+            raise ValueError(f"Expected {num_rows} pool states, got {len(pool_states)}.")
+        return pool_states
+
+
+def _to_scaled_strings(amounts: BatchAmounts, num_rows: int | None = None) -> list[str]:
+    """Converts FixedPoint values, or integers of their scaled value, to the scaled strings expected by hyperdrivepy."""
+    scaled_strings = []
+    for amount in amounts:
+        if isinstance(amount, FixedPoint):
+            scaled_strings.append(str(amount.scaled_value))
+        elif isinstance(amount, (int, np.integer)) and not isinstance(amount, bool):
+            scaled_strings.append(str(int(amount)))
+        else:
+            raise TypeError(f"Batch amounts must be FixedPoint or scaled integers, got {type(amount)=}.")
+    if num_rows is not None and len(scaled_strings) != num_rows:
+        raise ValueError(f"Expected {num_rows} amounts, got {len(scaled_strings)}.")
+    return scaled_strings
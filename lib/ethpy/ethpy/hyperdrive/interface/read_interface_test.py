@@ -1,12 +1,16 @@
 """Tests for hyperdrive_read_interface.py."""
 from __future__ import annotations
 
+import asyncio
 from copy import deepcopy
 from dataclasses import fields
 from typing import cast
 
+import numpy as np
+from eth_account import Account
+from ethpy.base import set_anvil_account_balance, smart_contract_transact
 from fixedpointmath import FixedPoint
-from hypertypes.fixedpoint_types import FeesFP
+from hypertypes.fixedpoint_types import FeesFP, PoolInfoFP
 from hypertypes.types import Checkpoint, PoolConfig
 from hypertypes.utilities.conversions import (
     checkpoint_to_fixedpoint,
@@ -15,9 +19,12 @@ from hypertypes.utilities.conversions import (
 )
 
 from .read_interface import HyperdriveReadInterface
+from .read_write_interface import HyperdriveReadWriteInterface
 
 # we need to use the outer name for fixtures
 # pylint: disable=redefined-outer-name
+# we access the calc cache to check it
+# pylint: disable=protected-access
 
 
 class TestHyperdriveReadInterface:
@@ -84,6 +91,121 @@ class TestHyperdriveReadInterface:
         _ = hyperdrive_read_interface.calc_max_short(FixedPoint(1000))
         _ = hyperdrive_read_interface.calc_present_value()
 
+    def test_calc_cache(self, hyperdrive_read_interface: HyperdriveReadInterface):
+        """Check that calc results on the current pool state are cached, and hypothetical states are not."""
+        pool_state = hyperdrive_read_interface.current_pool_state
+        max_long = hyperdrive_read_interface.calc_max_long(FixedPoint(1000), pool_state)
+        assert hyperdrive_read_interface._calc_cache.block_number == pool_state.block_number
+        assert hyperdrive_read_interface.calc_max_long(FixedPoint(1000), pool_state) == max_long
+        # A modified copy of the pool state is computed without the cache
+        hypothetical_pool_state = deepcopy(pool_state)
+        hypothetical_pool_state.pool_info.share_reserves *= FixedPoint(2)
+        assert hyperdrive_read_interface.calc_max_long(FixedPoint(1000), hypothetical_pool_state) != max_long
+
+    def test_batch_calcs(self, hyperdrive_read_interface: HyperdriveReadInterface):
+        """Check that batch calcs match calling the single calcs for each row."""
+        amounts = [FixedPoint(10), FixedPoint(100), FixedPoint(1000)]
+        pool_state = hyperdrive_read_interface.current_pool_state
+        open_longs = hyperdrive_read_interface.calc_open_long_batch(amounts)
+        assert list(open_longs) == [hyperdrive_read_interface.calc_open_long(amount) for amount in amounts]
+        # Amounts can also be given as scaled integers, with a pool state per row
+        open_shorts = hyperdrive_read_interface.calc_open_short_batch(
+            np.array([amount.scaled_value for amount in amounts]), [pool_state] * len(amounts)
+        )
+        assert list(open_shorts) == [hyperdrive_read_interface.calc_open_short(amount) for amount in amounts]
+        max_longs = hyperdrive_read_interface.calc_max_long_batch(amounts)
+        assert list(max_longs) == [hyperdrive_read_interface.calc_max_long(amount) for amount in amounts]
+
+    def test_reserves_to_hit_target_rate(self, hyperdrive_read_interface: HyperdriveReadInterface):
+        """Check that the reserves from the target rate solver hit the target rate."""
+        for target_rate in [FixedPoint("0.03"), FixedPoint("0.07")]:
+            pool_state = deepcopy(hyperdrive_read_interface.current_pool_state)
+            shares_needed, bonds_needed, iterations = hyperdrive_read_interface.calc_reserves_to_hit_target_rate(
+                target_rate
+            )
+            assert iterations < 50
+            pool_state.pool_info.share_reserves += shares_needed
+            pool_state.pool_info.bond_reserves += bonds_needed
+            fixed_rate = hyperdrive_read_interface.calc_fixed_rate(pool_state)
+            assert abs(fixed_rate - target_rate) <= FixedPoint(1e-16)
+
+    def test_offline_trades(self, hyperdrive_read_interface: HyperdriveReadInterface):
+        """Check that trades applied offline move the pool in the expected direction."""
+        pool_state = hyperdrive_read_interface.current_pool_state
+        share_reserves = pool_state.pool_info.share_reserves
+        fixed_rate = hyperdrive_read_interface.calc_fixed_rate(pool_state)
+
+        long_state, long_receipt = hyperdrive_read_interface.apply_open_long(FixedPoint(10_000))
+        assert long_receipt.bond_amount == hyperdrive_read_interface.calc_open_long(FixedPoint(10_000))
+        assert long_state.pool_info.longs_outstanding == long_receipt.bond_amount
+        assert hyperdrive_read_interface.calc_fixed_rate(long_state) < fixed_rate
+        # The given pool state isn't modified
+        assert pool_state.pool_info.share_reserves == share_reserves
+        close_state, close_receipt = hyperdrive_read_interface.apply_close_long(
+            long_receipt.bond_amount, long_receipt.maturity_time_seconds, long_state
+        )
+        assert close_receipt.base_amount < FixedPoint(10_000)
+        assert close_state.pool_info.longs_outstanding == FixedPoint(0)
+        assert abs(hyperdrive_read_interface.calc_fixed_rate(close_state) - fixed_rate) < FixedPoint("0.0001")
+
+        short_state, short_receipt = hyperdrive_read_interface.apply_open_short(FixedPoint(10_000))
+        assert hyperdrive_read_interface.calc_fixed_rate(short_state) > fixed_rate
+        close_state, _ = hyperdrive_read_interface.apply_close_short(
+            FixedPoint(10_000), short_receipt.maturity_time_seconds, pool_state=short_state
+        )
+        assert close_state.pool_info.shorts_outstanding == FixedPoint(0)
+
+        lp_state, lp_receipt = hyperdrive_read_interface.apply_add_liquidity(FixedPoint(10_000))
+        assert lp_state.pool_info.share_reserves > share_reserves
+        assert abs(hyperdrive_read_interface.calc_fixed_rate(lp_state) - fixed_rate) <= FixedPoint(1e-16)
+        remove_state, remove_receipt = hyperdrive_read_interface.apply_remove_liquidity(lp_receipt.lp_amount, lp_state)
+        assert abs(remove_receipt.base_amount - FixedPoint(10_000)) < FixedPoint("0.001")
+        assert abs(remove_state.pool_info.share_reserves - share_reserves) < FixedPoint("0.001")
+
+    def test_offline_trades_match_chain(self, hyperdrive_read_write_interface: HyperdriveReadWriteInterface):
+        """Check that trades applied offline result in the same pool info as the trades executed on the chain."""
+        interface = hyperdrive_read_write_interface
+        agent = Account.create()
+        set_anvil_account_balance(interface.web3, agent.address, 10**19)
+        base_amount = FixedPoint(100_000)
+        smart_contract_transact(
+            interface.web3,
+            interface.base_token_contract,
+            agent,
+            "mint(address,uint256)",
+            agent.address,
+            base_amount.scaled_value,
+        )
+        smart_contract_transact(
+            interface.web3,
+            interface.base_token_contract,
+            agent,
+            "approve",
+            interface.hyperdrive_contract.address,
+            base_amount.scaled_value,
+        )
+
+        pool_state = interface.current_pool_state
+        offline_state, offline_receipt = interface.apply_open_long(FixedPoint(10_000), pool_state)
+        receipt = asyncio.run(interface.async_open_long(agent, FixedPoint(10_000)))
+        assert abs(offline_receipt.bond_amount - receipt.bond_amount) <= receipt.bond_amount * FixedPoint("0.00001")
+        _assert_pool_info_close(offline_state.pool_info, interface.current_pool_state.pool_info)
+
+        pool_state = interface.current_pool_state
+        offline_state, _ = interface.apply_open_short(FixedPoint(5_000), pool_state)
+        asyncio.run(interface.async_open_short(agent, FixedPoint(5_000)))
+        _assert_pool_info_close(offline_state.pool_info, interface.current_pool_state.pool_info)
+
+        pool_state = interface.current_pool_state
+        offline_state, _ = interface.apply_add_liquidity(FixedPoint(10_000), pool_state)
+        asyncio.run(interface.async_add_liquidity(agent, FixedPoint(10_000), FixedPoint(0), FixedPoint(1)))
+        _assert_pool_info_close(offline_state.pool_info, interface.current_pool_state.pool_info)
+
+        pool_state = interface.current_pool_state
+        offline_state, _ = interface.apply_close_long(receipt.bond_amount, receipt.maturity_time_seconds, pool_state)
+        asyncio.run(interface.async_close_long(agent, receipt.bond_amount, receipt.maturity_time_seconds))
+        _assert_pool_info_close(offline_state.pool_info, interface.current_pool_state.pool_info)
+
     def test_deployed_fixed_rate(self, hyperdrive_read_interface: HyperdriveReadInterface):
         """Check that the bonds calculated actually hit the target rate."""
         assert abs(hyperdrive_read_interface.calc_fixed_rate() - FixedPoint(0.05)) < FixedPoint(1e-16)
@@ -196,3 +318,17 @@ class TestHyperdriveReadInterface:
         # TODO there are rounding errors between api spot price and fixed rates
         assert abs(api_spot_price - expected_spot_price) <= FixedPoint(1e-16)
         assert abs(api_fixed_rate - expected_fixed_rate) <= FixedPoint(1e-16)
+
+
+def _assert_pool_info_close(
+    offline_pool_info: PoolInfoFP, chain_pool_info: PoolInfoFP, tolerance: FixedPoint = FixedPoint("0.00001")
+) -> None:
+    """Check that each field of the pool info matches, up to a relative tolerance.
+
+    The trades on the chain are executed in the next block, so interest accrues between the offline and the chain state.
+    """
+    for field in fields(PoolInfoFP):
+        offline_value = getattr(offline_pool_info, field.name)
+        chain_value = getattr(chain_pool_info, field.name)
+        max_difference = tolerance * max(abs(chain_value), FixedPoint(1))
+        assert abs(offline_value - chain_value) <= max_difference, f"{field.name}: {offline_value=} != {chain_value=}"
@@ -27,6 +27,7 @@ if TYPE_CHECKING:
     from eth_typing import BlockNumber
     from ethpy import EthConfig
     from ethpy.hyperdrive.addresses import HyperdriveAddresses
+    from ethpy.hyperdrive.state import PoolState
     from fixedpointmath import FixedPoint
     from web3 import Web3
     from web3.types import Nonce
@@ -67,6 +68,7 @@ class HyperdriveReadWriteInterface(HyperdriveReadInterface):
         """
         super().__init__(eth_config, addresses, web3, read_retry_count)
         self.write_retry_count = write_retry_count
+        self._read_interface: HyperdriveReadInterface | None = None
 
     def get_read_interface(self) -> HyperdriveReadInterface:
         """Return the current instance as an instance of the parent (HyperdriveReadInterface) class.
@@ -76,7 +78,31 @@ class HyperdriveReadWriteInterface(HyperdriveReadInterface):
         HyperdriveReadInterface
             This instantiated object, but as a ReadInterface.
         """
-        return HyperdriveReadInterface(self.eth_config, self.addresses, self.web3, self.read_retry_count)
+        if self._read_interface is None:
+            self._read_interface = HyperdriveReadInterface(
+                self.eth_config, self.addresses, self.web3, self.read_retry_count
+            )
+            # Share calc results, since agents reading the same block often make the same calls
+            self._read_interface._calc_cache = self._calc_cache  # pylint: disable=protected-access
+        return self._read_interface
+
+    def set_current_pool_state(self, pool_state: PoolState) -> None:
+        """Use a pool state that was queried elsewhere as the current pool state, also for the read interface.
+
+        Arguments
+        ---------
+        pool_state: PoolState
+            The state of the pool at the latest block.
+        """
+        super().set_current_pool_state(pool_state)
+        if self._read_interface is not None:
+            self._read_interface.set_current_pool_state(pool_state)
+
+    def reset_current_pool_state(self) -> None:
+        """Drop the cached pool state and calc results of this interface and of its read interface."""
+        super().reset_current_pool_state()
+        if self._read_interface is not None:
+            self._read_interface.reset_current_pool_state()
 
     def create_checkpoint(
         self, sender: LocalAccount, block_number: BlockNumber | None = None, checkpoint_time: int | None = None
@@ -10,6 +10,7 @@ from eth_utils.crypto import keccak
 from eth_utils.curried import text_if_str
 from ethpy.base import set_anvil_account_balance
 from fixedpointmath import FixedPoint
+from web3.types import RPCEndpoint
 
 from .read_write_interface import HyperdriveReadWriteInterface
 
@@ -31,3 +32,21 @@ class TestHyperdriveReadWriteInterface:
         set_anvil_account_balance(hyperdrive_read_write_interface.web3, sender.address, 10**19)
         hyperdrive_read_write_interface.set_variable_rate(sender, new_rate)
         assert hyperdrive_read_write_interface.get_variable_rate() == new_rate
+
+    def test_reset_current_pool_state(self, hyperdrive_read_write_interface: HyperdriveReadWriteInterface):
+        """The read interface shares the state reset, so neither serves a state from a reverted block."""
+        interface = hyperdrive_read_write_interface
+        read_interface = interface.get_read_interface()
+        snapshot_id = interface.web3.provider.make_request(method=RPCEndpoint("evm_snapshot"), params=[])["result"]
+        snapshot_block_number = interface.current_pool_state.block_number
+        sender: LocalAccount = Account().create()
+        set_anvil_account_balance(interface.web3, sender.address, 10**19)
+        interface.set_variable_rate(sender, FixedPoint("0.1"))
+        assert read_interface.current_pool_state.block_number > snapshot_block_number
+        _ = read_interface.calc_spot_price()
+        interface.web3.provider.make_request(method=RPCEndpoint("evm_revert"), params=[snapshot_id])
+        interface.reset_current_pool_state()
+        assert read_interface.last_state_block_number == 0
+        assert read_interface._calc_cache.block_number is None  # pylint: disable=protected-access
+        assert interface.current_pool_state.block_number == snapshot_block_number
+        assert read_interface.current_pool_state.block_number == snapshot_block_number
@@ -0,0 +1,948 @@
+"""A read-write interface to a simulated Hyperdrive pool, which applies trades with the offline pool math."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Callable, cast
+
+import hyperdrivepy
+from ethpy import EthConfig
+from ethpy.hyperdrive.addresses import HyperdriveAddresses
+from ethpy.hyperdrive.assets import BASE_TOKEN_SYMBOL, AssetIdPrefix, encode_asset_id
+from fixedpointmath import FixedPoint
+from hypertypes.fixedpoint_types import CheckpointFP, FeesFP, PoolConfigFP, PoolInfoFP
+from web3.types import BlockData, Timestamp
+
+from ..receipt_breakdown import ReceiptBreakdown
+from ..state import PoolState, PoolStateHistory
+from ._calc_cache import BlockCalcCache
+from ._mock_contract import _calc_bonds_given_shares_and_rate, _calc_checkpoint_id, _calc_present_value
+from ._offline_trades import (
+    _apply_add_liquidity,
+    _apply_close_long,
+    _apply_close_short,
+    _apply_open_long,
+    _apply_open_short,
+    _apply_redeem_withdraw_shares,
+    _apply_remove_liquidity,
+)
+from .read_write_interface import HyperdriveReadWriteInterface
+
+# We have no control over the number of arguments since it is specified by the read-write interface
+# pylint: disable=too-many-arguments
+# We only worry about protected access for anyone outside of this folder.
+# pylint: disable=protected-access
+
+
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
+    from eth_typing import BlockNumber
+    from web3.types import BlockIdentifier, Nonce
+
+    from .read_interface import HyperdriveReadInterface
+
+SECONDS_PER_YEAR = 60 * 60 * 24 * 365
+# The zero address, which is used for all of the contracts of the simulated pool
+SIMULATED_CONTRACT_ADDRESS = "0x" + "0" * 40
+
+
+class UnsupportedSimulatedFeatureError(NotImplementedError):
+    """Raised when using a feature that needs a chain, such as the web3 provider, the contracts or the database,
+    with a simulated pool, which only exists in memory."""
+
+
+@dataclass
+class SimulatedPosition:
+    """The amount of a token held by an account on the simulated chain.
+
+    Attributes
+    ----------
+    token_type: str
+        The token type, with longs and shorts encoded as `LONG-{maturity_time}` and `SHORT-{maturity_time}`.
+    base_token_type: str
+        The type of the token, one of the base token symbol, `LONG`, `SHORT`, `LP` or `WITHDRAWAL_SHARE`.
+    amount: FixedPoint
+        The amount of the token.
+    maturity_time: int | None
+        The maturity time of longs and shorts in epoch seconds, None for other tokens.
+    """
+
+    token_type: str
+    base_token_type: str
+    amount: FixedPoint
+    maturity_time: int | None = None
+
+
+@dataclass
+class SimulatedWalletDelta:
+    """A change in the amount of a token held by an account, caused by a trade mined in a block.
+
+    Attributes
+    ----------
+    block_number: int
+        The block the trade was mined in.
+    wallet_address: str
+        The address of the account.
+    position: SimulatedPosition
+        The token that changed, with the amount of the token held after the trade.
+    delta: FixedPoint
+        The change in the amount of the token.
+    """
+
+    block_number: int
+    wallet_address: str
+    position: SimulatedPosition
+    delta: FixedPoint
+
+
+@dataclass
+class _SimulatedAccount:
+    """The balances of an account on the simulated chain."""
+
+    base: FixedPoint = FixedPoint(0)
+    eth: FixedPoint = FixedPoint(0)
+    # Bond amounts keyed by maturity time
+    longs: dict[int, FixedPoint] = field(default_factory=dict)
+    shorts: dict[int, FixedPoint] = field(default_factory=dict)
+    lp_shares: FixedPoint = FixedPoint(0)
+    withdrawal_shares: FixedPoint = FixedPoint(0)
+
+    def get_positions(self) -> dict[str, SimulatedPosition]:
+        """Get the positions of the account keyed by token type, leaving out empty LP and withdrawal shares."""
+        positions = [SimulatedPosition(BASE_TOKEN_SYMBOL, BASE_TOKEN_SYMBOL, self.base)]
+        positions += [
+            SimulatedPosition(f"LONG-{maturity_time}", "LONG", amount, maturity_time)
+            for maturity_time, amount in self.longs.items()
+        ]
+        positions += [
+            SimulatedPosition(f"SHORT-{maturity_time}", "SHORT", amount, maturity_time)
+            for maturity_time, amount in self.shorts.items()
+        ]
+        if self.lp_shares > FixedPoint(0):
+            positions.append(SimulatedPosition("LP", "LP", self.lp_shares))
+        if self.withdrawal_shares > FixedPoint(0):
+            positions.append(SimulatedPosition("WITHDRAWAL_SHARE", "WITHDRAWAL_SHARE", self.withdrawal_shares))
+        return {position.token_type: position for position in positions}
+
+
+def _unsupported_property(name: str) -> property:
+    """A property for an attribute of the read-write interface that the simulated pool doesn't have."""
+
+    def getter(_) -> Any:
+        raise UnsupportedSimulatedFeatureError(f"The simulated pool has no {name}, since nothing is sent to a chain.")
+
+    return property(getter, doc=f"The simulated pool has no {name}; raises `UnsupportedSimulatedFeatureError`.")
+
+
+class SimulatedHyperdriveReadWriteInterface(HyperdriveReadWriteInterface):
+    """Read-write end-point API for a simulated Hyperdrive pool.
+
+    Instead of connecting to a chain, the pool state, the balances of accounts and the blocks are kept in memory.
+    Trades are applied with the offline pool math, and every trade or checkpoint mines a new block,
+    similar to an anvil chain with automining. Interest accrues on the share price as blocks are mined.
+    The web3 provider and the contracts of the read-write interface raise `UnsupportedSimulatedFeatureError`.
+
+    .. note:: The simulated pool doesn't retire matured positions when a checkpoint is created; matured positions
+        are settled at par when they are closed, and the LP share price is updated as blocks are mined.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=super-init-not-called
+
+    # There is no provider or contracts, since nothing is sent to a chain
+    web3 = _unsupported_property("web3 provider")
+    base_token_contract = _unsupported_property("base token contract")
+    deployed_hyperdrive_pool = _unsupported_property("deployed hyperdrive pool")
+    hyperdrive_contract = _unsupported_property("hyperdrive contract")
+    hyperdrive_factory_contract = _unsupported_property("hyperdrive factory contract")
+    yield_address = _unsupported_property("yield source")
+    yield_contract = _unsupported_property("yield contract")
+
+    def __init__(
+        self,
+        pool_config: PoolConfigFP | None = None,
+        initial_liquidity: FixedPoint = FixedPoint(100_000_000),
+        initial_fixed_rate: FixedPoint = FixedPoint("0.05"),
+        initial_variable_rate: FixedPoint = FixedPoint("0.05"),
+        block_time: int = 12,
+        genesis_timestamp: int | None = None,
+        eth_config: EthConfig | None = None,
+    ) -> None:
+        """Initialize the simulated pool, with the initial liquidity provided by the governance address.
+
+        Arguments
+        ---------
+        pool_config: PoolConfigFP, optional
+            The config of the simulated pool.
+            If not given, the defaults of an interactive hyperdrive pool are used.
+        initial_liquidity: FixedPoint, optional
+            The amount of base provided for the initial pool liquidity. Defaults to 100 million.
+        initial_fixed_rate: FixedPoint, optional
+            The fixed rate of the pool on initialization. Defaults to 5%.
+        initial_variable_rate: FixedPoint, optional
+            The starting variable rate for the yield source. Defaults to 5%.
+        block_time: int, optional
+            The number of seconds between mined blocks. Defaults to 12.
+        genesis_timestamp: int, optional
+            The timestamp of the first block. Defaults to the current time.
+        eth_config: EthConfig, optional
+            Configuration dataclass for the ethereum environment. Only `preview_before_trade` is used.
+            Defaults to the default EthConfig.
+        """
+        self.eth_config = EthConfig() if eth_config is None else eth_config
+        self.addresses = HyperdriveAddresses(
+            base_token=SIMULATED_CONTRACT_ADDRESS,  # type: ignore
+            hyperdrive_factory=SIMULATED_CONTRACT_ADDRESS,  # type: ignore
+            mock_hyperdrive=SIMULATED_CONTRACT_ADDRESS,  # type: ignore
+            mock_hyperdrive_math=None,
+        )
+        self.read_retry_count = None
+        self.write_retry_count = None
+        self.block_time = block_time
+        if pool_config is None:
+            pool_config = build_default_pool_config(initial_fixed_rate)
+        self.pool_config = pool_config
+        self._accounts: dict[str, _SimulatedAccount] = {}
+        # The changes in the positions of accounts made by each trade, in the order they were mined
+        self.wallet_deltas: list[SimulatedWalletDelta] = []
+        # Share prices and exposures of the checkpoints that have been minted, keyed by checkpoint time
+        self._checkpoint_share_prices: dict[int, FixedPoint] = {}
+        self._checkpoint_exposures: dict[int, FixedPoint] = {}
+        # The state of the pool at every mined block
+        self.pool_state_history = PoolStateHistory(pool_config)
+        if genesis_timestamp is None:
+            genesis_timestamp = int(time.time())
+        self._current_pool_state = self._initialize_pool(
+            initial_liquidity, initial_fixed_rate, initial_variable_rate, genesis_timestamp
+        )
+        self.pool_state_history.append(self._current_pool_state)
+        self.last_state_block_number = self._current_pool_state.block_number
+        self._calc_cache = BlockCalcCache()
+        self._read_interface = None
+
+    def _initialize_pool(
+        self,
+        initial_liquidity: FixedPoint,
+        initial_fixed_rate: FixedPoint,
+        initial_variable_rate: FixedPoint,
+        genesis_timestamp: int,
+    ) -> PoolState:
+        """Build the pool state after the pool is initialized, crediting the LP shares to the governance address."""
+        share_price = self.pool_config.initial_share_price
+        share_reserves = initial_liquidity / share_price
+        checkpoint_time = int(_calc_checkpoint_id(self.pool_config.checkpoint_duration, Timestamp(genesis_timestamp)))
+        zero = FixedPoint(0)
+        pool_state = PoolState(
+            block=_build_block(0, genesis_timestamp),
+            pool_config=self.pool_config,
+            pool_info=PoolInfoFP(
+                share_reserves=share_reserves,
+                share_adjustment=zero,
+                zombie_share_reserves=zero,
+                bond_reserves=zero,
+                lp_total_supply=share_reserves - self.pool_config.minimum_share_reserves,
+                share_price=share_price,
+                longs_outstanding=zero,
+                long_average_maturity_time=zero,
+                shorts_outstanding=zero,
+                short_average_maturity_time=zero,
+                withdrawal_shares_ready_to_withdraw=zero,
+                withdrawal_shares_proceeds=zero,
+                lp_share_price=share_price,
+                long_exposure=zero,
+            ),
+            checkpoint=CheckpointFP(share_price=share_price),
+            exposure=zero,
+            variable_rate=initial_variable_rate,
+            vault_shares=share_reserves,
+            total_supply_withdrawal_shares=zero,
+            hyperdrive_base_balance=zero,
+            hyperdrive_eth_balance=zero,
+            gov_fees_accrued=zero,
+        )
+        pool_state.pool_info.bond_reserves = _calc_bonds_given_shares_and_rate(
+            pool_state, initial_fixed_rate, share_reserves
+        )
+        self._checkpoint_share_prices[checkpoint_time] = share_price
+        self._get_account(self.pool_config.governance).lp_shares = pool_state.pool_info.lp_total_supply
+        return pool_state
+
+    def _ensure_current_state(self) -> bool:
+        """The simulated pool state is always current, since it is updated as blocks are mined.
+
+        Returns
+        -------
+        bool
+            False, since the state never needs to be updated.
+        """
+        return False
+
+    def get_read_interface(self) -> HyperdriveReadInterface:
+        """Return the current instance, which reads from the same simulated pool.
+
+        Returns
+        -------
+        HyperdriveReadInterface
+            This instantiated object.
+        """
+        return self
+
+    def get_current_block(self) -> BlockData:
+        """Get the latest mined block.
+
+        Returns
+        -------
+        BlockData
+            A web3py dataclass containing information about the latest mined block.
+        """
+        return self._current_pool_state.block
+
+    def get_block(self, block_identifier: BlockIdentifier) -> BlockData:
+        """Get the block for the provided identifier.
+
+        Only the "latest" identifier and block numbers are supported.
+
+        Arguments
+        ---------
+        block_identifier: BlockIdentifier
+            Either "latest" or a block number.
+
+        Returns
+        -------
+        BlockData
+            A web3py dataclass containing block information.
+        """
+        return self._get_pool_state(block_identifier).block
+
+    def get_hyperdrive_state(self, block: BlockData | None = None) -> PoolState:
+        """Get the Hyperdrive pool and block state from the history of the simulated pool.
+
+        Arguments
+        ---------
+        block: BlockData, optional
+            A web3py dataclass for storing block information.
+            Defaults to the latest block.
+
+        Returns
+        -------
+        PoolState
+            A dataclass containing PoolInfo, PoolConfig, Checkpoint, and Block
+            information that is synced to a given block number.
+        """
+        if block is None:
+            return self._current_pool_state
+        return self._get_pool_state(self.get_block_number(block))
+
+    def _get_pool_state(self, block_identifier: BlockIdentifier) -> PoolState:
+        """Get the pool state for "latest" or a block number."""
+        if block_identifier == "latest" or block_identifier == self._current_pool_state.block_number:
+            return self._current_pool_state
+        if not isinstance(block_identifier, int) or not 0 <= block_identifier < self._current_pool_state.block_number:
+            raise ValueError(
+                f"The simulated chain only supports 'latest' or mined block numbers, not {block_identifier=}."
+            )
+        return self.pool_state_history.get_pool_state(block_identifier)
+
+    def get_total_supply_withdrawal_shares(self, block_number: BlockNumber | None) -> FixedPoint:
+        """See the read interface for documentation."""
+        return self._get_pool_state("latest" if block_number is None else block_number).total_supply_withdrawal_shares
+
+    def get_vault_shares(self, block_number: BlockNumber | None) -> FixedPoint:
+        """See the read interface for documentation."""
+        return self._get_pool_state("latest" if block_number is None else block_number).vault_shares
+
+    def get_variable_rate(self, block_number: BlockNumber | None = None) -> FixedPoint:
+        """See the read interface for documentation."""
+        return self._get_pool_state("latest" if block_number is None else block_number).variable_rate
+
+    def get_eth_base_balances(self, agent: LocalAccount) -> tuple[FixedPoint, FixedPoint]:
+        """Get the agent's balances on the simulated chain.
+
+        Arguments
+        ---------
+        agent: LocalAccount
+            The account for the agent.
+
+        Returns
+        -------
+        tuple[FixedPoint]
+            A tuple containing the [agent_eth_balance, agent_base_balance].
+        """
+        account = self._get_account(agent.address)
+        return account.eth, account.base
+
+    def get_hyperdrive_eth_balance(self) -> FixedPoint:
+        """See the read interface for documentation."""
+        return self._current_pool_state.hyperdrive_eth_balance
+
+    def get_hyperdrive_base_balance(self, block_number: BlockNumber | None = None) -> FixedPoint:
+        """See the read interface for documentation."""
+        return self._get_pool_state("latest" if block_number is None else block_number).hyperdrive_base_balance
+
+    def get_gov_fees_accrued(self, block_number: BlockNumber | None = None) -> FixedPoint:
+        """See the read interface for documentation."""
+        return self._get_pool_state("latest" if block_number is None else block_number).gov_fees_accrued
+
+    def get_checkpoint_share_price(self, checkpoint_time: int) -> FixedPoint:
+        """Get the share price of a checkpoint, which is zero if the checkpoint hasn't been minted.
+
+        Arguments
+        ---------
+        checkpoint_time: int
+            The checkpoint time.
+
+        Returns
+        -------
+        FixedPoint
+            The share price of the checkpoint.
+        """
+        return self._checkpoint_share_prices.get(checkpoint_time, FixedPoint(0))
+
+    def fund_account(
+        self, address: str, base: FixedPoint | None = None, eth: FixedPoint | None = None
+    ) -> tuple[FixedPoint, FixedPoint]:
+        """Add base and eth to an account on the simulated chain, without mining a block.
+
+        Arguments
+        ---------
+        address: str
+            The address of the account.
+        base: FixedPoint, optional
+            The amount of base to add. Defaults to none.
+        eth: FixedPoint, optional
+            The amount of eth to add. Defaults to none.
+
+        Returns
+        -------
+        tuple[FixedPoint, FixedPoint]
+            The [eth, base] balances of the account after funding.
+        """
+        account = self._get_account(address)
+        if base is not None:
+            account.base += base
+        if eth is not None:
+            account.eth += eth
+        return account.eth, account.base
+
+    def get_positions(self, address: str) -> list[SimulatedPosition]:
+        """Get the current positions of an account on the simulated chain.
+
+        Arguments
+        ---------
+        address: str
+            The address of the account.
+
+        Returns
+        -------
+        list[SimulatedPosition]
+            The base balance of the account, followed by its open longs, shorts, LP and withdrawal shares.
+        """
+        return list(self._get_account(address).get_positions().values())
+
+    def calc_position_value(self, position: SimulatedPosition, pool_state: PoolState | None = None) -> FixedPoint:
+        """Mark a position to market.
+
+        Base is valued at its amount, longs and shorts at the base they would return if they were closed,
+        and LP and withdrawal shares at the LP share price. Positions that can't be closed,
+        e.g. dust below the minimum transaction amount, are valued at zero.
+
+        Arguments
+        ---------
+        position: SimulatedPosition
+            The position to value.
+        pool_state: PoolState, optional
+            The state of the pool to value the position on. Defaults to the current pool state.
+
+        Returns
+        -------
+        FixedPoint
+            The value of the position in base.
+        """
+        if pool_state is None:
+            pool_state = self._current_pool_state
+        if position.base_token_type in ("LP", "WITHDRAWAL_SHARE"):
+            return position.amount * pool_state.pool_info.lp_share_price
+        if position.maturity_time is None or position.amount == FixedPoint(0):
+            return position.amount
+        try:
+            if position.base_token_type == "LONG":
+                _, receipt = self.apply_close_long(position.amount, position.maturity_time, pool_state)
+            else:
+                open_share_price = self._checkpoint_share_prices.get(
+                    position.maturity_time - self.pool_config.position_duration, None
+                )
+                _, receipt = self.apply_close_short(
+                    position.amount, position.maturity_time, open_share_price, pool_state
+                )
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            # Panics in hyperdrivepy aren't subclasses of Exception
+            if not isinstance(exc, Exception) and type(exc).__name__ != "PanicException":
+                raise
+            return FixedPoint(0)
+        return receipt.base_amount
+
+    def _get_account(self, address: str) -> _SimulatedAccount:
+        """Get the balances of an address, creating an empty account for new addresses."""
+        account = self._accounts.get(address, None)
+        if account is None:
+            account = _SimulatedAccount()
+            self._accounts[address] = account
+        return account
+
+    def mine_block(self, timestamp: int | None = None) -> BlockData:
+        """Mine a new block, accruing interest on the share price since the last block.
+
+        Arguments
+        ---------
+        timestamp: int, optional
+            The timestamp of the new block, which must be later than the latest block.
+            Defaults to the timestamp of the latest block plus the block time.
+
+        Returns
+        -------
+        BlockData
+            The new block.
+        """
+        return self._mine_block(timestamp)
+
+    def _mine_block(self, timestamp: int | None = None, **changes: Any) -> BlockData:
+        """Mine a new block, with optional changes to the attributes of the pool state in the new block."""
+        pool_state = self._current_pool_state
+        previous_timestamp = int(pool_state.block_time)
+        if timestamp is None:
+            timestamp = previous_timestamp + self.block_time
+        if timestamp <= previous_timestamp:
+            raise ValueError(f"The new block {timestamp=} must be later than the latest block {previous_timestamp}.")
+        pool_info = replace(
+            pool_state.pool_info,
+            share_price=pool_state.pool_info.share_price
+            * (
+                FixedPoint(1)
+                + pool_state.variable_rate * FixedPoint(timestamp - previous_timestamp) / FixedPoint(SECONDS_PER_YEAR)
+            ),
+        )
+        # Keep the exposure of the checkpoint we leave, and enter the checkpoint of the new block
+        checkpoint_duration = self.pool_config.checkpoint_duration
+        previous_checkpoint_time = int(_calc_checkpoint_id(checkpoint_duration, Timestamp(previous_timestamp)))
+        checkpoint_time = int(_calc_checkpoint_id(checkpoint_duration, Timestamp(timestamp)))
+        checkpoint, exposure = pool_state.checkpoint, pool_state.exposure
+        if checkpoint_time != previous_checkpoint_time:
+            self._checkpoint_exposures[previous_checkpoint_time] = exposure
+            checkpoint = CheckpointFP(share_price=self._checkpoint_share_prices.get(checkpoint_time, FixedPoint(0)))
+            exposure = self._checkpoint_exposures.get(checkpoint_time, FixedPoint(0))
+        new_pool_state = replace(
+            pool_state,
+            block=_build_block(pool_state.block_number + 1, timestamp),
+            pool_info=pool_info,
+            checkpoint=checkpoint,
+            exposure=exposure,
+            **changes,
+        )
+        if pool_info.lp_total_supply > FixedPoint(0):
+            pool_info.lp_share_price = (
+                _calc_present_value(new_pool_state, timestamp) * pool_info.share_price / pool_info.lp_total_supply
+            )
+        self._current_pool_state = new_pool_state
+        self.last_state_block_number = new_pool_state.block_number
+        self.pool_state_history.append(new_pool_state)
+        return new_pool_state.block
+
+    def advance_time(self, time_delta: int, create_checkpoints: bool = True) -> list[ReceiptBreakdown]:
+        """Advance the time of the simulated chain, mining a block at the end.
+
+        Arguments
+        ---------
+        time_delta: int
+            The number of seconds to advance.
+        create_checkpoints: bool, optional
+            If set to true, will create the checkpoints that are passed while advancing time. Defaults to True.
+
+        Returns
+        -------
+        list[ReceiptBreakdown]
+            The created checkpoints.
+        """
+        end_timestamp = int(self._current_pool_state.block_time) + int(time_delta)
+        checkpoint_duration = self.pool_config.checkpoint_duration
+        checkpoint_events: list[ReceiptBreakdown] = []
+        if create_checkpoints:
+            checkpoint_time = int(_calc_checkpoint_id(checkpoint_duration, self._current_pool_state.block_time))
+            if checkpoint_time not in self._checkpoint_share_prices:
+                checkpoint_events.append(self._create_checkpoint(checkpoint_time))
+            # Mine a block at each checkpoint boundary, and create the checkpoint in it
+            checkpoint_time += checkpoint_duration
+            while checkpoint_time <= end_timestamp:
+                if checkpoint_time > self._current_pool_state.block_time:
+                    self.mine_block(checkpoint_time)
+                checkpoint_events.append(self._create_checkpoint(checkpoint_time))
+                checkpoint_time += checkpoint_duration
+        if end_timestamp > self._current_pool_state.block_time:
+            self.mine_block(end_timestamp)
+        return checkpoint_events
+
+    def create_checkpoint(
+        self, sender: LocalAccount, block_number: BlockNumber | None = None, checkpoint_time: int | None = None
+    ) -> ReceiptBreakdown:
+        """Create a Hyperdrive checkpoint, mining a new block.
+
+        Arguments
+        ---------
+        sender: LocalAccount
+            The sender account that is executing and signing the trade transaction.
+        block_number: BlockNumber, optional
+            The number for any kept block.
+            Defaults to the current block number.
+        checkpoint_time: int, optional
+            The checkpoint time to use. Defaults to the corresponding checkpoint for the provided block_number
+
+        Returns
+        -------
+        ReceiptBreakdown
+            A dataclass containing the checkpoint time, share price and matured positions.
+        """
+        if checkpoint_time is None:
+            block_timestamp = self._get_pool_state("latest" if block_number is None else block_number).block_time
+            checkpoint_time = int(_calc_checkpoint_id(self.pool_config.checkpoint_duration, block_timestamp))
+        return self._create_checkpoint(checkpoint_time)
+
+    def _create_checkpoint(self, checkpoint_time: int) -> ReceiptBreakdown:
+        """Mint a checkpoint, which keeps its share price if it already exists, and mine a new block."""
+        pool_state = self._current_pool_state
+        if checkpoint_time > pool_state.block_time:
+            raise ValueError(f"Can not create a checkpoint in the future, {checkpoint_time=}.")
+        share_price = self._checkpoint_share_prices.setdefault(checkpoint_time, pool_state.pool_info.share_price)
+        if checkpoint_time == _calc_checkpoint_id(self.pool_config.checkpoint_duration, pool_state.block_time):
+            self._current_pool_state = replace(pool_state, checkpoint=CheckpointFP(share_price=share_price))
+        maturity_time = checkpoint_time
+        trade_result = ReceiptBreakdown(
+            checkpoint_time=checkpoint_time,
+            share_price=share_price,
+            lp_share_price=pool_state.pool_info.lp_share_price,
+            matured_longs=sum(
+                (account.longs.get(maturity_time, FixedPoint(0)) for account in self._accounts.values()), FixedPoint(0)
+            ),
+            matured_shorts=sum(
+                (account.shorts.get(maturity_time, FixedPoint(0)) for account in self._accounts.values()),
+                FixedPoint(0),
+            ),
+        )
+        self.mine_block()
+        return trade_result
+
+    def set_variable_rate(self, sender: LocalAccount, new_rate: FixedPoint) -> None:
+        """Set the variable rate for the yield source, mining a new block.
+
+        Arguments
+        ---------
+        sender: LocalAccount
+            The sender account that is executing and signing the trade transaction.
+        new_rate: FixedPoint
+            The new variable rate for the yield source.
+        """
+        # Interest accrues at the old rate until the new block
+        self._mine_block(variable_rate=new_rate)
+
+    def _execute_trade(
+        self,
+        agent: LocalAccount,
+        apply_trade: Callable[[PoolState], tuple[PoolState, ReceiptBreakdown]],
+        update_account: Callable[[_SimulatedAccount, ReceiptBreakdown], None],
+        asset_id_prefix: AssetIdPrefix,
+        closed_maturity_time: int | None = None,
+        exposure_delta: FixedPoint = FixedPoint(0),
+    ) -> ReceiptBreakdown:
+        """Apply a trade to the pool and the agent's account, and mine a new block.
+
+        The account is only updated if the trade succeeds, and `update_account` raises a ValueError
+        before the pool state is committed for trades that the agent can't afford.
+        Trades that close a position pass its maturity time and the change in exposure of its checkpoint.
+        """
+        pool_state, trade_result = apply_trade(self._current_pool_state)
+        account = self._get_account(agent.address)
+        positions_before = account.get_positions()
+        update_account(account, trade_result)
+        if closed_maturity_time is not None:
+            self._update_past_checkpoint_exposure(pool_state, closed_maturity_time, exposure_delta)
+        if asset_id_prefix in (AssetIdPrefix.LP, AssetIdPrefix.WITHDRAWAL_SHARE):
+            trade_result.provider = agent.address
+        else:
+            trade_result.trader = agent.address
+            trade_result.asset_id = encode_asset_id(asset_id_prefix, trade_result.maturity_time_seconds)
+        # The trade can mint the checkpoint
+        checkpoint_time = int(_calc_checkpoint_id(self.pool_config.checkpoint_duration, pool_state.block_time))
+        self._checkpoint_share_prices.setdefault(checkpoint_time, pool_state.checkpoint.share_price)
+        self._current_pool_state = pool_state
+        block_number = self.mine_block()["number"]
+        self._record_wallet_deltas(block_number, agent.address, positions_before, account.get_positions())
+        return trade_result
+
+    def _record_wallet_deltas(
+        self,
+        block_number: int,
+        address: str,
+        positions_before: dict[str, SimulatedPosition],
+        positions_after: dict[str, SimulatedPosition],
+    ) -> None:
+        """Record the changes in the positions of an account made by a trade."""
+        for token_type in positions_before.keys() | positions_after.keys():
+            before = positions_before.get(token_type, None)
+            after = positions_after.get(token_type, None)
+            if after is None:
+                assert before is not None
+                # The position was closed, so we keep its token with an amount of zero
+                after = replace(before, amount=FixedPoint(0))
+            delta = after.amount - (FixedPoint(0) if before is None else before.amount)
+            if delta != FixedPoint(0):
+                self.wallet_deltas.append(SimulatedWalletDelta(block_number, address, after, delta))
+
+    def _update_past_checkpoint_exposure(
+        self, pool_state: PoolState, maturity_time: int, exposure_delta: FixedPoint
+    ) -> None:
+        """Update the exposure of a past checkpoint for closing a position that was opened in it.
+
+        The offline trades only know the exposure of the current checkpoint, so we correct the pool's long exposure
+        with the exposure we keep for the checkpoint the position was opened in.
+        """
+        checkpoint_duration = self.pool_config.checkpoint_duration
+        open_checkpoint_time = maturity_time - self.pool_config.position_duration
+        if open_checkpoint_time == _calc_checkpoint_id(checkpoint_duration, pool_state.block_time):
+            return
+        exposure = self._checkpoint_exposures.get(open_checkpoint_time, FixedPoint(0))
+        new_exposure = exposure + exposure_delta
+        self._checkpoint_exposures[open_checkpoint_time] = new_exposure
+        # The pool's long exposure is the sum of the net long exposure of each checkpoint
+        pool_state.pool_info.long_exposure = max(
+            self._current_pool_state.pool_info.long_exposure
+            + max(new_exposure, FixedPoint(0))
+            - max(exposure, FixedPoint(0)),
+            FixedPoint(0),
+        )
+
+    async def async_open_long(
+        self,
+        agent: LocalAccount,
+        trade_amount: FixedPoint,
+        slippage_tolerance: FixedPoint | None = None,
+        nonce: Nonce | None = None,
+    ) -> ReceiptBreakdown:
+        """Open a long position in the simulated pool.
+
+        The slippage tolerance and nonce are ignored, since trades execute on the state they are previewed on.
+        See the read-write interface for the documentation of the arguments.
+        """
+
+        def update_account(account: _SimulatedAccount, trade_result: ReceiptBreakdown) -> None:
+            _withdraw(account, "base", trade_result.base_amount)
+            _add_bonds(account.longs, trade_result.maturity_time_seconds, trade_result.bond_amount)
+
+        return self._execute_trade(
+            agent, lambda pool_state: _apply_open_long(pool_state, trade_amount), update_account, AssetIdPrefix.LONG
+        )
+
+    async def async_close_long(
+        self,
+        agent: LocalAccount,
+        trade_amount: FixedPoint,
+        maturity_time: int,
+        slippage_tolerance: FixedPoint | None = None,
+        nonce: Nonce | None = None,
+    ) -> ReceiptBreakdown:
+        """Close a long position in the simulated pool.
+
+        The slippage tolerance and nonce are ignored, since trades execute on the state they are previewed on.
+        See the read-write interface for the documentation of the arguments.
+        """
+
+        def update_account(account: _SimulatedAccount, trade_result: ReceiptBreakdown) -> None:
+            _remove_bonds(account.longs, maturity_time, trade_result.bond_amount)
+            account.base += trade_result.base_amount
+
+        return self._execute_trade(
+            agent,
+            lambda pool_state: _apply_close_long(pool_state, trade_amount, maturity_time),
+            update_account,
+            AssetIdPrefix.LONG,
+            closed_maturity_time=maturity_time,
+            exposure_delta=-trade_amount,
+        )
+
+    async def async_open_short(
+        self,
+        agent: LocalAccount,
+        trade_amount: FixedPoint,
+        slippage_tolerance: FixedPoint | None = None,
+        nonce: Nonce | None = None,
+    ) -> ReceiptBreakdown:
+        """Open a short position in the simulated pool.
+
+        The slippage tolerance and nonce are ignored, since trades execute on the state they are previewed on.
+        See the read-write interface for the documentation of the arguments.
+        """
+
+        def update_account(account: _SimulatedAccount, trade_result: ReceiptBreakdown) -> None:
+            _withdraw(account, "base", trade_result.base_amount)
+            _add_bonds(account.shorts, trade_result.maturity_time_seconds, trade_result.bond_amount)
+
+        return self._execute_trade(
+            agent, lambda pool_state: _apply_open_short(pool_state, trade_amount), update_account, AssetIdPrefix.SHORT
+        )
+
+    async def async_close_short(
+        self,
+        agent: LocalAccount,
+        trade_amount: FixedPoint,
+        maturity_time: int,
+        slippage_tolerance: FixedPoint | None = None,
+        nonce: Nonce | None = None,
+    ) -> ReceiptBreakdown:
+        """Close a short position in the simulated pool.
+
+        The slippage tolerance and nonce are ignored, since trades execute on the state they are previewed on.
+        See the read-write interface for the documentation of the arguments.
+        """
+        open_share_price = self._checkpoint_share_prices.get(maturity_time - self.pool_config.position_duration, None)
+
+        def update_account(account: _SimulatedAccount, trade_result: ReceiptBreakdown) -> None:
+            _remove_bonds(account.shorts, maturity_time, trade_result.bond_amount)
+            account.base += trade_result.base_amount
+
+        return self._execute_trade(
+            agent,
+            lambda pool_state: _apply_close_short(pool_state, trade_amount, maturity_time, open_share_price),
+            update_account,
+            AssetIdPrefix.SHORT,
+            closed_maturity_time=maturity_time,
+            exposure_delta=trade_amount,
+        )
+
+    async def async_add_liquidity(
+        self,
+        agent: LocalAccount,
+        trade_amount: FixedPoint,
+        min_apr: FixedPoint,
+        max_apr: FixedPoint,
+        nonce: Nonce | None = None,
+    ) -> ReceiptBreakdown:
+        """Add liquidity to the simulated pool, if the fixed rate is within the given bounds.
+
+        The nonce is ignored. See the read-write interface for the documentation of the arguments.
+        """
+        fixed_rate = self.calc_fixed_rate()
+        if not min_apr <= fixed_rate <= max_apr:
+            raise ValueError(f"The fixed rate {fixed_rate} is not between {min_apr=} and {max_apr=}.")
+
+        def update_account(account: _SimulatedAccount, trade_result: ReceiptBreakdown) -> None:
+            _withdraw(account, "base", trade_result.base_amount)
+            account.lp_shares += trade_result.lp_amount
+
+        return self._execute_trade(
+            agent, lambda pool_state: _apply_add_liquidity(pool_state, trade_amount), update_account, AssetIdPrefix.LP
+        )
+
+    async def async_remove_liquidity(
+        self,
+        agent: LocalAccount,
+        trade_amount: FixedPoint,
+        nonce: Nonce | None = None,
+    ) -> ReceiptBreakdown:
+        """Remove liquidity from the simulated pool.
+
+        The nonce is ignored. See the read-write interface for the documentation of the arguments.
+        """
+
+        def update_account(account: _SimulatedAccount, trade_result: ReceiptBreakdown) -> None:
+            _withdraw(account, "lp_shares", trade_result.lp_amount)
+            account.base += trade_result.base_amount
+            account.withdrawal_shares += trade_result.withdrawal_share_amount
+
+        return self._execute_trade(
+            agent,
+            lambda pool_state: _apply_remove_liquidity(pool_state, trade_amount),
+            update_account,
+            AssetIdPrefix.LP,
+        )
+
+    async def async_redeem_withdraw_shares(
+        self,
+        agent: LocalAccount,
+        trade_amount: FixedPoint,
+        nonce: Nonce | None = None,
+    ) -> ReceiptBreakdown:
+        """Redeem withdrawal shares in the simulated pool.
+
+        The nonce is ignored. See the read-write interface for the documentation of the arguments.
+        """
+
+        def update_account(account: _SimulatedAccount, trade_result: ReceiptBreakdown) -> None:
+            _withdraw(account, "withdrawal_shares", trade_result.withdrawal_share_amount)
+            account.base += trade_result.base_amount
+
+        return self._execute_trade(
+            agent,
+            lambda pool_state: _apply_redeem_withdraw_shares(pool_state, trade_amount),
+            update_account,
+            AssetIdPrefix.WITHDRAWAL_SHARE,
+        )
+
+
+def build_default_pool_config(initial_fixed_rate: FixedPoint) -> PoolConfigFP:
+    """Build the pool config of an interactive hyperdrive pool with default settings.
+
+    Arguments
+    ---------
+    initial_fixed_rate: FixedPoint
+        The fixed rate the pool is deployed at, which sets the time stretch.
+
+    Returns
+    -------
+    PoolConfigFP
+        The default pool config.
+    """
+    return PoolConfigFP(
+        base_token=SIMULATED_CONTRACT_ADDRESS,
+        linker_factory=SIMULATED_CONTRACT_ADDRESS,
+        linker_code_hash=bytes(32),
+        initial_share_price=FixedPoint(1),
+        minimum_share_reserves=FixedPoint(10),
+        minimum_transaction_amount=FixedPoint("0.001"),
+        position_duration=604_800,  # 1 week
+        checkpoint_duration=3_600,  # 1 hour
+        time_stretch=FixedPoint(scaled_value=int(hyperdrivepy.get_time_stretch(str(initial_fixed_rate.scaled_value)))),
+        governance=SIMULATED_CONTRACT_ADDRESS,
+        fee_collector=SIMULATED_CONTRACT_ADDRESS,
+        fees=FeesFP(
+            curve=FixedPoint("0.1"),
+            flat=FixedPoint("0.0005"),
+            governance_lp=FixedPoint("0.01"),
+            governance_zombie=FixedPoint("0.1"),
+        ),
+    )
+
+
+def _build_block(block_number: int, timestamp: int) -> BlockData:
+    """Build the data of a simulated block."""
+    return cast(BlockData, {"number": block_number, "timestamp": timestamp})
+
+
+def _withdraw(account: _SimulatedAccount, balance: str, amount: FixedPoint) -> None:
+    """Withdraw an amount from a balance of the account, raising a ValueError if the balance is too low."""
+    available = getattr(account, balance)
+    if amount > available:
+        raise ValueError(f"Insufficient {balance}, {amount=} is larger than the balance {available}.")
+    setattr(account, balance, available - amount)
+
+
+def _add_bonds(positions: dict[int, FixedPoint], maturity_time: int, bond_amount: FixedPoint) -> None:
+    """Add bonds to the positions of an account."""
+    positions[maturity_time] = positions.get(maturity_time, FixedPoint(0)) + bond_amount
+
+
+def _remove_bonds(positions: dict[int, FixedPoint], maturity_time: int, bond_amount: FixedPoint) -> None:
+    """Remove bonds from the positions of an account, raising a ValueError if the position is too small."""
+    position = positions.get(maturity_time, FixedPoint(0))
+    if bond_amount > position:
+        raise ValueError(f"Insufficient bonds, {bond_amount=} is larger than the position {position}.")
+    if bond_amount == position:
+        del positions[maturity_time]
+    else:
+        positions[maturity_time] = position - bond_amount
@@ -0,0 +1,106 @@
+"""Tests for simulated_interface.py."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from eth_account import Account
+from fixedpointmath import FixedPoint
+
+from .simulated_interface import SimulatedHyperdriveReadWriteInterface, UnsupportedSimulatedFeatureError
+
+
+class TestSimulatedHyperdriveReadWriteInterface:
+    """Tests for the SimulatedHyperdriveReadWriteInterface api class."""
+
+    def test_initial_state(self):
+        """Check that the simulated pool is deployed at the requested rate."""
+        interface = SimulatedHyperdriveReadWriteInterface(initial_fixed_rate=FixedPoint("0.05"))
+        assert abs(interface.calc_fixed_rate() - FixedPoint("0.05")) < FixedPoint(1e-16)
+        assert interface.get_variable_rate() == FixedPoint("0.05")
+
+    def test_open_close_long(self):
+        """Check that trades update the pool, the account ledger, and mine blocks."""
+        interface = SimulatedHyperdriveReadWriteInterface()
+        agent = Account.create()
+        interface.fund_account(agent.address, base=FixedPoint(100_000), eth=FixedPoint(10))
+        start_block = interface.get_block_number(interface.get_current_block())
+        fixed_rate = interface.calc_fixed_rate()
+
+        open_result = asyncio.run(interface.async_open_long(agent, FixedPoint(10_000)))
+        assert interface.get_block_number(interface.get_current_block()) == start_block + 1
+        assert interface.current_pool_state.pool_info.longs_outstanding == open_result.bond_amount
+        assert interface.calc_fixed_rate() < fixed_rate
+        _, base_balance = interface.get_eth_base_balances(agent)
+        assert base_balance == FixedPoint(90_000)
+
+        close_result = asyncio.run(
+            interface.async_close_long(agent, open_result.bond_amount, open_result.maturity_time_seconds)
+        )
+        assert interface.current_pool_state.pool_info.longs_outstanding == FixedPoint(0)
+        _, base_balance = interface.get_eth_base_balances(agent)
+        assert base_balance == FixedPoint(90_000) + close_result.base_amount
+        # Past states are kept in the history
+        assert interface.pool_state_history.get_pool_state(start_block).pool_info.longs_outstanding == FixedPoint(0)
+
+    def test_advance_time(self):
+        """Check that advancing time creates checkpoints and accrues interest."""
+        interface = SimulatedHyperdriveReadWriteInterface(block_time=12)
+        share_price = interface.current_pool_state.pool_info.share_price
+        start_time = interface.current_pool_state.block_time
+        checkpoints = interface.advance_time(3 * interface.pool_config.checkpoint_duration)
+        assert len(checkpoints) >= 3
+        assert interface.current_pool_state.block_time == start_time + 3 * interface.pool_config.checkpoint_duration
+        assert interface.current_pool_state.pool_info.share_price > share_price
+
+    def test_insufficient_balance(self):
+        """Check that trades fail without updating the pool if the account can't afford them."""
+        interface = SimulatedHyperdriveReadWriteInterface()
+        agent = Account.create()
+        interface.fund_account(agent.address, base=FixedPoint(100))
+        pool_state = interface.current_pool_state
+        with pytest.raises(ValueError):
+            asyncio.run(interface.async_open_long(agent, FixedPoint(1_000)))
+        assert interface.current_pool_state is pool_state
+
+    def test_wallet_deltas(self):
+        """Check that trades record the changes in the positions of the account, and positions are marked to market."""
+        interface = SimulatedHyperdriveReadWriteInterface()
+        agent = Account.create()
+        interface.fund_account(agent.address, base=FixedPoint(100_000))
+        open_result = asyncio.run(interface.async_open_long(agent, FixedPoint(10_000)))
+        open_block = interface.get_block_number(interface.get_current_block())
+        asyncio.run(interface.async_close_long(agent, open_result.bond_amount, open_result.maturity_time_seconds))
+        long_token = f"LONG-{open_result.maturity_time_seconds}"
+        deltas = {
+            (delta.block_number, delta.position.token_type): delta.delta
+            for delta in interface.wallet_deltas
+            if delta.wallet_address == agent.address
+        }
+        assert deltas[(open_block, long_token)] == open_result.bond_amount
+        assert deltas[(open_block, "WETH")] == -FixedPoint(10_000)
+        assert deltas[(open_block + 1, long_token)] == -open_result.bond_amount
+        # Closed positions are no longer held
+        positions = interface.get_positions(agent.address)
+        assert [position.token_type for position in positions] == ["WETH"]
+        assert interface.calc_position_value(positions[0]) == positions[0].amount
+
+        open_result = asyncio.run(interface.async_open_short(agent, FixedPoint(1_000)))
+        (short,) = [
+            position for position in interface.get_positions(agent.address) if position.base_token_type == "SHORT"
+        ]
+        assert short.amount == FixedPoint(1_000)
+        # The short is valued at the base that closing it returns
+        short_value = interface.calc_position_value(short)
+        close_result = asyncio.run(interface.async_close_short(agent, short.amount, open_result.maturity_time_seconds))
+        assert short_value == close_result.base_amount
+
+    def test_unsupported_features(self):
+        """Check that the web3 provider and the contracts raise a specific error instead of an AttributeError."""
+        interface = SimulatedHyperdriveReadWriteInterface()
+        with pytest.raises(UnsupportedSimulatedFeatureError):
+            _ = interface.web3
+        with pytest.raises(UnsupportedSimulatedFeatureError):
+            _ = interface.hyperdrive_contract.address
+        with pytest.raises(NotImplementedError):
+            _ = interface.deployed_hyperdrive_pool
@@ -1,2 +1,3 @@
 """Hyperdrive state classes and conversion helper functions."""
 from .pool_state import PoolState
+from .pool_state_history import PoolStateHistory
@@ -1,10 +1,11 @@
 """Functions for storing Hyperdrive state."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, is_dataclass
+from typing import Any, Callable
 
 from fixedpointmath import FixedPoint
+from hypertypes import PoolConfig, PoolInfo
 from hypertypes.fixedpoint_types import CheckpointFP, PoolConfigFP, PoolInfoFP
 from hypertypes.utilities.conversions import (
     dataclass_to_dict,
@@ -45,18 +46,70 @@ class PoolState:
         if block_timestamp is None:
             raise AssertionError("The provided block has no timestamp")
         self.block_time = block_timestamp
+        # Converted pool config and info, along with the attribute values they were converted from
+        self._converted: dict[str, tuple[tuple[Any, ...], Any]] = {}
+
+    @property
+    def hyperdrivepy_pool_config(self) -> PoolConfig:
+        """The pool config in the form expected by hyperdrivepy.
+
+        The conversion is cached until an attribute of the pool config is changed. The returned object is shared
+        by all calls, and should not be modified.
+        """
+        return self._get_converted("pool_config", fixedpoint_to_pool_config)
+
+    @property
+    def hyperdrivepy_pool_info(self) -> PoolInfo:
+        """The pool info in the form expected by hyperdrivepy.
+
+        The conversion is cached until an attribute of the pool info is changed. The returned object is shared
+        by all calls, and should not be modified.
+        """
+        return self._get_converted("pool_info", fixedpoint_to_pool_info)
+
+    def _get_converted(self, name: str, convert: Callable[[Any], Any]) -> Any:
+        """Get the cached conversion of an attribute, converting it again if any of its values changed.
+
+        Values are compared by identity, which is cheap and catches both replacing the attribute
+        and assigning to its fields, e.g. `pool_state.pool_info.share_reserves += delta`.
+        """
+        # Pool states pickled before the cache existed don't have it
+        converted = self.__dict__.setdefault("_converted", {})
+        value = getattr(self, name)
+        values = _get_attribute_values(value)
+        cached = converted.get(name, None)
+        if (
+            cached is not None
+            and len(cached[0]) == len(values)
+            and all(cached_value is new_value for cached_value, new_value in zip(cached[0], values))
+        ):
+            return cached[1]
+        result = convert(value)
+        converted[name] = (values, result)
+        return result
 
     @property
     def pool_info_to_dict(self) -> dict[str, Any]:
         """Get the pool_info property."""
-        return dataclass_to_dict(fixedpoint_to_pool_info(self.pool_info))
+        return dataclass_to_dict(self.hyperdrivepy_pool_info)
 
     @property
     def pool_config_to_dict(self) -> dict[str, Any]:
         """Get the pool_config property."""
-        return dataclass_to_dict(fixedpoint_to_pool_config(self.pool_config))
+        return dataclass_to_dict(self.hyperdrivepy_pool_config)
 
     @property
     def checkpoint_to_dict(self) -> dict[str, Any]:
         """Get the checkpoint property."""
         return dataclass_to_dict(fixedpoint_to_checkpoint(self.checkpoint))
+
+
+def _get_attribute_values(value: Any) -> tuple[Any, ...]:
+    """Get a dataclass along with the values of its attributes, recursing into nested dataclasses."""
+    values: list[Any] = [value]
+    for attribute_value in vars(value).values():
+        if is_dataclass(attribute_value):
+            values.extend(_get_attribute_values(attribute_value))
+        else:
+            values.append(attribute_value)
+    return tuple(values)
@@ -0,0 +1,319 @@
+"""Columnar storage for the history of a Hyperdrive pool's state."""
+from __future__ import annotations
+
+from dataclasses import fields
+from typing import TYPE_CHECKING, Any, Iterator, overload
+
+import numpy as np
+from fixedpointmath import FixedPoint
+from hypertypes.fixedpoint_types import CheckpointFP, PoolConfigFP, PoolInfoFP
+from web3.types import BlockData
+
+from .pool_state import PoolState
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+POOL_INFO_COLUMNS = tuple(field.name for field in fields(PoolInfoFP))
+CHECKPOINT_COLUMNS = tuple(f"checkpoint_{field.name}" for field in fields(CheckpointFP))
+POOL_STATE_COLUMNS = (
+    "exposure",
+    "variable_rate",
+    "vault_shares",
+    "total_supply_withdrawal_shares",
+    "hyperdrive_base_balance",
+    "hyperdrive_eth_balance",
+    "gov_fees_accrued",
+)
+# The columns that store the scaled value of a FixedPoint
+FIXEDPOINT_COLUMNS = POOL_INFO_COLUMNS + CHECKPOINT_COLUMNS + POOL_STATE_COLUMNS
+
+DEFAULT_HISTORY_CAPACITY = 1024
+
+# FixedPoint columns store each scaled value in two int64 limbs, value = high * 2**63 + low, since scaled reserves
+# routinely exceed 2**63. Values that fit in int64 have a high limb of 0, otherwise 0 <= low < 2**63.
+# This supports scaled values in [-2**126, 2**126).
+_LIMB_BITS = 63
+_LOW_LIMB_MASK = (1 << _LIMB_BITS) - 1
+_INT64_MIN = int(np.iinfo(np.int64).min)
+_INT64_MAX = int(np.iinfo(np.int64).max)
+_MIN_SCALED_VALUE = -(1 << (2 * _LIMB_BITS))
+_MAX_SCALED_VALUE = (1 << (2 * _LIMB_BITS)) - 1
+
+
+class PoolStateHistory:
+    """Stores the states of a pool over many blocks in columns, with one array of scaled integer values per field.
+
+    This uses far less memory than a list of PoolState objects, which hold a FixedPoint object per field,
+    and allows vectorized computations over a whole run, e.g. `history.column("share_reserves") > 0`.
+    FixedPoint fields are stored exactly as two int64 arrays, with the high and low 63 bits of the scaled value,
+    so columns keep a fixed width even when values don't fit in int64. The pool config is the same for all states,
+    and is stored once.
+
+    PoolState objects are built on demand when indexing the history with an integer,
+    and slicing the history returns a view that shares the underlying arrays.
+    """
+
+    def __init__(self, pool_config: PoolConfigFP | None = None, capacity: int = DEFAULT_HISTORY_CAPACITY):
+        """Initialize an empty history.
+
+        Arguments
+        ---------
+        pool_config: PoolConfigFP, optional
+            The config of the pool. Defaults to the config of the first appended pool state.
+        capacity: int, optional
+            The initial number of states to allocate space for. Grows as needed. Defaults to 1024.
+        """
+        self.pool_config = pool_config
+        self._length = 0
+        # The block columns, and the low limbs of the FixedPoint columns
+        self._columns: dict[str, np.ndarray] = {
+            "block_number": np.zeros(max(capacity, 1), dtype=np.int64),
+            "block_time": np.zeros(max(capacity, 1), dtype=np.int64),
+            **{name: np.zeros(max(capacity, 1), dtype=np.int64) for name in FIXEDPOINT_COLUMNS},
+        }
+        # The high limbs of the FixedPoint columns
+        self._high_columns: dict[str, np.ndarray] = {
+            name: np.zeros(max(capacity, 1), dtype=np.int64) for name in FIXEDPOINT_COLUMNS
+        }
+        self._block_hashes: list[Any] = []
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[PoolState]:
+        for index in range(self._length):
+            yield self._get_pool_state(index)
+
+    @overload
+    def __getitem__(self, index: int) -> PoolState:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> PoolStateHistory:
+        ...
+
+    def __getitem__(self, index: int | slice) -> PoolState | PoolStateHistory:
+        if isinstance(index, slice):
+            return self._get_view(index)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"{index=} out of range for a history of length {self._length}")
+        return self._get_pool_state(index)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """The names of the columns in the history."""
+        return tuple(self._columns.keys())
+
+    @property
+    def block_numbers(self) -> np.ndarray:
+        """The block number of each state."""
+        return self.column("block_number")
+
+    def column(self, name: str) -> np.ndarray:
+        """Get the values of a field for all states, without copying when all values fit in int64.
+
+        Arguments
+        ---------
+        name: str
+            The name of the column, i.e. the name of a PoolInfoFP field, a PoolState field,
+            `checkpoint_` followed by a CheckpointFP field, `block_number`, or `block_time`.
+
+        Returns
+        -------
+        np.ndarray
+            A read only array of the column. FixedPoint fields are given as scaled integers,
+            as a view of an int64 array if all values fit in int64, and as python integers otherwise.
+        """
+        values = self._columns[name][: self._length]
+        if name in self._high_columns:
+            high = self._high_columns[name][: self._length]
+            if high.any():
+                values = (high.astype(object) << _LIMB_BITS) + values.astype(object)
+        view = values.view()
+        view.flags.writeable = False
+        return view
+
+    def column_float(self, name: str) -> np.ndarray:
+        """Get the values of a field for all states as floats.
+
+        Arguments
+        ---------
+        name: str
+            The name of the column, as in `column`.
+
+        Returns
+        -------
+        np.ndarray
+            A float64 array of the column. FixedPoint fields are given in units, instead of as scaled integers.
+        """
+        values = self._columns[name][: self._length].astype(np.float64)
+        if name in self._high_columns:
+            values += self._high_columns[name][: self._length] * float(1 << _LIMB_BITS)
+            values /= 1e18
+        return values
+
+    def append(self, pool_state: PoolState) -> None:
+        """Append the state of the pool at a block. States are expected to be appended in order of block number.
+
+        Arguments
+        ---------
+        pool_state: PoolState
+            The state of the pool.
+        """
+        if self.pool_config is None:
+            self.pool_config = pool_state.pool_config
+        elif pool_state.pool_config != self.pool_config:
+            raise ValueError("All states in the history must have the same pool config.")
+        if self._length > 0 and pool_state.block_number < self._columns["block_number"][self._length - 1]:
+            raise ValueError(
+                f"Pool state at block {pool_state.block_number} is older than the last state in the history."
+            )
+        if self._length == len(self._columns["block_number"]):
+            self._grow()
+        self._columns["block_number"][self._length] = int(pool_state.block_number)
+        self._columns["block_time"][self._length] = int(pool_state.block_time)
+        values: dict[str, int] = {}
+        for name in POOL_INFO_COLUMNS:
+            values[name] = getattr(pool_state.pool_info, name).scaled_value
+        for name in CHECKPOINT_COLUMNS:
+            values[name] = getattr(pool_state.checkpoint, name[len("checkpoint_") :]).scaled_value
+        for name in POOL_STATE_COLUMNS:
+            values[name] = getattr(pool_state, name).scaled_value
+        for name, value in values.items():
+            if _INT64_MIN <= value <= _INT64_MAX:
+                self._columns[name][self._length] = value
+                self._high_columns[name][self._length] = 0
+            elif _MIN_SCALED_VALUE <= value <= _MAX_SCALED_VALUE:
+                self._columns[name][self._length] = value & _LOW_LIMB_MASK
+                self._high_columns[name][self._length] = value >> _LIMB_BITS
+            else:
+                raise OverflowError(f"Scaled value {value} of {name} is too large to store in the history.")
+        self._block_hashes.append(pool_state.block.get("hash", None))
+        self._length += 1
+
+    def extend(self, pool_states: list[PoolState]) -> None:
+        """Append the states of the pool at many blocks.
+
+        Arguments
+        ---------
+        pool_states: list[PoolState]
+            The states of the pool, in order of block number.
+        """
+        for pool_state in pool_states:
+            self.append(pool_state)
+
+    def get_pool_state(self, block_number: int) -> PoolState:
+        """Get the state of the pool at a block.
+
+        Arguments
+        ---------
+        block_number: int
+            The block number. If there is no state at the block, the last state before the block is returned.
+
+        Returns
+        -------
+        PoolState
+            The state of the pool.
+        """
+        index = int(np.searchsorted(self.block_numbers, block_number, side="right")) - 1
+        if index < 0:
+            raise KeyError(f"No pool state at or before block {block_number}")
+        return self._get_pool_state(index)
+
+    def to_pandas(self, coerce_float: bool = False) -> pd.DataFrame:
+        """Export the history as a pandas DataFrame, with one row per state.
+
+        Arguments
+        ---------
+        coerce_float: bool, optional
+            If True, FixedPoint fields are converted to floats. Otherwise they are given as scaled integers,
+            which are python integers in columns with values that don't fit in int64.
+            Defaults to False.
+
+        Returns
+        -------
+        pd.DataFrame
+            The history with one column per field.
+        """
+        # pylint: disable=import-outside-toplevel
+        import pandas as pd
+
+        data: dict[str, Any] = {}
+        for name in self._columns:
+            if coerce_float and name in FIXEDPOINT_COLUMNS:
+                data[name] = self.column_float(name)
+            else:
+                data[name] = self.column(name)
+        return pd.DataFrame(data)
+
+    def to_arrow(self) -> pa.Table:
+        """Export the history as an Arrow table, with one row per state.
+
+        FixedPoint fields are stored as int64 when all values fit, and as decimal128(38, 0) otherwise.
+
+        Returns
+        -------
+        pa.Table
+            The history with one column per field.
+        """
+        # pylint: disable=import-outside-toplevel
+        import pyarrow as pa
+
+        arrays = {}
+        for name in self._columns:
+            column = self.column(name)
+            if column.dtype == object:
+                arrays[name] = pa.array(column.tolist(), type=pa.decimal128(38, 0))
+            else:
+                arrays[name] = pa.array(column)
+        return pa.table(arrays)
+
+    def _grow(self) -> None:
+        """Doubles the capacity of every column."""
+        for columns in (self._columns, self._high_columns):
+            for name, column in columns.items():
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[: self._length] = column[: self._length]
+                columns[name] = grown
+
+    def _get_view(self, index: slice) -> PoolStateHistory:
+        """Returns a history of a slice of the states that shares the arrays of this history."""
+        start, stop, step = index.indices(self._length)
+        view = PoolStateHistory.__new__(PoolStateHistory)
+        view.pool_config = self.pool_config
+        view._columns = {name: column[start:stop:step] for name, column in self._columns.items()}
+        view._high_columns = {name: column[start:stop:step] for name, column in self._high_columns.items()}
+        view._length = len(range(start, stop, step))
+        view._block_hashes = self._block_hashes[start:stop:step]
+        return view
+
+    def _get_pool_state(self, index: int) -> PoolState:
+        """Builds the pool state at an index of the history."""
+        assert self.pool_config is not None
+        columns = self._columns
+        block: dict[str, Any] = {
+            "number": int(columns["block_number"][index]),
+            "timestamp": int(columns["block_time"][index]),
+        }
+        if self._block_hashes[index] is not None:
+            block["hash"] = self._block_hashes[index]
+        pool_info = PoolInfoFP(**{name: self._get_fixedpoint(name, index) for name in POOL_INFO_COLUMNS})
+        checkpoint = CheckpointFP(
+            **{name[len("checkpoint_") :]: self._get_fixedpoint(name, index) for name in CHECKPOINT_COLUMNS}
+        )
+        return PoolState(
+            BlockData(**block),  # type: ignore
+            self.pool_config,
+            pool_info,
+            checkpoint,
+            *(self._get_fixedpoint(name, index) for name in POOL_STATE_COLUMNS),
+        )
+
+    def _get_fixedpoint(self, name: str, index: int) -> FixedPoint:
+        """Combines the limbs of a FixedPoint column at an index of the history."""
+        scaled_value = (int(self._high_columns[name][index]) << _LIMB_BITS) + int(self._columns[name][index])
+        return FixedPoint(scaled_value=scaled_value)
@@ -0,0 +1,110 @@
+"""Tests for pool_state_history.py"""
+from __future__ import annotations
+
+from dataclasses import fields
+
+import numpy as np
+import pytest
+from fixedpointmath import FixedPoint
+from hypertypes.fixedpoint_types import CheckpointFP, FeesFP, PoolConfigFP, PoolInfoFP
+from web3.types import BlockData
+
+from .pool_state import PoolState
+from .pool_state_history import PoolStateHistory
+
+
+def _make_pool_state(block_number: int, share_reserves: FixedPoint) -> PoolState:
+    """Make a pool state with the given block number and share reserves."""
+    pool_config = PoolConfigFP(
+        base_token="0x0",
+        linker_factory="0x0",
+        linker_code_hash=bytes(32),
+        initial_share_price=FixedPoint(1),
+        minimum_share_reserves=FixedPoint(10),
+        minimum_transaction_amount=FixedPoint("0.001"),
+        position_duration=31_536_000,
+        checkpoint_duration=3600,
+        time_stretch=FixedPoint("0.04"),
+        governance="0x0",
+        fee_collector="0x0",
+        fees=FeesFP(FixedPoint("0.1"), FixedPoint("0.0005"), FixedPoint("0.01"), FixedPoint("0.1")),
+    )
+    pool_info = PoolInfoFP(**{field.name: FixedPoint(block_number) for field in fields(PoolInfoFP)})
+    pool_info.share_reserves = share_reserves
+    return PoolState(
+        BlockData(number=block_number, timestamp=12 * block_number),  # type: ignore
+        pool_config,
+        pool_info,
+        CheckpointFP(share_price=FixedPoint("1.01")),
+        *[FixedPoint(block_number)] * 7,
+    )
+
+
+class TestPoolStateHistory:
+    """Tests for the PoolStateHistory."""
+
+    def test_round_trip(self):
+        """Pool states built from the history match the appended states."""
+        pool_states = [_make_pool_state(block_number, FixedPoint(block_number * 10)) for block_number in range(1, 6)]
+        history = PoolStateHistory(capacity=2)
+        history.extend(pool_states)
+        assert len(history) == 5
+        assert list(history) == pool_states
+        assert history[-1] == pool_states[-1]
+        assert history.get_pool_state(3) == pool_states[2]
+        np.testing.assert_array_equal(history.column("share_reserves"), [10 * 10**18 * n for n in range(1, 6)])
+        view = history[1:3]
+        assert list(view.block_numbers) == [2, 3]
+        assert np.shares_memory(view.column("bond_reserves"), history.column("bond_reserves"))
+
+    def test_large_values(self):
+        """Values that don't fit in int64 are stored exactly, without changing the type of the columns."""
+        history = PoolStateHistory()
+        history.append(_make_pool_state(1, FixedPoint(-1)))
+        history.append(_make_pool_state(2, FixedPoint(1_000_000_000)))
+        history.append(_make_pool_state(3, FixedPoint(scaled_value=-(2**100) - 1)))
+        assert history[0].pool_info.share_reserves == FixedPoint(-1)
+        assert history[1].pool_info.share_reserves == FixedPoint(1_000_000_000)
+        assert history[2].pool_info.share_reserves == FixedPoint(scaled_value=-(2**100) - 1)
+        assert history.column("share_reserves").tolist() == [-(10**18), 10**27, -(2**100) - 1]
+        np.testing.assert_allclose(history.column_float("share_reserves"), [-1, 1e9, -(2**100) / 1e18])
+        # Columns where all values fit in int64 are views of the stored arrays
+        assert history.column("bond_reserves").dtype == np.int64
+        assert history[:2].column("bond_reserves").dtype == np.int64
+        with pytest.raises(OverflowError):
+            history.append(_make_pool_state(4, FixedPoint(scaled_value=2**127)))
+
+    def test_to_pandas(self):
+        """The pandas export has one row per state, with exact scaled values or floats."""
+        history = PoolStateHistory()
+        history.append(_make_pool_state(1, FixedPoint(1)))
+        history.append(_make_pool_state(2, FixedPoint(1_000_000_000)))
+        pool_state_df = history.to_pandas()
+        assert list(pool_state_df.columns) == list(history.columns)
+        assert pool_state_df["block_number"].tolist() == [1, 2]
+        assert pool_state_df["share_reserves"].tolist() == [10**18, 10**27]
+        assert pool_state_df["bond_reserves"].dtype == np.int64
+        float_df = history.to_pandas(coerce_float=True)
+        assert float_df["block_time"].tolist() == [12, 24]
+        assert float_df["share_reserves"].tolist() == [1.0, 1e9]
+        assert float_df["share_reserves"].dtype == np.float64
+
+    def test_to_arrow(self):
+        """The Arrow export uses int64 columns, or decimals for values that don't fit in int64."""
+        pa = pytest.importorskip("pyarrow")
+        history = PoolStateHistory()
+        history.append(_make_pool_state(1, FixedPoint(1)))
+        history.append(_make_pool_state(2, FixedPoint(1_000_000_000)))
+        table = history.to_arrow()
+        assert table.num_rows == 2
+        assert table.column_names == list(history.columns)
+        assert table.schema.field("bond_reserves").type == pa.int64()
+        assert table.schema.field("share_reserves").type == pa.decimal128(38, 0)
+        assert [int(value) for value in table.column("share_reserves").to_pylist()] == [10**18, 10**27]
+
+    def test_out_of_order(self):
+        """States must be appended in order of block number."""
+        history = PoolStateHistory()
+        history.append(_make_pool_state(2, FixedPoint(1)))
+        with pytest.raises(ValueError):
+            history.append(_make_pool_state(1, FixedPoint(1)))
@@ -76,3 +76,28 @@ class CheckpointFP:
     """Checkpoint struct."""
 
     share_price: FixedPoint
+
+
+@dataclass
+class MarketStateFP:
+    """MarketState struct."""
+
+    share_reserves: FixedPoint
+    bond_reserves: FixedPoint
+    share_adjustment: FixedPoint
+    zombie_share_reserves: FixedPoint
+    long_exposure: FixedPoint
+    longs_outstanding: FixedPoint
+    shorts_outstanding: FixedPoint
+    long_average_maturity_time: FixedPoint
+    short_average_maturity_time: FixedPoint
+    is_initialized: bool
+    is_paused: bool
+
+
+@dataclass
+class WithdrawPoolFP:
+    """WithdrawPool struct."""
+
+    ready_to_withdraw: FixedPoint
+    proceeds: FixedPoint
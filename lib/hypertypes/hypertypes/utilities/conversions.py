@@ -1,13 +1,21 @@
 """Conversion for hypertypes to fixedpoint"""
 from __future__ import annotations
 
+import functools
 import re
-from dataclasses import asdict
-from typing import Any
+from dataclasses import fields
+from typing import Any, Callable
 
 from fixedpointmath import FixedPoint
-from hypertypes import Checkpoint, Fees, PoolConfig, PoolInfo
-from hypertypes.fixedpoint_types import CheckpointFP, FeesFP, PoolConfigFP, PoolInfoFP
+from hypertypes import Checkpoint, Fees, MarketState, PoolConfig, PoolInfo, WithdrawPool
+from hypertypes.fixedpoint_types import (
+    CheckpointFP,
+    FeesFP,
+    MarketStateFP,
+    PoolConfigFP,
+    PoolInfoFP,
+    WithdrawPoolFP,
+)
 
 
 def camel_to_snake(camel_string: str) -> str:
@@ -45,6 +53,52 @@ def snake_to_camel(snake_string: str) -> str:
     return camel_string[0].lower() + camel_string[1:] if camel_string else camel_string
 
 
+# The conversions below access each attribute directly, instead of converting the attribute names at runtime.
+# When the structs change, the conversions need to be updated to match the fields of the structs.
+
+
+def fees_to_fixedpoint(hypertypes_fees: Fees) -> FeesFP:
+    """Convert the HyperTypes Fees attribute types from what Solidity returns to FixedPoint.
+
+    Arguments
+    ---------
+    hypertypes_fees: Fees
+        The hyperdrive pool fees.
+
+    Returns
+    -------
+    FeesFP
+        A dataclass containing the fees converted to FixedPoint.
+    """
+    return FeesFP(
+        curve=FixedPoint(scaled_value=hypertypes_fees.curve),
+        flat=FixedPoint(scaled_value=hypertypes_fees.flat),
+        governance_lp=FixedPoint(scaled_value=hypertypes_fees.governanceLP),
+        governance_zombie=FixedPoint(scaled_value=hypertypes_fees.governanceZombie),
+    )
+
+
+def fixedpoint_to_fees(fixedpoint_fees: FeesFP) -> Fees:
+    """Convert the Fees attribute types from FixedPoint to what the Solidity ABI specifies.
+
+    Arguments
+    ---------
+    fixedpoint_fees: FeesFP
+        The hyperdrive pool fees in FixedPoint format.
+
+    Returns
+    -------
+    Fees
+        A dataclass containing the fees with derived types from Pypechain.
+    """
+    return Fees(
+        curve=fixedpoint_fees.curve.scaled_value,
+        flat=fixedpoint_fees.flat.scaled_value,
+        governanceLP=fixedpoint_fees.governance_lp.scaled_value,
+        governanceZombie=fixedpoint_fees.governance_zombie.scaled_value,
+    )
+
+
 def pool_info_to_fixedpoint(hypertypes_pool_info: PoolInfo) -> PoolInfoFP:
     """Convert the Hypertypes PoolInfo attribute types from what solidity returns to FixedPoint.
 
@@ -62,7 +116,22 @@ def pool_info_to_fixedpoint(hypertypes_pool_info: PoolInfo) -> PoolInfoFP:
           - FixedPoint types are used if the type was FixedPoint in the underlying contract.
     """
     return PoolInfoFP(
-        **{camel_to_snake(key): FixedPoint(scaled_value=value) for (key, value) in asdict(hypertypes_pool_info).items()}
+        share_reserves=FixedPoint(scaled_value=hypertypes_pool_info.shareReserves),
+        share_adjustment=FixedPoint(scaled_value=hypertypes_pool_info.shareAdjustment),
+        zombie_share_reserves=FixedPoint(scaled_value=hypertypes_pool_info.zombieShareReserves),
+        bond_reserves=FixedPoint(scaled_value=hypertypes_pool_info.bondReserves),
+        lp_total_supply=FixedPoint(scaled_value=hypertypes_pool_info.lpTotalSupply),
+        share_price=FixedPoint(scaled_value=hypertypes_pool_info.sharePrice),
+        longs_outstanding=FixedPoint(scaled_value=hypertypes_pool_info.longsOutstanding),
+        long_average_maturity_time=FixedPoint(scaled_value=hypertypes_pool_info.longAverageMaturityTime),
+        shorts_outstanding=FixedPoint(scaled_value=hypertypes_pool_info.shortsOutstanding),
+        short_average_maturity_time=FixedPoint(scaled_value=hypertypes_pool_info.shortAverageMaturityTime),
+        withdrawal_shares_ready_to_withdraw=FixedPoint(
+            scaled_value=hypertypes_pool_info.withdrawalSharesReadyToWithdraw
+        ),
+        withdrawal_shares_proceeds=FixedPoint(scaled_value=hypertypes_pool_info.withdrawalSharesProceeds),
+        lp_share_price=FixedPoint(scaled_value=hypertypes_pool_info.lpSharePrice),
+        long_exposure=FixedPoint(scaled_value=hypertypes_pool_info.longExposure),
     )
 
 
@@ -80,7 +149,20 @@ def fixedpoint_to_pool_info(fixedpoint_pool_info: PoolInfoFP) -> PoolInfo:
         A dataclass containing the Hyperdrive pool info with derived types from Pypechain.
     """
     return PoolInfo(
-        **{snake_to_camel(key): value.scaled_value for (key, value) in asdict(fixedpoint_pool_info).items()}
+        shareReserves=fixedpoint_pool_info.share_reserves.scaled_value,
+        shareAdjustment=fixedpoint_pool_info.share_adjustment.scaled_value,
+        zombieShareReserves=fixedpoint_pool_info.zombie_share_reserves.scaled_value,
+        bondReserves=fixedpoint_pool_info.bond_reserves.scaled_value,
+        lpTotalSupply=fixedpoint_pool_info.lp_total_supply.scaled_value,
+        sharePrice=fixedpoint_pool_info.share_price.scaled_value,
+        longsOutstanding=fixedpoint_pool_info.longs_outstanding.scaled_value,
+        longAverageMaturityTime=fixedpoint_pool_info.long_average_maturity_time.scaled_value,
+        shortsOutstanding=fixedpoint_pool_info.shorts_outstanding.scaled_value,
+        shortAverageMaturityTime=fixedpoint_pool_info.short_average_maturity_time.scaled_value,
+        withdrawalSharesReadyToWithdraw=fixedpoint_pool_info.withdrawal_shares_ready_to_withdraw.scaled_value,
+        withdrawalSharesProceeds=fixedpoint_pool_info.withdrawal_shares_proceeds.scaled_value,
+        lpSharePrice=fixedpoint_pool_info.lp_share_price.scaled_value,
+        longExposure=fixedpoint_pool_info.long_exposure.scaled_value,
     )
 
 
@@ -99,9 +181,7 @@ def checkpoint_to_fixedpoint(
     CheckpointFP
         A dataclass containing the checkpoint share_price and exposure fields converted to FixedPoint.
     """
-    return CheckpointFP(
-        **{camel_to_snake(key): FixedPoint(scaled_value=value) for key, value in asdict(hypertypes_checkpoint).items()}
-    )
+    return CheckpointFP(share_price=FixedPoint(scaled_value=hypertypes_checkpoint.sharePrice))
 
 
 def fixedpoint_to_checkpoint(
@@ -119,9 +199,7 @@ def fixedpoint_to_checkpoint(
     Checkpoint
         A dataclass containing the checkpoint share_price and exposure fields converted to integers.
     """
-    return Checkpoint(
-        **{snake_to_camel(key): value.scaled_value for key, value in asdict(fixedpoint_checkpoint).items()}
-    )
+    return Checkpoint(sharePrice=fixedpoint_checkpoint.share_price.scaled_value)
 
 
 def pool_config_to_fixedpoint(
@@ -142,24 +220,20 @@ def pool_config_to_fixedpoint(
           - The attribute names are converted to snake_case.
           - FixedPoint types are used if the type was FixedPoint in the underlying contract.
     """
-    dict_pool_config = {camel_to_snake(key): value for key, value in asdict(hypertypes_pool_config).items()}
-    fixedpoint_keys = [
-        "initial_share_price",
-        "minimum_share_reserves",
-        "minimum_transaction_amount",
-        "time_stretch",
-    ]
-    for key in dict_pool_config:
-        if key in fixedpoint_keys:
-            dict_pool_config[key] = FixedPoint(scaled_value=dict_pool_config[key])
-        elif key == "fees":
-            dict_pool_config[key] = (
-                FixedPoint(scaled_value=dict_pool_config[key]["curve"]),
-                FixedPoint(scaled_value=dict_pool_config[key]["flat"]),
-                FixedPoint(scaled_value=dict_pool_config[key]["governanceLP"]),
-                FixedPoint(scaled_value=dict_pool_config[key]["governanceZombie"]),
-            )
-    return PoolConfigFP(**dict_pool_config)
+    return PoolConfigFP(
+        base_token=hypertypes_pool_config.baseToken,
+        linker_factory=hypertypes_pool_config.linkerFactory,
+        linker_code_hash=hypertypes_pool_config.linkerCodeHash,
+        initial_share_price=FixedPoint(scaled_value=hypertypes_pool_config.initialSharePrice),
+        minimum_share_reserves=FixedPoint(scaled_value=hypertypes_pool_config.minimumShareReserves),
+        minimum_transaction_amount=FixedPoint(scaled_value=hypertypes_pool_config.minimumTransactionAmount),
+        position_duration=hypertypes_pool_config.positionDuration,
+        checkpoint_duration=hypertypes_pool_config.checkpointDuration,
+        time_stretch=FixedPoint(scaled_value=hypertypes_pool_config.timeStretch),
+        governance=hypertypes_pool_config.governance,
+        fee_collector=hypertypes_pool_config.feeCollector,
+        fees=fees_to_fixedpoint(hypertypes_pool_config.fees),
+    )
 
 
 def fixedpoint_to_pool_config(
@@ -177,44 +251,129 @@ def fixedpoint_to_pool_config(
     PoolConfig
         A dataclass containing the Hyperdrive PoolConfig with types specified by the ABI via Pypechain
     """
-    dict_pool_config = {snake_to_camel(key): value for key, value in asdict(fixedpoint_pool_config).items()}
-    fixedpoint_keys = [
-        "initialSharePrice",
-        "minimumShareReserves",
-        "minimumTransactionAmount",
-        "timeStretch",
-    ]
-    for key in dict_pool_config:
-        if key in fixedpoint_keys:
-            dict_pool_config[key] = dict_pool_config[key].scaled_value
-        elif key == "fees":
-            dict_pool_config[key] = (
-                dict_pool_config[key]["curve"].scaled_value,
-                dict_pool_config[key]["flat"].scaled_value,
-                dict_pool_config[key]["governance_lp"].scaled_value,
-                dict_pool_config[key]["governance_zombie"].scaled_value,
-            )
     return PoolConfig(
-        baseToken=dict_pool_config["baseToken"],
-        linkerFactory=dict_pool_config["linkerFactory"],
-        linkerCodeHash=dict_pool_config["linkerCodeHash"],
-        initialSharePrice=dict_pool_config["initialSharePrice"],
-        minimumShareReserves=dict_pool_config["minimumShareReserves"],
-        minimumTransactionAmount=dict_pool_config["minimumTransactionAmount"],
-        positionDuration=dict_pool_config["positionDuration"],
-        checkpointDuration=dict_pool_config["checkpointDuration"],
-        timeStretch=dict_pool_config["timeStretch"],
-        governance=dict_pool_config["governance"],
-        feeCollector=dict_pool_config["feeCollector"],
-        fees=Fees(
-            curve=dict_pool_config["fees"][0],
-            flat=dict_pool_config["fees"][1],
-            governanceLP=dict_pool_config["fees"][2],
-            governanceZombie=dict_pool_config["fees"][3],
-        ),
+        baseToken=fixedpoint_pool_config.base_token,
+        linkerFactory=fixedpoint_pool_config.linker_factory,
+        linkerCodeHash=fixedpoint_pool_config.linker_code_hash,
+        initialSharePrice=fixedpoint_pool_config.initial_share_price.scaled_value,
+        minimumShareReserves=fixedpoint_pool_config.minimum_share_reserves.scaled_value,
+        minimumTransactionAmount=fixedpoint_pool_config.minimum_transaction_amount.scaled_value,
+        positionDuration=fixedpoint_pool_config.position_duration,
+        checkpointDuration=fixedpoint_pool_config.checkpoint_duration,
+        timeStretch=fixedpoint_pool_config.time_stretch.scaled_value,
+        governance=fixedpoint_pool_config.governance,
+        feeCollector=fixedpoint_pool_config.fee_collector,
+        fees=fixedpoint_to_fees(fixedpoint_pool_config.fees),
     )
 
 
+def market_state_to_fixedpoint(hypertypes_market_state: MarketState) -> MarketStateFP:
+    """Convert the HyperTypes MarketState attribute types from what Solidity returns to FixedPoint.
+
+    Arguments
+    ---------
+    hypertypes_market_state: MarketState
+        The hyperdrive market state.
+
+    Returns
+    -------
+    MarketStateFP
+        A dataclass containing the market state with snake_case attributes and FixedPoint amounts.
+    """
+    return MarketStateFP(
+        share_reserves=FixedPoint(scaled_value=hypertypes_market_state.shareReserves),
+        bond_reserves=FixedPoint(scaled_value=hypertypes_market_state.bondReserves),
+        share_adjustment=FixedPoint(scaled_value=hypertypes_market_state.shareAdjustment),
+        zombie_share_reserves=FixedPoint(scaled_value=hypertypes_market_state.zombieShareReserves),
+        long_exposure=FixedPoint(scaled_value=hypertypes_market_state.longExposure),
+        longs_outstanding=FixedPoint(scaled_value=hypertypes_market_state.longsOutstanding),
+        shorts_outstanding=FixedPoint(scaled_value=hypertypes_market_state.shortsOutstanding),
+        long_average_maturity_time=FixedPoint(scaled_value=hypertypes_market_state.longAverageMaturityTime),
+        short_average_maturity_time=FixedPoint(scaled_value=hypertypes_market_state.shortAverageMaturityTime),
+        is_initialized=hypertypes_market_state.isInitialized,
+        is_paused=hypertypes_market_state.isPaused,
+    )
+
+
+def fixedpoint_to_market_state(fixedpoint_market_state: MarketStateFP) -> MarketState:
+    """Convert the MarketState attribute types from FixedPoint to what the Solidity ABI specifies.
+
+    Arguments
+    ---------
+    fixedpoint_market_state: MarketStateFP
+        The hyperdrive market state in FixedPoint format.
+
+    Returns
+    -------
+    MarketState
+        A dataclass containing the market state with derived types from Pypechain.
+    """
+    return MarketState(
+        shareReserves=fixedpoint_market_state.share_reserves.scaled_value,
+        bondReserves=fixedpoint_market_state.bond_reserves.scaled_value,
+        shareAdjustment=fixedpoint_market_state.share_adjustment.scaled_value,
+        zombieShareReserves=fixedpoint_market_state.zombie_share_reserves.scaled_value,
+        longExposure=fixedpoint_market_state.long_exposure.scaled_value,
+        longsOutstanding=fixedpoint_market_state.longs_outstanding.scaled_value,
+        shortsOutstanding=fixedpoint_market_state.shorts_outstanding.scaled_value,
+        longAverageMaturityTime=fixedpoint_market_state.long_average_maturity_time.scaled_value,
+        shortAverageMaturityTime=fixedpoint_market_state.short_average_maturity_time.scaled_value,
+        isInitialized=fixedpoint_market_state.is_initialized,
+        isPaused=fixedpoint_market_state.is_paused,
+    )
+
+
+def withdraw_pool_to_fixedpoint(hypertypes_withdraw_pool: WithdrawPool) -> WithdrawPoolFP:
+    """Convert the HyperTypes WithdrawPool attribute types from what Solidity returns to FixedPoint.
+
+    Arguments
+    ---------
+    hypertypes_withdraw_pool: WithdrawPool
+        The hyperdrive withdraw pool.
+
+    Returns
+    -------
+    WithdrawPoolFP
+        A dataclass containing the withdraw pool with snake_case attributes and FixedPoint amounts.
+    """
+    return WithdrawPoolFP(
+        ready_to_withdraw=FixedPoint(scaled_value=hypertypes_withdraw_pool.readyToWithdraw),
+        proceeds=FixedPoint(scaled_value=hypertypes_withdraw_pool.proceeds),
+    )
+
+
+def fixedpoint_to_withdraw_pool(fixedpoint_withdraw_pool: WithdrawPoolFP) -> WithdrawPool:
+    """Convert the WithdrawPool attribute types from FixedPoint to what the Solidity ABI specifies.
+
+    Arguments
+    ---------
+    fixedpoint_withdraw_pool: WithdrawPoolFP
+        The hyperdrive withdraw pool in FixedPoint format.
+
+    Returns
+    -------
+    WithdrawPool
+        A dataclass containing the withdraw pool with derived types from Pypechain.
+    """
+    return WithdrawPool(
+        readyToWithdraw=fixedpoint_withdraw_pool.ready_to_withdraw.scaled_value,
+        proceeds=fixedpoint_withdraw_pool.proceeds.scaled_value,
+    )
+
+
+# Converters for the field values of state dataclasses, keyed by the type of the value
+_DICT_VALUE_CONVERTERS: dict[type, Callable[[Any], Any]] = {
+    FixedPoint: lambda val: val.scaled_value,
+    FeesFP: lambda val: (val.curve, val.flat, val.governance_lp, val.governance_zombie),
+    Fees: lambda val: (val.curve, val.flat, val.governanceLP, val.governanceZombie),
+    dict: lambda val: (val["curve"], val["flat"], val["governanceLP"], val["governanceZombie"]),
+    int: lambda val: val,
+    bool: lambda val: val,
+    str: lambda val: val,
+    bytes: lambda val: val,
+}
+
+
 def dataclass_to_dict(
     cls: PoolInfo | PoolInfoFP | PoolConfig | PoolConfigFP | Checkpoint | CheckpointFP,
 ) -> dict[str, Any]:
@@ -230,21 +389,22 @@ def dataclass_to_dict(
     dict[str, Any]
         The corresponding dictionary
     """
+    # We read the attributes directly instead of using `asdict`, which deep copies every value
     out_dict = {}
-    for key, val in asdict(cls).items():
-        match val:
-            case FixedPoint():
-                out_dict[key] = val.scaled_value
-            case FeesFP():
-                out_dict[key] = (val.curve, val.flat, val.governance_lp, val.governance_zombie)
-            case dict():
-                out_dict[key] = (val["curve"], val["flat"], val["governanceLP"], val["governanceZombie"])
-            case int():
-                out_dict[key] = val
-            case str():
-                out_dict[key] = val
-            case bytes():
-                out_dict[key] = val
-            case _:
-                raise TypeError(f"Unsupported type for {key}={val}, with {type(val)=}.")
+    for field in fields(cls):
+        key = field.name
+        val = getattr(cls, key)
+        converter = _get_dict_value_converter(type(val))
+        if converter is None:
+            raise TypeError(f"Unsupported type for {key}={val}, with {type(val)=}.")
+        out_dict[key] = converter(val)
     return out_dict
+
+
+@functools.lru_cache(maxsize=None)
+def _get_dict_value_converter(value_type: type) -> Callable[[Any], Any] | None:
+    """Get the converter for a value type, falling back to its base classes (e.g. for HexBytes)."""
+    for base_type in value_type.__mro__:
+        if base_type in _DICT_VALUE_CONVERTERS:
+            return _DICT_VALUE_CONVERTERS[base_type]
+    return None
@@ -0,0 +1,75 @@
+"""Tests for conversions.py"""
+from __future__ import annotations
+
+from fixedpointmath import FixedPoint
+from hypertypes import Fees, MarketState, PoolConfig, WithdrawPool
+from hypertypes.fixedpoint_types import MarketStateFP, WithdrawPoolFP
+from hypertypes.utilities.conversions import (
+    dataclass_to_dict,
+    fixedpoint_to_market_state,
+    fixedpoint_to_withdraw_pool,
+    market_state_to_fixedpoint,
+    withdraw_pool_to_fixedpoint,
+)
+
+
+def test_market_state_round_trip():
+    """Test converting the market state to FixedPoint and back."""
+    market_state = MarketState(
+        shareReserves=10**24,
+        bondReserves=2 * 10**24,
+        shareAdjustment=-(10**18),
+        zombieShareReserves=3,
+        longExposure=4 * 10**20,
+        longsOutstanding=5 * 10**20,
+        shortsOutstanding=6 * 10**20,
+        longAverageMaturityTime=7 * 10**18,
+        shortAverageMaturityTime=8 * 10**18,
+        isInitialized=True,
+        isPaused=False,
+    )
+    fixedpoint_market_state = market_state_to_fixedpoint(market_state)
+    assert isinstance(fixedpoint_market_state, MarketStateFP)
+    assert fixedpoint_market_state.share_reserves == FixedPoint(1_000_000)
+    assert fixedpoint_market_state.share_adjustment == FixedPoint(-1)
+    assert fixedpoint_market_state.zombie_share_reserves == FixedPoint(scaled_value=3)
+    assert fixedpoint_market_state.is_initialized is True
+    assert fixedpoint_market_state.is_paused is False
+    assert fixedpoint_to_market_state(fixedpoint_market_state) == market_state
+
+
+def test_withdraw_pool_round_trip():
+    """Test converting the withdraw pool to FixedPoint and back."""
+    withdraw_pool = WithdrawPool(readyToWithdraw=10**18, proceeds=2 * 10**18 + 1)
+    fixedpoint_withdraw_pool = withdraw_pool_to_fixedpoint(withdraw_pool)
+    assert isinstance(fixedpoint_withdraw_pool, WithdrawPoolFP)
+    assert fixedpoint_withdraw_pool.ready_to_withdraw == FixedPoint(1)
+    assert fixedpoint_withdraw_pool.proceeds == FixedPoint(scaled_value=2 * 10**18 + 1)
+    assert fixedpoint_to_withdraw_pool(fixedpoint_withdraw_pool) == withdraw_pool
+
+
+def test_dataclass_to_dict():
+    """Test converting structs and FixedPoint dataclasses to dictionaries."""
+    market_state = MarketStateFP(*[FixedPoint(scaled_value=value) for value in range(9)], True, False)
+    market_state_dict = dataclass_to_dict(market_state)  # type: ignore
+    assert market_state_dict["share_reserves"] == 0
+    assert market_state_dict["short_average_maturity_time"] == 8
+    assert market_state_dict["is_initialized"] is True
+    pool_config = PoolConfig(
+        baseToken="0x0000000000000000000000000000000000000001",
+        linkerFactory="0x0000000000000000000000000000000000000002",
+        linkerCodeHash=b"\x01" * 32,
+        initialSharePrice=10**18,
+        minimumShareReserves=10**15,
+        minimumTransactionAmount=10**15,
+        positionDuration=604800,
+        checkpointDuration=3600,
+        timeStretch=10**17,
+        governance="0x0000000000000000000000000000000000000003",
+        feeCollector="0x0000000000000000000000000000000000000004",
+        fees=Fees(curve=1, flat=2, governanceLP=3, governanceZombie=4),
+    )
+    pool_config_dict = dataclass_to_dict(pool_config)
+    assert pool_config_dict["linkerCodeHash"] == b"\x01" * 32
+    assert pool_config_dict["initialSharePrice"] == 10**18
+    assert pool_config_dict["fees"] == (1, 2, 3, 4)